@@ -4,7 +4,7 @@ Oddupiacz - A global pre-commit hook to check for forbidden words in git changes
 
 __version__ = "0.0.0"
 
-from .checker import parse_diff_for_violations
+from .checker import parse_diff_for_violations, Scanner
 from .config import CannotLoadConfigError, Config, load_config
 from .formatters import format_violation_message
 from .git_utils import find_local_hook_path, get_git_diff, get_repo_name, run_local_hook_if_exists
@@ -13,6 +13,7 @@ from .models import InstallationResult, InstallationSettings, UninstallationResu
 
 __all__ = [
     "parse_diff_for_violations",
+    "Scanner",
     "Violation",
     "load_config",
     "Config",
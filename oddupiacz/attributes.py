@@ -0,0 +1,156 @@
+"""
+Files skipped because `.gitattributes` marks them generated, vendored or `oddupiacz=skip`.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from .overlay import file_fingerprint, Fingerprint
+
+SKIP_ATTRIBUTES = ("linguist-generated", "linguist-vendored")
+ODDUPIACZ_ATTRIBUTE = "oddupiacz"
+SKIP_VALUE = "skip"
+ATTRIBUTES_FILE_NAME = ".gitattributes"
+CACHE_FILE_NAME = "attributes.json"
+CACHE_FORMAT_VERSION = 1
+MAX_CACHED_PATHS = 100_000
+
+
+def _marks_skip(attribute: str, value: str) -> bool:
+    """Check whether an attribute value from `git check-attr` marks a file as skipped."""
+    if attribute == ODDUPIACZ_ATTRIBUTE:
+        return value == SKIP_VALUE
+    return value in ("set", "true")
+
+
+def check_skip_attributes(repo_root: Path, paths: list[str]) -> dict[str, str]:
+    """
+    Look up the skip attributes of files with a single `git check-attr --stdin -z` call.
+
+    Args:
+        repo_root: Working tree root of the repository
+        paths: Repository-relative file paths
+
+    Returns:
+        Mapping of each skipped path to the attribute that marks it
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+    """
+    if not paths:
+        return {}
+
+    result = subprocess.run(  # noqa: S603
+        ["git", "-C", str(repo_root), "check-attr", "-z", "--stdin", *SKIP_ATTRIBUTES, ODDUPIACZ_ATTRIBUTE],  # noqa: S607
+        input="".join(f"{path}\0" for path in paths),
+        capture_output=True,
+        text=True,
+        errors="replace",
+        check=True,
+    )
+    fields = result.stdout.split("\0")
+    skipped: dict[str, str] = {}
+    for index in range(0, len(fields) - 2, 3):
+        path, attribute, value = fields[index : index + 3]
+        if _marks_skip(attribute, value):
+            skipped.setdefault(path, attribute)
+    return skipped
+
+
+def _is_entry(entry: object, key: str) -> bool:
+    """Check whether a cache entry is a `[key, attribute]` pair for the given key."""
+    return isinstance(entry, list) and len(entry) == 2 and entry[0] == key and isinstance(entry[1], str)
+
+
+class AttributeCache:
+    """
+    Skip attributes of files cached across runs in the repository's git directory.
+
+    Each cached path is keyed by the stat fingerprints of the attribute files that apply to it:
+    `.gitattributes` in the root and in each of its parent directories, `info/attributes` and the
+    user's global attributes file. Editing one of them invalidates only the paths below it.
+    """
+
+    def __init__(self, repo_root: Path, git_common_dir: Path) -> None:
+        self.repo_root = repo_root
+        self.cache_path = git_common_dir / "oddupiacz" / CACHE_FILE_NAME
+        config_home = Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config")
+        self._global_fingerprints = (
+            file_fingerprint(git_common_dir / "info" / "attributes"),
+            file_fingerprint(config_home / "git" / "attributes"),
+        )
+        self._directory_fingerprints: dict[str, tuple[Fingerprint, ...]] = {}
+
+    def _fingerprints(self, directory: str) -> tuple[Fingerprint, ...]:
+        """Fingerprints of the `.gitattributes` files of a directory and all of its parents."""
+        fingerprints = self._directory_fingerprints.get(directory)
+        if fingerprints is None:
+            parent = directory.rpartition("/")[0] if directory else None
+            own = file_fingerprint(self.repo_root / directory / ATTRIBUTES_FILE_NAME)
+            fingerprints = (*(self._fingerprints(parent) if parent is not None else ()), own)
+            self._directory_fingerprints[directory] = fingerprints
+        return fingerprints
+
+    def _key(self, path: str) -> str:
+        """Cache key of a path: a digest of the fingerprints of every attribute file that applies to it."""
+        directory = path.rpartition("/")[0]
+        fingerprints = (*self._global_fingerprints, *self._fingerprints(directory))
+        return hashlib.blake2b(repr(fingerprints).encode(), digest_size=8).hexdigest()
+
+    def _read(self) -> dict[str, list[str]]:
+        """Read the cached entries; an unreadable or outdated cache is treated as empty."""
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_FORMAT_VERSION:
+            return {}
+        entries = data.get("paths")
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries: dict[str, list[str]]) -> None:
+        """Atomically replace the cache; failures only cost a `git check-attr` call on the next run."""
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".attributes-", dir=self.cache_path.parent)
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_FORMAT_VERSION, "paths": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+
+    def find_skipped(self, paths: list[str]) -> dict[str, str]:
+        """
+        Find the files marked as skipped, asking git only about paths without a current cache entry.
+
+        Args:
+            paths: Repository-relative file paths
+
+        Returns:
+            Mapping of each skipped path to the attribute that marks it
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        entries = self._read()
+        keys = {path: self._key(path) for path in paths}
+        hits = {path: entries[path][1] for path, key in keys.items() if _is_entry(entries.get(path), key)}
+        misses = [path for path in keys if path not in hits]
+        if misses:
+            checked = check_skip_attributes(self.repo_root, misses)
+            if len(entries) + len(misses) > MAX_CACHED_PATHS:
+                entries = {}
+            for path in misses:
+                hits[path] = checked.get(path, "")
+                entries[path] = [keys[path], hits[path]]
+            self._write(entries)
+
+        return {path: attribute for path, attribute in hits.items() if attribute}
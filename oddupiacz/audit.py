@@ -0,0 +1,56 @@
+"""
+Audit log for audit-only forbidden phrase matches.
+"""
+
+import json
+from datetime import datetime, UTC
+from pathlib import Path
+
+from .config import Config
+from .models import Violation
+
+AUDIT_LOG_FILE_NAME = "audit.jsonl"
+
+
+def get_audit_log_path(config: Config) -> Path:
+    """
+    Get the audit log path: `audit_log` from the config, or a file in the hooks directory.
+
+    Args:
+        config: Configuration with the hooks directory and optional audit log path
+
+    Returns:
+        Path to the audit log
+    """
+    return config.audit_log if config.audit_log is not None else config.hooks_dir / AUDIT_LOG_FILE_NAME
+
+
+def append_audit_log(violations: list[Violation], log_path: Path, repo_name: str | None) -> None:
+    """
+    Append audit-only matches to the audit log, one JSON object per line.
+
+    Args:
+        violations: Audit-only violations to record
+        log_path: Path to the audit log
+        repo_name: Name of the repository the commit is made in, if known
+
+    Raises:
+        OSError: If the audit log cannot be written
+    """
+    if not violations:
+        return
+
+    timestamp = datetime.now(UTC).isoformat(timespec="seconds")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as f:
+        for violation in violations:
+            record = {
+                "timestamp": timestamp,
+                "repo": repo_name,
+                "file": violation.file,
+                "phrase": violation.phrase,
+                "line": violation.line,
+            }
+            if violation.detector is not None:
+                record["detector"] = violation.detector
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,124 @@
+"""
+Background full scans of files deferred by the commit latency budget.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .audit import append_audit_log, get_audit_log_path
+from .baseline import load_repo_baseline
+from .checker import scan_file_diffs, split_diff_by_file
+from .detectors import load_detectors
+from .formatters import format_background_report
+from .git_utils import get_git_common_dir, get_repo_dirs
+from .models import FileDiff, Severity, Violation
+from .overlay import load_merged_config
+
+REPORT_FILE_NAME = "background-report.txt"
+
+
+def get_background_report_path() -> Path:
+    """
+    Get the path of the background scan report for the current repository.
+
+    Returns:
+        Path inside the git directory, or inside the temp directory if not in a git repo
+    """
+    git_common_dir = get_git_common_dir()
+    base_dir = git_common_dir if git_common_dir is not None else Path(tempfile.gettempdir())
+    return (base_dir / "oddupiacz" / REPORT_FILE_NAME).absolute()
+
+
+def write_deferred_diff(deferred_files: list[FileDiff], directory: Path) -> Path:
+    """
+    Write deferred file sections to a diff file for the background scan.
+
+    Args:
+        deferred_files: File sections that were not scanned
+        directory: Directory to write the diff file to
+
+    Returns:
+        Path to the written diff file
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, diff_path = tempfile.mkstemp(prefix="deferred-", suffix=".diff", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for file_diff in deferred_files:
+            f.write(file_diff.to_diff_text())
+    return Path(diff_path)
+
+
+def spawn_background_scan(deferred_files: list[FileDiff], config_path: Path, report_path: Path) -> None:
+    """
+    Start a detached process that fully scans deferred files and writes a report.
+
+    Args:
+        deferred_files: File sections that were not scanned within the budget
+        config_path: Path to the config file used by the hook
+        report_path: Path where the report will be written
+    """
+    diff_path = write_deferred_diff(deferred_files, report_path.parent)
+    subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "oddupiacz.cli_background_scan",
+            "--config",
+            str(config_path),
+            "--diff",
+            str(diff_path),
+            "--report",
+            str(report_path),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def run_background_scan(diff_path: Path, config_path: Path, report_path: Path) -> list[Violation]:
+    """
+    Fully scan a deferred diff file with the merged global and repository config, write the report
+    and remove the diff file.
+
+    Blocking and warning matches go to the report; audit-only matches go to the audit log.
+    Violations recorded in the repository's baseline are dropped.
+
+    Args:
+        diff_path: Path to the deferred diff file
+        config_path: Path to the config file
+        report_path: Path where the report will be written
+
+    Returns:
+        List of Violation objects found in the deferred files (all severities)
+
+    Raises:
+        CannotLoadConfigError: If the config cannot be loaded
+    """
+    repo_dirs = get_repo_dirs()
+    merged_config = load_merged_config(config_path, repo_dirs)
+    baseline = load_repo_baseline(repo_dirs[0]) if repo_dirs is not None else None
+    config = merged_config.config
+    diff_content = diff_path.read_text(encoding="utf-8")
+    file_diffs = list(split_diff_by_file(diff_content))
+    detectors = load_detectors(config.detectors)
+    violations = scan_file_diffs(
+        file_diffs, config, resolver=merged_config.resolver, detectors=detectors, baseline=baseline
+    ).violations
+    reported = [violation for violation in violations if violation.severity is not Severity.AUDIT]
+    audits = [violation for violation in violations if violation.severity is Severity.AUDIT]
+    if audits:
+        repo_name = repo_dirs[0].name if repo_dirs is not None else None
+        append_audit_log(audits, get_audit_log_path(config), repo_name)
+
+    scanned_files = [line[6:] for line in diff_content.splitlines() if line.startswith("+++ b/")]
+    tmp_report_path = report_path.with_suffix(".tmp")
+    tmp_report_path.write_text(format_background_report(reported, scanned_files) + "\n", encoding="utf-8")
+    tmp_report_path.replace(report_path)
+    diff_path.unlink()
+
+    return violations
@@ -0,0 +1,177 @@
+"""
+Baseline of known violations, stored as sorted fingerprints, so scans report only new ones.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+
+from .config import CannotLoadConfigError
+from .models import Violation
+
+BASELINE_FILE_NAME = ".oddupiacz-baseline"
+MAGIC = b"ODDUBSL\0"
+FORMAT_VERSION = 1
+# magic, format version, fingerprint count
+HEADER = struct.Struct("<8sII")
+FINGERPRINT_BYTES = 8
+
+
+def normalize_line(line: str) -> str:
+    """
+    Normalize a line for fingerprinting: whitespace runs collapse to one space, so reindenting
+    or reformatting spacing does not turn a known violation into a new one.
+
+    Args:
+        line: Line content
+
+    Returns:
+        Normalized line
+    """
+    return " ".join(line.split())
+
+
+def violation_fingerprint(violation: Violation) -> int:
+    """
+    Fingerprint a violation by its file, normalized line and phrase, but not its line number,
+    so it stays the same when unrelated lines are added or removed around it.
+
+    Args:
+        violation: Violation to fingerprint
+
+    Returns:
+        64-bit fingerprint
+    """
+    key = f"{violation.file}\0{normalize_line(violation.line)}\0{violation.phrase}"
+    digest = hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=FINGERPRINT_BYTES).digest()
+    return int.from_bytes(digest, "little")
+
+
+class Baseline:
+    """Set of known violation fingerprints with constant-time lookups."""
+
+    def __init__(self, fingerprints: Iterable[int]) -> None:
+        self._fingerprints = frozenset(fingerprints)
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def __or__(self, other: "Baseline") -> "Baseline":
+        return Baseline(self._fingerprints | other._fingerprints)
+
+    def __contains__(self, violation: Violation) -> bool:
+        return violation_fingerprint(violation) in self._fingerprints
+
+    def filter(self, violations: list[Violation]) -> list[Violation]:
+        """
+        Drop known violations.
+
+        Args:
+            violations: Violations found by a scan
+
+        Returns:
+            Violations whose fingerprints are not in the baseline, in their original order
+        """
+        if not self._fingerprints:
+            return violations
+        return [violation for violation in violations if violation not in self]
+
+
+def write_baseline(violations: Iterable[Violation], baseline_path: Path) -> int:
+    """
+    Write the fingerprints of violations to a baseline file, sorted and without duplicates.
+
+    Args:
+        violations: Violations to record as known
+        baseline_path: Path of the baseline file
+
+    Returns:
+        Number of fingerprints written
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    fingerprints = array("Q", sorted({violation_fingerprint(violation) for violation in violations}))
+    if sys.byteorder != "little":
+        fingerprints.byteswap()
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{baseline_path.name}-", dir=baseline_path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(fingerprints)))
+            f.write(fingerprints.tobytes())
+        os.replace(tmp_path, baseline_path)
+    except OSError:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return len(fingerprints)
+
+
+def load_baseline(baseline_path: Path) -> Baseline | None:
+    """
+    Load a baseline file.
+
+    Args:
+        baseline_path: Path of the baseline file
+
+    Returns:
+        Baseline, or None if the file doesn't exist
+
+    Raises:
+        CannotLoadConfigError: If the file cannot be read or is not a valid baseline
+    """
+    try:
+        data = baseline_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        raise CannotLoadConfigError from exc
+    return parse_baseline(data, str(baseline_path))
+
+
+def parse_baseline(data: bytes, name: str) -> Baseline:
+    """
+    Parse the content of a baseline file.
+
+    Args:
+        data: Content of the baseline file
+        name: Name of the baseline for error messages (its path, or the revision it was read from)
+
+    Returns:
+        Baseline
+
+    Raises:
+        CannotLoadConfigError: If the content is not a valid baseline
+    """
+    if len(data) < HEADER.size:
+        raise CannotLoadConfigError(f"Invalid baseline file: {name}")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or len(data) != HEADER.size + count * FINGERPRINT_BYTES:
+        raise CannotLoadConfigError(f"Invalid baseline file: {name}")
+
+    fingerprints = array("Q")
+    fingerprints.frombytes(data[HEADER.size :])
+    if sys.byteorder != "little":
+        fingerprints.byteswap()
+    return Baseline(fingerprints)
+
+
+def load_repo_baseline(repo_root: Path) -> Baseline | None:
+    """
+    Load the baseline committed at the root of a repository.
+
+    Args:
+        repo_root: Working tree root of the repository
+
+    Returns:
+        Baseline, or None if the repository has none
+
+    Raises:
+        CannotLoadConfigError: If the baseline cannot be read or is invalid
+    """
+    return load_baseline(repo_root / BASELINE_FILE_NAME)
@@ -0,0 +1,43 @@
+"""
+Commit latency budget enforcement.
+"""
+
+import threading
+import time
+
+WATCHDOG_HEADROOM = 0.8
+
+
+class Watchdog:
+    """
+    Flags a time budget as nearly exhausted from a background timer.
+
+    The flag is raised once `headroom` of the budget has elapsed, leaving the rest
+    of the budget for the scanner to finish with a cheaper plan.
+    """
+
+    def __init__(self, budget_seconds: float, started_at: float | None = None, headroom: float = WATCHDOG_HEADROOM):
+        self.budget_seconds = budget_seconds
+        self.started_at = time.monotonic() if started_at is None else started_at
+        self._expired = threading.Event()
+        delay = max(0.0, budget_seconds * headroom - (time.monotonic() - self.started_at))
+        self._timer = threading.Timer(delay, self._expired.set)
+        self._timer.daemon = True
+
+    @property
+    def expired(self) -> bool:
+        """Whether the scan is about to exceed the budget."""
+        return self._expired.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds elapsed since the budget started."""
+        return time.monotonic() - self.started_at
+
+    def start(self) -> None:
+        """Start the background timer."""
+        self._timer.start()
+
+    def stop(self) -> None:
+        """Stop the background timer if it has not fired yet."""
+        self._timer.cancel()
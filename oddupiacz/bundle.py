@@ -0,0 +1,105 @@
+"""
+Single-file zipapp of the pre-commit hook, with its dependencies and precompiled bytecode.
+
+The bundle is built by the Python executable that runs the hook (`python -m oddupiacz.bundle
+<output>`), so it holds the packages that interpreter imports and bytecode for its version.
+"""
+
+import importlib
+import importlib.util
+import marshal
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+HOOK_MODULE = "oddupiacz.cli_hook"
+# Hash-based pyc that is never checked against its source: the bundle is rebuilt with its sources
+UNCHECKED_HASH_PYC_FLAGS = 0b01
+# Keeps typer from importing rich (and its dependencies) to format errors, so they need not be bundled
+BUNDLE_MAIN = f"""import os
+
+os.environ.setdefault("TYPER_USE_RICH", "0")
+
+from {HOOK_MODULE} import app
+
+if __name__ == "__main__":
+    app()
+"""
+# Modification time of the files in the bundle; hash-based bytecode doesn't depend on it
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def find_hook_packages() -> dict[str, Path]:
+    """
+    Import the hook and find the non-standard-library packages it loaded.
+
+    Returns:
+        Top-level package or module name mapped to its directory (or file, for a module)
+    """
+    os.environ.setdefault("TYPER_USE_RICH", "0")
+    importlib.import_module(HOOK_MODULE)
+
+    stdlib = sys.stdlib_module_names | set(sys.builtin_module_names)
+    packages = {}
+    for name in sorted({name.partition(".")[0] for name in sys.modules} - stdlib):
+        file = getattr(sys.modules.get(name), "__file__", None)
+        if name.startswith("__") or file is None or not file.endswith(".py"):
+            # The running script, namespace packages and extension modules (optional speedups, like yaml's)
+            continue
+        path = Path(file)
+        packages[name] = path.parent if path.name == "__init__.py" else path
+    return packages
+
+
+def compile_pyc(source: bytes, filename: str) -> bytes:
+    """
+    Compile a module to the contents of an unchecked hash-based `.pyc` file.
+
+    Args:
+        source: Module source
+        filename: Path of the source as it is imported, shown in tracebacks
+
+    Returns:
+        Contents of the `.pyc` file
+    """
+    code = compile(source, filename, "exec", dont_inherit=True)
+    return (
+        importlib.util.MAGIC_NUMBER
+        + UNCHECKED_HASH_PYC_FLAGS.to_bytes(4, "little")
+        + importlib.util.source_hash(source)
+        + marshal.dumps(code)
+    )
+
+
+def write_bundle(output: Path) -> None:
+    """
+    Write the zipapp of the hook: the sources of the packages it imports, each with its bytecode.
+
+    The archive is written next to the output and moved over it, so a running hook never reads a
+    partially written bundle.
+
+    Args:
+        output: Path of the `.pyz` file
+    """
+    files = {"__main__.py": BUNDLE_MAIN.encode()}
+    for name, path in find_hook_packages().items():
+        if path.is_file():
+            files[path.name] = path.read_bytes()
+            continue
+        for module in sorted(path.rglob("*.py")):
+            files[f"{name}/{module.relative_to(path).as_posix()}"] = module.read_bytes()
+
+    partial = output.with_name(f".{output.name}.tmp")
+    with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for archive_path, source in sorted(files.items()):
+            pyc = compile_pyc(source, str(output / archive_path))
+            for entry, data in [(archive_path, source), (f"{archive_path}c", pyc)]:
+                info = zipfile.ZipInfo(entry, date_time=ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                bundle.writestr(info, data)
+    partial.replace(output)
+
+
+if __name__ == "__main__":
+    write_bundle(Path(sys.argv[1]))
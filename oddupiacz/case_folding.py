@@ -0,0 +1,79 @@
+"""
+Case-insensitive character equivalence, following regex IGNORECASE.
+
+Forbidden phrases are matched with `re.IGNORECASE`, which treats some characters as equal that
+`str.lower` keeps apart (`ſ` and `s`, the Kelvin sign and `k`, `ς` and `σ`, `İ` and `i`). Wordlists,
+hashed phrases and safe patterns fold case with these helpers so they match exactly the same text.
+"""
+
+import re
+from functools import lru_cache
+
+# Characters with a multi-character uppercase that regex IGNORECASE still treats as equal (see re._casefix)
+EXTRA_CASE_FOLDS = {"\u1fd3": "\u0390", "\u1fe3": "\u03b0", "\ufb05": "\ufb06"}
+# Characters that are not the uppercase or titlecase of the character they fold to, so they
+# cannot be derived from it (checked against every code point in the tests)
+UNDERIVABLE_CASE_VARIANTS = (
+    "\u00b5\u0130\u0131\u017f\u0345\u03c2\u03d0\u03d1"
+    "\u03d5\u03d6\u03f0\u03f1\u03f4\u03f5\u1c80\u1c81"
+    "\u1c82\u1c83\u1c84\u1c85\u1c86\u1c87\u1c88\u1e9b"
+    "\u1e9e\u1fbe\u1fd3\u1fe3\u2126\u212a\u212b\ufb05"
+)
+
+
+def fold_case(text: str) -> str:
+    """
+    Fold the case of text like regex IGNORECASE, without changing its length, so match offsets stay valid.
+
+    Args:
+        text: Text to fold
+
+    Returns:
+        Folded text of the same length, where characters equal under regex IGNORECASE are the same
+    """
+    folded = text.lower()
+    if text.isascii():
+        return folded
+    # Most lines are folded by str.lower already; the rest (like ſ, ς or ß) are folded character by character
+    if len(folded) == len(text) and "\u03c2" not in folded and folded.upper().lower() == folded:
+        return folded
+    return text.translate(_CASE_FOLDS)
+
+
+@lru_cache(maxsize=4096)
+def case_variants(char: str) -> frozenset[str]:
+    """
+    Get every character that regex IGNORECASE treats as equal to a character.
+
+    Args:
+        char: Character
+
+    Returns:
+        Set of case variants, including the character itself
+    """
+    folded = fold_char(char)
+    candidates = {char, folded, folded.upper(), folded.title()}
+    candidates.update(variant for variant in UNDERIVABLE_CASE_VARIANTS if fold_char(variant) == folded)
+    return frozenset(candidate for candidate in candidates if len(candidate) == 1 and fold_char(candidate) == folded)
+
+
+def fold_char(char: str) -> str:
+    """Fold a single character like regex IGNORECASE (see `fold_case`)."""
+    if char in EXTRA_CASE_FOLDS:
+        return EXTRA_CASE_FOLDS[char]
+    upper = char.upper()
+    folded = upper.lower() if len(upper) == 1 else char.lower()
+    if len(folded) == 1:
+        return folded
+    return folded[0] if re.fullmatch(re.escape(folded[0]), char, re.IGNORECASE) else char
+
+
+class _CaseFoldTable(dict[int, str]):
+    """A `str.translate` table folding each character like regex IGNORECASE, filled in as characters are seen."""
+
+    def __missing__(self, code: int) -> str:
+        folded = self[code] = fold_char(chr(code))
+        return folded
+
+
+_CASE_FOLDS = _CaseFoldTable()
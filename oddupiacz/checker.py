@@ -3,39 +3,808 @@ Core logic for parsing git diffs and detecting violations.
 """
 
 import re
+import string
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future
+from dataclasses import replace
+from functools import lru_cache
+from pathlib import Path
+from typing import TextIO, TypeGuard
 
-from .config import Config
-from .models import Violation
+from .baseline import Baseline
+from .budget import Watchdog
+from .config import CannotLoadConfigError, Config, pattern_source, rule_severity
+from .detectors import DetectorRunner
+from .exclusions import ExclusionClassifier
+from .hashed_phrases import HashedPhraseMatcher
+from .models import FileDiff, HashedPhrases, PatternRule, PhraseRule, ScanPlan, ScanResult, Severity, Violation
+from .notebooks import NOTEBOOK_EXTENSION, notebook_source_lines
+from .rule_sets import RuleSetIndex
+from .safe_regex import compile_safe_patterns
+from .wordlists import compile_phrase_files, PhraseAutomaton, sources_digest
 
+UNKNOWN_FILE = "unknown_file"
+WATCHDOG_CHECK_INTERVAL = 1024
+HUNK_HEADER_REGEX = re.compile(r"@@ -\d+(?:,\d+)? \+(\d+)")
+CONTENT_HANDLERS: dict[str, Callable[[list[str]], list[str]]] = {NOTEBOOK_EXTENSION: notebook_source_lines}
+WORD_START = r"(?<!\w)"
+WORD_END = r"(?!\w)"
+TOKEN_REGEX = re.compile(r"\w+")
+WORDLIST_CACHE_DIR_NAME = "wordlists"
+SCANNER_CACHE_SIZE = 16
 
-def parse_diff_for_violations(diff_content: str, config: Config) -> list[Violation]:
+SEVERITY_ORDER = tuple(Severity)
+
+MatcherRules = tuple[tuple[str | PhraseRule, ...], tuple[str | PatternRule, ...], Path | None, HashedPhrases | None]
+
+
+def phrase_regex_source(entry: str | PhraseRule) -> str:
     """
-    Parse git diff output and find forbidden phrases in added lines.
+    Build the regex source for a single forbidden phrase entry.
+
+    Match options become part of the alternative itself: `case_sensitive` scopes the
+    IGNORECASE flag off, and `whole_word`/`prefix`/`suffix` add single-character word
+    boundary assertions on the sides of the phrase that start or end with a word character.
 
     Args:
-        diff_content: Git diff output (unified format)
-        config: Configuration with forbidden phrases
+        entry: Plain phrase or PhraseRule
 
     Returns:
-        List of Violation objects
+        Regex source matching the entry
     """
-    if not config.forbidden_phrases:
-        return []
+    if isinstance(entry, str):
+        return re.escape(entry)
 
-    pattern_str = "|".join(map(re.escape, config.forbidden_phrases))
-    regex = re.compile(pattern_str, re.IGNORECASE)
-    violations = []
-    current_file = "unknown_file"
+    source = re.escape(entry.phrase)
+    if (entry.whole_word or entry.prefix) and re.match(r"\w", entry.phrase):
+        source = WORD_START + source
+    if (entry.whole_word or entry.suffix) and re.search(r"\w$", entry.phrase):
+        source += WORD_END
+    return f"(?-i:{source})" if entry.case_sensitive else source
+
+
+def phrases_regex_source(forbidden_phrases: tuple[str | PhraseRule, ...]) -> str:
+    """
+    Build the combined regex source for forbidden phrases.
+
+    When phrases have different severities, the alternatives of each severity are wrapped
+    in a group named after it, most severe first, so a match is tagged by `Match.lastgroup`
+    and a more severe phrase wins when several match at the same position.
+
+    Args:
+        forbidden_phrases: Phrases (plain strings or PhraseRules with match options) to search for
+
+    Returns:
+        Regex source matching any of the phrases
+    """
+    severities = [
+        severity for severity in SEVERITY_ORDER if any(rule_severity(e) is severity for e in forbidden_phrases)
+    ]
+    if len(severities) <= 1:
+        return "|".join(map(phrase_regex_source, forbidden_phrases))
+
+    groups = []
+    for severity in severities:
+        sources = [phrase_regex_source(entry) for entry in forbidden_phrases if rule_severity(entry) is severity]
+        groups.append(f"(?P<{severity.value}>{'|'.join(sources)})")
+    return "|".join(groups)
+
+
+@lru_cache(maxsize=16)
+def compile_phrases_regex(forbidden_phrases: tuple[str | PhraseRule, ...]) -> re.Pattern[str]:
+    """
+    Compile forbidden phrases into a single case-insensitive regex (see `phrases_regex_source`).
+
+    Args:
+        forbidden_phrases: Phrases (plain strings or PhraseRules with match options) to search for
+
+    Returns:
+        Compiled regex matching any of the phrases
+    """
+    return re.compile(phrases_regex_source(forbidden_phrases), re.IGNORECASE)
+
+
+@lru_cache(maxsize=16)
+def compile_ascii_phrases_regex(
+    forbidden_phrases: tuple[str | PhraseRule, ...],
+) -> tuple[re.Pattern[str], bool] | None:
+    """
+    Compile ASCII-only forbidden phrases into a regex for ASCII lines.
+
+    On ASCII text, Unicode case-insensitive matching is the same as comparing lowercased text,
+    so the phrases are lowercased and matched without IGNORECASE against the lowercased line.
+    When an entry is `case_sensitive`, the line cannot be lowercased, and ASCII-only
+    IGNORECASE is used instead. Both keep the offsets of the original line.
+
+    Args:
+        forbidden_phrases: Phrases (plain strings or PhraseRules with match options) to search for
+
+    Returns:
+        Tuple of the compiled regex and whether lines must be lowercased before matching,
+        or None if a phrase contains non-ASCII characters
+    """
+    if not all((entry if isinstance(entry, str) else entry.phrase).isascii() for entry in forbidden_phrases):
+        return None
+    if any(isinstance(entry, PhraseRule) and entry.case_sensitive for entry in forbidden_phrases):
+        return re.compile(phrases_regex_source(forbidden_phrases), re.IGNORECASE | re.ASCII), False
+
+    lowered = tuple(
+        entry.lower() if isinstance(entry, str) else replace(entry, phrase=entry.phrase.lower())
+        for entry in forbidden_phrases
+    )
+    return re.compile(phrases_regex_source(lowered), re.ASCII), True
+
+
+def is_token_phrase(entry: str | PhraseRule) -> TypeGuard[PhraseRule]:
+    """
+    Check whether a phrase entry can be matched by token lookup: a whole-word ASCII identifier.
+
+    Args:
+        entry: Plain phrase or PhraseRule
+
+    Returns:
+        True if the entry is a `whole_word` PhraseRule consisting only of ASCII word characters
+    """
+    return (
+        isinstance(entry, PhraseRule)
+        and entry.whole_word
+        and entry.phrase.isascii()
+        and TOKEN_REGEX.fullmatch(entry.phrase) is not None
+    )
+
+
+@lru_cache(maxsize=4096)
+def _ascii_equivalent(char: str) -> str | None:
+    """Find the lowercase ASCII letter a non-ASCII character matches case-insensitively (like the Kelvin sign)."""
+    for letter in string.ascii_lowercase:
+        if re.fullmatch(letter, char, re.IGNORECASE):
+            return letter
+    return None
+
+
+class TokenMatcher:
+    """
+    Finds whole-word identifier phrases by looking up the line's word tokens in hash tables.
+
+    A whole-word match of an identifier is exactly a `\\w+` token equal to it, so the cost per
+    line depends on the number of tokens and not on the number of phrases. Lines without any
+    forbidden token are rejected with one set-disjointness check, without a Python-level loop.
+    """
+
+    def __init__(self, entries: list[tuple[int, PhraseRule]]) -> None:
+        self._folded: dict[str, tuple[int, int]] = {}
+        self._exact: dict[str, tuple[int, int]] = {}
+        for priority, entry in entries:
+            table, key = (self._exact, entry.phrase) if entry.case_sensitive else (self._folded, entry.phrase.lower())
+            rank = (SEVERITY_ORDER.index(entry.severity), priority)
+            if key not in table or rank < table[key]:
+                table[key] = rank
+
+    def find_all(self, content: str) -> list[tuple[int, int, int, str]]:
+        """
+        Find every forbidden token in a line.
+
+        Args:
+            content: Line content
+
+        Returns:
+            List of (start, severity rank, priority, token) tuples in line order, where a lower severity
+            rank is more severe and a lower priority means the phrase is listed earlier
+        """
+        if (
+            content.isascii()
+            and self._folded.keys().isdisjoint(TOKEN_REGEX.findall(content.lower()))
+            and self._exact.keys().isdisjoint(TOKEN_REGEX.findall(content))
+        ):
+            return []
+
+        hits = []
+        for match in TOKEN_REGEX.finditer(content):
+            token = match.group()
+            ranks = [rank for rank in (self._exact.get(token), self._lookup_folded(token)) if rank is not None]
+            if ranks:
+                hits.append((match.start(), *min(ranks), token))
+        return hits
+
+    def _lookup_folded(self, token: str) -> tuple[int, int] | None:
+        if token.isascii():
+            return self._folded.get(token.lower())
+        # Regex case-insensitive matching also treats a few non-ASCII letters as ASCII ones.
+        letters = []
+        for char in token:
+            letter = char.lower() if char.isascii() else _ascii_equivalent(char)
+            if letter is None:
+                return None
+            letters.append(letter)
+        return self._folded.get("".join(letters))
+
+
+class LineMatcher:
+    """Finds the first forbidden phrase or forbidden pattern match of each severity in a line."""
+
+    def __init__(
+        self,
+        phrases: tuple[str | PhraseRule, ...],
+        patterns: tuple[str | PatternRule, ...] = (),
+        wordlist: Path | None = None,
+        hashed_phrases: HashedPhrases | None = None,
+    ) -> None:
+        token_entries = [(priority, entry) for priority, entry in enumerate(phrases) if is_token_phrase(entry)]
+        regex_phrases = tuple(entry for entry in phrases if not is_token_phrase(entry))
+        self._tokens = TokenMatcher(token_entries) if token_entries else None
+        self._regex = compile_phrases_regex(regex_phrases) if regex_phrases else None
+        self._ascii_regex = compile_ascii_phrases_regex(regex_phrases) if regex_phrases else None
+        self._regex_severity = rule_severity(regex_phrases[0]) if regex_phrases else Severity.BLOCK
+        self._regex_priorities: dict[str, int] = {}
+        for priority, entry in enumerate(phrases):
+            if not is_token_phrase(entry):
+                phrase = entry if isinstance(entry, str) else entry.phrase
+                self._regex_priorities.setdefault(phrase.lower(), priority)
+        self._phrase_severities = {rule_severity(entry) for entry in phrases}
+        self._blocking_searches: list[Callable[[str], tuple[int, int] | None]] = []
+        if wordlist is not None:
+            self._blocking_searches.append(PhraseAutomaton(wordlist).search)
+        if hashed_phrases is not None:
+            self._blocking_searches.append(HashedPhraseMatcher(hashed_phrases).search)
+        self._patterns = None
+        if patterns:
+            sources = tuple(pattern_source(entry) for entry in patterns)
+            groups = tuple(SEVERITY_ORDER.index(rule_severity(entry)) for entry in patterns)
+            self._patterns = compile_safe_patterns(sources, groups)
+
+    def find(self, content: str) -> list[tuple[Severity, str]]:
+        """
+        Find the first (leftmost) forbidden match of each severity in a line.
+
+        Phrases and patterns of all severities are matched by one combined regex and one
+        set of pattern automata, so additional severities do not add passes over the line.
+
+        Args:
+            content: Line content
+
+        Returns:
+            List of (severity, matched text) tuples, most severe first
+        """
+        found: dict[Severity, tuple[int, str]] = {}
+
+        if self._regex is not None or self._tokens is not None:
+            self._find_phrases(content, found)
+
+        for search in self._blocking_searches:
+            span = search(content)
+            if span is not None and (Severity.BLOCK not in found or span[0] < found[Severity.BLOCK][0]):
+                found[Severity.BLOCK] = (span[0], content[span[0] : span[1]])
+
+        if self._patterns is not None:
+            for group, pattern_match in self._patterns.search_groups(content).items():
+                severity = SEVERITY_ORDER[group]
+                if severity not in found or pattern_match.start < found[severity][0]:
+                    found[severity] = (pattern_match.start, content[pattern_match.start : pattern_match.end])
+
+        return [(severity, found[severity][1]) for severity in SEVERITY_ORDER if severity in found]
+
+    def _find_phrases(self, content: str, found: dict[Severity, tuple[int, str]]) -> None:
+        """
+        Find the first phrase match of each severity, merging regex matches with token hits.
+
+        Matches are visited in line order and a position is claimed by its most severe match
+        (then by the phrase listed first), exactly as if every phrase were in the combined regex.
+        ASCII lines are matched with the cheaper ASCII variant of the regex when the phrases allow it.
+        """
+        tokens = self._tokens.find_all(content) if self._tokens is not None else []
+        token_index = 0
+        regex, subject = self._regex, content
+        if self._ascii_regex is not None and content.isascii():
+            regex, lowered = self._ascii_regex
+            subject = content.lower() if lowered else content
+        regex_match = regex.search(subject) if regex is not None else None
+
+        while len(found) < len(self._phrase_severities):
+            candidates = []
+            if regex_match is not None:
+                severity = Severity(regex_match.lastgroup) if regex_match.lastgroup else self._regex_severity
+                text = content[regex_match.start() : regex_match.end()]
+                priority = self._regex_priorities.get(text.lower(), len(self._regex_priorities))
+                candidates.append((regex_match.start(), SEVERITY_ORDER.index(severity), priority, text))
+            if token_index < len(tokens):
+                candidates.append(tokens[token_index])
+            if not candidates:
+                break
+
+            start, rank, _, text = min(candidates)
+            found.setdefault(SEVERITY_ORDER[rank], (start, text))
+            if regex is not None and regex_match is not None and regex_match.start() == start:
+                regex_match = regex.search(subject, start + 1)
+            if token_index < len(tokens) and tokens[token_index][0] == start:
+                token_index += 1
+
+
+@lru_cache(maxsize=16)
+def compile_matcher(
+    phrases: tuple[str | PhraseRule, ...],
+    patterns: tuple[str | PatternRule, ...] = (),
+    wordlist: Path | None = None,
+    hashed_phrases: HashedPhrases | None = None,
+) -> LineMatcher:
+    """
+    Compile forbidden phrases, forbidden patterns, a compiled wordlist and hashed phrases into a single line matcher.
+
+    Args:
+        phrases: Phrases (plain strings or PhraseRules) to search for
+        patterns: Safe regex patterns (plain strings or PatternRules) to search for
+        wordlist: Path to a compiled wordlist automaton (see `compile_phrase_files`), or None
+        hashed_phrases: Salted phrase hashes to search for, or None
+
+    Returns:
+        Compiled LineMatcher
+    """
+    return LineMatcher(phrases, patterns, wordlist, hashed_phrases)
+
+
+class MatcherResolver:
+    """
+    Selects the combined matcher for each file from the global rules and the path-scoped rule sets.
+
+    The rule sets that apply to a file are found with a RuleSetIndex when its `+++ b/` header
+    is seen, and one matcher is compiled and kept per combination of rule sets, so every
+    line is still checked with a single matcher call. Resolvers can be pickled together
+    with their compiled matchers.
+    """
+
+    def __init__(self, config: Config) -> None:
+        wordlist = None
+        if config.phrase_files:
+            try:
+                wordlist = compile_phrase_files(tuple(config.phrase_files), config.hooks_dir / WORDLIST_CACHE_DIR_NAME)
+            except (OSError, ValueError) as exc:
+                raise CannotLoadConfigError(f"Cannot compile phrase files: {exc}") from exc
+
+        self._base: MatcherRules = (
+            tuple(config.forbidden_phrases),
+            tuple(config.forbidden_patterns),
+            wordlist,
+            config.hashed_phrases,
+        )
+        self._rule_sets = config.rule_sets
+        self._index = RuleSetIndex(config.rule_sets) if config.rule_sets else None
+        self._rules: dict[tuple[int, ...], MatcherRules] = {(): self._base}
+        self._matchers: dict[tuple[int, ...], LineMatcher] = {(): compile_matcher(*self._base)}
+
+    def _combination(self, path: str) -> tuple[int, ...]:
+        return self._index.lookup(path) if self._index is not None else ()
+
+    def rules_for(self, path: str) -> MatcherRules:
+        """
+        Get the phrases and patterns that apply to a file.
+
+        Args:
+            path: Repository-relative file path
+
+        Returns:
+            Tuple of the applicable phrases, patterns, compiled wordlist and hashed phrases
+        """
+        combination = self._combination(path)
+        rules = self._rules.get(combination)
+        if rules is None:
+            phrases, patterns, wordlist, hashed_phrases = self._base
+            for index in combination:
+                phrases += self._rule_sets[index].forbidden_phrases
+                patterns += self._rule_sets[index].forbidden_patterns
+            rules = self._rules[combination] = (phrases, patterns, wordlist, hashed_phrases)
+        return rules
+
+    def matcher_for(self, path: str) -> LineMatcher:
+        """
+        Get the compiled matcher for a file.
+
+        Args:
+            path: Repository-relative file path
+
+        Returns:
+            LineMatcher combining the global rules with the rule sets matching the path
+        """
+        combination = self._combination(path)
+        matcher = self._matchers.get(combination)
+        if matcher is None:
+            matcher = self._matchers[combination] = compile_matcher(*self.rules_for(path))
+        return matcher
+
+
+def split_diff_by_file(diff_content: str) -> Iterator[FileDiff]:
+    """
+    Split git diff output into per-file sections of added lines.
+
+    Lines added before the first `+++ b/` header are attributed to an unknown file. The start of
+    each hunk is recorded from its `@@` header.
+
+    Args:
+        diff_content: Git diff output (unified format)
+
+    Yields:
+        FileDiff for each file section, in diff order
+    """
+    return split_diff_lines(diff_content.splitlines())
+
+
+def split_diff_lines(lines: Iterable[str]) -> Iterator[FileDiff]:
+    """
+    Split the lines of git diff output into per-file sections of added lines, as they are read.
+
+    Args:
+        lines: Lines of the diff, without line endings
+
+    Yields:
+        FileDiff for each file section, in diff order, as soon as the next section starts
+    """
+    current = FileDiff(path=UNKNOWN_FILE, added_lines=[], has_header=False)
 
-    for line in diff_content.splitlines():
+    for line in lines:
         if line.startswith("+++ b/"):
-            current_file = line[6:]
+            if current.has_header or current.added_lines:
+                yield current
+            current = FileDiff(path=line[6:], added_lines=[])
+            continue
+
+        if line.startswith("@@ "):
+            match = HUNK_HEADER_REGEX.match(line)
+            if match is not None:
+                current.hunks.append((len(current.added_lines), int(match.group(1))))
             continue
 
         if line.startswith("+") and not line.startswith("+++"):
-            content = line[1:]
-            match = regex.search(content)
-            if match:
-                violations.append(Violation(phrase=match.group(), file=current_file, line=content.strip()))
+            current.added_lines.append(line[1:])
+
+    if current.has_header or current.added_lines:
+        yield current
+
+
+def scannable_lines(path: str, lines: list[str]) -> list[str]:
+    """
+    Select the lines of a file to scan: all of them, or what the content handler for its type keeps
+    (e.g. only cell sources of notebooks).
+
+    Args:
+        path: File the lines belong to
+        lines: Added line contents
+
+    Returns:
+        Lines to scan
+    """
+    handler = CONTENT_HANDLERS.get(Path(path).suffix.lower())
+    return handler(lines) if handler is not None else lines
+
+
+def find_violations_in_lines(path: str, lines: list[str], matcher: LineMatcher) -> list[Violation]:
+    """
+    Find the first forbidden phrase or pattern match of each severity in each of the given added lines.
+
+    Args:
+        path: File the lines belong to
+        lines: Added line contents (without the leading '+')
+        matcher: Compiled line matcher
 
+    Returns:
+        List of Violation objects
+    """
+    violations = []
+    for content in lines:
+        for severity, phrase in matcher.find(content):
+            violations.append(Violation(phrase=phrase, file=path, line=content.strip(), severity=severity))
     return violations
+
+
+def scan_diff(diff_content: str, config: Config, watchdog: Watchdog | None = None) -> ScanResult:
+    """
+    Scan git diff output for forbidden phrases within an optional time budget.
+
+    Args:
+        diff_content: Git diff output (unified format)
+        config: Configuration with forbidden phrases and budget settings
+        watchdog: Started Watchdog enforcing the time budget, or None for no budget
+
+    Returns:
+        ScanResult with violations and the plan that was used
+    """
+    return scan_file_diffs(list(split_diff_by_file(diff_content)), config, watchdog)
+
+
+def scan_file_diffs(
+    file_diffs: list[FileDiff],
+    config: Config,
+    watchdog: Watchdog | None = None,
+    executor: Executor | None = None,
+    resolver: MatcherResolver | None = None,
+    verdicts: Callable[[FileDiff], list[Violation] | None] | None = None,
+    detectors: DetectorRunner | None = None,
+    baseline: Baseline | None = None,
+) -> ScanResult:
+    """
+    Scan file sections for forbidden phrases and patterns, optionally in parallel and within a time budget.
+
+    When the watchdog reports the budget is nearly exhausted, the rest of the diff
+    is scanned with the cheaper plan selected by `config.degraded_plan`. With an executor,
+    files are split into chunks of `config.scan_chunk_lines` lines that are scanned by the
+    executor's workers, while results are still collected (and budget plans applied) in diff order.
+
+    Args:
+        file_diffs: File sections to scan
+        config: Configuration with forbidden phrases, rule sets, budget and planning settings
+        watchdog: Started Watchdog enforcing the time budget, or None for no budget
+        executor: Executor (typically a process pool) for parallel scanning, or None to scan serially
+        resolver: Matcher resolver for the config (e.g. loaded from the config cache), or None to build one
+        verdicts: Lookup of known violations of a file section (e.g. `PrescanStore.lookup`); files it
+            returns a verdict for are not scanned again
+        detectors: Detectors that check each scanned file section after the phrase matcher
+        baseline: Known violations to drop as they are found, so they never end a `first_violation` scan
+
+    Returns:
+        ScanResult with violations and the plan that was used
+    """
+    result = ScanResult()
+    if not (
+        config.forbidden_phrases
+        or config.forbidden_patterns
+        or config.rule_sets
+        or config.phrase_files
+        or config.hashed_phrases
+        or detectors is not None
+    ):
+        return result
+
+    if resolver is None:
+        resolver = MatcherResolver(config)
+    known = [verdicts(file_diff) if verdicts is not None else None for file_diff in file_diffs]
+    chunk_lines = config.scan_chunk_lines if executor is not None else WATCHDOG_CHECK_INTERVAL
+    chunked = executor is not None or watchdog is not None
+    futures = _submit_chunks(executor, file_diffs, known, resolver, chunk_lines) if executor is not None else None
+
+    def add(violations: list[Violation]) -> None:
+        result.violations.extend(baseline.filter(violations) if baseline is not None else violations)
+
+    try:
+        for index, file_diff in enumerate(file_diffs):
+            lines = scannable_lines(file_diff.path, file_diff.added_lines)
+            skipped = False
+            known_violations = known[index]
+            if known_violations is not None:
+                add(known_violations)
+            else:
+                matcher = resolver.matcher_for(file_diff.path) if futures is None else None
+                starts = range(0, len(lines), chunk_lines) if chunked else range(1)
+                for chunk_index, start in enumerate(starts or range(1)):
+                    if result.plan is ScanPlan.FULL and watchdog is not None and watchdog.expired:
+                        result.plan = ScanPlan(config.degraded_plan)
+
+                    if result.plan is ScanPlan.BACKGROUND:
+                        result.deferred_files = file_diffs[index:]
+                        return result
+
+                    if result.plan is ScanPlan.SKIP_LARGE_FILES and len(lines) > config.large_file_lines:
+                        result.skipped_files.append(file_diff.path)
+                        skipped = True
+                        break
+
+                    if futures is not None:
+                        add(futures[index][chunk_index].result())
+                    elif matcher is not None:
+                        chunk = lines[start : start + chunk_lines] if chunked else lines
+                        add(find_violations_in_lines(file_diff.path, chunk, matcher))
+
+                    if result.plan is ScanPlan.FIRST_VIOLATION and result.blocking:
+                        return result
+
+            if detectors is not None and not skipped:
+                add(detectors.scan(file_diff, lines, result.detector_seconds))
+            if result.plan is ScanPlan.FIRST_VIOLATION and result.blocking:
+                return result
+    finally:
+        if futures is not None:
+            for file_futures in futures:
+                for future in file_futures:
+                    future.cancel()
+
+    return result
+
+
+def _submit_chunks(
+    executor: Executor,
+    file_diffs: list[FileDiff],
+    known: list[list[Violation] | None],
+    resolver: MatcherResolver,
+    chunk_lines: int,
+) -> list[list[Future[list[Violation]]]]:
+    futures: list[list[Future[list[Violation]]]] = []
+    for file_diff, known_violations in zip(file_diffs, known, strict=True):
+        if known_violations is not None:
+            futures.append([])
+            continue
+        rules = resolver.rules_for(file_diff.path)
+        lines = scannable_lines(file_diff.path, file_diff.added_lines)
+        futures.append(
+            [
+                executor.submit(_scan_chunk, rules, file_diff.path, lines[start : start + chunk_lines])
+                for start in range(0, len(lines), chunk_lines) or range(1)
+            ]
+        )
+    return futures
+
+
+def _scan_chunk(rules: MatcherRules, path: str, lines: list[str]) -> list[Violation]:
+    """Scan a chunk of lines in a worker process."""
+    return find_violations_in_lines(path, lines, compile_matcher(*rules))
+
+
+class Scanner:
+    """
+    Reusable scanner compiled once from a Config, for embedding the checks in other tools.
+
+    The phrase and pattern matchers (including those of rule sets) and the exclusion lists are
+    compiled when the scanner is created, so each scan only parses its diff and matches lines.
+    Scanners are immutable and can be shared by threads: the caches that matchers fill while
+    scanning only ever gain entries computed from the rules, except for the automata of forbidden
+    patterns, which lock while they search. Scanners can be pickled (e.g. to pass them to worker
+    processes) together with their compiled matchers.
+
+    Files excluded by `exclude_paths`, `exclude_files` or `exclude_extensions` are skipped, unless
+    a scan is made with `skip_excluded=False`. Detectors, time budgets and scan plans are not applied.
+    """
+
+    __slots__ = ("_resolver", "_exclusions")
+
+    _resolver: MatcherResolver
+    _exclusions: ExclusionClassifier
+
+    def __init__(self, config: Config) -> None:
+        """
+        Compile the matchers and exclusion lists of a Config.
+
+        Args:
+            config: Configuration with forbidden phrases, patterns, rule sets and exclusions
+
+        Raises:
+            CannotLoadConfigError: If the phrase files cannot be compiled
+        """
+        object.__setattr__(self, "_resolver", MatcherResolver(config))
+        object.__setattr__(self, "_exclusions", ExclusionClassifier.from_config(config))
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getstate__(self) -> tuple[MatcherResolver, ExclusionClassifier]:
+        return self._resolver, self._exclusions
+
+    def __setstate__(self, state: tuple[MatcherResolver, ExclusionClassifier]) -> None:
+        object.__setattr__(self, "_resolver", state[0])
+        object.__setattr__(self, "_exclusions", state[1])
+
+    def is_excluded(self, path: str) -> bool:
+        """Check whether a file is skipped by the exclusion lists."""
+        return self._exclusions.classify(path) is not None
+
+    def scan_text(self, diff_content: str, *, skip_excluded: bool = True) -> list[Violation]:
+        """
+        Scan git diff output for forbidden phrases and patterns in added lines.
+
+        Args:
+            diff_content: Git diff output (unified format)
+            skip_excluded: Whether to skip files excluded by the config
+
+        Returns:
+            List of Violation objects, in diff order
+        """
+        return self._scan(split_diff_by_file(diff_content), skip_excluded)
+
+    def scan_lines(self, lines: Iterable[str], *, skip_excluded: bool = True) -> list[Violation]:
+        """
+        Scan the lines of git diff output, consuming them as they are produced.
+
+        Args:
+            lines: Lines of the diff, with or without line endings
+            skip_excluded: Whether to skip files excluded by the config
+
+        Returns:
+            List of Violation objects, in diff order
+        """
+        return self._scan(split_diff_lines(part for line in lines for part in line.splitlines()), skip_excluded)
+
+    def scan_stream(self, stream: TextIO, *, skip_excluded: bool = True) -> list[Violation]:
+        """
+        Scan git diff output read from a text stream, holding only one file section in memory at a time.
+
+        Args:
+            stream: Text stream of the diff, such as standard input or the output of a subprocess
+            skip_excluded: Whether to skip files excluded by the config
+
+        Returns:
+            List of Violation objects, in diff order
+        """
+        return self.scan_lines(stream, skip_excluded=skip_excluded)
+
+    def scan_file(self, path: Path, *, skip_excluded: bool = True) -> list[Violation]:
+        """
+        Scan a diff or patch file. Undecodable bytes are replaced, so they do not stop the scan.
+
+        Args:
+            path: Path of the file, in unified diff format and UTF-8 encoded
+            skip_excluded: Whether to skip files excluded by the config
+
+        Returns:
+            List of Violation objects, in diff order
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        with open(path, encoding="utf-8", errors="replace", newline="") as stream:
+            return self.scan_stream(stream, skip_excluded=skip_excluded)
+
+    def _scan(self, file_diffs: Iterable[FileDiff], skip_excluded: bool) -> list[Violation]:
+        violations = []
+        for file_diff in file_diffs:
+            path = file_diff.path
+            if skip_excluded and self._exclusions.classify(path) is not None:
+                continue
+            lines = scannable_lines(path, file_diff.added_lines)
+            violations.extend(find_violations_in_lines(path, lines, self._resolver.matcher_for(path)))
+        return violations
+
+
+_scanners: OrderedDict[str, Scanner] = OrderedDict()
+_scanners_lock = threading.Lock()
+
+
+def get_scanner(config: Config) -> Scanner:
+    """
+    Get a Scanner for a Config, reusing one created for an equal Config.
+
+    Scanners are cached by the contents of the Config (and the stat data of its phrase files, so
+    edited wordlists are compiled again); the `SCANNER_CACHE_SIZE` most recently used ones are kept.
+
+    Args:
+        config: Configuration with forbidden phrases, patterns, rule sets and exclusions
+
+    Returns:
+        Scanner compiled from the Config
+
+    Raises:
+        CannotLoadConfigError: If the phrase files cannot be compiled
+    """
+    key = repr(config)
+    if config.phrase_files:
+        try:
+            key += sources_digest(config.phrase_files).hex()
+        except OSError:
+            return Scanner(config)
+
+    with _scanners_lock:
+        scanner = _scanners.get(key)
+        if scanner is not None:
+            _scanners.move_to_end(key)
+            return scanner
+
+    scanner = Scanner(config)
+    with _scanners_lock:
+        _scanners[key] = scanner
+        if len(_scanners) > SCANNER_CACHE_SIZE:
+            _scanners.popitem(last=False)
+    return scanner
+
+
+def parse_diff_for_violations(diff_content: str, config: Config) -> list[Violation]:
+    """
+    Parse git diff output and find forbidden phrases in added lines.
+
+    The matchers are compiled once per Config (see `get_scanner`). Exclusions are not applied.
+
+    Args:
+        diff_content: Git diff output (unified format)
+        config: Configuration with forbidden phrases
+
+    Returns:
+        List of Violation objects
+    """
+    return get_scanner(config).scan_text(diff_content, skip_excluded=False)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Background scan CLI for files deferred by the commit latency budget.
+"""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from .background_scan import run_background_scan
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    config_path: Annotated[Path, typer.Option("--config", "-c", help="Path to config.yaml with forbidden phrases")],
+    diff_path: Annotated[Path, typer.Option("--diff", help="Path to the deferred diff file")],
+    report_path: Annotated[Path, typer.Option("--report", help="Path where the report will be written")],
+) -> None:
+    """
+    Fully scan files deferred by the pre-commit hook and write a report.
+
+    Typically spawned in the background by the pre-commit hook.
+    """
+    violations = run_background_scan(diff_path=diff_path, config_path=config_path, report_path=report_path)
+    raise typer.Exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Baseline CLI that records the violations already in a repository as known.
+"""
+
+import sys
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from .baseline import BASELINE_FILE_NAME, write_baseline
+from .config import CannotLoadConfigError
+from .detectors import load_detectors
+from .git_utils import get_repo_dirs
+from .overlay import load_merged_config
+from .sweep import scan_repository
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    config_path: Annotated[Path, typer.Option("--config", "-c", help="Path to config.yaml with forbidden phrases")],
+    output: Annotated[
+        Path | None,
+        typer.Option("--output", "-o", help=f"Baseline path ({BASELINE_FILE_NAME} in the repository by default)"),
+    ] = None,
+) -> None:
+    """
+    Scan all tracked files of the current repository and record every violation as known.
+
+    Commit the baseline file: the hook, background scans and sweeps then report only violations
+    that are not in it. Run the command again to drop fixed violations from the baseline.
+    """
+    repo_dirs = get_repo_dirs()
+    if repo_dirs is None:
+        typer.secho("[ERROR] Not in a git repository", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+    repo_root = repo_dirs[0]
+
+    try:
+        merged = load_merged_config(config_path, repo_dirs)
+        detectors = load_detectors(merged.config.detectors)
+    except CannotLoadConfigError as e:
+        typer.secho(f"[ERROR] {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+
+    scan = scan_repository(repo_root, merged.config, merged.resolver, detectors, use_baseline=False)
+    if scan.error is not None:
+        typer.secho(f"[ERROR] {scan.error}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+
+    baseline_path = output if output is not None else repo_root / BASELINE_FILE_NAME
+    try:
+        count = write_baseline(scan.violations, baseline_path)
+    except OSError as e:
+        typer.secho(f"[ERROR] Cannot write baseline: {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+    typer.echo(f"[BASELINE] Recorded {count} known violation(s) from {scan.files} file(s) in {baseline_path}")
+
+
+if __name__ == "__main__":
+    app()
@@ -3,16 +3,41 @@
 Pre-commit hook CLI to check for forbidden phrases in git diffs.
 """
 
+import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Annotated
 
 import typer
 
-from .checker import parse_diff_for_violations
-from .config import CannotLoadConfigError, load_config
-from .formatters import format_violation_message
-from .git_utils import find_local_hook_path, get_git_diff, get_repo_name, run_local_hook_if_exists
+from .attributes import AttributeCache
+from .audit import append_audit_log, get_audit_log_path
+from .background_scan import get_background_report_path, spawn_background_scan
+from .baseline import load_repo_baseline
+from .budget import Watchdog
+from .checker import scan_file_diffs
+from .config import CannotLoadConfigError, Config
+from .detectors import load_detectors
+from .formatters import (
+    format_detector_timings,
+    format_local_hook_results,
+    format_scan_plan_message,
+    format_violation_message,
+    format_warning_message,
+)
+from .git_utils import (
+    find_local_hook_dir_paths,
+    find_local_hook_path,
+    get_repo_dirs,
+    run_local_hook_if_exists,
+)
+from .local_hooks import LocalHookRunner
+from .models import Violation
+from .overlay import load_merged_config
+from .planner import get_parallel_workers, plan_file_diffs
+from .prescan import open_prescan_store
 
 app = typer.Typer(add_completion=False)
 
@@ -29,6 +54,48 @@ def print_error_with_help(message: str) -> None:
     typer.secho("[INFO] To bypass: git commit --no-verify", fg=typer.colors.YELLOW, err=True)
 
 
+def find_local_hook_paths() -> list[Path]:
+    """
+    Find all local hooks to chain: the pre-commit file followed by the pre-commit.d executables.
+
+    Returns:
+        List of local hook paths in execution report order
+    """
+    hook_path = find_local_hook_path()
+    return ([hook_path] if hook_path else []) + find_local_hook_dir_paths()
+
+
+def report_audits(audits: list[Violation], config: Config, repo_name: str | None) -> None:
+    """
+    Write audit-only matches to the audit log without interrupting the commit.
+
+    Args:
+        audits: Audit-only violations
+        config: Configuration with the audit log location
+        repo_name: Name of the current repository, if known
+    """
+    try:
+        append_audit_log(audits, get_audit_log_path(config), repo_name)
+    except OSError as e:
+        typer.secho(f"[AUDIT] Cannot write audit log: {e}", fg=typer.colors.YELLOW, err=True)
+
+
+def report_local_hooks(runner: LocalHookRunner) -> bool:
+    """
+    Wait for local hooks and print their buffered output in order.
+
+    Args:
+        runner: Started LocalHookRunner
+
+    Returns:
+        True if all hooks succeeded, False otherwise
+    """
+    results = runner.wait()
+    if results:
+        typer.echo(format_local_hook_results(results))
+    return all(result.succeeded for result in results)
+
+
 @app.command()
 def main(
     config_path: Annotated[
@@ -39,9 +106,12 @@ def main(
     """
     Check git diff for forbidden phrases.
 
-    This command reads git diff output from stdin and checks for forbidden phrases.
-    Typically called by the pre-commit hook shim.
+    This command checks the staged changes for forbidden phrases. Without input (as run by the
+    pre-commit hook shim) it plans the scan from `git diff --cached --numstat` and reads the diff
+    of the selected files only; git diff output piped to stdin is scanned instead.
     """
+    started_at = time.monotonic()
+
     if config_path is None:
         print_error_with_help("No config file specified")
         typer.secho(
@@ -49,33 +119,92 @@ def main(
         )
         sys.exit(1)
 
-    diff_input = sys.stdin.read()
-
-    if not diff_input:
-        try:
-            diff_input = get_git_diff(cached=True)
-        except Exception:
-            sys.exit(0)
+    diff_input = sys.stdin.read() if not sys.stdin.isatty() else ""
+    repo_dirs = get_repo_dirs()
 
     try:
-        config = load_config(config_path)
+        merged_config = load_merged_config(config_path, repo_dirs)
+        baseline = load_repo_baseline(repo_dirs[0]) if repo_dirs is not None else None
+        detectors = load_detectors(merged_config.config.detectors)
     except CannotLoadConfigError as e:
         print_error_with_help(str(e))
         sys.exit(1)
+    config = merged_config.config
 
-    repo_name = get_repo_name()
+    repo_name = repo_dirs[0].name if repo_dirs is not None else None
     if repo_name and repo_name in config.exclude_repos:
         sys.exit(0)
 
-    violations = parse_diff_for_violations(diff_input, config)
+    try:
+        attributes = AttributeCache(*repo_dirs) if repo_dirs is not None else None
+        strategy, file_diffs = plan_file_diffs(diff_input, config, attributes)
+    except (subprocess.CalledProcessError, OSError):
+        sys.exit(0)
+
+    hook_runner = None
+    if config.concurrent_local_hook:
+        hook_runner = LocalHookRunner(find_local_hook_paths(), sys.argv[1:], config.local_hook_workers)
+        hook_runner.start()
+
+    watchdog = None
+    if config.time_budget_ms is not None:
+        watchdog = Watchdog(config.time_budget_ms / 1000, started_at=started_at)
+        watchdog.start()
+
+    prescan_store = open_prescan_store(repo_dirs[1], config) if repo_dirs is not None else None
+    verdicts = prescan_store.lookup if prescan_store is not None else None
+
+    executor = ProcessPoolExecutor(max_workers=get_parallel_workers()) if strategy.parallel else None
+    try:
+        scan_result = scan_file_diffs(
+            file_diffs, config, watchdog, executor, merged_config.resolver, verdicts, detectors, baseline
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if watchdog is not None:
+            watchdog.stop()
+
+    report_path = None
+    if scan_result.deferred_files:
+        report_path = get_background_report_path()
+        spawn_background_scan(scan_result.deferred_files, config_path, report_path)
+
+    detector_timings = format_detector_timings(scan_result.detector_seconds)
+    if detector_timings:
+        typer.echo(detector_timings, err=True)
+
+    plan_message = format_scan_plan_message(scan_result, config, report_path)
+    if plan_message:
+        typer.secho(plan_message, fg=typer.colors.YELLOW, err=True)
+
+    report_audits(scan_result.audits, config, repo_name)
+
+    warnings = scan_result.warnings
+    if warnings:
+        typer.secho(format_warning_message(warnings), fg=typer.colors.YELLOW, err=True)
+
+    violations = scan_result.blocking
 
     if violations:
+        if hook_runner is not None:
+            hook_runner.cancel()
         error_message = format_violation_message(violations)
         typer.secho(error_message, fg=typer.colors.RED, err=True)
         sys.exit(1)
 
-    hook_path = find_local_hook_path()
-    if not run_local_hook_if_exists(hook_path, sys.argv[1:]):
+    if hook_runner is None:
+        hook_dir_paths = find_local_hook_dir_paths()
+        if not hook_dir_paths:
+            hook_path = find_local_hook_path()
+            if not run_local_hook_if_exists(hook_path, sys.argv[1:]):
+                sys.exit(1)
+            sys.exit(0)
+
+        hook_runner = LocalHookRunner(find_local_hook_paths(), sys.argv[1:], config.local_hook_workers)
+        hook_runner.start()
+
+    if not report_local_hooks(hook_runner):
         sys.exit(1)
 
     sys.exit(0)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Pre-receive CLI that enforces the forbidden phrase policy on a git server.
+"""
+
+import contextlib
+import os
+import signal
+import sys
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from .audit import append_audit_log, get_audit_log_path
+from .checker import MatcherResolver
+from .config import CannotLoadConfigError, load_config
+from .detectors import load_detectors
+from .formatters import format_push_report
+from .models import PushScan, RefUpdate
+from .planner import get_parallel_workers
+from .receive import (
+    DEFAULT_PUSH_TIMEOUT,
+    git_object_env,
+    parse_ref_updates,
+    PushScanner,
+    PushScanServer,
+    repository_name,
+    request_push_scan,
+)
+
+app = typer.Typer(help="Scan pushes on a git server with a pre-receive hook", add_completion=False)
+
+ConfigOption = Annotated[Path, typer.Option("--config", "-c", help="Path to config.yaml with forbidden phrases")]
+TimeoutOption = Annotated[float, typer.Option(help="Seconds a push may be scanned for before it is rejected", min=0)]
+WorkersOption = Annotated[int | None, typer.Option(help="Number of worker processes", min=1)]
+
+
+def _scan_in_hook(
+    config_path: Path, git_dir: Path, updates: list[RefUpdate], env: dict[str, str], timeout: float, workers: int
+) -> PushScan:
+    """Scan a push in a process pool started just for it."""
+    try:
+        config = load_config(config_path)
+        detectors = load_detectors(config.detectors)
+    except CannotLoadConfigError as e:
+        return PushScan(error=str(e))
+    with PushScanner(config, MatcherResolver(config), detectors, workers) as scanner:
+        return scanner.scan_push(git_dir, updates, env, timeout)
+
+
+@app.command()
+def hook(
+    config_path: ConfigOption,
+    socket_path: Annotated[
+        Path | None, typer.Option("--socket", help="Unix socket of a running `serve` command to scan with")
+    ] = None,
+    timeout: TimeoutOption = DEFAULT_PUSH_TIMEOUT,
+    workers: WorkersOption = None,
+) -> None:
+    """
+    Scan a push, reading the `<old> <new> <ref>` lines of a pre-receive hook from standard input.
+
+    Only blobs the push adds to the repository are scanned. With --socket, the scan is done by a
+    running scan server; if it cannot be reached, the hook scans the push itself. Rejects the push
+    if a blocking violation is found or the scan fails or does not finish in time.
+    """
+    try:
+        updates = parse_ref_updates(sys.stdin.read())
+    except ValueError as e:
+        typer.secho(f"[ERROR] {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+
+    cwd = Path.cwd()
+    git_dir = (cwd / os.environ.get("GIT_DIR", ".")).resolve()
+    env = git_object_env(os.environ, cwd)
+
+    scan = None
+    if socket_path is not None:
+        try:
+            scan = request_push_scan(socket_path, git_dir, updates, env, timeout)
+        except OSError as e:
+            typer.secho(f"[WARN] Scan server unavailable ({e}), scanning in the hook", fg=typer.colors.YELLOW, err=True)
+    if scan is None:
+        scan = _scan_in_hook(config_path, git_dir, updates, env, timeout, workers or get_parallel_workers())
+
+    if scan.audits:
+        try:
+            append_audit_log(scan.audits, get_audit_log_path(load_config(config_path)), repository_name(git_dir))
+        except (CannotLoadConfigError, OSError) as e:
+            typer.secho(f"[AUDIT] Cannot write audit log: {e}", fg=typer.colors.YELLOW, err=True)
+
+    typer.echo(format_push_report(scan, timeout), err=True)
+    sys.exit(1 if scan.blocking or scan.error is not None or scan.timed_out else 0)
+
+
+@app.command()
+def serve(
+    config_path: ConfigOption,
+    socket_path: Annotated[Path, typer.Option("--socket", help="Unix socket to listen on")],
+    workers: WorkersOption = None,
+) -> None:
+    """
+    Scan the pushes of pre-receive hooks started with --socket, until interrupted.
+
+    The config is loaded and the rules compiled once, in a pool of worker processes shared by
+    concurrent pushes. Verdicts of scanned blobs are kept, so blobs pushed again (to another
+    branch or repository) are not scanned twice.
+    """
+    try:
+        config = load_config(config_path)
+        detectors = load_detectors(config.detectors)
+    except CannotLoadConfigError as e:
+        typer.secho(f"[ERROR] {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+
+    with (
+        PushScanner(config, MatcherResolver(config), detectors, workers or get_parallel_workers()) as scanner,
+        PushScanServer(socket_path, scanner) as server,
+    ):
+        typer.echo(f"[SERVE] Scanning pushes on {socket_path}", err=True)
+        # Stop as on Ctrl+C when a service manager terminates the server
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            with contextlib.suppress(KeyboardInterrupt):
+                server.serve_forever()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Scan-patches CLI that scans patch files, mbox archives and compressed diffs.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Annotated, TextIO
+
+import typer
+
+from .checker import MatcherResolver
+from .config import CannotLoadConfigError, load_config
+from .detectors import load_detectors
+from .formatters import format_patch_summary
+from .models import Severity
+from .patches import find_patch_files, scan_patch_files, write_patch_records
+from .planner import get_parallel_workers
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    paths: Annotated[list[Path], typer.Argument(help="Patch files and directories to search for them")],
+    config_path: Annotated[Path, typer.Option("--config", "-c", help="Path to config.yaml with forbidden phrases")],
+    output: Annotated[
+        Path | None, typer.Option("--output", "-o", help="JSON Lines report path (standard output by default)")
+    ] = None,
+    workers: Annotated[int | None, typer.Option(help="Number of worker processes", min=1)] = None,
+) -> None:
+    """
+    Scan the added lines of patch files, such as `git format-patch` series, mbox archives and diffs.
+
+    Files compressed with gzip, bzip2, xz or zstd are decompressed as they are read; directories
+    are searched for `.patch`, `.diff` and `.mbox` files. Violations are streamed to a JSON Lines
+    report; a summary is printed to stderr. Exits with status 1 if any blocking violation was found,
+    a file could not be read or scanned, or the report cannot be written.
+    """
+    try:
+        config = load_config(config_path)
+        resolver = MatcherResolver(config)
+        detectors = load_detectors(config.detectors)
+    except CannotLoadConfigError as e:
+        typer.secho(f"[ERROR] {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+
+    started_at = time.monotonic()
+    files: set[Path] = set()
+    messages: set[tuple[Path, int]] = set()
+    lines = violations = 0
+    failed = False
+
+    try:
+        report: TextIO = open(output, "w", encoding="utf-8") if output is not None else sys.stdout  # noqa: SIM115
+    except OSError as e:
+        typer.secho(f"[ERROR] Cannot write report: {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+    try:
+        scans = scan_patch_files(
+            find_patch_files(paths), config, resolver, workers or get_parallel_workers(), detectors
+        )
+        for scan in scans:
+            write_patch_records(scan, report)
+            report.flush()
+            files.add(scan.source)
+            if scan.error is not None:
+                typer.secho(f"[ERROR] {scan.source}: {scan.error}", fg=typer.colors.RED, err=True)
+                failed = True
+                continue
+            messages.add((scan.source, scan.message))
+            lines += scan.lines
+            violations += len(scan.violations)
+            failed = failed or any(violation.severity is Severity.BLOCK for violation in scan.violations)
+    finally:
+        if output is not None:
+            report.close()
+
+    seconds = time.monotonic() - started_at
+    typer.echo(format_patch_summary(len(files), len(messages), lines, violations, seconds), err=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    app()
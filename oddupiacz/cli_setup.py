@@ -3,66 +3,144 @@
 Setup CLI for installing/uninstalling Oddupiacz as a global git pre-commit hook.
 """
 
+import secrets
 import subprocess
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Annotated
 
 import typer
+import yaml
 
-from .config import load_config
+from .config import CannotLoadConfigError, load_config
 from .config_io import create_hook_path
-from .installer import install_hook, uninstall_hook
+from .hashed_phrases import hash_phrases, MAX_SALT_BYTES, MIN_SALT_BYTES
+from .installer import create_installation_settings, find_outdated_installation, install_hook, uninstall_hook
 from .ui import prompt_config_path, prompt_installation_settings
 
 app = typer.Typer(help="Setup Oddupiacz global git hooks")
 
 
+ConfigOption = Annotated[
+    Path | None,
+    typer.Option(
+        "--config",
+        "-c",
+        envvar="ODDUPIACZ_CONFIG",
+        help="Path to config.yaml; installs or uninstalls without prompting",
+    ),
+]
+HooksDirOption = Annotated[
+    Path | None,
+    typer.Option(envvar="ODDUPIACZ_HOOKS_DIR", help="Hooks directory (the config's hooks_dir by default)"),
+]
+
+
 @app.command()
-def install() -> None:
-    """Install Oddupiacz as a global git pre-commit hook (interactive)."""
+def install(
+    config_path: ConfigOption = None,
+    hooks_dir: HooksDirOption = None,
+    python_exec: Annotated[
+        str | None,
+        typer.Option("--python", envvar="ODDUPIACZ_PYTHON", help="Python executable that runs the hook"),
+    ] = None,
+    precompile: Annotated[
+        bool, typer.Option("--precompile", help="Compile the bytecode when installing, not on the first commit")
+    ] = False,
+    zipapp: Annotated[
+        bool,
+        typer.Option("--zipapp", help="Run the hook from a single-file zipapp, isolated from site-packages"),
+    ] = False,
+    check: Annotated[
+        bool, typer.Option("--check", help="Only check whether the installation is up to date (requires --config)")
+    ] = False,
+) -> None:
+    """
+    Install Oddupiacz as a global git pre-commit hook.
+
+    Prompts for the settings unless --config is given. Installing again with the same settings
+    changes nothing. With --check, nothing is installed; exits with status 1 if the installation
+    is missing or out of date. With --zipapp, the hook and its dependencies are bundled into a
+    zipapp with precompiled bytecode, which is rebuilt when installing after an update.
+    """
+
+    if config_path is None:
+        if check or hooks_dir is not None or python_exec is not None:
+            typer.secho("Error: --config is required without prompts", fg=typer.colors.RED, err=True)
+            raise typer.Exit(1)
+        settings = replace(prompt_installation_settings(), precompile=precompile, zipapp=zipapp)
+    else:
+        try:
+            settings = create_installation_settings(config_path, hooks_dir, python_exec, precompile, zipapp)
+        except (CannotLoadConfigError, FileNotFoundError) as e:
+            typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
+            raise typer.Exit(1)
+
+    if check:
+        outdated = find_outdated_installation(settings)
+        for problem in outdated:
+            typer.echo(problem)
+        if not outdated:
+            typer.echo("Installation is up to date")
+        raise typer.Exit(1 if outdated else 0)
 
     try:
-        settings = prompt_installation_settings()
-
         result = install_hook(settings=settings)
-
-        typer.echo()
-        typer.secho("✅ Installation successful!", fg=typer.colors.GREEN, bold=True)
-        typer.echo()
-        if result.dir_created:
-            typer.secho(f"  Created hooks directory: {result.hooks_dir}", fg=typer.colors.GREEN)
-        typer.echo(f"  Oddupiacz path: {result.oddupiacz_path}")
-        typer.echo(f"  Hook installed at: {create_hook_path(hooks_dir=settings.hooks_dir)}")
-        typer.echo(f"  Config file: {result.config_path}")
-        typer.echo(f"  Python executable: {result.python_exec}")
-        typer.echo()
-        typer.secho("Oddupiacz is now active for all git repositories!", fg=typer.colors.GREEN)
-        typer.echo()
-        typer.echo("To bypass on specific commits: git commit --no-verify")
-        typer.echo("To uninstall: ./uninstall")
-
     except FileNotFoundError as e:
         typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
         raise typer.Exit(1)
     except subprocess.CalledProcessError as e:
-        typer.secho(f"Error configuring git: {e}", fg=typer.colors.RED, err=True)
+        typer.secho(f"Error running {e.cmd[0]}: {e}", fg=typer.colors.RED, err=True)
+        if e.stderr:
+            typer.echo(e.stderr.decode(errors="replace"), err=True, nl=False)
         raise typer.Exit(1)
 
+    if config_path is not None:
+        status = "Installed" if result.changed else "Already installed"
+        typer.echo(f"{status}: {create_hook_path(hooks_dir=settings.hooks_dir)} (config: {result.config_path})")
+        return
 
-@app.command()
-def uninstall() -> None:
-    """Uninstall Oddupiacz global git hooks."""
-
-    config_path = prompt_config_path()
-    config = load_config(config_path=config_path)
-
     typer.echo()
-    typer.echo(f"Uninstalling Oddupiacz from: {config.hooks_dir}")
+    typer.secho("✅ Installation successful!", fg=typer.colors.GREEN, bold=True)
+    typer.echo()
+    if result.dir_created:
+        typer.secho(f"  Created hooks directory: {result.hooks_dir}", fg=typer.colors.GREEN)
+    typer.echo(f"  Oddupiacz path: {result.oddupiacz_path}")
+    typer.echo(f"  Hook installed at: {create_hook_path(hooks_dir=settings.hooks_dir)}")
+    typer.echo(f"  Config file: {result.config_path}")
+    typer.echo(f"  Python executable: {result.python_exec}")
     typer.echo()
+    typer.secho("Oddupiacz is now active for all git repositories!", fg=typer.colors.GREEN)
+    typer.echo()
+    typer.echo("To bypass on specific commits: git commit --no-verify")
+    typer.echo("To uninstall: ./uninstall")
 
-    if not typer.confirm("Proceed with uninstall?", default=True):
-        typer.secho("Uninstall cancelled.", fg=typer.colors.YELLOW)
-        raise typer.Exit(0)
 
-    hook_path = create_hook_path(hooks_dir=config.hooks_dir)
+@app.command()
+def uninstall(config_path: ConfigOption = None, hooks_dir: HooksDirOption = None) -> None:
+    """Uninstall Oddupiacz global git hooks, without prompting if --config is given."""
+
+    interactive = config_path is None
+    if config_path is None:
+        config_path = prompt_config_path()
+    if hooks_dir is None:
+        try:
+            hooks_dir = load_config(config_path=config_path).hooks_dir
+        except CannotLoadConfigError as e:
+            typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
+            raise typer.Exit(1)
+
+    if interactive:
+        typer.echo()
+        typer.echo(f"Uninstalling Oddupiacz from: {hooks_dir}")
+        typer.echo()
+
+        if not typer.confirm("Proceed with uninstall?", default=True):
+            typer.secho("Uninstall cancelled.", fg=typer.colors.YELLOW)
+            raise typer.Exit(0)
+
+    hook_path = create_hook_path(hooks_dir=hooks_dir.expanduser().resolve())
     result = uninstall_hook(hook_path=hook_path)
 
     if result.hook_removed:
@@ -73,8 +151,35 @@ def uninstall() -> None:
     else:
         typer.echo("Note: core.hooksPath was not set globally")
 
-    typer.echo()
-    typer.secho("✅ Uninstallation successful!", fg=typer.colors.GREEN, bold=True)
+    if interactive:
+        typer.echo()
+        typer.secho("✅ Uninstallation successful!", fg=typer.colors.GREEN, bold=True)
+
+
+@app.command("hash-phrases")
+def hash_phrases_command(
+    salt: Annotated[
+        str | None,
+        typer.Option(help="Hex salt of an existing 'hashed_phrases' block (a new random salt by default)"),
+    ] = None,
+) -> None:
+    """Read forbidden phrases from stdin, one per line, and print them as a 'hashed_phrases' config block."""
+
+    try:
+        salt_bytes = bytes.fromhex(salt) if salt is not None else secrets.token_bytes(MIN_SALT_BYTES)
+    except ValueError:
+        salt_bytes = b""
+    if not MIN_SALT_BYTES <= len(salt_bytes) <= MAX_SALT_BYTES:
+        typer.secho(
+            f"Error: --salt must be a hex string of {MIN_SALT_BYTES} to {MAX_SALT_BYTES} bytes",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    hashed = hash_phrases(sys.stdin.read().splitlines(), salt_bytes)
+    block = {"salt": hashed.salt, "hashes": {length: list(entries) for length, entries in hashed.hashes}}
+    typer.echo(yaml.safe_dump({"hashed_phrases": block}, default_flow_style=False, sort_keys=False), nl=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Sweep CLI that scans every git repository under a directory tree.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Annotated, TextIO
+
+import typer
+
+from .checker import MatcherResolver
+from .config import CannotLoadConfigError, load_config
+from .detectors import load_detectors
+from .formatters import format_sweep_progress, format_sweep_summary
+from .models import Severity
+from .planner import get_parallel_workers
+from .sweep import find_repositories, sweep_repositories, write_sweep_records
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    root: Annotated[Path, typer.Argument(help="Directory to search for git repositories")],
+    config_path: Annotated[Path, typer.Option("--config", "-c", help="Path to config.yaml with forbidden phrases")],
+    output: Annotated[
+        Path | None, typer.Option("--output", "-o", help="JSON Lines report path (standard output by default)")
+    ] = None,
+    workers: Annotated[int | None, typer.Option(help="Number of worker processes", min=1)] = None,
+) -> None:
+    """
+    Scan all tracked files of every git repository under ROOT with the global config.
+
+    Repositories named in `exclude_repos` are skipped. Violations are streamed to a JSON Lines
+    report as each repository finishes; progress and throughput are printed to stderr. Exits
+    with status 1 if any blocking violation was found or the report cannot be written.
+    """
+    try:
+        config = load_config(config_path)
+        resolver = MatcherResolver(config)
+        detectors = load_detectors(config.detectors)
+    except CannotLoadConfigError as e:
+        typer.secho(f"[ERROR] {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+
+    repos = list(find_repositories(root, config.exclude_repos))
+    started_at = time.monotonic()
+    files = lines = scanned_bytes = violations = 0
+    blocked = False
+
+    try:
+        report: TextIO = open(output, "w", encoding="utf-8") if output is not None else sys.stdout  # noqa: SIM115
+    except OSError as e:
+        typer.secho(f"[ERROR] Cannot write report: {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+    try:
+        scans = sweep_repositories(repos, config, resolver, workers or get_parallel_workers(), detectors)
+        for done, scan in enumerate(scans, start=1):
+            write_sweep_records(scan, report)
+            report.flush()
+            files += scan.files
+            lines += scan.lines
+            scanned_bytes += scan.scanned_bytes
+            violations += len(scan.violations)
+            blocked = blocked or any(violation.severity is Severity.BLOCK for violation in scan.violations)
+            typer.echo(format_sweep_progress(scan, done, len(repos)), err=True)
+    finally:
+        if output is not None:
+            report.close()
+
+    seconds = time.monotonic() - started_at
+    typer.echo(format_sweep_summary(len(repos), files, lines, scanned_bytes, violations, seconds), err=True)
+    sys.exit(1 if blocked else 0)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Watcher CLI that pre-scans changes so the pre-commit hook only looks up verdicts.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from .attributes import AttributeCache
+from .config import CannotLoadConfigError
+from .git_utils import get_git_path, get_repo_dirs
+from .overlay import load_merged_config
+from .prescan import get_prescan_dir, PrescanStore
+from .watcher import RepositoryWatcher
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    config_path: Annotated[Path, typer.Option("--config", "-c", help="Path to config.yaml with forbidden phrases")],
+) -> None:
+    """
+    Watch the current repository and pre-scan changed files in the background.
+
+    Verdicts are stored in the repository's git directory, keyed by the content of each file's
+    changes; the pre-commit hook reuses them and scans only what the watcher has not seen.
+    Restart the watcher after changing the config.
+    """
+    repo_dirs = get_repo_dirs()
+    index_path = get_git_path("index")
+    if repo_dirs is None or index_path is None:
+        typer.secho("[ERROR] Not in a git repository", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+    repo_root, git_common_dir = repo_dirs
+    os.chdir(repo_root)
+
+    try:
+        merged = load_merged_config(config_path, repo_dirs)
+        store = PrescanStore(get_prescan_dir(git_common_dir, merged.config))
+        store.directory.mkdir(parents=True, exist_ok=True)
+        store.prune()
+        watcher = RepositoryWatcher(repo_root, index_path, merged, store, AttributeCache(repo_root, git_common_dir))
+    except (CannotLoadConfigError, OSError) as e:
+        typer.secho(f"[ERROR] {e}", fg=typer.colors.RED, err=True)
+        sys.exit(1)
+
+    def report(scanned: int) -> None:
+        if scanned:
+            typer.echo(f"[WATCH] Pre-scanned {scanned} file(s)")
+
+    typer.echo(f"[WATCH] Watching {repo_root} (Ctrl+C to stop)")
+    try:
+        watcher.run(on_scan=report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    app()
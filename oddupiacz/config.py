@@ -2,29 +2,106 @@
 Configuration management for Oddupiacz.
 """
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from .hashed_phrases import ENTRY_HEX_LENGTH, MAX_SALT_BYTES, MIN_SALT_BYTES
+from .models import DetectorSpec, HashedPhrases, PatternRule, PhraseRule, RuleSet, ScanPlan, Severity
+from .safe_regex import compile_safe_patterns, UnsafePatternError
+
+DEGRADED_PLANS = tuple(plan.value for plan in ScanPlan if plan is not ScanPlan.FULL)
+PHRASE_OPTIONS = ("case_sensitive", "whole_word", "prefix", "suffix")
+RULE_SET_KEYS = ("paths", "forbidden_phrases", "forbidden_patterns")
+OVERLAY_KEYS = ("forbidden_phrases", "forbidden_patterns", "rule_sets")
+SEVERITIES = tuple(severity.value for severity in Severity)
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
 
 @dataclass
 class Config:
     hooks_dir: Path
-    forbidden_phrases: list[str]
+    forbidden_phrases: list[str | PhraseRule]
     exclude_paths: list[str]
     exclude_files: list[str]
     exclude_extensions: list[str]
     exclude_repos: list[str]
+    concurrent_local_hook: bool = False
+    local_hook_workers: int = 4
+    time_budget_ms: int | None = None
+    degraded_plan: str = "skip_large_files"
+    large_file_lines: int = 1000
+    max_file_lines: int | None = None
+    scan_chunk_lines: int = 50000
+    parallel_min_lines: int = 200000
+    forbidden_patterns: list[str | PatternRule] = field(default_factory=list)
+    audit_log: Path | None = None
+    rule_sets: list[RuleSet] = field(default_factory=list)
+    phrase_files: list[Path] = field(default_factory=list)
+    hashed_phrases: HashedPhrases | None = None
+    skip_generated: bool = True
+    detectors: list[DetectorSpec] = field(default_factory=list)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert Config to dictionary for YAML serialization."""
         data = asdict(self)
         data["hooks_dir"] = self.hooks_dir.as_posix()
+        data["forbidden_phrases"] = [_phrase_to_yaml(entry) for entry in self.forbidden_phrases]
+        data["forbidden_patterns"] = [_pattern_to_yaml(entry) for entry in self.forbidden_patterns]
+        data["audit_log"] = self.audit_log.as_posix() if self.audit_log is not None else None
+        data["rule_sets"] = [
+            {
+                "paths": list(rule_set.paths),
+                "forbidden_phrases": [_phrase_to_yaml(entry) for entry in rule_set.forbidden_phrases],
+                "forbidden_patterns": [_pattern_to_yaml(entry) for entry in rule_set.forbidden_patterns],
+            }
+            for rule_set in self.rule_sets
+        ]
+        data["phrase_files"] = [path.as_posix() for path in self.phrase_files]
+        data["hashed_phrases"] = (
+            {
+                "salt": self.hashed_phrases.salt,
+                "hashes": {length: list(entries) for length, entries in self.hashed_phrases.hashes},
+            }
+            if self.hashed_phrases is not None
+            else None
+        )
+        data["detectors"] = [_detector_to_yaml(spec) for spec in self.detectors]
         return data
 
 
+def _detector_to_yaml(spec: DetectorSpec) -> str | dict[str, Any]:
+    """Convert a detector to its YAML form: a bare name unless it has a severity or options."""
+    if spec.severity is None and not spec.options:
+        return spec.name
+    data: dict[str, Any] = {"name": spec.name}
+    if spec.severity is not None:
+        data["severity"] = spec.severity.value
+    return data | dict(spec.options)
+
+
+def _phrase_to_yaml(entry: str | PhraseRule) -> str | dict[str, Any]:
+    """Serialize a phrase entry, keeping only the options that are set."""
+    if isinstance(entry, str):
+        return entry
+    data: dict[str, Any] = {"phrase": entry.phrase}
+    data |= {option: True for option in PHRASE_OPTIONS if getattr(entry, option)}
+    if entry.severity is not Severity.BLOCK:
+        data["severity"] = entry.severity.value
+    return data
+
+
+def _pattern_to_yaml(entry: str | PatternRule) -> str | dict[str, Any]:
+    """Serialize a pattern entry, keeping the severity only if it is not the default."""
+    if isinstance(entry, str):
+        return entry
+    if entry.severity is Severity.BLOCK:
+        return entry.pattern
+    return {"pattern": entry.pattern, "severity": entry.severity.value}
+
+
 def create_default_config() -> Config:
     """Create a default Config object with empty forbidden phrases."""
     return Config(
@@ -57,31 +134,280 @@ class CannotLoadConfigError(Exception):
             return f"{self.base_message}: {self.message}"
 
 
-def load_config(config_path: Path) -> Config:
+def pattern_source(entry: str | PatternRule) -> str:
+    """Get the regex source of a `forbidden_patterns` entry."""
+    return entry if isinstance(entry, str) else entry.pattern
+
+
+def rule_severity(entry: str | PhraseRule | PatternRule) -> Severity:
+    """Get the severity of a `forbidden_phrases` or `forbidden_patterns` entry."""
+    return Severity.BLOCK if isinstance(entry, str) else entry.severity
+
+
+def _is_positive_int(value: Any) -> bool:
+    """Check that a YAML value is a positive integer (booleans excluded)."""
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _parse_phrase_entry(entry: Any) -> str | PhraseRule:
     """
-    Load configuration from YAML file.
+    Parse a `forbidden_phrases` entry: a plain string or a mapping with `phrase` and match options.
 
-    Args:
-        config_path: Path to the YAML config file
+    Raises:
+        CannotLoadConfigError: If the entry is malformed
+    """
+    if isinstance(entry, str):
+        return entry
 
-    Returns:
-        Config object with loaded values
+    if not isinstance(entry, dict) or not isinstance(entry.get("phrase"), str) or not entry["phrase"]:
+        raise CannotLoadConfigError("'forbidden_phrases' entries must be strings or mappings with a 'phrase' string")
+
+    unknown = sorted(set(entry) - {"phrase", "severity", *PHRASE_OPTIONS})
+    if unknown:
+        raise CannotLoadConfigError(f"Unknown options for phrase '{entry['phrase']}': {', '.join(unknown)}")
+
+    options = {option: entry.get(option, False) for option in PHRASE_OPTIONS}
+    for option, value in options.items():
+        if not isinstance(value, bool):
+            raise CannotLoadConfigError(f"'{option}' of phrase '{entry['phrase']}' must be a boolean")
+
+    severity = _parse_severity(entry, f"phrase '{entry['phrase']}'")
+    return PhraseRule(phrase=entry["phrase"], severity=severity, **options)
+
+
+def _parse_pattern_entry(entry: Any) -> str | PatternRule:
+    """
+    Parse a `forbidden_patterns` entry: a plain string or a mapping with `pattern` and `severity`.
 
     Raises:
-        CannotLoadConfigError: If config file doesn't exist, has syntax errors,
-                               or is missing required fields
+        CannotLoadConfigError: If the entry is malformed
+    """
+    if isinstance(entry, str):
+        return entry
+
+    if not isinstance(entry, dict) or not isinstance(entry.get("pattern"), str):
+        raise CannotLoadConfigError("'forbidden_patterns' entries must be strings or mappings with a 'pattern' string")
+
+    unknown = sorted(set(entry) - {"pattern", "severity"})
+    if unknown:
+        raise CannotLoadConfigError(f"Unknown options for pattern '{entry['pattern']}': {', '.join(unknown)}")
+
+    return PatternRule(pattern=entry["pattern"], severity=_parse_severity(entry, f"pattern '{entry['pattern']}'"))
+
+
+def _parse_phrases(entries: Any, name: str) -> list[str | PhraseRule]:
+    """Parse a list of phrase entries."""
+    if not isinstance(entries, list):
+        raise CannotLoadConfigError(f"'{name}' must be a list")
+    return [_parse_phrase_entry(entry) for entry in entries]
+
+
+def _parse_patterns(entries: Any, name: str) -> list[str | PatternRule]:
+    """Parse a list of pattern entries and check that the patterns are safe to compile."""
+    if not isinstance(entries, list):
+        raise CannotLoadConfigError(f"'{name}' must be a list")
+
+    patterns = [_parse_pattern_entry(entry) for entry in entries]
+    if patterns:
+        try:
+            compile_safe_patterns(tuple(pattern_source(entry) for entry in patterns))
+        except UnsafePatternError as exc:
+            raise CannotLoadConfigError(f"Invalid '{name}' entry: {exc}") from exc
+    return patterns
+
+
+def _parse_rule_set(entry: Any, index: int) -> RuleSet:
+    """
+    Parse a `rule_sets` entry: path globs with the phrases and patterns that apply to them.
+
+    Raises:
+        CannotLoadConfigError: If the entry is malformed
+    """
+    name = f"rule_sets[{index}]"
+    if not isinstance(entry, dict):
+        raise CannotLoadConfigError(f"'{name}' must be a mapping")
+
+    unknown = sorted(set(entry) - set(RULE_SET_KEYS))
+    if unknown:
+        raise CannotLoadConfigError(f"Unknown keys in '{name}': {', '.join(unknown)}")
+
+    paths = entry.get("paths")
+    if not isinstance(paths, list) or not paths or not all(isinstance(path, str) and path for path in paths):
+        raise CannotLoadConfigError(f"'{name}.paths' must be a non-empty list of path globs")
+
+    phrases = _parse_phrases(entry.get("forbidden_phrases", []), f"{name}.forbidden_phrases")
+    patterns = _parse_patterns(entry.get("forbidden_patterns", []), f"{name}.forbidden_patterns")
+    if not phrases and not patterns:
+        raise CannotLoadConfigError(f"'{name}' must contain 'forbidden_phrases' or 'forbidden_patterns'")
+
+    return RuleSet(paths=tuple(paths), forbidden_phrases=tuple(phrases), forbidden_patterns=tuple(patterns))
+
+
+def _parse_severity(entry: dict[str, Any], name: str) -> Severity:
+    """Parse the optional `severity` of a phrase or pattern mapping."""
+    severity = entry.get("severity", Severity.BLOCK.value)
+    if severity not in SEVERITIES:
+        raise CannotLoadConfigError(f"'severity' of {name} must be one of: {', '.join(SEVERITIES)}")
+    return Severity(severity)
+
+
+def _parse_detector(entry: Any) -> DetectorSpec:
+    """Parse a `detectors` entry: a detector name or a mapping with `name`, `severity` and options."""
+    if isinstance(entry, str) and entry:
+        return DetectorSpec(name=entry)
+    if not isinstance(entry, dict) or not isinstance(entry.get("name"), str) or not entry["name"]:
+        raise CannotLoadConfigError("'detectors' entries must be names or mappings with a 'name' string")
+    severity = _parse_severity(entry, "detectors") if "severity" in entry else None
+    options = tuple((key, value) for key, value in entry.items() if key not in ("name", "severity"))
+    return DetectorSpec(name=entry["name"], severity=severity, options=options)
+
+
+def _parse_detectors(entries: Any) -> list[DetectorSpec]:
+    """Parse the `detectors` list."""
+    if not isinstance(entries, list):
+        raise CannotLoadConfigError("'detectors' must be a list")
+    return [_parse_detector(entry) for entry in entries]
+
+
+def _parse_rule_sets(entries: Any) -> list[RuleSet]:
+    """Parse the `rule_sets` list."""
+    if not isinstance(entries, list):
+        raise CannotLoadConfigError("'rule_sets' must be a list")
+    return [_parse_rule_set(entry, index) for index, entry in enumerate(entries)]
+
+
+def _parse_phrase_files(entries: Any, config_path: Path) -> list[Path]:
+    """
+    Parse the `phrase_files` list: wordlist paths, relative to the config file's directory.
+
+    Raises:
+        CannotLoadConfigError: If the list is malformed or a wordlist doesn't exist
+    """
+    if not isinstance(entries, list) or not all(isinstance(entry, str) and entry for entry in entries):
+        raise CannotLoadConfigError("'phrase_files' must be a list of paths")
+
+    phrase_files = [(config_path.parent / Path(entry).expanduser()).resolve() for entry in entries]
+    for phrase_file in phrase_files:
+        if not phrase_file.is_file():
+            raise CannotLoadConfigError(f"Phrase file not found: {phrase_file}")
+    return phrase_files
+
+
+def _parse_hashed_phrases(entry: Any) -> HashedPhrases | None:
+    """
+    Parse the `hashed_phrases` mapping: a hex salt and hash entries grouped by phrase length.
+
+    Raises:
+        CannotLoadConfigError: If the mapping is malformed
+    """
+    if entry is None:
+        return None
+
+    if not isinstance(entry, dict) or set(entry) != {"salt", "hashes"}:
+        raise CannotLoadConfigError("'hashed_phrases' must be a mapping with 'salt' and 'hashes'")
+
+    salt = entry["salt"]
+    if not isinstance(salt, str) or not _is_hex(salt) or not MIN_SALT_BYTES <= len(salt) // 2 <= MAX_SALT_BYTES:
+        raise CannotLoadConfigError(
+            f"'hashed_phrases.salt' must be a hex string of {MIN_SALT_BYTES} to {MAX_SALT_BYTES} bytes"
+        )
+
+    hashes = entry["hashes"]
+    if not isinstance(hashes, dict) or not all(
+        _is_positive_int(length) and isinstance(entries, list) for length, entries in hashes.items()
+    ):
+        raise CannotLoadConfigError("'hashed_phrases.hashes' must map phrase lengths to lists of hashes")
+
+    for entries in hashes.values():
+        for hash_entry in entries:
+            if not isinstance(hash_entry, str) or len(hash_entry) != ENTRY_HEX_LENGTH or not _is_hex(hash_entry):
+                raise CannotLoadConfigError(f"Invalid entry in 'hashed_phrases.hashes': {hash_entry!r}")
+
+    return HashedPhrases(
+        salt=salt.lower(),
+        hashes=tuple((length, tuple(entry.lower() for entry in hashes[length])) for length in sorted(hashes)),
+    )
+
+
+def _is_hex(value: str) -> bool:
+    """Check that a string is a non-empty sequence of hex byte pairs."""
+    return bool(value) and len(value) % 2 == 0 and HEX_DIGITS.issuperset(value)
+
+
+def _read_yaml(config_path: Path) -> Any:
+    """
+    Read a YAML config file.
+
+    Raises:
+        CannotLoadConfigError: If the file doesn't exist, cannot be read or has syntax errors
     """
     if not config_path.exists():
         raise CannotLoadConfigError(f"Config file not found: {config_path}")
 
     try:
         with open(config_path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+            return yaml.safe_load(f)
     except yaml.YAMLError as exc:
         raise CannotLoadConfigError(f"Invalid YAML syntax in config file: {exc}") from exc
     except (IOError, OSError) as exc:
         raise CannotLoadConfigError(f"Cannot read config file: {exc}") from exc
 
+
+def merge_overlay(config: Config, overlay_path: Path) -> Config:
+    """
+    Merge a per-repository overlay config into the global config.
+
+    An overlay can only add rules: its `forbidden_phrases`, `forbidden_patterns` and
+    `rule_sets` are appended to the global ones, and every other setting stays global.
+
+    Args:
+        config: Global configuration
+        overlay_path: Path to the overlay YAML file
+
+    Returns:
+        New Config with the overlay rules added
+
+    Raises:
+        CannotLoadConfigError: If the overlay doesn't exist, has syntax errors or contains
+                               keys other than rules
+    """
+    data = _read_yaml(overlay_path)
+    if data is None:
+        return config
+
+    if not isinstance(data, dict):
+        raise CannotLoadConfigError(f"Overlay config must be a YAML dictionary: {overlay_path}")
+
+    unknown = sorted(set(data) - set(OVERLAY_KEYS))
+    if unknown:
+        raise CannotLoadConfigError(f"Unknown keys in overlay config {overlay_path}: {', '.join(unknown)}")
+
+    return replace(
+        config,
+        forbidden_phrases=config.forbidden_phrases
+        + _parse_phrases(data.get("forbidden_phrases", []), "forbidden_phrases"),
+        forbidden_patterns=config.forbidden_patterns
+        + _parse_patterns(data.get("forbidden_patterns", []), "forbidden_patterns"),
+        rule_sets=config.rule_sets + _parse_rule_sets(data.get("rule_sets", [])),
+    )
+
+
+def load_config(config_path: Path) -> Config:
+    """
+    Load configuration from YAML file.
+
+    Args:
+        config_path: Path to the YAML config file
+
+    Returns:
+        Config object with loaded values
+
+    Raises:
+        CannotLoadConfigError: If config file doesn't exist, has syntax errors,
+                               or is missing required fields
+    """
+    data = _read_yaml(config_path)
+
     if data is None:
         raise CannotLoadConfigError("Config file is empty")
 
@@ -94,17 +420,75 @@ def load_config(config_path: Path) -> Config:
     if "forbidden_phrases" not in data:
         raise CannotLoadConfigError("Config must contain 'forbidden_phrases' key")
 
-    if not isinstance(data["forbidden_phrases"], list):
-        raise CannotLoadConfigError("'forbidden_phrases' must be a list")
+    forbidden_phrases = _parse_phrases(data["forbidden_phrases"], "forbidden_phrases")
+    forbidden_patterns = _parse_patterns(data.get("forbidden_patterns", []), "forbidden_patterns")
 
-    if not data["forbidden_phrases"]:
+    rule_sets = _parse_rule_sets(data.get("rule_sets", []))
+    phrase_files = _parse_phrase_files(data.get("phrase_files", []), config_path)
+    hashed_phrases = _parse_hashed_phrases(data.get("hashed_phrases"))
+    detectors = _parse_detectors(data.get("detectors", []))
+
+    if not (forbidden_phrases or forbidden_patterns or rule_sets or phrase_files or hashed_phrases or detectors):
         raise CannotLoadConfigError("'forbidden_phrases' list cannot be empty")
 
+    if not isinstance(data.get("concurrent_local_hook", False), bool):
+        raise CannotLoadConfigError("'concurrent_local_hook' must be a boolean")
+
+    local_hook_workers = data.get("local_hook_workers", 4)
+    if not _is_positive_int(local_hook_workers):
+        raise CannotLoadConfigError("'local_hook_workers' must be a positive integer")
+
+    time_budget_ms = data.get("time_budget_ms")
+    if time_budget_ms is not None and not _is_positive_int(time_budget_ms):
+        raise CannotLoadConfigError("'time_budget_ms' must be a positive integer")
+
+    degraded_plan = data.get("degraded_plan", "skip_large_files")
+    if degraded_plan not in DEGRADED_PLANS:
+        raise CannotLoadConfigError(f"'degraded_plan' must be one of: {', '.join(DEGRADED_PLANS)}")
+
+    large_file_lines = data.get("large_file_lines", 1000)
+    if not _is_positive_int(large_file_lines):
+        raise CannotLoadConfigError("'large_file_lines' must be a positive integer")
+
+    max_file_lines = data.get("max_file_lines")
+    if max_file_lines is not None and not _is_positive_int(max_file_lines):
+        raise CannotLoadConfigError("'max_file_lines' must be a positive integer")
+
+    scan_chunk_lines = data.get("scan_chunk_lines", 50000)
+    if not _is_positive_int(scan_chunk_lines):
+        raise CannotLoadConfigError("'scan_chunk_lines' must be a positive integer")
+
+    parallel_min_lines = data.get("parallel_min_lines", 200000)
+    if not _is_positive_int(parallel_min_lines):
+        raise CannotLoadConfigError("'parallel_min_lines' must be a positive integer")
+
+    audit_log = data.get("audit_log")
+    if audit_log is not None and not isinstance(audit_log, str):
+        raise CannotLoadConfigError("'audit_log' must be a path")
+
+    if not isinstance(data.get("skip_generated", True), bool):
+        raise CannotLoadConfigError("'skip_generated' must be a boolean")
+
     return Config(
         hooks_dir=Path(data["hooks_dir"]).expanduser().resolve(),
-        forbidden_phrases=data["forbidden_phrases"],
+        forbidden_phrases=forbidden_phrases,
         exclude_paths=data.get("exclude_paths", []),
         exclude_files=data.get("exclude_files", []),
         exclude_extensions=data.get("exclude_extensions", []),
         exclude_repos=data.get("exclude_repos", []),
+        concurrent_local_hook=data.get("concurrent_local_hook", False),
+        local_hook_workers=local_hook_workers,
+        time_budget_ms=time_budget_ms,
+        degraded_plan=degraded_plan,
+        large_file_lines=large_file_lines,
+        max_file_lines=max_file_lines,
+        scan_chunk_lines=scan_chunk_lines,
+        parallel_min_lines=parallel_min_lines,
+        forbidden_patterns=forbidden_patterns,
+        audit_log=Path(audit_log).expanduser().resolve() if audit_log is not None else None,
+        rule_sets=rule_sets,
+        phrase_files=phrase_files,
+        hashed_phrases=hashed_phrases,
+        skip_generated=data.get("skip_generated", True),
+        detectors=detectors,
     )
@@ -0,0 +1,242 @@
+"""
+Detectors that check the parsed diff alongside the phrase matcher, and their plugin registry.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from importlib.metadata import entry_points
+from typing import ClassVar
+
+from .config import CannotLoadConfigError
+from .models import DetectorSpec, FileDiff, Severity, Violation
+
+ENTRY_POINT_GROUP = "oddupiacz.detectors"
+
+
+class Detector:
+    """
+    Base class of detectors.
+
+    A detector receives the events of each scanned file section: `start_file`, then `start_hunk`
+    for each hunk of the diff (when it has hunk headers) followed by `check_line` for each of its
+    added lines, then `finish_file`. Every event may return violations; the rest of the work
+    (splitting the diff, exclusions, time budgets, reporting) is shared with the phrase matcher.
+
+    Subclasses set `name`, override the events they need and take their options from the config
+    as keyword arguments. Detectors must be picklable, as sweeps send them to worker processes.
+    """
+
+    name: ClassVar[str] = ""
+    default_severity: ClassVar[Severity] = Severity.BLOCK
+
+    def __init__(self, severity: Severity | None = None) -> None:
+        self.severity = severity if severity is not None else self.default_severity
+
+    def violation(self, path: str, line: str, finding: str) -> Violation:
+        """Create a violation reported by this detector."""
+        return Violation(phrase=finding, file=path, line=line.strip(), severity=self.severity, detector=self.name)
+
+    def start_file(self, path: str) -> list[Violation]:
+        """Handle the start of a file section."""
+        return []
+
+    def start_hunk(self, path: str, new_start: int) -> list[Violation]:
+        """Handle the start of a hunk whose first line has the given number in the new file."""
+        return []
+
+    def check_line(self, path: str, line: str) -> list[Violation]:
+        """Check an added line."""
+        return []
+
+    def finish_file(self, path: str) -> list[Violation]:
+        """Handle the end of a file section."""
+        return []
+
+
+class MergeConflictDetector(Detector):
+    """Reports merge conflict markers left in added lines."""
+
+    name = "merge-conflict"
+    START_MARKERS = ("<<<<<<< ", "||||||| ")
+    END_MARKER = ">>>>>>> "
+    SEPARATOR = "======="
+
+    def __init__(self, severity: Severity | None = None) -> None:
+        super().__init__(severity)
+        self._in_conflict = False
+
+    def start_file(self, path: str) -> list[Violation]:
+        self._in_conflict = False
+        return []
+
+    def check_line(self, path: str, line: str) -> list[Violation]:
+        # A bare separator is only a marker inside a conflict: elsewhere it underlines a heading
+        if line.startswith(self.START_MARKERS) or line in ("<<<<<<<", "|||||||"):
+            self._in_conflict = True
+        elif line.startswith(self.END_MARKER) or line == ">>>>>>>":
+            self._in_conflict = False
+        elif not (line == self.SEPARATOR and self._in_conflict):
+            return []
+        return [self.violation(path, line, line[:7])]
+
+
+class LongLineDetector(Detector):
+    """Reports added lines longer than `max_length` characters, typically minified or generated content."""
+
+    name = "long-line"
+    default_severity = Severity.WARN
+
+    def __init__(self, severity: Severity | None = None, max_length: int = 500) -> None:
+        super().__init__(severity)
+        if not isinstance(max_length, int) or isinstance(max_length, bool) or max_length <= 0:
+            raise CannotLoadConfigError(f"'max_length' of detector '{self.name}' must be a positive integer")
+        self.max_length = max_length
+
+    def check_line(self, path: str, line: str) -> list[Violation]:
+        if len(line) <= self.max_length:
+            return []
+        return [self.violation(path, line[: self.max_length], f"line longer than {self.max_length} characters")]
+
+
+class EntropyDetector(Detector):
+    """Reports long random-looking tokens, such as secrets or keys, by their Shannon entropy."""
+
+    name = "high-entropy"
+    default_severity = Severity.WARN
+    TOKEN_REGEX = re.compile(r"[A-Za-z0-9+/_=-]{20,}")
+    HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+    def __init__(self, severity: Severity | None = None, base64_entropy: float = 4.5, hex_entropy: float = 3.0) -> None:
+        super().__init__(severity)
+        for option, value in (("base64_entropy", base64_entropy), ("hex_entropy", hex_entropy)):
+            if not isinstance(value, int | float) or isinstance(value, bool) or value <= 0:
+                raise CannotLoadConfigError(f"'{option}' of detector '{self.name}' must be a positive number")
+        self.base64_entropy = base64_entropy
+        self.hex_entropy = hex_entropy
+
+    @staticmethod
+    def entropy(token: str) -> float:
+        """Shannon entropy of a token in bits per character."""
+        length = len(token)
+        return -sum(count / length * math.log2(count / length) for count in Counter(token).values())
+
+    def check_line(self, path: str, line: str) -> list[Violation]:
+        for match in self.TOKEN_REGEX.finditer(line):
+            token = match.group()
+            threshold = self.hex_entropy if self.HEX_DIGITS.issuperset(token) else self.base64_entropy
+            if self.entropy(token) > threshold:
+                return [self.violation(path, line, token)]
+        return []
+
+
+BUILTIN_DETECTORS: dict[str, type[Detector]] = {
+    detector.name: detector for detector in (MergeConflictDetector, LongLineDetector, EntropyDetector)
+}
+
+
+def find_detector_class(name: str) -> type[Detector]:
+    """
+    Find a detector by name among the built-in ones and the `oddupiacz.detectors` entry points.
+
+    Args:
+        name: Detector name
+
+    Returns:
+        Detector class
+
+    Raises:
+        CannotLoadConfigError: If no detector has the name or its entry point cannot be loaded
+    """
+    detector_class = BUILTIN_DETECTORS.get(name)
+    if detector_class is not None:
+        return detector_class
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP, name=name):
+        try:
+            loaded = entry_point.load()
+        except Exception as exc:
+            raise CannotLoadConfigError(f"Cannot load detector '{name}': {str(exc) or type(exc).__name__}") from None
+        if not (isinstance(loaded, type) and issubclass(loaded, Detector)):
+            raise CannotLoadConfigError(f"Entry point of detector '{name}' is not a Detector subclass")
+        return loaded
+    raise CannotLoadConfigError(f"Unknown detector: '{name}'")
+
+
+class DetectorRunner:
+    """Dispatches the events of each file section to all enabled detectors and times them."""
+
+    def __init__(self, detectors: list[Detector]) -> None:
+        self.detectors = detectors
+
+    def scan(self, file_diff: FileDiff, lines: list[str], timings: dict[str, float]) -> list[Violation]:
+        """
+        Run all detectors over one file section.
+
+        Args:
+            file_diff: File section, for its path and hunks
+            lines: Lines of the section to check (added lines selected for scanning)
+            timings: Seconds spent per detector name, updated in place
+
+        Returns:
+            Violations in detector order
+        """
+        hunks = list(self._hunks(file_diff, lines))
+        violations: list[Violation] = []
+        for detector in self.detectors:
+            started_at = time.perf_counter()
+            path = file_diff.path
+            violations.extend(detector.start_file(path))
+            for new_start, hunk_lines in hunks:
+                if new_start is not None:
+                    violations.extend(detector.start_hunk(path, new_start))
+                for line in hunk_lines:
+                    violations.extend(detector.check_line(path, line))
+            violations.extend(detector.finish_file(path))
+            timings[detector.name] = timings.get(detector.name, 0.0) + time.perf_counter() - started_at
+        return violations
+
+    @staticmethod
+    def _hunks(file_diff: FileDiff, lines: list[str]) -> Iterator[tuple[int | None, list[str]]]:
+        """Split the lines into hunks; lines transformed by a content handler form a single block."""
+        if not file_diff.hunks or lines is not file_diff.added_lines:
+            yield None, lines
+            return
+        if file_diff.hunks[0][0] > 0:
+            yield None, lines[: file_diff.hunks[0][0]]
+        bounds = [index for index, _ in file_diff.hunks[1:]] + [len(lines)]
+        for (start, new_start), end in zip(file_diff.hunks, bounds, strict=True):
+            yield new_start, lines[start:end]
+
+
+def load_detectors(specs: list[DetectorSpec]) -> DetectorRunner | None:
+    """
+    Create the detectors enabled in the config.
+
+    Args:
+        specs: Enabled detectors from the config
+
+    Returns:
+        DetectorRunner, or None if no detector is enabled
+
+    Raises:
+        CannotLoadConfigError: If a detector is unknown, its options are invalid or it fails to initialize
+    """
+    if not specs:
+        return None
+    detectors = []
+    for spec in specs:
+        detector_class = find_detector_class(spec.name)
+        try:
+            detectors.append(detector_class(severity=spec.severity, **dict(spec.options)))
+        except CannotLoadConfigError:
+            raise
+        except TypeError as exc:
+            raise CannotLoadConfigError(f"Invalid options of detector '{spec.name}': {exc}") from None
+        except Exception as exc:
+            raise CannotLoadConfigError(
+                f"Cannot create detector '{spec.name}': {str(exc) or type(exc).__name__}"
+            ) from None
+    return DetectorRunner(detectors)
@@ -0,0 +1,47 @@
+"""
+Classification of files excluded from checking by the config.
+"""
+
+from .config import Config
+
+
+class ExclusionClassifier:
+    """Decides whether a file is excluded by `exclude_paths`, `exclude_files` or `exclude_extensions`."""
+
+    def __init__(self, exclude_paths: list[str], exclude_files: list[str], exclude_extensions: list[str]) -> None:
+        directories = [entry.strip("/") for entry in exclude_paths if entry.strip("/")]
+        self._path_prefixes = tuple(f"{directory}/" for directory in directories)
+        self._path_infixes = tuple(f"/{directory}/" for directory in directories)
+        self._exact_paths = frozenset(directories)
+        self._file_names = frozenset(exclude_files)
+        self._extensions = tuple(ext if ext.startswith(".") else f".{ext}" for ext in exclude_extensions if ext)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ExclusionClassifier":
+        """Create a classifier from the exclusion lists of a Config."""
+        return cls(config.exclude_paths, config.exclude_files, config.exclude_extensions)
+
+    def classify(self, path: str) -> str | None:
+        """
+        Classify a file path against the exclusion lists.
+
+        Args:
+            path: Repository-relative file path
+
+        Returns:
+            Name of the matching exclusion list, or None if the file is not excluded
+        """
+        if (
+            path in self._exact_paths
+            or path.startswith(self._path_prefixes)
+            or any(infix in path for infix in self._path_infixes)
+        ):
+            return "exclude_paths"
+
+        if path in self._file_names or path.rsplit("/", 1)[-1] in self._file_names:
+            return "exclude_files"
+
+        if self._extensions and path.endswith(self._extensions):
+            return "exclude_extensions"
+
+        return None
@@ -2,7 +2,16 @@
 Output formatting utilities.
 """
 
-from .models import Violation
+from pathlib import Path
+
+from .config import Config
+from .models import LocalHookResult, PushScan, RepositoryScan, ScanPlan, ScanResult, Severity, Violation
+
+
+def _describe_finding(violation: Violation, phrase_label: str) -> str:
+    """Describe what was found: a phrase match, or the finding of the detector that reported it."""
+    source = f"Detector '{violation.detector}'" if violation.detector is not None else phrase_label
+    return f"{source} found: '{violation.phrase}'"
 
 
 def format_violation_message(violations: list[Violation]) -> str:
@@ -17,7 +26,7 @@ def format_violation_message(violations: list[Violation]) -> str:
     """
     lines = []
     for violation in violations:
-        lines.append(f"[BLOCKED] Forbidden phrase found: '{violation.phrase}'")
+        lines.append(f"[BLOCKED] {_describe_finding(violation, 'Forbidden phrase')}")
         lines.append(f"  File: {violation.file}")
         lines.append(f"  Line: {violation.line}")
         lines.append("-" * 40)
@@ -26,3 +35,215 @@ def format_violation_message(violations: list[Violation]) -> str:
         lines.append("Commit aborted.")
 
     return "\n".join(lines)
+
+
+def format_warning_message(warnings: list[Violation]) -> str:
+    """
+    Format warning-only violations for display.
+
+    Args:
+        warnings: List of Violation objects with the warn severity
+
+    Returns:
+        Formatted warning message string (plain text, styling applied at display time)
+    """
+    lines = []
+    for violation in warnings:
+        lines.append(f"[WARN] {_describe_finding(violation, 'Discouraged phrase')}")
+        lines.append(f"  File: {violation.file}")
+        lines.append(f"  Line: {violation.line}")
+        lines.append("-" * 40)
+
+    return "\n".join(lines)
+
+
+def format_local_hook_results(results: list[LocalHookResult]) -> str:
+    """
+    Format buffered local hook results for display, in the order the hooks were listed.
+
+    Args:
+        results: List of LocalHookResult objects
+
+    Returns:
+        Formatted report string with each hook's status, duration and output
+    """
+    lines = []
+    for result in results:
+        if result.cancelled:
+            lines.append(f"[HOOK] {result.path.name}: cancelled")
+            continue
+
+        status = "passed" if result.succeeded else f"FAILED (exit code {result.returncode})"
+        lines.append(f"[HOOK] {result.path.name}: {status} in {result.duration:.2f}s")
+        if result.output:
+            lines.append(result.output.rstrip("\n"))
+
+    return "\n".join(lines)
+
+
+def format_scan_plan_message(result: ScanResult, config: Config, report_path: Path | None = None) -> str:
+    """
+    Format a notice describing the degraded plan used to stay within the time budget.
+
+    Args:
+        result: ScanResult of the budgeted scan
+        config: Configuration with budget settings
+        report_path: Path of the background scan report, if one was started
+
+    Returns:
+        Formatted notice string (empty if the full plan was used)
+    """
+    if result.plan is ScanPlan.FULL:
+        return ""
+
+    lines = [f"[BUDGET] Time budget of {config.time_budget_ms} ms nearly exhausted, used plan: {result.plan}"]
+    if result.plan is ScanPlan.SKIP_LARGE_FILES:
+        lines.append(f"  Skipped {len(result.skipped_files)} file(s) over {config.large_file_lines} added lines")
+        lines.extend(f"  - {path}" for path in result.skipped_files)
+    elif result.plan is ScanPlan.FIRST_VIOLATION:
+        lines.append("  Stopped scanning at the first blocking violation")
+    elif result.plan is ScanPlan.BACKGROUND:
+        lines.append(f"  Handed {len(result.deferred_files)} file(s) to a background scan")
+        if report_path is not None:
+            lines.append(f"  Report: {report_path}")
+
+    return "\n".join(lines)
+
+
+def format_background_report(violations: list[Violation], scanned_files: list[str]) -> str:
+    """
+    Format the report written by a background scan of deferred files.
+
+    Args:
+        violations: List of Violation objects found in the deferred files
+        scanned_files: Paths of the deferred files
+
+    Returns:
+        Formatted report string
+    """
+    lines = ["Oddupiacz background scan report", f"Scanned {len(scanned_files)} deferred file(s)"]
+    lines.extend(f"  - {path}" for path in scanned_files)
+    lines.append("-" * 40)
+    for violation in violations:
+        label = "FOUND" if violation.severity is Severity.BLOCK else violation.severity.value.upper()
+        lines.append(f"[{label}] {_describe_finding(violation, 'Forbidden phrase')}")
+        lines.append(f"  File: {violation.file}")
+        lines.append(f"  Line: {violation.line}")
+        lines.append("-" * 40)
+
+    lines.append(f"{len(violations)} violation(s) found.")
+    return "\n".join(lines)
+
+
+def format_sweep_progress(scan: RepositoryScan, done: int, total: int) -> str:
+    """
+    Format the progress line printed when a repository of a sweep is done.
+
+    Args:
+        scan: Result of scanning the repository
+        done: Number of repositories scanned so far
+        total: Number of repositories in the sweep
+
+    Returns:
+        Formatted progress line
+    """
+    status = (
+        f"ERROR: {scan.error}"
+        if scan.error is not None
+        else f"{scan.files} file(s), {len(scan.violations)} violation(s)"
+    )
+    return f"[SWEEP] {done}/{total} {scan.repo}: {status}"
+
+
+def format_sweep_summary(
+    repos: int, files: int, lines: int, scanned_bytes: int, violations: int, seconds: float
+) -> str:
+    """
+    Format the summary of a sweep with its total throughput.
+
+    Args:
+        repos: Number of scanned repositories
+        files: Number of scanned files
+        lines: Number of scanned lines
+        scanned_bytes: Size of the scanned files
+        violations: Number of violations found
+        seconds: Wall-clock duration of the sweep
+
+    Returns:
+        Formatted summary line
+    """
+    seconds = max(seconds, 1e-9)
+    megabytes = scanned_bytes / 1_000_000
+    return (
+        f"[SWEEP] {repos} repositories, {files} file(s), {lines} line(s), {megabytes:.1f} MB "
+        f"in {seconds:.2f}s ({megabytes / seconds:.1f} MB/s, {lines / seconds:.0f} lines/s); "
+        f"{violations} violation(s) found"
+    )
+
+
+def format_push_report(scan: PushScan, timeout: float) -> str:
+    """
+    Format the report a pre-receive hook sends back to the pusher.
+
+    Args:
+        scan: Result of scanning the push
+        timeout: Seconds the scan was allowed to take
+
+    Returns:
+        Formatted report string, ending with a rejection notice if the push is rejected
+    """
+    lines = []
+    for violation in scan.blocking + scan.warnings:
+        label = "BLOCKED" if violation.severity is Severity.BLOCK else "WARN"
+        phrase_label = "Forbidden phrase" if violation.severity is Severity.BLOCK else "Discouraged phrase"
+        lines.append(f"[{label}] {_describe_finding(violation, phrase_label)}")
+        lines.append(f"  File: {violation.file}")
+        lines.append(f"  Line: {violation.line}")
+        lines.append("-" * 40)
+
+    lines.append(f"[PUSH] Scanned {scan.blobs} new file(s), {scan.cached_blobs} of them already known")
+    if scan.error is not None:
+        lines.append(f"[ERROR] {scan.error}")
+    if scan.timed_out:
+        lines.append(f"[PUSH] Scan did not finish within {timeout:g}s; push again to continue from the scanned files")
+    if scan.blocking or scan.error is not None or scan.timed_out:
+        lines.append("Push rejected.")
+
+    return "\n".join(lines)
+
+
+def format_detector_timings(detector_seconds: dict[str, float]) -> str:
+    """
+    Format the time each detector spent on the scan.
+
+    Args:
+        detector_seconds: Seconds spent per detector name
+
+    Returns:
+        Formatted timing line (empty if no detector ran)
+    """
+    if not detector_seconds:
+        return ""
+    timings = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in detector_seconds.items())
+    return f"[DETECTORS] {timings}"
+
+
+def format_patch_summary(files: int, messages: int, lines: int, violations: int, seconds: float) -> str:
+    """
+    Format the summary of a scan of patch files with its throughput.
+
+    Args:
+        files: Number of patch files read
+        messages: Number of patches (mbox messages) with a diff
+        lines: Number of scanned diff lines
+        violations: Number of violations found
+        seconds: Wall-clock duration of the scan
+
+    Returns:
+        Formatted summary line
+    """
+    seconds = max(seconds, 1e-9)
+    return (
+        f"[PATCHES] {files} file(s), {messages} patch(es), {lines} line(s) in {seconds:.2f}s "
+        f"({lines / seconds:.0f} lines/s); {violations} violation(s) found"
+    )
@@ -6,6 +6,10 @@ import os
 import subprocess
 from pathlib import Path
 
+from .models import FileStat
+
+PATHSPEC_BATCH_SIZE = 1000
+
 
 def get_repo_name() -> str | None:
     """
@@ -25,13 +29,36 @@ def get_repo_name() -> str | None:
         return None
 
 
-def get_git_diff(cached: bool = True, unified: int = 0) -> str:
+def get_repo_dirs() -> tuple[Path, Path] | None:
+    """
+    Get the root and the common git directory of the current repository in a single git call.
+
+    Returns:
+        Tuple of the working tree root and the common git directory, or None if not in a git repo
+    """
+    try:
+        output = subprocess.check_output(  # noqa: S603
+            ["git", "rev-parse", "--show-toplevel", "--git-common-dir"],  # noqa: S607
+            text=True,
+            stderr=subprocess.DEVNULL,
+        )
+    except subprocess.CalledProcessError:
+        return None
+
+    repo_root, git_common_dir = output.splitlines()[:2]
+    return Path(repo_root), Path(git_common_dir).absolute()
+
+
+def get_git_diff(cached: bool = True, unified: int = 0, paths: list[str] | None = None, base: str | None = None) -> str:
     """
     Get git diff output.
 
     Args:
         cached: If True, get staged changes; if False, get working directory changes
         unified: Number of context lines (0 to focus on changes only)
+        paths: Limit the diff to these literal paths (None for all changes)
+        base: Commit to compare against instead of the index (for working directory changes)
+            or HEAD (for staged changes)
 
     Returns:
         Git diff output as string
@@ -42,19 +69,111 @@ def get_git_diff(cached: bool = True, unified: int = 0) -> str:
     cmd = ["git", "diff", f"--unified={unified}", "--no-color"]
     if cached:
         cmd.insert(2, "--cached")
+    if base is not None:
+        cmd.append(base)
+
+    if paths is None:
+        return _run_git_diff(cmd)
 
+    return "".join(
+        _run_git_diff(cmd + ["--"] + [f":(literal){path}" for path in paths[start : start + PATHSPEC_BATCH_SIZE]])
+        for start in range(0, len(paths), PATHSPEC_BATCH_SIZE)
+    )
+
+
+def _run_git_diff(cmd: list[str]) -> str:
     result = subprocess.run(  # noqa: S603
         cmd, capture_output=True, text=True, errors="replace", check=True
     )
     return result.stdout
 
 
-def find_local_hook_path() -> Path | None:
+def get_git_numstat(cached: bool = True) -> list[FileStat]:
     """
-    Find the local pre-commit hook path for the current repository.
+    Get per-file added and deleted line counts without producing the diff itself.
+
+    Args:
+        cached: If True, get staged changes; if False, get working directory changes
 
     Returns:
-        Path to local pre-commit hook if it exists and is executable, None otherwise
+        List of FileStat objects (binary files are flagged and have zero counts)
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+    """
+    cmd = ["git", "diff", "--numstat", "-z"]
+    if cached:
+        cmd.insert(2, "--cached")
+
+    result = subprocess.run(  # noqa: S603
+        cmd, capture_output=True, text=True, errors="replace", check=True
+    )
+    return parse_numstat(result.stdout)
+
+
+def parse_numstat(output: str) -> list[FileStat]:
+    """
+    Parse `git diff --numstat -z` output.
+
+    Args:
+        output: NUL-separated numstat output
+
+    Returns:
+        List of FileStat objects; renamed and copied files are reported under their new path, with their source path
+    """
+    stats = []
+    fields = output.split("\0")
+    index = 0
+    while index < len(fields) and fields[index]:
+        added, deleted, path = fields[index].split("\t", 2)
+        old_path = None
+        index += 1
+        if not path:
+            old_path, path = fields[index], fields[index + 1]
+            index += 2
+
+        binary = added == "-"
+        stats.append(
+            FileStat(
+                path=path,
+                added=0 if binary else int(added),
+                deleted=0 if binary else int(deleted),
+                binary=binary,
+                old_path=old_path,
+            )
+        )
+    return stats
+
+
+def list_tracked_files(repo_root: Path) -> list[str]:
+    """
+    List the files tracked in a repository's index.
+
+    Args:
+        repo_root: Working tree root of the repository
+
+    Returns:
+        Repository-relative file paths
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+    """
+    result = subprocess.run(  # noqa: S603
+        ["git", "-C", str(repo_root), "ls-files", "-z"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        errors="replace",
+        check=True,
+    )
+    return [path for path in result.stdout.split("\0") if path]
+
+
+def get_git_common_dir() -> Path | None:
+    """
+    Get the common git directory of the current repository (shared by all worktrees).
+
+    Returns:
+        Path to the common git directory or None if not in a git repo
     """
     try:
         git_common_dir = subprocess.check_output(  # noqa: S603
@@ -65,7 +184,63 @@ def find_local_hook_path() -> Path | None:
     except subprocess.CalledProcessError:
         return None
 
-    local_hook_path = Path(git_common_dir) / "hooks" / "pre-commit"
+    return Path(git_common_dir)
+
+
+def get_git_path(name: str) -> Path | None:
+    """
+    Resolve a path inside the git directory of the current worktree (such as its `index`).
+
+    Args:
+        name: Path relative to the git directory
+
+    Returns:
+        Absolute path or None if not in a git repo
+    """
+    try:
+        git_path = subprocess.check_output(  # noqa: S603
+            ["git", "rev-parse", "--git-path", name],  # noqa: S607
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except subprocess.CalledProcessError:
+        return None
+
+    return Path(git_path).absolute()
+
+
+def list_ignored_dirs() -> list[str]:
+    """
+    List the directories of the working tree that hold only ignored files (such as build outputs).
+
+    Returns:
+        Repository-relative directory paths without a trailing slash
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+    """
+    result = subprocess.run(  # noqa: S603
+        ["git", "ls-files", "-z", "--others", "--ignored", "--exclude-standard", "--directory"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        errors="replace",
+        check=True,
+    )
+    return [path.rstrip("/") for path in result.stdout.split("\0") if path.endswith("/")]
+
+
+def find_local_hook_path() -> Path | None:
+    """
+    Find the local pre-commit hook path for the current repository.
+
+    Returns:
+        Path to local pre-commit hook if it exists and is executable, None otherwise
+    """
+    git_common_dir = get_git_common_dir()
+    if git_common_dir is None:
+        return None
+
+    local_hook_path = git_common_dir / "hooks" / "pre-commit"
 
     if local_hook_path.exists() and os.access(local_hook_path, os.X_OK):
         return local_hook_path
@@ -73,6 +248,24 @@ def find_local_hook_path() -> Path | None:
     return None
 
 
+def find_local_hook_dir_paths() -> list[Path]:
+    """
+    Find executable hooks in the local pre-commit.d directory of the current repository.
+
+    Returns:
+        Executable hook paths sorted by name (empty if the directory doesn't exist)
+    """
+    git_common_dir = get_git_common_dir()
+    if git_common_dir is None:
+        return []
+
+    hooks_dir = git_common_dir / "hooks" / "pre-commit.d"
+    if not hooks_dir.is_dir():
+        return []
+
+    return sorted(path for path in hooks_dir.iterdir() if path.is_file() and os.access(path, os.X_OK))
+
+
 def run_local_hook_if_exists(hook_path: Path | None, args: list[str]) -> bool:
     """
     Execute a local pre-commit hook if it exists.
@@ -91,6 +284,22 @@ def run_local_hook_if_exists(hook_path: Path | None, args: list[str]) -> bool:
     return result.returncode == 0
 
 
+def get_global_hooks_path() -> Path | None:
+    """
+    Get the hooks directory configured globally in Git.
+
+    Returns:
+        Path from the global core.hooksPath setting, or None if it isn't set
+    """
+    result = subprocess.run(  # noqa: S603
+        ["git", "config", "--global", "--get", "core.hooksPath"],  # noqa: S607
+        capture_output=True,
+        text=True,
+    )
+    value = result.stdout.strip()
+    return Path(value).expanduser() if result.returncode == 0 and value else None
+
+
 def configure_git_hooks_path(hooks_dir: Path) -> None:
     """
     Configure Git to use the specified hooks directory globally.
@@ -0,0 +1,125 @@
+"""
+Forbidden phrases stored as salted hashes and found with a Rabin-Karp rolling hash.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from itertools import accumulate
+
+from .case_folding import fold_case
+from .models import HashedPhrases
+
+HASH_MASK = 0xFFFFFFFF
+FINGERPRINT_HEX_LENGTH = 8
+DIGEST_SIZE = 16
+ENTRY_HEX_LENGTH = FINGERPRINT_HEX_LENGTH + 2 * DIGEST_SIZE
+MIN_SALT_BYTES = 16
+MAX_SALT_BYTES = 64
+
+
+def rolling_base(salt: bytes) -> int:
+    """Derive the (odd) base of the rolling hash from the salt."""
+    return int.from_bytes(hashlib.blake2b(b"rolling-hash-base", key=salt, digest_size=4).digest()) | 1
+
+
+def phrase_digest(text: str, salt: bytes) -> str:
+    """Get the salted digest confirming a case-folded phrase."""
+    return hashlib.blake2b(text.encode(), key=salt, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def hash_phrase(phrase: str, salt: bytes) -> tuple[int, str]:
+    """
+    Hash a forbidden phrase for the `hashed_phrases` config.
+
+    The entry is the phrase's 32-bit rolling hash (used by the Rabin-Karp pass to find candidate
+    windows) followed by its salted BLAKE2b digest (used to confirm a candidate), both in hex.
+
+    Args:
+        phrase: Forbidden phrase (matched case-insensitively)
+        salt: Salt shared by all entries
+
+    Returns:
+        Tuple of the phrase length and its hash entry
+    """
+    folded = fold_case(phrase)
+    base = rolling_base(salt)
+    fingerprint = 0
+    for code in map(ord, folded):
+        fingerprint = (fingerprint * base + code) & HASH_MASK
+    return len(folded), f"{fingerprint:08x}{phrase_digest(folded, salt)}"
+
+
+def hash_phrases(phrases: Iterable[str], salt: bytes) -> HashedPhrases:
+    """
+    Hash forbidden phrases, grouped by length.
+
+    Args:
+        phrases: Forbidden phrases (surrounding whitespace is stripped, blank entries are skipped)
+        salt: Salt shared by all entries
+
+    Returns:
+        HashedPhrases for the config
+    """
+    groups: dict[int, list[str]] = {}
+    for phrase in phrases:
+        if phrase.strip():
+            length, entry = hash_phrase(phrase.strip(), salt)
+            if entry not in groups.setdefault(length, []):
+                groups[length].append(entry)
+    return HashedPhrases(salt=salt.hex(), hashes=tuple((length, tuple(groups[length])) for length in sorted(groups)))
+
+
+class HashedPhraseMatcher:
+    """
+    Finds hashed forbidden phrases in lines without knowing the phrases themselves.
+
+    For every phrase length present, a Rabin-Karp pass compares the rolling hash of each window
+    of the line against the stored rolling hashes; only windows that hit are hashed with the
+    salted digest to confirm them. The matched text is taken from the line itself.
+    """
+
+    def __init__(self, hashed_phrases: HashedPhrases) -> None:
+        self._salt = bytes.fromhex(hashed_phrases.salt)
+        self._base = rolling_base(self._salt)
+        # Longest lengths first, so the longest phrase wins among those starting at the same position.
+        self._groups = [
+            (
+                length,
+                pow(self._base, length, HASH_MASK + 1),
+                frozenset(int(entry[:FINGERPRINT_HEX_LENGTH], 16) for entry in entries),
+                frozenset(entry[FINGERPRINT_HEX_LENGTH:] for entry in entries),
+            )
+            for length, entries in sorted(hashed_phrases.hashes, reverse=True)
+        ]
+
+    def search(self, text: str) -> tuple[int, int] | None:
+        """
+        Find the leftmost hashed phrase in a line, case-insensitively.
+
+        Args:
+            text: Line content
+
+        Returns:
+            Tuple of the start and end offsets of the match, or None if no hashed phrase occurs in the line
+        """
+        folded = fold_case(text)
+        base = self._base
+        prefix = list(accumulate(map(ord, folded), lambda value, code: (value * base + code) & HASH_MASK, initial=0))
+        best: tuple[int, int] | None = None
+
+        for length, power, fingerprints, digests in self._groups:
+            limit = len(folded) - length + 1 if best is None else min(len(folded) - length + 1, best[0])
+            if limit <= 0:
+                continue
+            windows = [
+                (end - start * power) & HASH_MASK
+                for end, start in zip(prefix[length : length + limit], prefix[:limit], strict=True)
+            ]
+            if fingerprints.isdisjoint(windows):
+                continue
+            for start, window in enumerate(windows):
+                if window in fingerprints and phrase_digest(folded[start : start + length], self._salt) in digests:
+                    best = (start, start + length)
+                    break
+
+        return best
@@ -2,13 +2,38 @@
 Hook installation and management utilities.
 """
 
+import hashlib
+import os
+import shutil
 import stat
+import subprocess
+import sys
 from pathlib import Path
 
+from .config import load_config
 from .config_io import create_hook_path
-from .git_utils import configure_git_hooks_path, unset_git_hooks_path
+from .git_utils import configure_git_hooks_path, get_global_hooks_path, unset_git_hooks_path
 from .models import InstallationResult, InstallationSettings, UninstallationResult
 
+DEFAULT_ODDUPIACZ_PATH = Path(__file__).parent.parent.expanduser().resolve()
+
+
+def source_fingerprint(package_dir: Path) -> str:
+    """
+    Fingerprint the Python sources of a package, to tell whether a bundle of it is out of date.
+
+    Args:
+        package_dir: Directory of the package
+
+    Returns:
+        Hex digest of the relative paths and contents of the package's `.py` files
+    """
+    digest = hashlib.sha256()
+    for path in sorted(package_dir.rglob("*.py")):
+        digest.update(path.relative_to(package_dir).as_posix().encode() + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()[:16]
+
 
 def generate_shim_content(settings: InstallationSettings) -> str:
     """
@@ -20,18 +45,142 @@ def generate_shim_content(settings: InstallationSettings) -> str:
     Returns:
         Shell script content as a string
     """
+    zipapp_note = ""
+    if settings.zipapp:
+        # Changes the hook when the sources change, so the zipapp is rebuilt by the next installation
+        fingerprint = source_fingerprint(settings.oddupiacz_path / "oddupiacz")
+        zipapp_note = f"# It runs {settings.ZIPAPP_FILE_NAME}, built from sources {fingerprint}.\n"
     return f"""#!/bin/sh
 # This is a generated shim by Oddupiacz.
-# It runs git diff and pipes the output to the main script.
-
+# It runs the main script, which asks git for the staged changes it decides to scan.
+{zipapp_note}
 export PYTHONPATH="{settings.oddupiacz_path}:$PYTHONPATH"
-git diff --cached --unified=0 --no-color | {settings.create_exec_command()}
+{settings.create_exec_command()} < /dev/null
 EXIT_CODE=$?
 
 exit $EXIT_CODE
 """
 
 
+def create_installation_settings(
+    config_path: Path,
+    hooks_dir: Path | None = None,
+    python_exec: str | None = None,
+    precompile: bool = False,
+    zipapp: bool = False,
+) -> InstallationSettings:
+    """
+    Create installation settings without prompting, with the defaults the interactive installation offers.
+
+    Args:
+        config_path: Path to the config file
+        hooks_dir: Hooks directory (the config's `hooks_dir` by default)
+        python_exec: Python executable that runs the hook (the current one by default)
+        precompile: Compile the bytecode of the checkout when installing
+        zipapp: Run the hook from a zipapp built when installing
+
+    Returns:
+        InstallationSettings with absolute paths
+
+    Raises:
+        CannotLoadConfigError: If the config cannot be loaded
+        FileNotFoundError: If the Python executable is not found
+    """
+    config_path = config_path.expanduser().resolve()
+    config = load_config(config_path=config_path)
+    python_exec = python_exec or sys.executable
+    if shutil.which(python_exec) is None:
+        raise FileNotFoundError(f"Python executable not found: {python_exec}")
+
+    return InstallationSettings(
+        hooks_dir=hooks_dir.expanduser().resolve() if hooks_dir is not None else config.hooks_dir,
+        oddupiacz_path=DEFAULT_ODDUPIACZ_PATH,
+        config_path=config_path,
+        python_exec=python_exec,
+        precompile=precompile,
+        zipapp=zipapp,
+    )
+
+
+def is_hook_up_to_date(hook_path: Path, content: str) -> bool:
+    """
+    Check whether a hook file is executable and has the expected content.
+
+    Args:
+        hook_path: Path to the hook file
+        content: Expected content of the hook script
+
+    Returns:
+        True if the hook doesn't have to be written again
+    """
+    try:
+        return hook_path.read_text() == content and os.access(hook_path, os.X_OK)
+    except OSError:
+        return False
+
+
+def find_outdated_installation(settings: InstallationSettings) -> list[str]:
+    """
+    Find what an installation with the given settings would change, without changing anything.
+
+    Args:
+        settings: InstallationSettings object
+
+    Returns:
+        Descriptions of the parts that are missing or out of date (empty if the installation is up to date)
+    """
+    hook_path = create_hook_path(hooks_dir=settings.hooks_dir)
+    outdated = []
+    if not settings.hooks_dir.is_dir():
+        outdated.append(f"Hooks directory {settings.hooks_dir} does not exist")
+    if not hook_path.exists():
+        outdated.append(f"Hook {hook_path} is not installed")
+    elif not is_hook_up_to_date(hook_path, generate_shim_content(settings=settings)):
+        outdated.append(f"Hook {hook_path} is out of date")
+    if settings.zipapp and not settings.zipapp_path.is_file():
+        outdated.append(f"Zipapp {settings.zipapp_path} is not built")
+    hooks_path = get_global_hooks_path()
+    if hooks_path != settings.hooks_dir:
+        outdated.append(f"Git global core.hooksPath is {hooks_path or 'not set'}, not {settings.hooks_dir}")
+    return outdated
+
+
+def precompile_bytecode(settings: InstallationSettings) -> None:
+    """
+    Compile the bytecode of the checkout's modules that changed, with the Python executable of the hook.
+
+    Args:
+        settings: InstallationSettings object
+
+    Raises:
+        subprocess.CalledProcessError: If a module cannot be compiled
+    """
+    subprocess.run(  # noqa: S603
+        [settings.python_exec, "-m", "compileall", "-q", str(settings.oddupiacz_path / "oddupiacz")],
+        check=True,
+        capture_output=True,
+    )
+
+
+def build_zipapp(settings: InstallationSettings) -> None:
+    """
+    Build the zipapp of the hook with the Python executable of the hook, so it bundles the
+    packages and bytecode of that interpreter.
+
+    Args:
+        settings: InstallationSettings object
+
+    Raises:
+        subprocess.CalledProcessError: If the zipapp cannot be built
+    """
+    subprocess.run(  # noqa: S603
+        [settings.python_exec, "-m", "oddupiacz.bundle", str(settings.zipapp_path)],
+        check=True,
+        capture_output=True,
+        env=os.environ | {"PYTHONPATH": str(settings.oddupiacz_path)},
+    )
+
+
 def create_hook_directory(hooks_dir: Path) -> bool:
     """
     Create the hooks directory if it doesn't exist.
@@ -82,6 +231,9 @@ def install_hook(settings: InstallationSettings) -> InstallationResult:
     """
     Install Oddupiacz as a global git pre-commit hook.
 
+    Installing again with the same settings is a no-op: the hook (and zipapp) is only written and
+    the git config only changed if they differ from the settings.
+
     Args:
         settings: InstallationSettings object
 
@@ -90,20 +242,37 @@ def install_hook(settings: InstallationSettings) -> InstallationResult:
 
     Raises:
         FileNotFoundError: If main script is not found
-        subprocess.CalledProcessError: If git config fails
+        subprocess.CalledProcessError: If git config, compiling the bytecode or building the zipapp fails
     """
     dir_created = create_hook_directory(hooks_dir=settings.hooks_dir)
     shim_content = generate_shim_content(settings=settings)
     hook_path = create_hook_path(hooks_dir=settings.hooks_dir)
-    write_executable_hook(hook_path=hook_path, content=shim_content)
-    configure_git_hooks_path(hooks_dir=settings.hooks_dir)
+    if settings.precompile:
+        precompile_bytecode(settings=settings)
+    hook_written = not is_hook_up_to_date(hook_path=hook_path, content=shim_content) or (
+        settings.zipapp and not settings.zipapp_path.is_file()
+    )
+    if hook_written:
+        # The zipapp is built before the hook that runs it is written
+        if settings.zipapp:
+            build_zipapp(settings=settings)
+        else:
+            remove_hook_file(hook_path=settings.zipapp_path)
+        write_executable_hook(hook_path=hook_path, content=shim_content)
+    hooks_path_configured = get_global_hooks_path() != settings.hooks_dir
+    if hooks_path_configured:
+        configure_git_hooks_path(hooks_dir=settings.hooks_dir)
 
     return InstallationResult(
         hooks_dir=settings.hooks_dir,
         oddupiacz_path=settings.oddupiacz_path,
         config_path=settings.config_path,
         python_exec=settings.python_exec,
+        precompile=settings.precompile,
+        zipapp=settings.zipapp,
         dir_created=dir_created,
+        hook_written=hook_written,
+        hooks_path_configured=hooks_path_configured,
     )
 
 
@@ -118,5 +287,6 @@ def uninstall_hook(hook_path: Path) -> UninstallationResult:
         UninstallationResult with uninstallation details
     """
     hook_removed = remove_hook_file(hook_path=hook_path)
+    remove_hook_file(hook_path=hook_path.with_name(InstallationSettings.ZIPAPP_FILE_NAME))
     config_unset = unset_git_hooks_path()
     return UninstallationResult(hook_removed=hook_removed, config_unset=config_unset)
@@ -0,0 +1,139 @@
+"""
+Background execution of local pre-commit hooks.
+"""
+
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+from .models import LocalHookResult
+
+CANCEL_TIMEOUT_SECONDS = 2.0
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class RunningLocalHook:
+    """A local pre-commit hook started in the background."""
+
+    path: Path
+    process: subprocess.Popen[bytes]
+    output_file: IO[bytes]
+    started_at: float
+    cancelled: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def wait(self) -> LocalHookResult:
+        """
+        Wait for the hook to finish and collect its buffered output.
+
+        Returns:
+            LocalHookResult with exit code, output and duration (output is empty if the hook was cancelled)
+        """
+        returncode = self.process.wait()
+        duration = time.monotonic() - self.started_at
+        with self._lock:
+            output = "" if self.cancelled else self._read_output()
+            self.output_file.close()
+        return LocalHookResult(
+            path=self.path, returncode=returncode, output=output, duration=duration, cancelled=self.cancelled
+        )
+
+    def cancel(self) -> None:
+        """Terminate the hook (killing it if it does not stop in time) and discard its output."""
+        with self._lock:
+            self.cancelled = True
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=CANCEL_TIMEOUT_SECONDS)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        with self._lock:
+            self.output_file.close()
+
+    def _read_output(self) -> str:
+        self.output_file.seek(0)
+        return self.output_file.read().decode(errors="replace")
+
+
+def start_local_hook(hook_path: Path, args: list[str]) -> RunningLocalHook:
+    """
+    Start a local pre-commit hook without waiting for it to finish.
+
+    The hook's stdout and stderr are buffered in a temporary file, so they
+    never interleave with Oddupiacz output and a chatty hook cannot block on a full pipe.
+
+    Args:
+        hook_path: Path to the hook script
+        args: Additional arguments to pass to the hook
+
+    Returns:
+        RunningLocalHook handle
+    """
+    output_file = tempfile.TemporaryFile()  # noqa: SIM115
+    process = subprocess.Popen(  # noqa: S603
+        [str(hook_path)] + args,
+        stdin=subprocess.DEVNULL,
+        stdout=output_file,
+        stderr=subprocess.STDOUT,
+    )
+    return RunningLocalHook(path=hook_path, process=process, output_file=output_file, started_at=time.monotonic())
+
+
+class LocalHookRunner:
+    """
+    Runs several local pre-commit hooks in parallel with a bounded number of workers.
+
+    The first failing hook cancels every other hook, both running and not yet started.
+    """
+
+    def __init__(self, hook_paths: list[Path], args: list[str], max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        self._hook_paths = hook_paths
+        self._args = args
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(hook_paths))))
+        self._futures: list[Future[LocalHookResult]] = []
+        self._running: list[RunningLocalHook] = []
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Schedule all hooks on the worker pool without waiting for them."""
+        self._futures = [self._executor.submit(self._run, hook_path) for hook_path in self._hook_paths]
+
+    def cancel(self) -> None:
+        """Cancel running hooks and prevent pending ones from starting."""
+        with self._lock:
+            self._cancelled = True
+            running = list(self._running)
+        for running_hook in running:
+            running_hook.cancel()
+
+    def wait(self) -> list[LocalHookResult]:
+        """
+        Wait for all scheduled hooks.
+
+        Returns:
+            List of LocalHookResult in the same order as the hook paths
+        """
+        results = [future.result() for future in self._futures]
+        self._executor.shutdown()
+        return results
+
+    def _run(self, hook_path: Path) -> LocalHookResult:
+        with self._lock:
+            if self._cancelled:
+                return LocalHookResult(path=hook_path, returncode=-1, output="", duration=0.0, cancelled=True)
+            running_hook = start_local_hook(hook_path, self._args)
+            self._running.append(running_hook)
+
+        result = running_hook.wait()
+        if not result.succeeded and not result.cancelled:
+            self.cancel()
+        return result
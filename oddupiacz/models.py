@@ -2,9 +2,18 @@
 Data models for Oddupiacz.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import StrEnum
 from pathlib import Path
-from typing import ClassVar
+from typing import Any, ClassVar
+
+
+class Severity(StrEnum):
+    """How a forbidden phrase match is handled, from most to least severe."""
+
+    BLOCK = "block"
+    WARN = "warn"
+    AUDIT = "audit"
 
 
 @dataclass
@@ -14,6 +23,210 @@ class Violation:
     phrase: str
     file: str
     line: str
+    severity: Severity = Severity.BLOCK
+    detector: str | None = None
+
+
+@dataclass(frozen=True)
+class PhraseRule:
+    """A forbidden phrase with match options."""
+
+    phrase: str
+    case_sensitive: bool = False
+    whole_word: bool = False
+    prefix: bool = False
+    suffix: bool = False
+    severity: Severity = Severity.BLOCK
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """A forbidden pattern with a severity."""
+
+    pattern: str
+    severity: Severity = Severity.BLOCK
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Forbidden phrases and patterns that apply only to files matching path globs."""
+
+    paths: tuple[str, ...]
+    forbidden_phrases: tuple[str | PhraseRule, ...] = ()
+    forbidden_patterns: tuple[str | PatternRule, ...] = ()
+
+
+@dataclass(frozen=True)
+class HashedPhrases:
+    """Forbidden phrases stored only as salted hashes, grouped by phrase length."""
+
+    salt: str
+    hashes: tuple[tuple[int, tuple[str, ...]], ...]
+
+
+@dataclass(frozen=True)
+class DetectorSpec:
+    """A detector enabled in the config, with its severity and options."""
+
+    name: str
+    severity: Severity | None = None
+    options: tuple[tuple[str, Any], ...] = ()
+
+
+class ScanPlan(StrEnum):
+    """How much of a diff the scanner checks."""
+
+    FULL = "full"
+    SKIP_LARGE_FILES = "skip_large_files"
+    FIRST_VIOLATION = "first_violation"
+    BACKGROUND = "background"
+
+
+@dataclass
+class FileDiff:
+    """Added lines of a single file section in a diff."""
+
+    path: str
+    added_lines: list[str]
+    has_header: bool = True
+    # (index into added_lines, first line number in the new file) of each hunk, if the diff has hunk headers
+    hunks: list[tuple[int, int]] = field(default_factory=list, compare=False)
+
+    def to_diff_text(self) -> str:
+        """Render the section back into minimal unified diff text."""
+        header = [f"+++ b/{self.path}"] if self.has_header else []
+        return "\n".join(header + [f"+{line}" for line in self.added_lines]) + "\n"
+
+
+@dataclass
+class FileStat:
+    """Per-file change counts reported by `git diff --numstat`; `old_path` is the source of a rename or copy."""
+
+    path: str
+    added: int
+    deleted: int
+    binary: bool = False
+    old_path: str | None = None
+
+
+@dataclass
+class ScanStrategy:
+    """Scan plan chosen from per-file change counts before any diff content is read."""
+
+    scan_paths: list[str] = field(default_factory=list)
+    parallel: bool = False
+
+
+class SeverityTiers:
+    """Mixin splitting the `violations` of a scan result by severity."""
+
+    violations: list[Violation]
+
+    @property
+    def blocking(self) -> list[Violation]:
+        """Violations that block the commit (or reject the push)."""
+        return [violation for violation in self.violations if violation.severity is Severity.BLOCK]
+
+    @property
+    def warnings(self) -> list[Violation]:
+        """Violations reported as warnings only."""
+        return [violation for violation in self.violations if violation.severity is Severity.WARN]
+
+    @property
+    def audits(self) -> list[Violation]:
+        """Violations only written to the audit log."""
+        return [violation for violation in self.violations if violation.severity is Severity.AUDIT]
+
+
+@dataclass
+class ScanResult(SeverityTiers):
+    """Result of scanning a diff, including which plan was used to stay within the time budget."""
+
+    violations: list[Violation] = field(default_factory=list)
+    plan: ScanPlan = ScanPlan.FULL
+    skipped_files: list[str] = field(default_factory=list)
+    deferred_files: list[FileDiff] = field(default_factory=list)
+    detector_seconds: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class RepositoryScan:
+    """Result of scanning all tracked files of one repository during a sweep."""
+
+    repo: Path
+    violations: list[Violation] = field(default_factory=list)
+    files: int = 0
+    lines: int = 0
+    scanned_bytes: int = 0
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class PatchChunk:
+    """Part of one message of a patch file, scanned by a worker as a diff."""
+
+    source: Path
+    message: int
+    subject: str | None
+    text: str
+
+
+@dataclass
+class PatchScan:
+    """Result of scanning a chunk of a patch file, or the error that stopped reading the file or scanning the chunk."""
+
+    source: Path
+    message: int
+    subject: str | None = None
+    violations: list[Violation] = field(default_factory=list)
+    lines: int = 0
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class RefUpdate:
+    """A ref update received by a pre-receive hook; deleted or created refs have an all-zero object name."""
+
+    old: str
+    new: str
+    ref: str
+
+
+@dataclass(frozen=True)
+class PushedBlob:
+    """A blob added to a repository by a push, under one of the paths it appears at."""
+
+    oid: str
+    path: str
+    size: int
+
+
+@dataclass
+class PushScan(SeverityTiers):
+    """Result of scanning the blobs a push adds to a server-side repository."""
+
+    violations: list[Violation] = field(default_factory=list)
+    blobs: int = 0
+    cached_blobs: int = 0
+    scanned_bytes: int = 0
+    timed_out: bool = False
+    error: str | None = None
+
+
+@dataclass
+class LocalHookResult:
+    """Result of running a local pre-commit hook with buffered output."""
+
+    path: Path
+    returncode: int
+    output: str
+    duration: float
+    cancelled: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the hook ran to completion and exited with a zero status."""
+        return self.returncode == 0 and not self.cancelled
 
 
 @dataclass
@@ -21,14 +234,26 @@ class InstallationSettings:
     """Settings for Oddupiacz installation."""
 
     HOOK_FILE_NAME: ClassVar[str] = "cli_hook"
+    ZIPAPP_FILE_NAME: ClassVar[str] = "oddupiacz-hook.pyz"
 
     hooks_dir: Path
     oddupiacz_path: Path
     config_path: Path
     python_exec: str
+    # Compile the bytecode of the checkout when installing, instead of on the first commit
+    precompile: bool = field(default=False, kw_only=True)
+    # Run the hook from a zipapp with its dependencies, in isolated mode without site-packages
+    zipapp: bool = field(default=False, kw_only=True)
+
+    @property
+    def zipapp_path(self) -> Path:
+        """Path of the zipapp the hook runs from, if `zipapp` is set."""
+        return self.hooks_dir / self.ZIPAPP_FILE_NAME
 
     def create_exec_command(self) -> str:
         """Generate the command to run Oddupiacz with the current settings."""
+        if self.zipapp:
+            return f'"{self.python_exec}" -I -S "{self.zipapp_path}" --config "{self.config_path}" "$@"'
         return f'"{self.python_exec}" -m oddupiacz.{self.HOOK_FILE_NAME} --config "{self.config_path}" "$@"'
 
 
@@ -37,6 +262,13 @@ class InstallationResult(InstallationSettings):
     """Result of hook installation, extends InstallationSettings with additional info."""
 
     dir_created: bool
+    hook_written: bool = True
+    hooks_path_configured: bool = True
+
+    @property
+    def changed(self) -> bool:
+        """Whether anything had to be changed, i.e. the installation was not already up to date."""
+        return self.dir_created or self.hook_written or self.hooks_path_configured
 
 
 @dataclass
@@ -0,0 +1,85 @@
+"""
+Extraction of cell sources from the added lines of Jupyter notebooks.
+"""
+
+import json
+import re
+
+NOTEBOOK_EXTENSION = ".ipynb"
+# Depth of cell keys and of source lines in the nbformat layout: {"cells": [{"source": ["line"]}]}
+CELL_KEY_DEPTH = 3
+SOURCE_LINE_DEPTH = 4
+CELL_DEPTH = 2
+SKIPPED_CELL_TYPES = frozenset({"raw"})
+# Indentation widths tried when a hunk has no cell key to take the width from
+FALLBACK_INDENT_UNITS = (1, 2, 4)
+
+CELL_KEY_REGEX = re.compile(r'( +)"(?:cell_type|source)": ')
+CELL_TYPE_REGEX = re.compile(r' +"cell_type": "(\w+)"')
+SOURCE_STRING_REGEX = re.compile(r'( +)"source": (".*")')
+
+
+def _indent_unit(lines: list[str]) -> int | None:
+    """Detect the indentation width of a notebook from a cell key line, or None when there is none."""
+    for line in lines:
+        match = CELL_KEY_REGEX.match(line)
+        if match is not None and len(match.group(1)) % CELL_KEY_DEPTH == 0:
+            return len(match.group(1)) // CELL_KEY_DEPTH
+    return None
+
+
+def _decode_source(literal: str) -> list[str]:
+    """Decode a JSON string literal of a source line, or nothing when it is not one."""
+    try:
+        text = json.loads(literal.rstrip().removesuffix(","))
+    except ValueError:
+        return []
+    return (text.splitlines() or [""]) if isinstance(text, str) else []
+
+
+def notebook_source_lines(lines: list[str]) -> list[str]:
+    """
+    Pick the cell source lines out of the added lines of a notebook and decode them.
+
+    Notebooks are written one JSON value per line, so the role of a line follows from its
+    indentation even without the surrounding diff context: source lines are bare JSON strings
+    at the depth of a cell's `source` list. Everything else, including outputs with embedded
+    images, is skipped after looking at its indentation only, without being decoded. Sources of
+    raw cells are skipped when the diff shows their cell type, and a source written as a single
+    string (`"source": "..."`) is decoded as well. The indentation width is taken from a cell key in
+    the diff; when the diff has none, string lines at the source depth of any common width are
+    kept, so a hunk is never dropped for lack of context. Lines of a notebook that is not indented
+    (e.g. minified) are kept as they are.
+
+    Args:
+        lines: Added lines of a notebook file
+
+    Returns:
+        Decoded source lines to scan
+    """
+    unit = _indent_unit(lines)
+    units = FALLBACK_INDENT_UNITS if unit is None else (unit,)
+    source_indents = {SOURCE_LINE_DEPTH * width for width in units}
+    cell_key_indents = {CELL_KEY_DEPTH * width for width in units}
+    cell_type_prefix = " " * (CELL_KEY_DEPTH * (unit or 1)) + '"cell_type": '
+    cell_end = " " * (CELL_DEPTH * (unit or 1)) + "}"
+
+    sources: list[str] = []
+    cell_type: str | None = None
+    for line in lines:
+        indent = len(line) - len(line.lstrip(" "))
+        source_string = SOURCE_STRING_REGEX.match(line)
+        if indent in source_indents and line[indent : indent + 1] == '"':
+            if cell_type not in SKIPPED_CELL_TYPES:
+                sources.extend(_decode_source(line[indent:]))
+        elif source_string is not None and len(source_string.group(1)) in cell_key_indents:
+            if cell_type not in SKIPPED_CELL_TYPES:
+                sources.extend(_decode_source(source_string.group(2)))
+        elif unit is not None and line.startswith(cell_type_prefix):
+            match = CELL_TYPE_REGEX.match(line)
+            cell_type = match.group(1) if match is not None else None
+        elif unit is not None and line.startswith(cell_end):
+            cell_type = None
+        elif line[:1] not in ("", " ", "\t") and line.rstrip() not in ("{", "}"):
+            sources.append(line)
+    return sources
@@ -0,0 +1,153 @@
+"""
+Per-repository config overlays and the cache of merged, compiled configs.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from . import __version__
+from .checker import MatcherResolver
+from .config import Config, load_config, merge_overlay
+
+OVERLAY_FILE_NAME = ".oddupiacz.yaml"
+CACHE_FILE_NAME = "merged-config.pickle"
+CACHE_FORMAT_VERSION = 4
+
+Fingerprint = tuple[int, int, int, int] | None
+CacheKey = tuple[int, str, str, Fingerprint, str | None, Fingerprint]
+
+
+@dataclass
+class MergedConfig:
+    """Global config merged with the repository overlay, together with its compiled matchers."""
+
+    config: Config
+    resolver: MatcherResolver
+
+
+def file_fingerprint(path: Path) -> Fingerprint:
+    """
+    Fingerprint a file by its stat data, so a change can be detected without reading it.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Tuple of device, inode, size and modification time (ns), or None if the file doesn't exist
+        or cannot be accessed (e.g. a parent directory is not searchable or is a file)
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+@lru_cache(maxsize=1)
+def code_fingerprint() -> str:
+    """
+    Fingerprint the installed package by its version and the stat data of its modules.
+
+    Pickled matchers are only valid for the code that pickled them, so an upgrade (or an edit
+    of a development checkout) must invalidate the cache even when the config files are unchanged.
+
+    Returns:
+        Hex digest of the package version and the paths, sizes and modification times of its modules
+    """
+    digest = hashlib.sha256(f"{__version__}\n".encode())
+    for module in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(f"{module.name}\0{file_fingerprint(module)}\n".encode())
+    return digest.hexdigest()
+
+
+def load_merged_config(config_path: Path, repo_dirs: tuple[Path, Path] | None) -> MergedConfig:
+    """
+    Load the global config merged with the repository's `.oddupiacz.yaml` overlay, if there is one.
+
+    The merged config and its matchers are cached in the repository's git directory, keyed by the
+    fingerprints of both files (and of the `phrase_files` they reference) and of the package code,
+    so repeat commits skip parsing, validating and merging the rules and compiling the wordlists.
+    Unpickling still recompiles the phrase regexes and rebuilds the safe-pattern automata from
+    their patterns.
+
+    Args:
+        config_path: Path to the global config file
+        repo_dirs: Root and common git directory of the current repository, or None outside a repository
+
+    Returns:
+        MergedConfig with the merged config and its matcher resolver
+
+    Raises:
+        CannotLoadConfigError: If the global config or the overlay cannot be loaded
+    """
+    overlay_path = repo_dirs[0] / OVERLAY_FILE_NAME if repo_dirs is not None else None
+    overlay_fingerprint = file_fingerprint(overlay_path) if overlay_path is not None else None
+    key: CacheKey = (
+        CACHE_FORMAT_VERSION,
+        code_fingerprint(),
+        str(config_path.absolute()),
+        file_fingerprint(config_path),
+        str(overlay_path) if overlay_fingerprint is not None else None,
+        overlay_fingerprint,
+    )
+    cache_path = repo_dirs[1] / "oddupiacz" / CACHE_FILE_NAME if repo_dirs is not None else None
+
+    if cache_path is not None and key[3] is not None:
+        cached = _read_cache(cache_path, key)
+        if cached is not None:
+            return cached
+
+    config = load_config(config_path)
+    if overlay_path is not None and overlay_fingerprint is not None:
+        config = merge_overlay(config, overlay_path)
+    merged = MergedConfig(config=config, resolver=MatcherResolver(config))
+
+    if cache_path is not None:
+        dependencies = tuple((path, file_fingerprint(path)) for path in config.phrase_files)
+        _write_cache(cache_path, key, dependencies, merged)
+    return merged
+
+
+def _read_cache(cache_path: Path, key: CacheKey) -> MergedConfig | None:
+    """
+    Read the cached merged config if it was built from the same files; None on a miss or a broken cache.
+
+    The key and the fingerprints of referenced files are stored ahead of the config, so a stale
+    cache is detected without unpickling the matchers. Unpickling runs constructors of the cached
+    objects, which may fail in any way on a cache written by other code, so every error is a miss.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            if pickle.load(f) != key:  # noqa: S301
+                return None
+            dependencies = pickle.load(f)  # noqa: S301
+            if any(file_fingerprint(path) != fingerprint for path, fingerprint in dependencies):
+                return None
+            merged = pickle.load(f)  # noqa: S301
+    except Exception:
+        return None
+    return merged if isinstance(merged, MergedConfig) else None
+
+
+def _write_cache(
+    cache_path: Path, key: CacheKey, dependencies: tuple[tuple[Path, Fingerprint], ...], merged: MergedConfig
+) -> None:
+    """Atomically replace the cached merged config; failures only cost a rebuild on the next commit."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".merged-config-", dir=cache_path.parent)
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for part in (key, dependencies, merged):
+                pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        Path(tmp_path).unlink(missing_ok=True)
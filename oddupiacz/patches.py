@@ -0,0 +1,321 @@
+"""
+Scanning of patch files, mbox archives and compressed diffs, streamed in chunks to worker processes.
+"""
+
+import bz2
+import contextlib
+import gzip
+import io
+import json
+import lzma
+import re
+import subprocess
+import zlib
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import TextIO
+
+from .checker import MatcherResolver, scan_file_diffs
+from .config import Config
+from .detectors import DetectorRunner
+from .models import PatchChunk, PatchScan, Violation
+from .planner import plan_file_diffs
+
+PATCH_SUFFIXES = frozenset({".patch", ".diff", ".mbox"})
+COMPRESSION_SUFFIXES = frozenset({".gz", ".bz2", ".xz", ".zst"})
+# Leading bytes of each supported compression format
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+MAGIC_BYTES = 6
+# The `From ` line starting each message of an mbox, such as `From <sha> Mon Sep 17 00:00:00 2001` of format-patch
+MBOX_FROM_REGEX = re.compile(r"From \S+ +\w{3} \w{3} [ \d]\d \d\d:\d\d:\d\d \d{4}$")
+FILE_HEADER = "+++ b/"
+# Lines of a file header that a chunk is never cut after
+HEADER_PREFIXES = ("diff ", "index ", "--- ", "+++ ")
+# Chunks waiting for or being scanned by workers, per worker; bounds the decompressed text held in memory
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+# Errors of reading a patch file: I/O, truncated streams and corrupt xz and gzip data (bzip2 raises OSError)
+READ_ERRORS = (OSError, EOFError, lzma.LZMAError, zlib.error)
+
+_worker_rules: tuple[Config, MatcherResolver, DetectorRunner | None] | None = None
+
+
+def find_patch_files(paths: Iterable[Path]) -> Iterator[Path]:
+    """
+    Expand the paths given to the command into patch files.
+
+    Files are taken as they are. Directories are searched recursively for `.patch`, `.diff` and
+    `.mbox` files, optionally compressed (`.gz`, `.bz2`, `.xz`, `.zst`), in sorted order.
+
+    Args:
+        paths: Files and directories
+
+    Yields:
+        Patch file paths
+    """
+    for path in paths:
+        if not path.is_dir():
+            yield path
+            continue
+        for candidate in sorted(path.rglob("*")):
+            suffixes = [suffix.lower() for suffix in candidate.suffixes[-2:]]
+            if suffixes and suffixes[-1] in COMPRESSION_SUFFIXES:
+                suffixes.pop()
+            if suffixes and suffixes[-1] in PATCH_SUFFIXES and candidate.is_file():
+                yield candidate
+
+
+@contextlib.contextmanager
+def open_patch_file(path: Path) -> Iterator[TextIO]:
+    """
+    Open a patch file as a text stream, decompressing it on the fly.
+
+    The compression is recognized from the leading bytes, not the file name. Gzip, bzip2 and xz
+    are decompressed in process; zstd by a `zstd` child process whose output is read as it comes.
+
+    Args:
+        path: Patch file
+
+    Yields:
+        Text stream of the (decompressed) patch, with undecodable bytes replaced
+
+    Raises:
+        OSError: If the file cannot be read or decompressed
+        EOFError: If a compressed file is truncated (raised while reading the stream)
+        lzma.LZMAError: If an xz file is corrupt (raised while reading the stream)
+        zlib.error: If a gzip file is corrupt (raised while reading the stream)
+    """
+    with open(path, "rb") as f:
+        magic = f.read(MAGIC_BYTES)
+
+    if magic.startswith(ZSTD_MAGIC):
+        with _zstd_stream(path) as stream:
+            yield stream
+        return
+
+    opener = (
+        gzip.open
+        if magic.startswith(GZIP_MAGIC)
+        else bz2.open
+        if magic.startswith(BZIP2_MAGIC)
+        else lzma.open
+        if magic.startswith(XZ_MAGIC)
+        else open
+    )
+    with opener(path, "rt", encoding="utf-8", errors="replace") as stream:
+        yield stream
+
+
+@contextlib.contextmanager
+def _zstd_stream(path: Path) -> Iterator[TextIO]:
+    """Read a zstd file through `zstd -dc`, stopping the process if the reader gives up early."""
+    process = subprocess.Popen(  # noqa: S603
+        ["zstd", "-dcq", "--", str(path)],  # noqa: S607
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if process.stdout is None:
+        raise OSError("Cannot read the output of zstd")
+    try:
+        yield io.TextIOWrapper(process.stdout, encoding="utf-8", errors="replace")
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise OSError(f"zstd failed: {stderr.decode(errors='replace').strip()}")
+
+
+def split_patches(lines: Iterable[str], source: Path, max_lines: int) -> Iterator[PatchChunk]:
+    """
+    Split the lines of a patch file into chunks of diff text, without holding more than a chunk.
+
+    Messages of an mbox (e.g. a `git format-patch --stdout` series) start with a `From ` line; a
+    file without one is a single patch. Lines of a message before its first file header (mail
+    headers, commit message and diffstat) are skipped, except for the subject. A chunk ends once
+    it has `max_lines` lines, but never right after a file header line; a file section cut in two
+    has its `+++ b/` header repeated at the start of the next chunk.
+
+    Args:
+        lines: Lines of the patch file
+        source: Patch file, for reporting
+        max_lines: Number of lines after which a chunk ends
+
+    Yields:
+        PatchChunk of each part of each message with a diff, in file order
+    """
+    message = 1
+    subject: str | None = None
+    in_diff = False
+    header: str | None = None
+    chunk: list[str] = []
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if MBOX_FROM_REGEX.match(line):
+            if chunk:
+                yield PatchChunk(source=source, message=message, subject=subject, text="\n".join(chunk) + "\n")
+                message += 1
+            subject, in_diff, header, chunk = None, False, None, []
+            continue
+
+        if not in_diff:
+            if subject is None and line.startswith("Subject: "):
+                subject = line.removeprefix("Subject: ")
+            if not line.startswith(("diff ", "--- ", FILE_HEADER)):
+                continue
+            in_diff = True
+
+        if len(chunk) >= max_lines and not chunk[-1].startswith(HEADER_PREFIXES):
+            yield PatchChunk(source=source, message=message, subject=subject, text="\n".join(chunk) + "\n")
+            chunk = [header] if header is not None and not line.startswith(FILE_HEADER) else []
+        if line.startswith(FILE_HEADER):
+            header = line
+        chunk.append(line)
+
+    if chunk:
+        yield PatchChunk(source=source, message=message, subject=subject, text="\n".join(chunk) + "\n")
+
+
+def scan_patch_chunk(
+    chunk: PatchChunk, config: Config, resolver: MatcherResolver, detectors: DetectorRunner | None = None
+) -> PatchScan:
+    """
+    Scan a chunk of a patch like a piped diff: excluded files and files over `max_file_lines` are skipped.
+
+    Args:
+        chunk: Chunk of a patch file
+        config: Configuration with forbidden phrases and exclusions
+        resolver: Matcher resolver for the config
+        detectors: Detectors that check each file after the phrase matcher
+
+    Returns:
+        PatchScan with the violations of the chunk
+    """
+    _, file_diffs = plan_file_diffs(chunk.text, config)
+    result = scan_file_diffs(file_diffs, config, resolver=resolver, detectors=detectors)
+    return PatchScan(
+        source=chunk.source,
+        message=chunk.message,
+        subject=chunk.subject,
+        violations=result.violations,
+        lines=chunk.text.count("\n"),
+    )
+
+
+def _init_worker(config: Config, resolver: MatcherResolver, detectors: DetectorRunner | None) -> None:
+    """Keep the config, its compiled matchers and detectors in a worker process for all of its chunks."""
+    global _worker_rules
+    _worker_rules = (config, resolver, detectors)
+
+
+def _scan_chunk_in_worker(chunk: PatchChunk) -> PatchScan:
+    """Scan a chunk with the rules the worker was started with."""
+    if _worker_rules is None:
+        raise RuntimeError("Patch worker was started without rules")
+    return scan_patch_chunk(chunk, *_worker_rules)
+
+
+def scan_patch_files(
+    paths: Iterable[Path],
+    config: Config,
+    resolver: MatcherResolver,
+    workers: int,
+    detectors: DetectorRunner | None = None,
+) -> Iterator[PatchScan]:
+    """
+    Scan patch files in a process pool, streaming their chunks to the workers.
+
+    Files are read one at a time and only a few chunks per worker are decompressed ahead of the
+    results, so memory use doesn't grow with the size of the files.
+
+    Args:
+        paths: Patch files
+        config: Configuration with forbidden phrases and exclusions; `scan_chunk_lines` sets the chunk size
+        resolver: Matcher resolver for the config
+        workers: Number of worker processes
+        detectors: Detectors that check each file after the phrase matcher
+
+    Yields:
+        PatchScan of each chunk, or of a file that could not be read or a chunk that could not be
+        scanned (e.g. a worker died), in file order
+    """
+    pending: deque[tuple[PatchChunk, Future[PatchScan]] | PatchScan] = deque()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(config, resolver, detectors)
+    ) as executor:
+        try:
+            for path in paths:
+                try:
+                    with open_patch_file(path) as stream:
+                        for chunk in split_patches(stream, path, config.scan_chunk_lines):
+                            try:
+                                pending.append((chunk, executor.submit(_scan_chunk_in_worker, chunk)))
+                            except BrokenProcessPool as exc:
+                                pending.append(_failed_scan(chunk, exc))
+                            while len(pending) > workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                                yield _result(pending.popleft())
+                except READ_ERRORS as exc:
+                    pending.append(PatchScan(source=path, message=0, error=f"Cannot read patch file: {exc}"))
+            while pending:
+                yield _result(pending.popleft())
+        finally:
+            for item in pending:
+                if isinstance(item, tuple):
+                    item[1].cancel()
+
+
+def _result(item: tuple[PatchChunk, Future[PatchScan]] | PatchScan) -> PatchScan:
+    """Get the scan of a chunk; a failure of its worker is reported for the chunk instead of being raised."""
+    if not isinstance(item, tuple):
+        return item
+    chunk, future = item
+    try:
+        return future.result()
+    except Exception as exc:
+        return _failed_scan(chunk, exc)
+
+
+def _failed_scan(chunk: PatchChunk, exc: Exception) -> PatchScan:
+    return PatchScan(
+        source=chunk.source,
+        message=chunk.message,
+        subject=chunk.subject,
+        error=f"Cannot scan message {chunk.message}: {str(exc) or type(exc).__name__}",
+    )
+
+
+def write_patch_records(scan: PatchScan, report: TextIO) -> None:
+    """
+    Append the results of one chunk to a JSON Lines report: one object per violation, or one
+    object with the error if the patch file could not be read.
+
+    Args:
+        scan: Result of scanning a chunk of a patch file
+        report: Open text file of the report
+    """
+    if scan.error is not None:
+        report.write(json.dumps({"source": str(scan.source), "error": scan.error}, ensure_ascii=False) + "\n")
+    for violation in scan.violations:
+        report.write(json.dumps(_violation_record(scan, violation), ensure_ascii=False) + "\n")
+
+
+def _violation_record(scan: PatchScan, violation: Violation) -> dict[str, str | int]:
+    record: dict[str, str | int] = {"source": str(scan.source), "message": scan.message}
+    if scan.subject is not None:
+        record["subject"] = scan.subject
+    record |= {
+        "file": violation.file,
+        "severity": violation.severity.value,
+        "phrase": violation.phrase,
+        "line": violation.line,
+    }
+    if violation.detector is not None:
+        record["detector"] = violation.detector
+    return record
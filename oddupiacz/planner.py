@@ -0,0 +1,132 @@
+"""
+Adaptive scan planning from per-file change counts.
+"""
+
+import os
+import subprocess
+
+from .attributes import AttributeCache
+from .checker import split_diff_by_file
+from .config import Config
+from .exclusions import ExclusionClassifier
+from .git_utils import get_git_diff, get_git_numstat
+from .models import FileDiff, FileStat, ScanStrategy
+
+MAX_PARALLEL_WORKERS = 8
+
+
+def file_stats_from_diff(file_diffs: list[FileDiff]) -> list[FileStat]:
+    """
+    Derive per-file added line counts from an already produced diff.
+
+    Args:
+        file_diffs: File sections of the diff
+
+    Returns:
+        List of FileStat objects (deleted counts are not tracked and set to 0)
+    """
+    return [FileStat(path=file_diff.path, added=len(file_diff.added_lines), deleted=0) for file_diff in file_diffs]
+
+
+def plan_scan(
+    stats: list[FileStat], config: Config, skipped_by_attributes: dict[str, str] | None = None
+) -> ScanStrategy:
+    """
+    Choose which files to scan and how, based on per-file change counts.
+
+    Binary files, files excluded by the config or by their git attributes, files without added
+    lines and files over `max_file_lines` are dropped up front. The scan runs in parallel once
+    `parallel_min_lines` added lines are reached.
+
+    Args:
+        stats: Per-file change counts
+        config: Configuration with exclusions and planning thresholds
+        skipped_by_attributes: Paths marked as skipped in `.gitattributes`, with the marking attribute
+
+    Returns:
+        ScanStrategy describing the chosen plan
+    """
+    classifier = ExclusionClassifier.from_config(config)
+    strategy = ScanStrategy()
+    total_added_lines = 0
+
+    for stat in stats:
+        reason = _exclusion_reason(stat, classifier, config)
+        if reason is None and skipped_by_attributes:
+            reason = skipped_by_attributes.get(stat.path)
+        if reason is None:
+            strategy.scan_paths.append(stat.path)
+            total_added_lines += stat.added
+
+    strategy.parallel = total_added_lines >= config.parallel_min_lines and get_parallel_workers() > 1
+    return strategy
+
+
+def get_parallel_workers() -> int:
+    """Get the number of worker processes used for a parallel scan."""
+    return min(os.cpu_count() or 1, MAX_PARALLEL_WORKERS)
+
+
+def _exclusion_reason(stat: FileStat, classifier: ExclusionClassifier, config: Config) -> str | None:
+    if stat.binary:
+        return "binary"
+    reason = classifier.classify(stat.path)
+    if reason is not None:
+        return reason
+    if stat.added == 0:
+        return "no added lines"
+    if config.max_file_lines is not None and stat.added > config.max_file_lines:
+        return "max_file_lines"
+    return None
+
+
+def _find_skipped_by_attributes(
+    stats: list[FileStat], config: Config, attributes: AttributeCache | None
+) -> dict[str, str]:
+    """Look up the git attributes of changed files; if git cannot tell, no file is skipped."""
+    if attributes is None or not config.skip_generated:
+        return {}
+    try:
+        return attributes.find_skipped([stat.path for stat in stats if stat.added and not stat.binary])
+    except (subprocess.CalledProcessError, OSError):
+        return {}
+
+
+def plan_file_diffs(
+    diff_content: str, config: Config, attributes: AttributeCache | None = None
+) -> tuple[ScanStrategy, list[FileDiff]]:
+    """
+    Plan the scan and load only the file sections it decided to scan.
+
+    If a diff was already produced (e.g. piped in by the shim), counts are derived from it.
+    Otherwise `git diff --cached --numstat -z` is inspected first, and the diff is
+    requested only for the files selected by the plan.
+
+    Args:
+        diff_content: Git diff output, or an empty string to let the planner query git
+        config: Configuration with exclusions and planning thresholds
+        attributes: Cached git attributes of the repository, to skip generated and vendored files
+
+    Returns:
+        Tuple of the chosen ScanStrategy and the file sections to scan
+
+    Raises:
+        subprocess.CalledProcessError: If a git command fails
+    """
+    if diff_content:
+        file_diffs = list(split_diff_by_file(diff_content))
+        stats = file_stats_from_diff(file_diffs)
+        strategy = plan_scan(stats, config, _find_skipped_by_attributes(stats, config, attributes))
+        scan_paths = set(strategy.scan_paths)
+        return strategy, [file_diff for file_diff in file_diffs if file_diff.path in scan_paths]
+
+    stats = get_git_numstat(cached=True)
+    strategy = plan_scan(stats, config, _find_skipped_by_attributes(stats, config, attributes))
+    if not strategy.scan_paths:
+        return strategy, []
+
+    # The source of a renamed or copied file must be in the pathspec too, or git shows the file as entirely added
+    scan_paths = set(strategy.scan_paths)
+    sources = [stat.old_path for stat in stats if stat.path in scan_paths and stat.old_path is not None]
+    diff = get_git_diff(cached=True, paths=strategy.scan_paths + sources)
+    return strategy, [file_diff for file_diff in split_diff_by_file(diff) if file_diff.path in scan_paths]
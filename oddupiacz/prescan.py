@@ -0,0 +1,207 @@
+"""
+Verdicts of file sections scanned ahead of the commit, keyed by the hash of their content.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from .attributes import AttributeCache
+from .checker import MatcherResolver, scan_file_diffs
+from .config import Config
+from .models import FileDiff, Severity, Violation
+from .planner import plan_file_diffs
+from .wordlists import sources_digest
+
+PRESCAN_DIR_NAME = "prescan"
+PRESCAN_FORMAT_VERSION = 1
+MAX_ENTRY_AGE_SECONDS = 7 * 24 * 3600
+
+
+def rules_digest(config: Config) -> str:
+    """
+    Fingerprint the rules that decide a verdict, so verdicts of an older config are never reused.
+
+    Args:
+        config: Merged configuration
+
+    Returns:
+        Hex digest of the phrases, patterns, rule sets, hashed phrases and wordlist stat data
+
+    Raises:
+        OSError: If a phrase file doesn't exist
+    """
+    digest = hashlib.sha256(f"{PRESCAN_FORMAT_VERSION}\n".encode())
+    rules = (config.forbidden_phrases, config.forbidden_patterns, config.rule_sets, config.hashed_phrases)
+    digest.update(repr(rules).encode())
+    digest.update(sources_digest(config.phrase_files))
+    return digest.hexdigest()
+
+
+def file_diff_key(file_diff: FileDiff) -> str:
+    """
+    Hash a file section by its path and added lines: exactly what the scanner checks.
+
+    Args:
+        file_diff: File section of a diff
+
+    Returns:
+        Hex digest identifying the section's content
+    """
+    digest = hashlib.blake2b(file_diff.path.encode(), digest_size=20)
+    for line in file_diff.added_lines:
+        data = line.encode("utf-8", "surrogateescape")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class PrescanStore:
+    """
+    Directory of scan verdicts, one small file per file section named after its content hash.
+
+    Entries are written atomically and never modified, so the watcher can add verdicts while
+    the hook reads them without any locking.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / key[2:]
+
+    def lookup(self, file_diff: FileDiff) -> list[Violation] | None:
+        """
+        Get the stored verdict of a file section.
+
+        Args:
+            file_diff: File section of a diff
+
+        Returns:
+            Violations found in the section (empty if it is clean), or None if it was never scanned
+        """
+        try:
+            entries = json.loads(self._entry_path(file_diff_key(file_diff)).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return [
+            Violation(phrase=phrase, file=file_diff.path, line=line, severity=Severity(severity))
+            for severity, phrase, line in entries
+        ]
+
+    def store(self, file_diff: FileDiff, violations: list[Violation]) -> None:
+        """
+        Store the verdict of a fully scanned file section.
+
+        Args:
+            file_diff: File section of a diff
+            violations: All violations found in the section
+
+        Raises:
+            OSError: If the verdict cannot be written
+        """
+        entry_path = self._entry_path(file_diff_key(file_diff))
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        entries = [[violation.severity.value, violation.phrase, violation.line] for violation in violations]
+        fd, tmp_path = tempfile.mkstemp(prefix=".verdict-", dir=entry_path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def prune(self, max_age: float = MAX_ENTRY_AGE_SECONDS) -> None:
+        """
+        Remove verdicts of other configs and verdicts not written for a while.
+
+        Args:
+            max_age: Age in seconds after which a verdict is removed
+        """
+        for sibling in self.directory.parent.glob("*"):
+            if sibling != self.directory and sibling.is_dir():
+                shutil.rmtree(sibling, ignore_errors=True)
+
+        cutoff = time.time() - max_age
+        for entry_path in self.directory.glob("*/*"):
+            try:
+                if entry_path.stat().st_mtime < cutoff:
+                    entry_path.unlink()
+            except OSError:
+                continue
+
+
+def get_prescan_dir(git_common_dir: Path, config: Config) -> Path:
+    """
+    Get the verdict directory of a repository for a config.
+
+    Args:
+        git_common_dir: Common git directory of the repository
+        config: Merged configuration
+
+    Returns:
+        Path inside the git directory, named after the rules digest
+
+    Raises:
+        OSError: If a phrase file doesn't exist
+    """
+    return git_common_dir / "oddupiacz" / PRESCAN_DIR_NAME / rules_digest(config)[:16]
+
+
+def open_prescan_store(git_common_dir: Path, config: Config) -> PrescanStore | None:
+    """
+    Open the verdicts written by `oddupiacz watch` for the current config, if there are any.
+
+    Args:
+        git_common_dir: Common git directory of the repository
+        config: Merged configuration
+
+    Returns:
+        PrescanStore, or None if no watcher has stored verdicts for this config
+    """
+    if not (git_common_dir / "oddupiacz" / PRESCAN_DIR_NAME).is_dir():
+        return None
+    try:
+        directory = get_prescan_dir(git_common_dir, config)
+    except OSError:
+        return None
+    return PrescanStore(directory) if directory.is_dir() else None
+
+
+def prescan_diff(
+    diff_content: str,
+    config: Config,
+    resolver: MatcherResolver,
+    store: PrescanStore,
+    attributes: AttributeCache | None = None,
+) -> int:
+    """
+    Scan the file sections of a diff that have no stored verdict yet and store their verdicts.
+
+    Files excluded by the config or by their git attributes are skipped, as the hook never scans them.
+
+    Args:
+        diff_content: Git diff output (unified format)
+        config: Merged configuration
+        resolver: Matcher resolver for the config
+        store: Verdict store to read and update
+        attributes: Cached git attributes of the repository
+
+    Returns:
+        Number of file sections scanned
+
+    Raises:
+        OSError: If a verdict cannot be written
+    """
+    if not diff_content:
+        return 0
+    _, file_diffs = plan_file_diffs(diff_content, config, attributes)
+    file_diffs = [file_diff for file_diff in file_diffs if store.lookup(file_diff) is None]
+    for file_diff in file_diffs:
+        store.store(file_diff, scan_file_diffs([file_diff], config, resolver=resolver).violations)
+    return len(file_diffs)
@@ -0,0 +1,505 @@
+"""
+Server-side scanning of the blobs a push adds to a repository, for pre-receive hooks.
+"""
+
+import functools
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from .baseline import Baseline, BASELINE_FILE_NAME, parse_baseline
+from .checker import MatcherResolver
+from .config import CannotLoadConfigError, Config
+from .detectors import DetectorRunner
+from .exclusions import ExclusionClassifier
+from .models import PushedBlob, PushScan, RefUpdate, Severity, Violation
+from .sweep import decode_text_file, scan_file_lines
+
+# Variables git sets for a pre-receive hook, pointing at the pushed objects while they are quarantined
+OBJECT_ENV_VARS = ("GIT_OBJECT_DIRECTORY", "GIT_ALTERNATE_OBJECT_DIRECTORIES", "GIT_QUARANTINE_PATH")
+BATCH_BYTES = 4 * 1024 * 1024
+MAX_BATCH_BLOBS = 256
+MAX_CACHED_VERDICTS = 200_000
+DEFAULT_PUSH_TIMEOUT = 60.0
+# Seconds a hook waits for the server beyond the push time limit before giving up on it
+SERVER_TIMEOUT_MARGIN = 10.0
+
+_worker_rules: tuple[Config, MatcherResolver, DetectorRunner | None] | None = None
+
+
+def parse_ref_updates(text: str) -> list[RefUpdate]:
+    """
+    Parse the `<old> <new> <ref>` lines a pre-receive hook reads from standard input.
+
+    Args:
+        text: Standard input of the hook
+
+    Returns:
+        Ref updates in input order
+
+    Raises:
+        ValueError: If a line is malformed
+    """
+    updates = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        fields = line.split()
+        if len(fields) != 3:
+            raise ValueError(f"Malformed ref update: {line!r}")
+        updates.append(RefUpdate(*fields))
+    return updates
+
+
+def is_zero_oid(oid: str) -> bool:
+    """Whether an object name is the all-zero name git uses for a missing side of a ref update."""
+    return not oid.strip("0")
+
+
+def repository_name(git_dir: Path) -> str:
+    """Name of a repository from its git directory: `name` for both `name.git` and `name/.git`."""
+    if git_dir.name == ".git":
+        return git_dir.parent.name
+    return git_dir.name.removesuffix(".git")
+
+
+def git_object_env(environ: Mapping[str, str], cwd: Path) -> dict[str, str]:
+    """
+    Pick the variables that let another process read a push's quarantined objects.
+
+    Args:
+        environ: Environment of the pre-receive hook
+        cwd: Working directory of the hook, which relative object directories are resolved against
+
+    Returns:
+        Object directory variables with absolute paths
+    """
+    env = {}
+    for name in OBJECT_ENV_VARS:
+        value = environ.get(name)
+        if value:
+            env[name] = os.pathsep.join(str(cwd / entry) for entry in value.split(os.pathsep) if entry)
+    return env
+
+
+def _run_git(git_dir: Path, args: list[str], env: Mapping[str, str], stdin: bytes = b"") -> bytes:
+    result = subprocess.run(  # noqa: S603
+        ["git", f"--git-dir={git_dir}", *args],  # noqa: S607
+        cwd=git_dir,
+        env={**os.environ, **env},
+        input=stdin,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def list_new_blobs(git_dir: Path, updates: list[RefUpdate], env: Mapping[str, str]) -> list[PushedBlob]:
+    """
+    List the blobs reachable from the new tips of a push but from no existing ref, under every path they appear at.
+
+    `git rev-list --objects` names each blob by the first path it finds only, so the paths are
+    collected from the changes of the pushed commits as well: a blob added at an excluded path
+    and at a scanned one must still be scanned.
+
+    Args:
+        git_dir: Git directory of the repository
+        updates: Ref updates of the push
+        env: Object directory variables of the push (see `git_object_env`)
+
+    Returns:
+        One entry per new blob and path, blobs in `git rev-list --objects` order
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+    """
+    new_oids = [update.new for update in updates if not is_zero_oid(update.new)]
+    if not new_oids:
+        return []
+
+    objects = _run_git(git_dir, ["rev-list", "--objects", *new_oids, "--not", "--all"], env)
+    # Commits are listed without a path; their trees and blobs are followed by one
+    named = b"".join(line + b"\n" for line in objects.splitlines() if b" " in line)
+    checked = _run_git(
+        git_dir, ["cat-file", "--batch-check=%(objecttype) %(objectname) %(objectsize) %(rest)"], env, named
+    )
+
+    sizes: dict[str, int] = {}
+    paths: dict[str, dict[str, None]] = {}
+    for line in checked.decode("utf-8", errors="replace").splitlines():
+        fields = line.split(" ", 3)
+        if len(fields) == 4 and fields[0] == "blob":
+            sizes[fields[1]] = int(fields[2])
+            paths.setdefault(fields[1], {})[fields[3]] = None
+    if not sizes:
+        return []
+
+    changes = _run_git(
+        git_dir,
+        ["log", "-z", "--format=", "--raw", "--no-abbrev", "--no-renames", "-m", "--root", *new_oids, "--not", "--all"],
+        env,
+    )
+    entries = [entry.lstrip(b"\n") for entry in changes.split(b"\0")]
+    for header, path in zip(entries, entries[1:], strict=False):
+        if header.startswith(b":"):
+            oid = header.split()[3].decode()
+            if oid in paths:
+                paths[oid][path.decode("utf-8", errors="replace")] = None
+
+    return [PushedBlob(oid=oid, path=path, size=sizes[oid]) for oid, blob_paths in paths.items() for path in blob_paths]
+
+
+def read_objects(git_dir: Path, names: list[str], env: Mapping[str, str]) -> list[bytes | None]:
+    """
+    Read the content of objects with a single `git cat-file --batch` call.
+
+    Args:
+        git_dir: Git directory of the repository
+        names: Object names or `<rev>:<path>` expressions
+        env: Object directory variables of the push (see `git_object_env`)
+
+    Returns:
+        Content of each object in order, or None for names that don't resolve to an object
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+    """
+    output = _run_git(git_dir, ["cat-file", "--batch"], env, "".join(f"{name}\n" for name in names).encode())
+    contents: list[bytes | None] = []
+    position = 0
+    for _ in names:
+        end = output.index(b"\n", position)
+        header = output[position:end]
+        position = end + 1
+        if header.endswith((b" missing", b" ambiguous")):
+            contents.append(None)
+            continue
+        size = int(header.rsplit(b" ", 1)[1])
+        contents.append(output[position : position + size])
+        position += size + 1
+    return contents
+
+
+def load_server_baseline(git_dir: Path, env: Mapping[str, str]) -> Baseline | None:
+    """
+    Load the baseline of the repository's default branch as it is before the push.
+
+    Baselines in the pushed commits are ignored: the pusher controls them, so a push could
+    whitelist its own violations. Ref updates are only applied after the pre-receive hook, so
+    `HEAD` still names the default branch without the push, and a baseline change takes effect
+    only once it is on the default branch.
+
+    Args:
+        git_dir: Git directory of the repository
+        env: Object directory variables of the push (see `git_object_env`)
+
+    Returns:
+        Baseline, or None if the default branch has none (or doesn't exist yet)
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+        CannotLoadConfigError: If the baseline is invalid
+    """
+    name = f"HEAD:{BASELINE_FILE_NAME}"
+    data = read_objects(git_dir, [name], env)[0]
+    return parse_baseline(data, name) if data is not None else None
+
+
+def scan_blobs(
+    git_dir: Path,
+    env: Mapping[str, str],
+    blobs: list[PushedBlob],
+    config: Config,
+    resolver: MatcherResolver,
+    detectors: DetectorRunner | None = None,
+) -> list[list[Violation]]:
+    """
+    Read blobs and scan each one as a file whose lines are all added.
+
+    Binary blobs and blobs over `max_file_lines` are not scanned and have no violations.
+
+    Args:
+        git_dir: Git directory of the repository
+        env: Object directory variables of the push (see `git_object_env`)
+        blobs: Blobs to scan
+        config: Configuration with `max_file_lines`
+        resolver: Matcher resolver for the config
+        detectors: Detectors that check each blob after the phrase matcher
+
+    Returns:
+        Violations of each blob, in order
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+    """
+    verdicts = []
+    for blob, data in zip(blobs, read_objects(git_dir, [blob.oid for blob in blobs], env), strict=True):
+        lines = decode_text_file(data, config) if data is not None else None
+        verdicts.append(scan_file_lines(blob.path, lines, resolver, detectors) if lines is not None else [])
+    return verdicts
+
+
+def _init_worker(config: Config, resolver: MatcherResolver, detectors: DetectorRunner | None) -> None:
+    """Keep the config, its compiled matchers and detectors in a worker process for all of its pushes."""
+    global _worker_rules
+    _worker_rules = (config, resolver, detectors)
+
+
+def _scan_blobs_in_worker(git_dir: Path, env: dict[str, str], blobs: list[PushedBlob]) -> list[list[Violation]]:
+    """Scan a batch of blobs with the rules the worker was started with."""
+    if _worker_rules is None:
+        raise RuntimeError("Pre-receive worker was started without rules")
+    return scan_blobs(git_dir, env, blobs, *_worker_rules)
+
+
+def _batches(blobs: list[PushedBlob]) -> Iterator[list[PushedBlob]]:
+    """Group blobs so small ones share a git call and a worker round trip, while large pushes still spread out."""
+    batch: list[PushedBlob] = []
+    size = 0
+    for blob in blobs:
+        if batch and (size + blob.size > BATCH_BYTES or len(batch) == MAX_BATCH_BLOBS):
+            yield batch
+            batch, size = [], 0
+        batch.append(blob)
+        size += blob.size
+    if batch:
+        yield batch
+
+
+class VerdictCache:
+    """
+    Violations of scanned blobs, shared by all pushes a scanner handles, so a blob pushed to several
+    branches or repositories is scanned once. Entries are keyed by the blob and its path, which
+    selects the rules, and the least recently used ones are evicted past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_VERDICTS) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], list[Violation]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, blob: PushedBlob) -> list[Violation] | None:
+        """Get the violations of a blob, or None if it was not scanned yet."""
+        key = (blob.oid, blob.path)
+        with self._lock:
+            violations = self._entries.get(key)
+            if violations is not None:
+                self._entries.move_to_end(key)
+            return violations
+
+    def put(self, blob: PushedBlob, violations: list[Violation]) -> None:
+        """Store the violations of a scanned blob."""
+        with self._lock:
+            self._entries[(blob.oid, blob.path)] = violations
+            self._entries.move_to_end((blob.oid, blob.path))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class PushScanner:
+    """
+    Scans pushes in a process pool that is started once and keeps the compiled rules loaded.
+
+    Pushes may be scanned from several threads at once; they share the pool and the verdict cache.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        resolver: MatcherResolver,
+        detectors: DetectorRunner | None,
+        workers: int,
+        cache: VerdictCache | None = None,
+    ) -> None:
+        self.config = config
+        self.cache = cache if cache is not None else VerdictCache()
+        self._classifier = ExclusionClassifier.from_config(config)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(config, resolver, detectors)
+        )
+
+    def __enter__(self) -> "PushScanner":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes, dropping batches that have not started."""
+        self._executor.shutdown(cancel_futures=True)
+
+    def scan_push(self, git_dir: Path, updates: list[RefUpdate], env: Mapping[str, str], timeout: float) -> PushScan:
+        """
+        Scan the blobs a push adds to a repository.
+
+        Blobs reachable from an existing ref, excluded by the config or with a cached verdict are
+        not scanned. The rest are scanned in batches in the pool. If that takes longer than
+        `timeout`, the scan stops waiting and is marked as timed out; batches that finish later
+        still fill the cache, so pushing again picks up where the scan stopped. Violations
+        recorded in the baseline of the default branch (before the push) are dropped.
+
+        Args:
+            git_dir: Git directory of the repository
+            updates: Ref updates of the push
+            env: Object directory variables of the push (see `git_object_env`)
+            timeout: Seconds the scan may take
+
+        Returns:
+            PushScan with the violations in blob order
+        """
+        started_at = time.monotonic()
+        scan = PushScan()
+        if repository_name(git_dir) in self.config.exclude_repos:
+            return scan
+
+        try:
+            blobs = [
+                blob for blob in list_new_blobs(git_dir, updates, env) if self._classifier.classify(blob.path) is None
+            ]
+            baseline = load_server_baseline(git_dir, env)
+        except subprocess.CalledProcessError as exc:
+            scan.error = f"Cannot read the pushed objects: {exc.stderr.decode(errors='replace').strip()}"
+            return scan
+        except (OSError, CannotLoadConfigError) as exc:
+            scan.error = str(exc)
+            return scan
+
+        verdicts: dict[PushedBlob, list[Violation]] = {}
+        pending = []
+        for blob in blobs:
+            cached = self.cache.get(blob)
+            if cached is None:
+                pending.append(blob)
+            else:
+                verdicts[blob] = cached
+        scan.blobs = len(blobs)
+        scan.cached_blobs = len(blobs) - len(pending)
+
+        batches: dict[Future[list[list[Violation]]], list[PushedBlob]] = {}
+        for batch in _batches(pending):
+            future = self._executor.submit(_scan_blobs_in_worker, git_dir, dict(env), batch)
+            future.add_done_callback(functools.partial(self._cache_batch, batch))
+            batches[future] = batch
+
+        done, not_done = wait(batches, timeout=max(0.0, timeout - (time.monotonic() - started_at)))
+        for future in not_done:
+            future.cancel()
+        scan.timed_out = bool(not_done)
+        for future in done:
+            try:
+                results = future.result()
+            except (subprocess.CalledProcessError, OSError, BrokenProcessPool) as exc:
+                scan.error = f"Cannot scan the pushed objects: {exc}"
+                continue
+            verdicts.update(zip(batches[future], results, strict=True))
+            scan.scanned_bytes += sum(blob.size for blob in batches[future])
+
+        for blob in blobs:
+            scan.violations.extend(verdicts.get(blob, []))
+        if baseline is not None:
+            scan.violations = baseline.filter(scan.violations)
+        return scan
+
+    def _cache_batch(self, batch: list[PushedBlob], future: Future[list[list[Violation]]]) -> None:
+        """Cache the verdicts of a finished batch, even if the push it was started for stopped waiting."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        for blob, violations in zip(batch, future.result(), strict=True):
+            self.cache.put(blob, violations)
+
+
+def _push_scan_from_json(data: dict[str, Any]) -> PushScan:
+    """Rebuild a PushScan sent by the scan server."""
+    violations = [
+        Violation(**(violation | {"severity": Severity(violation["severity"])})) for violation in data["violations"]
+    ]
+    return PushScan(
+        violations=violations,
+        blobs=data["blobs"],
+        cached_blobs=data["cached_blobs"],
+        scanned_bytes=data["scanned_bytes"],
+        timed_out=data["timed_out"],
+        error=data["error"],
+    )
+
+
+class _PushScanHandler(socketserver.StreamRequestHandler):
+    """Handles one scan request: a JSON line with the push, answered with a JSON line with its PushScan."""
+
+    server: "PushScanServer"
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            updates = [RefUpdate(*update) for update in request["updates"]]
+            scan = self.server.scanner.scan_push(
+                Path(request["git_dir"]), updates, request["env"], float(request["timeout"])
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            scan = PushScan(error=f"Invalid scan request: {exc}")
+        self.wfile.write(json.dumps(asdict(scan), ensure_ascii=False).encode() + b"\n")
+
+
+class PushScanServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Serves the scan requests of pre-receive hooks on a Unix socket, one thread per push, all
+    sharing one PushScanner. The socket is accessible to the server's user only.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, scanner: PushScanner) -> None:
+        self.scanner = scanner
+        socket_path.unlink(missing_ok=True)
+        super().__init__(str(socket_path), _PushScanHandler)
+        socket_path.chmod(0o600)
+
+
+def request_push_scan(
+    socket_path: Path, git_dir: Path, updates: list[RefUpdate], env: Mapping[str, str], timeout: float
+) -> PushScan:
+    """
+    Ask a scan server to scan a push.
+
+    Args:
+        socket_path: Unix socket of the server
+        git_dir: Git directory of the repository
+        updates: Ref updates of the push
+        env: Object directory variables of the push (see `git_object_env`)
+        timeout: Seconds the scan may take
+
+    Returns:
+        PushScan computed by the server
+
+    Raises:
+        OSError: If the server is not running or doesn't answer in time
+    """
+    request = {
+        "git_dir": str(git_dir),
+        "env": dict(env),
+        "updates": [[update.old, update.new, update.ref] for update in updates],
+        "timeout": timeout,
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout + SERVER_TIMEOUT_MARGIN)
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as response:
+            line = response.readline()
+    if not line:
+        raise ConnectionError("Scan server closed the connection without an answer")
+    return _push_scan_from_json(json.loads(line))
@@ -0,0 +1,76 @@
+"""
+Resolution of path-scoped rule sets for files in a diff.
+"""
+
+import glob
+import re
+from dataclasses import dataclass, field
+
+from .models import RuleSet
+
+GLOB_CHARS = frozenset("*?[")
+
+
+@dataclass
+class _TrieNode:
+    """Node of the path trie: a literal directory (or file) name with the globs anchored below it."""
+
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    globs: list[tuple[int, re.Pattern[str]]] = field(default_factory=list)
+
+
+def _normalize_glob(path_glob: str) -> str:
+    """
+    Normalize a rule set path glob.
+
+    Globs without a slash match file names at any depth (like `.gitignore` entries),
+    and a trailing slash matches everything under a directory.
+    """
+    path_glob = path_glob.lstrip("/")
+    if path_glob.endswith("/"):
+        path_glob += "**"
+    return path_glob if "/" in path_glob else f"**/{path_glob}"
+
+
+class RuleSetIndex:
+    """
+    Finds the rule sets that apply to a path using a trie of the globs' literal leading directories.
+
+    Each glob is stored at the node of its longest literal directory prefix (`src/**` under `src`,
+    `**/*.ts` at the root), so resolving a path only tests the globs found along its own
+    directories instead of every glob in the config.
+    """
+
+    def __init__(self, rule_sets: list[RuleSet]) -> None:
+        self._root = _TrieNode()
+        for index, rule_set in enumerate(rule_sets):
+            for path_glob in rule_set.paths:
+                self._insert(_normalize_glob(path_glob), index)
+
+    def _insert(self, path_glob: str, index: int) -> None:
+        node = self._root
+        for segment in path_glob.split("/")[:-1]:
+            if GLOB_CHARS.intersection(segment):
+                break
+            node = node.children.setdefault(segment, _TrieNode())
+        regex = re.compile(glob.translate(path_glob, recursive=True, include_hidden=True))
+        node.globs.append((index, regex))
+
+    def lookup(self, path: str) -> tuple[int, ...]:
+        """
+        Find the rule sets that apply to a file.
+
+        Args:
+            path: Repository-relative file path
+
+        Returns:
+            Sorted indices of the matching rule sets
+        """
+        matches: set[int] = set()
+        node: _TrieNode | None = self._root
+        for segment in path.split("/"):
+            if node is None:
+                break
+            matches.update(index for index, regex in node.globs if index not in matches and regex.match(path))
+            node = node.children.get(segment)
+        return tuple(sorted(matches))
@@ -0,0 +1,797 @@
+"""
+Linear-time matching of user-supplied regular expressions.
+
+Patterns are restricted to a regular subset of Python regex syntax (no backreferences,
+lookaround, word boundaries or other constructs that need backtracking) and compiled into
+a Thompson NFA of bounded size, which is simulated by a lazily built DFA with a bounded
+state cache. Each character of a line is examined a constant number of times, with at most
+one NFA step per character when the cache misses, so matching is linear in the line length
+no matter how the pattern is written.
+
+Supported syntax: literals, `.`, character classes (`[a-z]`, `[^...]`), `\\d \\w \\s`
+and their negations (ASCII only, as in RE2), groups (`(...)`, `(?:...)`, `(?P<name>...)`),
+alternation, the quantifiers `* + ? {m} {m,} {m,n}` (lazy variants behave like greedy ones),
+and the anchors `^ $ \\A \\Z`. Matching is case-insensitive, like forbidden phrases.
+"""
+
+import re
+import threading
+from bisect import bisect_right
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .case_folding import case_variants, fold_char
+
+MAX_CODE_POINT = 0x10FFFF
+MAX_REPEAT = 100
+MAX_NFA_STATES = 5000
+MAX_DFA_STATES = 10000
+CASE_CLOSURE_MAX_RANGE = 512
+QUANTIFIER_REGEX = re.compile(r"\{(\d*)(,(\d*))?\}")
+
+Intervals = tuple[tuple[int, int], ...]
+
+DIGIT: Intervals = ((ord("0"), ord("9")),)
+WORD: Intervals = ((ord("0"), ord("9")), (ord("A"), ord("Z")), (ord("_"), ord("_")), (ord("a"), ord("z")))
+SPACE: Intervals = ((9, 13), (32, 32))
+ANY_BUT_NEWLINE: Intervals = ((0, 9), (11, MAX_CODE_POINT))
+
+SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "a": "\a"}
+CLASS_ESCAPES = {"d": (DIGIT, False), "D": (DIGIT, True), "w": (WORD, False), "W": (WORD, True)}
+CLASS_ESCAPES |= {"s": (SPACE, False), "S": (SPACE, True)}
+REJECTED_ESCAPES = {
+    "b": "word boundaries (\\b) are not supported",
+    "B": "word boundaries (\\B) are not supported",
+    "G": "\\G is not supported",
+    "N": "named characters (\\N{...}) are not supported",
+}
+
+# NFA state kinds
+_CHAR, _SPLIT, _BOL, _EOL, _MATCH = range(5)
+
+# AST node: ("set", intervals) | ("cat", [nodes]) | ("alt", [nodes]) | ("rep", node, min, max) | ("bol",) | ("eol",)
+Node = tuple
+
+
+class UnsafePatternError(Exception):
+    """Raised when a forbidden pattern uses unsupported syntax or is too complex for a bounded DFA."""
+
+    def __init__(self, pattern: str, reason: str) -> None:
+        super().__init__()
+        self.pattern = pattern
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"Unsafe or unsupported pattern '{self.pattern}': {self.reason}"
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    """A match of a forbidden pattern within a line."""
+
+    start: int
+    end: int
+    pattern_index: int
+
+
+def _normalize(intervals: list[tuple[int, int]]) -> Intervals:
+    merged: list[tuple[int, int]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return tuple(merged)
+
+
+def _negate(intervals: Intervals) -> Intervals:
+    result = []
+    next_lo = 0
+    for lo, hi in intervals:
+        if lo > next_lo:
+            result.append((next_lo, lo - 1))
+        next_lo = hi + 1
+    if next_lo <= MAX_CODE_POINT:
+        result.append((next_lo, MAX_CODE_POINT))
+    return tuple(result)
+
+
+def _case_closure(intervals: Intervals) -> Intervals:
+    extra = list(intervals)
+    for lo, hi in intervals:
+        if hi - lo > CASE_CLOSURE_MAX_RANGE:
+            continue
+        for code in range(lo, hi + 1):
+            extra.extend((ord(variant), ord(variant)) for variant in case_variants(chr(code)))
+    return _normalize(extra)
+
+
+def _contains(intervals: Intervals, code: int) -> bool:
+    index = bisect_right(intervals, (code, MAX_CODE_POINT + 1)) - 1
+    return index >= 0 and intervals[index][0] <= code <= intervals[index][1]
+
+
+class _Parser:
+    """Recursive descent parser for the supported regex subset."""
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.pos = 0
+
+    def error(self, reason: str) -> UnsafePatternError:
+        return UnsafePatternError(self.pattern, reason)
+
+    def parse(self) -> Node:
+        node = self.parse_alternation()
+        if self.pos < len(self.pattern):
+            raise self.error(f"unbalanced parenthesis at position {self.pos}")
+        return node
+
+    def peek(self) -> str | None:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def parse_alternation(self) -> Node:
+        branches = [self.parse_concatenation()]
+        while self.peek() == "|":
+            self.pos += 1
+            branches.append(self.parse_concatenation())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def parse_concatenation(self) -> Node:
+        items = []
+        while self.peek() not in (None, "|", ")"):
+            items.append(self.parse_repetition())
+        return ("cat", items)
+
+    def parse_repetition(self) -> Node:
+        node = self.parse_atom()
+        quantifier = self.parse_quantifier()
+        if quantifier is None:
+            return node
+
+        if self.peek() == "?":
+            self.pos += 1
+        elif self.peek() == "+":
+            raise self.error("possessive quantifiers are not supported")
+        if self.peek() in ("*", "+", "?") or self._quantifier_at(self.pos):
+            raise self.error(f"multiple repeat at position {self.pos}")
+
+        minimum, maximum = quantifier
+        if minimum > MAX_REPEAT or (maximum is not None and maximum > MAX_REPEAT):
+            raise self.error(f"repetition counts above {MAX_REPEAT} are not supported")
+        if maximum is not None and maximum < minimum:
+            raise self.error("min repeat greater than max repeat")
+        return ("rep", node, minimum, maximum)
+
+    def _quantifier_at(self, pos: int) -> re.Match[str] | None:
+        match = QUANTIFIER_REGEX.match(self.pattern, pos)
+        return match if match is not None and (match.group(1) or match.group(2)) else None
+
+    def parse_quantifier(self) -> tuple[int, int | None] | None:
+        char = self.peek()
+        if char == "*":
+            self.pos += 1
+            return 0, None
+        if char == "+":
+            self.pos += 1
+            return 1, None
+        if char == "?":
+            self.pos += 1
+            return 0, 1
+        if char == "{":
+            match = self._quantifier_at(self.pos)
+            if match is None:
+                return None
+            self.pos = match.end()
+            minimum = int(match.group(1) or 0)
+            if match.group(2) is None:
+                return minimum, minimum
+            return minimum, int(match.group(3)) if match.group(3) else None
+        return None
+
+    def parse_atom(self) -> Node:
+        char = self.pattern[self.pos]
+        self.pos += 1
+
+        if char == "(":
+            return self.parse_group()
+        if char == "[":
+            return ("set", self.parse_class())
+        if char == ".":
+            return ("set", ANY_BUT_NEWLINE)
+        if char == "^":
+            return ("bol",)
+        if char == "$":
+            return ("eol",)
+        if char == "\\":
+            return self.parse_escape()
+        if char in "*+?" or (char == "{" and self._quantifier_at(self.pos - 1)):
+            raise self.error(f"nothing to repeat at position {self.pos - 1}")
+        return ("set", _case_closure(((ord(char), ord(char)),)))
+
+    def parse_group(self) -> Node:
+        if self.pattern.startswith("?", self.pos):
+            rest = self.pattern[self.pos + 1 :]
+            if rest.startswith(":"):
+                self.pos += 2
+            elif rest.startswith("P<"):
+                end = self.pattern.find(">", self.pos)
+                if end < 0:
+                    raise self.error("unterminated group name")
+                self.pos = end + 1
+            elif rest.startswith(("=", "!", "<=", "<!")):
+                raise self.error("lookaround assertions are not supported")
+            elif rest.startswith("P="):
+                raise self.error("backreferences are not supported")
+            elif rest.startswith(">"):
+                raise self.error("atomic groups are not supported")
+            elif rest.startswith("("):
+                raise self.error("conditional groups are not supported")
+            else:
+                raise self.error("inline flags and other group extensions are not supported")
+
+        node = self.parse_alternation()
+        if self.peek() != ")":
+            raise self.error("missing ), unterminated subpattern")
+        self.pos += 1
+        return node
+
+    def parse_escape(self) -> Node:
+        if self.pos >= len(self.pattern):
+            raise self.error("bad escape (end of pattern)")
+        char = self.pattern[self.pos]
+        self.pos += 1
+
+        if char in CLASS_ESCAPES:
+            intervals, negated = CLASS_ESCAPES[char]
+            return ("set", _negate(intervals) if negated else intervals)
+        if char == "A":
+            return ("bol",)
+        if char in "Zz":
+            return ("eol",)
+        if char.isdigit() and char != "0":
+            raise self.error("backreferences are not supported")
+        if char in REJECTED_ESCAPES:
+            raise self.error(REJECTED_ESCAPES[char])
+        return ("set", _case_closure(((self.parse_escaped_code(char),) * 2,)))
+
+    def parse_escaped_code(self, char: str) -> int:
+        if char in SIMPLE_ESCAPES:
+            return ord(SIMPLE_ESCAPES[char])
+        if char == "0":
+            return 0
+        hex_lengths = {"x": 2, "u": 4, "U": 8}
+        if char in hex_lengths:
+            digits = self.pattern[self.pos : self.pos + hex_lengths[char]]
+            if len(digits) != hex_lengths[char] or not all(d in "0123456789abcdefABCDEF" for d in digits):
+                raise self.error(f"incomplete escape \\{char}{digits}")
+            self.pos += hex_lengths[char]
+            code = int(digits, 16)
+            if code > MAX_CODE_POINT:
+                raise self.error(f"bad escape \\{char}{digits}")
+            return code
+        if char.isascii() and char.isalnum():
+            raise self.error(f"bad escape \\{char}")
+        return ord(char)
+
+    def parse_class(self) -> Intervals:
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+
+        items: list[tuple[int, int]] = []
+        first = True
+        while True:
+            if self.pos >= len(self.pattern):
+                raise self.error("unterminated character set")
+            char = self.pattern[self.pos]
+            if char == "]" and not first:
+                self.pos += 1
+                break
+            first = False
+            self.pos += 1
+
+            if char == "\\":
+                escape = self.pattern[self.pos] if self.pos < len(self.pattern) else ""
+                self.pos += 1
+                if escape in CLASS_ESCAPES:
+                    intervals, escape_negated = CLASS_ESCAPES[escape]
+                    items.extend(_negate(intervals) if escape_negated else intervals)
+                    continue
+                if escape == "b":
+                    low = ord("\b")
+                elif escape in REJECTED_ESCAPES or (escape.isdigit() and escape != "0"):
+                    raise self.error(f"bad escape \\{escape} in character set")
+                else:
+                    low = self.parse_escaped_code(escape)
+            else:
+                low = ord(char)
+
+            high = low
+            if self.peek() == "-" and self.pattern[self.pos + 1 : self.pos + 2] not in ("]", ""):
+                self.pos += 1
+                end_char = self.pattern[self.pos]
+                self.pos += 1
+                if end_char == "\\":
+                    escape = self.pattern[self.pos] if self.pos < len(self.pattern) else ""
+                    self.pos += 1
+                    if escape in CLASS_ESCAPES:
+                        raise self.error("bad character range")
+                    high = self.parse_escaped_code(escape)
+                else:
+                    high = ord(end_char)
+                if high < low:
+                    raise self.error("bad character range")
+            items.append((low, high))
+
+        intervals = _case_closure(_normalize(items))
+        return _negate(intervals) if negated else intervals
+
+
+def _nullable(node: Node) -> bool:
+    kind = node[0]
+    if kind == "set":
+        return False
+    if kind == "cat":
+        return all(_nullable(child) for child in node[1])
+    if kind == "alt":
+        return any(_nullable(child) for child in node[1])
+    if kind == "rep":
+        return node[2] == 0 or _nullable(node[1])
+    return True
+
+
+def _nfa_size(node: Node) -> int:
+    kind = node[0]
+    if kind == "cat":
+        return sum(_nfa_size(child) for child in node[1])
+    if kind == "alt":
+        return 1 + sum(_nfa_size(child) for child in node[1])
+    if kind == "rep":
+        _, child, minimum, maximum = node
+        size = _nfa_size(child)
+        return minimum * size + (size + 1 if maximum is None else (maximum - minimum) * (size + 1))
+    return 1
+
+
+def _literal_char(node: Node) -> str | None:
+    """Get the case-folded character matched by a set node, if it only matches case variants of one character."""
+    if node[0] != "set" or sum(hi - lo + 1 for lo, hi in node[1]) > CASE_CLOSURE_MAX_RANGE:
+        return None
+    folded = {fold_char(chr(code)) for lo, hi in node[1] for code in range(lo, hi + 1)}
+    return folded.pop() if len(folded) == 1 else None
+
+
+def _required_literal(node: Node) -> str:
+    """Get the longest literal (case-folded) that every match of a node must contain, or an empty string."""
+    kind = node[0]
+    if kind == "set":
+        return _literal_char(node) or ""
+    if kind == "rep":
+        return _required_literal(node[1]) if node[2] > 0 else ""
+    if kind != "cat":
+        return ""
+
+    candidates = [""]
+    run = ""
+    for child in node[1]:
+        char = _literal_char(child)
+        if char is not None:
+            run += char
+            continue
+        candidates.extend([run, _required_literal(child)])
+        run = ""
+    candidates.append(run)
+    return max(candidates, key=len)
+
+
+def _reverse(node: Node) -> Node:
+    kind = node[0]
+    if kind == "cat":
+        return ("cat", [_reverse(child) for child in reversed(node[1])])
+    if kind == "alt":
+        return ("alt", [_reverse(child) for child in node[1]])
+    if kind == "rep":
+        return ("rep", _reverse(node[1]), node[2], node[3])
+    if kind == "bol":
+        return ("eol",)
+    if kind == "eol":
+        return ("bol",)
+    return node
+
+
+def parse_pattern(pattern: str) -> Node:
+    """
+    Parse a pattern into an AST, rejecting unsafe or unsupported constructs.
+
+    Args:
+        pattern: Pattern source
+
+    Returns:
+        AST of the pattern
+
+    Raises:
+        UnsafePatternError: If the pattern is invalid, unsupported, too large
+                            or can match an empty string
+    """
+    if not pattern:
+        raise UnsafePatternError(pattern, "pattern cannot be empty")
+    node = _Parser(pattern).parse()
+    if _nullable(node):
+        raise UnsafePatternError(pattern, "pattern can match an empty string")
+    if _nfa_size(node) > MAX_NFA_STATES:
+        raise UnsafePatternError(pattern, f"pattern is too complex (more than {MAX_NFA_STATES} automaton states)")
+    return node
+
+
+class _Nfa:
+    """Thompson NFA built from pattern ASTs, one match state per pattern."""
+
+    def __init__(self) -> None:
+        self.kinds: list[int] = []
+        self.sets: list[Intervals] = []
+        self.outs: list[list[int]] = []
+        self.tags: list[int] = []
+
+    def add(self, kind: int, outs: list[int], intervals: Intervals = (), tag: int = -1) -> int:
+        self.kinds.append(kind)
+        self.outs.append(outs)
+        self.sets.append(intervals)
+        self.tags.append(tag)
+        return len(self.kinds) - 1
+
+    def build(self, node: Node, next_state: int) -> int:
+        kind = node[0]
+        if kind == "set":
+            return self.add(_CHAR, [next_state], node[1])
+        if kind == "cat":
+            for child in reversed(node[1]):
+                next_state = self.build(child, next_state)
+            return next_state
+        if kind == "alt":
+            return self.add(_SPLIT, [self.build(child, next_state) for child in node[1]])
+        if kind == "bol":
+            return self.add(_BOL, [next_state])
+        if kind == "eol":
+            return self.add(_EOL, [next_state])
+
+        _, child, minimum, maximum = node
+        if maximum is None:
+            entry = self.add(_SPLIT, [])
+            self.outs[entry].extend([self.build(child, entry), next_state])
+        else:
+            entry = next_state
+            for _ in range(maximum - minimum):
+                entry = self.add(_SPLIT, [self.build(child, entry), next_state])
+        for _ in range(minimum):
+            entry = self.build(child, entry)
+        return entry
+
+
+class _LazyDfa:
+    """
+    DFA over alphabet equivalence classes, built lazily from an NFA by subset construction.
+
+    States are created on first use and kept in a cache of at most `max_states` states;
+    when the cache is full it is flushed and rebuilt on demand, which bounds memory use
+    while keeping the per-character cost bounded by the NFA size.
+    """
+
+    def __init__(self, nfa: _Nfa, root: int, unanchored: bool, max_states: int | None = None) -> None:
+        self._nfa = nfa
+        self._root = root
+        self._max_states = MAX_DFA_STATES if max_states is None else max_states
+        self._build_alphabet()
+        self._inject = self._closure([root], at_start=False, at_end=False) if unanchored else frozenset()
+
+        self._ids: dict[frozenset[int], int] = {}
+        self.states: list[frozenset[int]] = []
+        self.table: list[list[int]] = []
+        self.match_tags: list[frozenset[int]] = []
+        self.match_tags_at_end: list[frozenset[int]] = []
+        self.accepting: list[bool] = []
+        self.accepting_at_end: list[bool] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        for cache in (self._ids, self.states, self.table, self.match_tags, self.match_tags_at_end):
+            cache.clear()
+        self.accepting.clear()
+        self.accepting_at_end.clear()
+        self.start_at_bol = self._add(self._closure([self._root], at_start=True, at_end=False))
+        self.start = self._add(self._closure([self._root], at_start=False, at_end=False))
+        self.dead = self._add(frozenset()) if not self._inject else -1
+
+    def _add(self, nfa_states: frozenset[int]) -> int:
+        state = self._ids.get(nfa_states)
+        if state is None:
+            state = self._ids[nfa_states] = len(self.states)
+            self.states.append(nfa_states)
+            self.table.append([-1] * self.class_count)
+            tags = self._tags(nfa_states)
+            tags_at_end = self._tags(self._closure(nfa_states, at_start=False, at_end=True))
+            self.match_tags.append(tags)
+            self.match_tags_at_end.append(tags_at_end)
+            self.accepting.append(bool(tags))
+            self.accepting_at_end.append(bool(tags_at_end))
+        return state
+
+    def _move(self, nfa_states: frozenset[int], class_id: int) -> frozenset[int]:
+        nfa = self._nfa
+        moved = [nfa.outs[s][0] for s in nfa_states if nfa.kinds[s] == _CHAR and class_id in self._accepts[s]]
+        return self._closure(moved, at_start=False, at_end=False) | self._inject
+
+    def transition(self, state: int, class_id: int) -> int:
+        """
+        Get the state reached from `state` on a character class, computing it if needed.
+
+        Args:
+            state: Current DFA state
+            class_id: Alphabet class of the next character
+
+        Returns:
+            Next DFA state (state numbers are only valid until the next cache flush,
+            so callers must continue from the returned state)
+        """
+        target = self.table[state][class_id]
+        if target >= 0:
+            return target
+
+        source = self.states[state]
+        target_states = self._move(source, class_id)
+        if target_states not in self._ids and len(self.states) >= self._max_states:
+            self._reset()
+            state = self._add(source)
+        target = self._add(target_states)
+        self.table[state][class_id] = target
+        return target
+
+    def _build_alphabet(self) -> None:
+        nfa = self._nfa
+        char_states = [s for s, kind in enumerate(nfa.kinds) if kind == _CHAR]
+        points = {0}
+        for s in char_states:
+            for lo, hi in nfa.sets[s]:
+                points.add(lo)
+                if hi < MAX_CODE_POINT:
+                    points.add(hi + 1)
+        self.boundaries = sorted(points)
+
+        signatures: dict[tuple[int, ...], int] = {}
+        self.interval_classes = []
+        for point in self.boundaries:
+            signature = tuple(s for s in char_states if _contains(nfa.sets[s], point))
+            self.interval_classes.append(signatures.setdefault(signature, len(signatures)))
+        self.class_count = len(signatures)
+
+        self._accepts: dict[int, set[int]] = {s: set() for s in char_states}
+        for signature, class_id in signatures.items():
+            for s in signature:
+                self._accepts[s].add(class_id)
+
+        self.ascii_classes = [self._lookup_class(code) for code in range(128)]
+        self._class_cache: dict[str, int] = {}
+
+    def _lookup_class(self, code: int) -> int:
+        return self.interval_classes[bisect_right(self.boundaries, code) - 1]
+
+    def class_of(self, char: str) -> int:
+        """Get the alphabet equivalence class of a character."""
+        code = ord(char)
+        if code < 128:
+            return self.ascii_classes[code]
+        class_id = self._class_cache.get(char)
+        if class_id is None:
+            class_id = self._class_cache[char] = self._lookup_class(code)
+        return class_id
+
+    def _closure(self, states: list[int] | frozenset[int], at_start: bool, at_end: bool) -> frozenset[int]:
+        nfa = self._nfa
+        seen: set[int] = set()
+        stack = list(states)
+        while stack:
+            s = stack.pop()
+            if s in seen:
+                continue
+            seen.add(s)
+            kind = nfa.kinds[s]
+            if kind == _SPLIT or (kind == _BOL and at_start) or (kind == _EOL and at_end):
+                stack.extend(nfa.outs[s])
+        return frozenset(s for s in seen if nfa.kinds[s] in (_CHAR, _EOL, _MATCH))
+
+    def _tags(self, states: frozenset[int]) -> frozenset[int]:
+        return frozenset(self._nfa.tags[s] for s in states if self._nfa.kinds[s] == _MATCH)
+
+    def skip_regex(self) -> re.Pattern[str] | None:
+        """
+        Build a regex finding the next character that can leave the unanchored start state.
+
+        Returns:
+            Compiled character class regex, or None if every character leaves the start state
+        """
+        active = {
+            class_id for class_id in range(self.class_count) if self._move(self._inject, class_id) != self._inject
+        }
+        if len(active) == self.class_count:
+            return None
+        ranges = []
+        for index, point in enumerate(self.boundaries):
+            if self.interval_classes[index] in active:
+                high = self.boundaries[index + 1] - 1 if index + 1 < len(self.boundaries) else MAX_CODE_POINT
+                ranges.append(f"\\U{point:08x}-\\U{high:08x}")
+        return re.compile(f"[{''.join(ranges)}]") if ranges else re.compile("(?!)")
+
+
+class SafePatternSet:
+    """
+    Forbidden patterns compiled together into linear-time forward, reverse and anchored automata.
+
+    Each pattern belongs to a group (by default all patterns share group 0); a single pass of each
+    automaton finds the leftmost match of every group, so grouping patterns never adds passes over a line.
+    The automata grow (and are flushed) while matching, so searches hold a lock and a pattern set
+    can be shared by threads. Pickling a pattern set stores only its patterns; the automata are
+    built again when unpickled.
+    """
+
+    def __init__(self, patterns: tuple[str, ...], groups: tuple[int, ...] = ()) -> None:
+        self.patterns = patterns
+        self.groups = groups or (0,) * len(patterns)
+        if len(self.groups) != len(patterns):
+            raise ValueError("Each pattern needs exactly one group")
+
+        nodes = [parse_pattern(pattern) for pattern in patterns]
+        self._forward = self._compile(nodes, unanchored=True)
+        self._reverse = self._compile([_reverse(node) for node in nodes], unanchored=True)
+        self._anchored = self._compile(nodes, unanchored=False)
+        self._skip = self._forward.skip_regex()
+        literals = [_required_literal(node) for node in nodes]
+        self._prefilter = re.compile("|".join(map(re.escape, literals)), re.IGNORECASE) if all(literals) else None
+
+        self._all_tags = frozenset(range(len(patterns)))
+        self._group_tags = {
+            group: frozenset(tag for tag, tag_group in enumerate(self.groups) if tag_group == group)
+            for group in self.groups
+        }
+        self._lock = threading.Lock()
+
+    def __reduce__(self) -> tuple[type["SafePatternSet"], tuple[tuple[str, ...], tuple[int, ...]]]:
+        return SafePatternSet, (self.patterns, self.groups)
+
+    @staticmethod
+    def _compile(nodes: list[Node], unanchored: bool) -> _LazyDfa:
+        nfa = _Nfa()
+        entries = [nfa.build(node, nfa.add(_MATCH, [], tag=index)) for index, node in enumerate(nodes)]
+        return _LazyDfa(nfa, nfa.add(_SPLIT, entries), unanchored=unanchored)
+
+    def search(self, text: str) -> PatternMatch | None:
+        """
+        Find the leftmost match of any pattern in a line.
+
+        Lines without a literal that every match must contain are rejected up front. Otherwise
+        the forward automaton checks whether any pattern matches, the reverse automaton, run back
+        from the end of the line, finds the leftmost position where a match starts, and the
+        anchored automaton extends it to the longest match from that start. Each pass is linear
+        in the line length.
+
+        Args:
+            text: Line content
+
+        Returns:
+            PatternMatch, or None if no pattern matches
+        """
+        with self._lock:
+            if not self._find_groups(text, lambda tags: {0} if tags else set(), group_count=1):
+                return None
+            return self._complete(text, {0: self._all_tags})[0]
+
+    def search_groups(self, text: str) -> dict[int, PatternMatch]:
+        """
+        Find the leftmost match of each pattern group in a line, with one pass of each automaton.
+
+        Args:
+            text: Line content
+
+        Returns:
+            Dictionary mapping group IDs to the group's leftmost PatternMatch (groups without a match are omitted)
+        """
+        with self._lock:
+            groups = self._find_groups(text, self._split_tags, group_count=len(self._group_tags))
+            return self._complete(text, {group: self._group_tags[group] for group in sorted(groups)})
+
+    def _split_tags(self, tags: frozenset[int]) -> set[int]:
+        return {group for group, group_tags in self._group_tags.items() if group_tags & tags}
+
+    def _find_groups(self, text: str, split: Callable[[frozenset[int]], set[int]], group_count: int) -> set[int]:
+        """Run the forward automaton until every group has matched, returning the groups that match."""
+        if self._prefilter is not None and self._prefilter.search(text) is None:
+            return set()
+
+        forward = self._forward
+        table = forward.table
+        accepting = forward.accepting
+        state = forward.start_at_bol
+        length = len(text)
+        groups: set[int] = set()
+        index = 0
+
+        while index < length:
+            if state == forward.start and self._skip is not None:
+                found = self._skip.search(text, index)
+                if found is None:
+                    break
+                index = found.start()
+            class_id = forward.class_of(text[index])
+            next_state = table[state][class_id]
+            state = next_state if next_state >= 0 else forward.transition(state, class_id)
+            index += 1
+            if accepting[state]:
+                groups |= split(forward.match_tags[state])
+                if len(groups) == group_count:
+                    return groups
+
+        return groups | split(forward.match_tags_at_end[state])
+
+    def _complete(self, text: str, groups: dict[int, frozenset[int]]) -> dict[int, PatternMatch]:
+        """Find the full leftmost match of each group known to match, considering only the group's patterns."""
+        starts = self._find_starts(text, groups)
+        matches = {}
+        for group, start in starts.items():
+            end, tags = self._find_end(text, start, groups[group])
+            matches[group] = PatternMatch(start=start, end=end, pattern_index=min(tags))
+        return matches
+
+    def _find_starts(self, text: str, groups: dict[int, frozenset[int]]) -> dict[int, int]:
+        """
+        Run the unanchored reverse automaton from the end of the line, recording the leftmost start of each group.
+
+        The reverse automaton accepts after reading `text[index]` exactly when some match starts
+        at `index`, so the last accepting position is the leftmost start, wherever its match ends.
+        """
+        reverse = self._reverse
+        table = reverse.table
+        accepting_at_end = reverse.accepting_at_end
+        state = reverse.start_at_bol
+        starts: dict[int, int] = {}
+        for index in range(len(text) - 1, -1, -1):
+            class_id = reverse.class_of(text[index])
+            next_state = table[state][class_id]
+            state = next_state if next_state >= 0 else reverse.transition(state, class_id)
+            if accepting_at_end[state]:
+                tags = reverse.match_tags_at_end[state] if index == 0 else reverse.match_tags[state]
+                for group, allowed in groups.items():
+                    if tags & allowed:
+                        starts[group] = index
+        return starts
+
+    def _find_end(self, text: str, start: int, allowed: frozenset[int]) -> tuple[int, frozenset[int]]:
+        anchored = self._anchored
+        state = anchored.start_at_bol if start == 0 else anchored.start
+        end, tags = start, frozenset[int]()
+        for index in range(start, len(text)):
+            state = anchored.transition(state, anchored.class_of(text[index]))
+            if state == anchored.dead:
+                return end, tags
+            if anchored.match_tags[state] & allowed:
+                end, tags = index + 1, anchored.match_tags[state] & allowed
+        if anchored.match_tags_at_end[state] & allowed:
+            end, tags = len(text), anchored.match_tags_at_end[state] & allowed
+        return end, tags
+
+
+@lru_cache(maxsize=16)
+def compile_safe_patterns(patterns: tuple[str, ...], groups: tuple[int, ...] = ()) -> SafePatternSet:
+    """
+    Compile forbidden patterns into a linear-time matcher.
+
+    Args:
+        patterns: Pattern sources
+        groups: Group ID of each pattern, or an empty tuple to put all patterns in group 0
+
+    Returns:
+        Compiled SafePatternSet
+
+    Raises:
+        UnsafePatternError: If a pattern is unsupported or too complex
+    """
+    return SafePatternSet(patterns, groups)
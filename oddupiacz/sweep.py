@@ -0,0 +1,224 @@
+"""
+Sweeps of every git repository under a directory tree, scanned in parallel worker processes.
+"""
+
+import contextlib
+import json
+import os
+import subprocess
+from collections.abc import Iterable, Iterator
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from pathlib import Path
+from typing import TextIO
+
+from .attributes import check_skip_attributes
+from .baseline import load_repo_baseline
+from .checker import find_violations_in_lines, MatcherResolver, scannable_lines
+from .config import CannotLoadConfigError, Config
+from .detectors import DetectorRunner
+from .exclusions import ExclusionClassifier
+from .git_utils import list_tracked_files
+from .models import FileDiff, RepositoryScan, Violation
+
+BINARY_CHECK_BYTES = 8000
+GIT_DIR_NAME = ".git"
+
+_worker_rules: tuple[Config, MatcherResolver, DetectorRunner | None] | None = None
+
+
+def find_repositories(root: Path, exclude_repos: list[str]) -> Iterator[Path]:
+    """
+    Find the git repositories under a directory.
+
+    Repositories are not searched for nested repositories (such as submodules).
+
+    Args:
+        root: Directory to search
+        exclude_repos: Repository (directory) names to skip, as in the config
+
+    Yields:
+        Working tree root of each repository, in sorted directory order
+    """
+    excluded = frozenset(exclude_repos)
+    for directory, dir_names, file_names in os.walk(root):
+        if GIT_DIR_NAME in dir_names or GIT_DIR_NAME in file_names:
+            dir_names[:] = []
+            if Path(directory).name not in excluded:
+                yield Path(directory)
+            continue
+        dir_names.sort()
+
+
+def decode_text_file(data: bytes, config: Config) -> list[str] | None:
+    """
+    Split the content of a file into lines, unless it is binary or too long to scan.
+
+    Args:
+        data: Content of the file
+        config: Configuration with `max_file_lines`
+
+    Returns:
+        Lines of the file, or None if it has a NUL byte near the start or more than `max_file_lines` lines
+    """
+    if b"\0" in data[:BINARY_CHECK_BYTES]:
+        return None
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    if config.max_file_lines is not None and len(lines) > config.max_file_lines:
+        return None
+    return lines
+
+
+def scan_file_lines(
+    path: str, lines: list[str], resolver: MatcherResolver, detectors: DetectorRunner | None = None
+) -> list[Violation]:
+    """
+    Scan every line of a file, as if all of them were added.
+
+    Args:
+        path: Repository-relative file path
+        lines: Lines of the file
+        resolver: Matcher resolver for the config
+        detectors: Detectors that check the file after the phrase matcher
+
+    Returns:
+        Violations found by the phrase matcher, then by the detectors
+    """
+    scanned = scannable_lines(path, lines)
+    violations = find_violations_in_lines(path, scanned, resolver.matcher_for(path))
+    if detectors is not None:
+        violations.extend(detectors.scan(FileDiff(path=path, added_lines=lines, hunks=[(0, 1)]), scanned, {}))
+    return violations
+
+
+def scan_repository(
+    repo_root: Path,
+    config: Config,
+    resolver: MatcherResolver,
+    detectors: DetectorRunner | None = None,
+    use_baseline: bool = True,
+) -> RepositoryScan:
+    """
+    Scan every line of the files tracked in a repository, as if all of them were added.
+
+    Files excluded by the config or marked as skipped in `.gitattributes`, binary files (with a
+    NUL byte near the start) and files over `max_file_lines` are skipped. Violations recorded in
+    the repository's baseline are dropped.
+
+    Args:
+        repo_root: Working tree root of the repository
+        config: Configuration with the exclusion lists
+        resolver: Matcher resolver for the config
+        detectors: Detectors that check each file after the phrase matcher
+        use_baseline: If False, report violations recorded in the baseline too
+
+    Returns:
+        RepositoryScan with the violations and the amount of scanned content
+    """
+    scan = RepositoryScan(repo=repo_root)
+    try:
+        baseline = load_repo_baseline(repo_root) if use_baseline else None
+    except CannotLoadConfigError as exc:
+        scan.error = str(exc)
+        return scan
+    try:
+        paths = list_tracked_files(repo_root)
+    except (subprocess.CalledProcessError, OSError) as exc:
+        scan.error = f"Cannot list tracked files: {exc}"
+        return scan
+
+    skipped: dict[str, str] = {}
+    if config.skip_generated:
+        with contextlib.suppress(subprocess.CalledProcessError, OSError):
+            skipped = check_skip_attributes(repo_root, paths)
+
+    classifier = ExclusionClassifier.from_config(config)
+    for path in paths:
+        if path in skipped or classifier.classify(path) is not None:
+            continue
+        try:
+            data = (repo_root / path).read_bytes()
+        except OSError:
+            continue
+        lines = decode_text_file(data, config)
+        if lines is None:
+            continue
+        scan.files += 1
+        scan.lines += len(lines)
+        scan.scanned_bytes += len(data)
+        scan.violations.extend(scan_file_lines(path, lines, resolver, detectors))
+
+    if baseline is not None:
+        scan.violations = baseline.filter(scan.violations)
+    return scan
+
+
+def _init_worker(config: Config, resolver: MatcherResolver, detectors: DetectorRunner | None) -> None:
+    """Keep the config, its compiled matchers and detectors in a worker process for all of its repositories."""
+    global _worker_rules
+    _worker_rules = (config, resolver, detectors)
+
+
+def _scan_in_worker(repo_root: Path) -> RepositoryScan:
+    """Scan a repository with the rules the worker was started with."""
+    if _worker_rules is None:
+        raise RuntimeError("Sweep worker was started without rules")
+    return scan_repository(repo_root, *_worker_rules)
+
+
+def sweep_repositories(
+    repos: Iterable[Path],
+    config: Config,
+    resolver: MatcherResolver,
+    workers: int,
+    detectors: DetectorRunner | None = None,
+) -> Iterator[RepositoryScan]:
+    """
+    Scan repositories in a process pool.
+
+    The config, its compiled matchers and the detectors are handed to each worker once, when it starts, so no
+    repository pays for loading the config or compiling the rules again.
+
+    Args:
+        repos: Working tree roots of the repositories
+        config: Configuration with forbidden phrases and exclusions
+        resolver: Matcher resolver for the config
+        workers: Number of worker processes
+        detectors: Detectors that check each file after the phrase matcher
+
+    Yields:
+        RepositoryScan of each repository, in completion order
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(config, resolver, detectors)
+    ) as executor:
+        futures = [executor.submit(_scan_in_worker, repo) for repo in repos]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def write_sweep_records(scan: RepositoryScan, report: TextIO) -> None:
+    """
+    Append the results of one repository to a JSON Lines report: one object per violation,
+    or one object with the error if the repository could not be scanned.
+
+    Args:
+        scan: Result of scanning a repository
+        report: Open text file of the report
+    """
+    if scan.error is not None:
+        report.write(json.dumps({"repo": str(scan.repo), "error": scan.error}, ensure_ascii=False) + "\n")
+    for violation in scan.violations:
+        record = {
+            "repo": str(scan.repo),
+            "file": violation.file,
+            "severity": violation.severity.value,
+            "phrase": violation.phrase,
+            "line": violation.line,
+        }
+        if violation.detector is not None:
+            record["detector"] = violation.detector
+        report.write(json.dumps(record, ensure_ascii=False) + "\n")
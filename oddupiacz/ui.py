@@ -9,6 +9,7 @@ import typer
 
 from .config import CannotLoadConfigError, Config, create_default_config, create_default_hooks_dir_path, load_config
 from .config_io import save_config, USER_CONFIG
+from .installer import DEFAULT_ODDUPIACZ_PATH
 from .models import InstallationSettings
 
 CONFIGS_DIR = Path(__file__).parent.parent / "configs"
@@ -180,7 +181,7 @@ def prompt_installation_settings() -> InstallationSettings:
     typer.secho("🚀 Oddupiacz Installation", fg=typer.colors.CYAN, bold=True)
     typer.echo()
 
-    default_oddupiacz_path = Path(__file__).parent.parent.expanduser().resolve()
+    default_oddupiacz_path = DEFAULT_ODDUPIACZ_PATH
     typer.echo(f"Oddupiacz path: {default_oddupiacz_path}")
 
     if typer.confirm("Use this path? (overriding not recommended)", default=True):
@@ -0,0 +1,253 @@
+"""
+Watcher that scans working tree and index changes ahead of the commit (Linux inotify).
+"""
+
+import ctypes
+import os
+import select
+import struct
+import subprocess
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .attributes import AttributeCache
+from .git_utils import get_git_diff, list_ignored_dirs
+from .overlay import MergedConfig
+from .prescan import prescan_diff, PrescanStore
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+TREE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+GIT_DIR_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+DEBOUNCE_SECONDS = 0.2
+GIT_DIR_NAME = ".git"
+
+
+@dataclass
+class InotifyEvent:
+    """A single inotify event."""
+
+    directory: Path
+    name: str
+    mask: int
+
+    @property
+    def path(self) -> Path:
+        """Path of the file or directory the event is about."""
+        return self.directory / self.name if self.name else self.directory
+
+
+class Inotify:
+    """
+    Minimal inotify binding over libc, so the watcher needs no extra dependency.
+
+    Raises:
+        OSError: If inotify is not available on this system
+    """
+
+    def __init__(self) -> None:
+        try:
+            self._libc = ctypes.CDLL(None, use_errno=True)
+            init = self._libc.inotify_init1
+        except (OSError, AttributeError) as exc:
+            raise OSError("inotify is not available on this system") from exc
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._directories: dict[int, Path] = {}
+
+    def add_watch(self, directory: Path, mask: int) -> None:
+        """
+        Watch a directory for events.
+
+        Args:
+            directory: Directory to watch
+            mask: Inotify event mask
+
+        Raises:
+            OSError: If the watch cannot be added (e.g. the directory was removed)
+        """
+        descriptor = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), mask | IN_ONLYDIR)
+        if descriptor < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(directory))
+        self._directories[descriptor] = directory
+
+    def read(self, timeout: float | None) -> list[InotifyEvent]:
+        """
+        Wait for events and read all that are queued.
+
+        Args:
+            timeout: Seconds to wait for the first event, or None to wait indefinitely
+
+        Returns:
+            List of events (empty if the timeout expired)
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            if mask & IN_IGNORED:
+                self._directories.pop(descriptor, None)
+                continue
+            directory = self._directories.get(descriptor)
+            if directory is not None or mask & IN_Q_OVERFLOW:
+                events.append(InotifyEvent(directory=directory or Path(), name=name, mask=mask))
+        return events
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        os.close(self.fd)
+
+
+@dataclass
+class PendingChanges:
+    """Changes collected since the last pre-scan."""
+
+    paths: set[str] = field(default_factory=set)
+    index_changed: bool = False
+    rescan_all: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.paths) or self.index_changed or self.rescan_all
+
+
+class RepositoryWatcher:
+    """
+    Follows working tree and index changes of a repository and pre-scans them into a PrescanStore.
+
+    Changed files are pre-scanned against HEAD, as they would be committed after `git add`, and
+    index updates pre-scan the staged diff exactly as the hook will see it. Bursts of events
+    are collected for `DEBOUNCE_SECONDS` before scanning.
+    """
+
+    def __init__(
+        self,
+        repo_root: Path,
+        index_path: Path,
+        merged: MergedConfig,
+        store: PrescanStore,
+        attributes: AttributeCache | None = None,
+    ) -> None:
+        self.repo_root = repo_root
+        self.index_path = index_path
+        self.merged = merged
+        self.store = store
+        self.attributes = attributes
+        self._inotify = Inotify()
+        self._ignored = {repo_root / path for path in list_ignored_dirs()}
+        self._inotify.add_watch(index_path.parent, GIT_DIR_EVENTS)
+        for directory in self._walk(repo_root):
+            self._add_tree_watch(directory)
+
+    def _walk(self, top: Path) -> Iterator[Path]:
+        for directory, dir_names, _ in os.walk(top):
+            dir_names[:] = [
+                name for name in dir_names if name != GIT_DIR_NAME and Path(directory, name) not in self._ignored
+            ]
+            yield Path(directory)
+
+    def _add_tree_watch(self, directory: Path) -> None:
+        try:
+            self._inotify.add_watch(directory, TREE_EVENTS)
+        except OSError:
+            return
+
+    def collect(self, events: list[InotifyEvent], pending: PendingChanges) -> None:
+        """
+        Record the changes described by inotify events.
+
+        Args:
+            events: Events read from inotify
+            pending: Changes to update
+        """
+        for event in events:
+            if event.mask & IN_Q_OVERFLOW:
+                pending.rescan_all = True
+                pending.index_changed = True
+            elif event.path == self.index_path:
+                pending.index_changed = True
+            elif event.directory == self.index_path.parent:
+                continue
+            elif event.mask & IN_ISDIR:
+                if event.mask & (IN_CREATE | IN_MOVED_TO) and event.name != GIT_DIR_NAME:
+                    for directory in self._walk(event.path):
+                        self._add_tree_watch(directory)
+                    pending.rescan_all = True
+            elif not event.mask & IN_DELETE_SELF:
+                pending.paths.add(event.path.relative_to(self.repo_root).as_posix())
+
+    def prescan(self, pending: PendingChanges) -> int:
+        """
+        Pre-scan collected changes.
+
+        Args:
+            pending: Changes collected since the last pre-scan
+
+        Returns:
+            Number of file sections scanned
+        """
+        diffs = []
+        try:
+            if pending.index_changed:
+                diffs.append(get_git_diff(cached=True))
+            if pending.rescan_all:
+                diffs.append(get_git_diff(cached=False, base="HEAD"))
+            elif pending.paths:
+                diffs.append(get_git_diff(cached=False, paths=sorted(pending.paths), base="HEAD"))
+        except subprocess.CalledProcessError:
+            pass
+
+        config, resolver = self.merged.config, self.merged.resolver
+        return sum(prescan_diff(diff, config, resolver, self.store, self.attributes) for diff in diffs)
+
+    def run(self, on_scan: Callable[[int], None] | None = None, stop: Callable[[], bool] | None = None) -> None:
+        """
+        Watch the repository until stopped.
+
+        The current staged and working tree changes are pre-scanned first.
+
+        Args:
+            on_scan: Called with the number of scanned file sections after every pre-scan
+            stop: Called between events; the watcher returns when it returns True
+        """
+        pending = PendingChanges(index_changed=True, rescan_all=True)
+        while stop is None or not stop():
+            if pending:
+                deadline = time.monotonic() + DEBOUNCE_SECONDS
+                while (remaining := deadline - time.monotonic()) > 0:
+                    self.collect(self._inotify.read(remaining), pending)
+                scanned = self.prescan(pending)
+                pending = PendingChanges()
+                if on_scan is not None:
+                    on_scan(scanned)
+            self.collect(self._inotify.read(DEBOUNCE_SECONDS), pending)
+
+    def close(self) -> None:
+        """Stop watching."""
+        self._inotify.close()
@@ -0,0 +1,331 @@
+"""
+Large forbidden phrase wordlists compiled into a memory-mapped Aho-Corasick automaton.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from pathlib import Path
+
+from .case_folding import fold_case
+
+FORMAT_VERSION = 2
+MAGIC = b"ODDUPAC\0"
+ENDIAN_MARK = 0x01020304
+NO_TERM = 0xFFFFFFFF
+# magic, endian mark, format version, state count, transition count, longest term, sources digest
+HEADER = struct.Struct("=8sIIIII32s")
+AUTOMATON_FILE_PREFIX = "phrases-"
+CHAR_BITS = 21
+MAX_CACHED_STEPS = 1 << 20
+
+
+class InvalidAutomatonError(Exception):
+    """Raised when a compiled automaton file has the wrong format, version or byte order."""
+
+
+def read_terms(phrase_files: Iterable[Path]) -> dict[str, int]:
+    """
+    Read newline-delimited wordlists into case-folded terms.
+
+    Surrounding whitespace is stripped and blank lines are skipped.
+
+    Args:
+        phrase_files: Wordlist paths, in priority order
+
+    Returns:
+        Dictionary mapping each term to the position of its first occurrence
+
+    Raises:
+        OSError: If a wordlist cannot be read
+        ValueError: If a wordlist is not valid UTF-8
+    """
+    terms: dict[str, int] = {}
+    for phrase_file in phrase_files:
+        with open(phrase_file, encoding="utf-8") as f:
+            try:
+                for line in f:
+                    term = fold_case(line.strip())
+                    if term:
+                        terms.setdefault(term, len(terms))
+            except UnicodeDecodeError as exc:
+                raise ValueError(f"{phrase_file} is not valid UTF-8: {exc.reason}") from None
+    return terms
+
+
+def build_automaton(terms: dict[str, int], digest: bytes = bytes(32)) -> bytes:
+    """
+    Build the binary Aho-Corasick automaton for a set of terms.
+
+    States are numbered breadth-first and the transitions of each state are stored as a sorted
+    run of (character, target) pairs (compressed sparse rows), so the file needs no per-process
+    decoding: every array is used directly from the memory map.
+
+    Args:
+        terms: Dictionary mapping case-folded terms to their priority (lower wins ties)
+        digest: Fingerprint of the sources, stored in the header to detect stale files
+
+    Returns:
+        Automaton file content
+    """
+    ordered = sorted(terms)
+    node = array("I", bytes(4 * len(ordered)))
+    depth = array("I", [0])
+    term = array("I", [NO_TERM])
+    parents = array("I")
+    chars = array("I")
+
+    # Level d holds the distinct prefixes of length d; since the terms are sorted, the children
+    # of every state are created contiguously and in character order, already in CSR layout.
+    active = list(range(len(ordered)))
+    level = 0
+    while active:
+        next_active = []
+        last = (-1, -1)
+        for index in active:
+            key = (node[index], ord(ordered[index][level]))
+            if key != last:
+                parents.append(key[0])
+                chars.append(key[1])
+                depth.append(level + 1)
+                term.append(NO_TERM)
+                last = key
+            state = len(depth) - 1
+            node[index] = state
+            if len(ordered[index]) == level + 1:
+                term[state] = terms[ordered[index]]
+            else:
+                next_active.append(index)
+        active = next_active
+        level += 1
+
+    state_count = len(depth)
+    targets = array("I", range(1, state_count))
+    offsets = array("I", bytes(4 * (state_count + 1)))
+    for parent in parents:
+        offsets[parent + 1] += 1
+    for state in range(state_count):
+        offsets[state + 1] += offsets[state]
+
+    fail = array("I", bytes(4 * state_count))
+    output = array("I", bytes(4 * state_count))
+    for parent in range(state_count):
+        for position in range(offsets[parent], offsets[parent + 1]):
+            child = targets[position]
+            fallback = 0
+            if parent:
+                state = fail[parent]
+                while True:
+                    found = _goto(offsets, chars, targets, state, chars[position])
+                    if found is not None or not state:
+                        fallback = found or 0
+                        break
+                    state = fail[state]
+            fail[child] = fallback
+            output[child] = fallback if term[fallback] != NO_TERM else output[fallback]
+
+    header = HEADER.pack(MAGIC, ENDIAN_MARK, FORMAT_VERSION, state_count, len(chars), max(depth), digest)
+    return b"".join(
+        part.tobytes() if isinstance(part, array) else part
+        for part in (header, offsets, chars, targets, fail, depth, term, output)
+    )
+
+
+def _goto(offsets: array[int], chars: array[int], targets: array[int], state: int, char: int) -> int | None:
+    """Follow the transition of a state on a character, if it exists."""
+    low, high = offsets[state], offsets[state + 1]
+    position = bisect_left(chars, char, low, high)
+    return targets[position] if position < high and chars[position] == char else None
+
+
+class PhraseAutomaton:
+    """
+    Read-only view of a compiled wordlist automaton, memory-mapped so its pages are shared by
+    every process that opens the same file.
+
+    Transitions that follow failure links are resolved once and then kept in a bounded
+    in-process cache, so scanning typical code mostly costs one dictionary lookup per character.
+    Pickling an automaton stores only its path; the file is mapped again when unpickled.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise InvalidAutomatonError(f"Truncated automaton file: {path}")
+        magic, endian_mark, version, state_count, transition_count, max_depth, self.digest = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC or endian_mark != ENDIAN_MARK or version != FORMAT_VERSION:
+            raise InvalidAutomatonError(f"Unsupported automaton file: {path}")
+        if len(self._mmap) != HEADER.size + 4 * (5 * state_count + 2 * transition_count + 1):
+            raise InvalidAutomatonError(f"Truncated automaton file: {path}")
+
+        view = memoryview(self._mmap)[HEADER.size :].cast("I")
+        sizes = (
+            state_count + 1,
+            transition_count,
+            transition_count,
+            state_count,
+            state_count,
+            state_count,
+            state_count,
+        )
+        sections = []
+        start = 0
+        for size in sizes:
+            sections.append(view[start : start + size])
+            start += size
+        self._offsets, self._chars, self._targets, self._fail, self._depth, self._term, self._output = sections
+        self._max_depth = max_depth
+        self._steps: dict[int, int] = {}
+
+    def __reduce__(self) -> tuple[type["PhraseAutomaton"], tuple[Path]]:
+        return PhraseAutomaton, (self.path,)
+
+    def search(self, text: str) -> tuple[int, int] | None:
+        """
+        Find the leftmost term in a line, case-insensitively.
+
+        When several terms start at the same position, the one listed first in the wordlists wins,
+        like alternation in a regex.
+
+        Args:
+            text: Line content
+
+        Returns:
+            Tuple of the start and end offsets of the match, or None if no term occurs in the line
+        """
+        depth, term, output, steps = self._depth, self._term, self._output, self._steps
+        best: tuple[int, int, int] | None = None
+        state = 0
+
+        for index, char in enumerate(map(ord, fold_case(text))):
+            step = steps.get(state << CHAR_BITS | char)
+            if step is None:
+                step = self._step(state, char)
+            if step >= 0:
+                state = step
+                continue
+
+            state = hit = ~step
+            if term[hit] == NO_TERM:
+                hit = output[hit]
+            while hit:
+                candidate = (index + 1 - depth[hit], term[hit], index + 1)
+                if best is None or candidate < best:
+                    best = candidate
+                hit = output[hit]
+
+            if best is not None and index + 1 - self._max_depth >= best[0]:
+                break
+
+        return (best[0], best[2]) if best is not None else None
+
+    def _step(self, state: int, char: int) -> int:
+        """
+        Follow failure links to the next state and remember the result.
+
+        Returns:
+            The next state, or its bitwise complement if terms end in it
+        """
+        offsets, chars, targets, fail = self._offsets, self._chars, self._targets, self._fail
+        key = state << CHAR_BITS | char
+        while True:
+            low, high = offsets[state], offsets[state + 1]
+            position = bisect_left(chars, char, low, high)
+            if position < high and chars[position] == char:
+                state = targets[position]
+                break
+            if not state:
+                break
+            state = fail[state]
+
+        step = ~state if self._term[state] != NO_TERM or self._output[state] else state
+        if len(self._steps) < MAX_CACHED_STEPS:
+            self._steps[key] = step
+        return step
+
+
+def sources_digest(phrase_files: Iterable[Path]) -> bytes:
+    """
+    Fingerprint wordlists by path and stat data, so a change is detected without reading them.
+
+    Raises:
+        OSError: If a wordlist doesn't exist
+    """
+    digest = hashlib.sha256(f"{FORMAT_VERSION}\n".encode())
+    for phrase_file in phrase_files:
+        stat = phrase_file.stat()
+        digest.update(f"{phrase_file}\0{stat.st_dev}\0{stat.st_ino}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.digest()
+
+
+def get_automaton_path(phrase_files: tuple[Path, ...], digest: bytes, cache_dir: Path) -> Path:
+    """Get the automaton file for a set of wordlists: named after their paths and their sources digest."""
+    name = hashlib.sha256("\n".join(map(str, phrase_files)).encode()).hexdigest()[:16]
+    return cache_dir / f"{AUTOMATON_FILE_PREFIX}{name}-{digest.hex()[:16]}.bin"
+
+
+def compile_phrase_files(phrase_files: tuple[Path, ...], cache_dir: Path) -> Path:
+    """
+    Compile wordlists into an automaton file, unless an up-to-date one already exists.
+
+    The file name includes a digest of the wordlists' stat data, so a change produces a new
+    file instead of rewriting one that other processes may still have mapped. Older files
+    for the same wordlists are removed once the new one is in place.
+
+    Args:
+        phrase_files: Wordlist paths, in priority order
+        cache_dir: Directory for compiled automaton files
+
+    Returns:
+        Path to the compiled automaton file
+
+    Raises:
+        OSError: If a wordlist cannot be read or the automaton cannot be written
+        ValueError: If a wordlist is not valid UTF-8
+    """
+    digest = sources_digest(phrase_files)
+    automaton_path = get_automaton_path(phrase_files, digest, cache_dir)
+    if _read_digest(automaton_path) == digest:
+        return automaton_path
+
+    content = build_automaton(read_terms(phrase_files), digest)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{automaton_path.name}-", dir=cache_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, automaton_path)
+    except OSError:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    stale_prefix = automaton_path.name.rsplit("-", 1)[0] + "-"
+    for stale_path in cache_dir.glob(f"{stale_prefix}*.bin"):
+        if stale_path != automaton_path:
+            stale_path.unlink(missing_ok=True)
+    return automaton_path
+
+
+def _read_digest(automaton_path: Path) -> bytes | None:
+    """Read the sources digest from an automaton file header, or None if it is missing or unusable."""
+    try:
+        with open(automaton_path, "rb") as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, endian_mark, version, *_, digest = HEADER.unpack(header)
+    if magic != MAGIC or endian_mark != ENDIAN_MARK or version != FORMAT_VERSION:
+        return None
+    return digest
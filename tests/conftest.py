@@ -0,0 +1,31 @@
+"""
+Shared helpers for the test suite.
+"""
+
+import dataclasses
+from pathlib import Path
+from typing import Any
+
+from oddupiacz.config import Config
+from oddupiacz.models import PhraseRule, Severity
+
+
+def make_config(**changes: Any) -> Config:
+    """
+    Create a Config with a blocking `TODO` and a warning `FIXME` and nothing excluded.
+
+    Args:
+        **changes: Config fields to set instead of the defaults; unknown fields raise TypeError
+
+    Returns:
+        Config for tests
+    """
+    config = Config(
+        hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+        forbidden_phrases=["TODO", PhraseRule(phrase="FIXME", severity=Severity.WARN)],
+        exclude_paths=[],
+        exclude_files=[],
+        exclude_extensions=[],
+        exclude_repos=[],
+    )
+    return dataclasses.replace(config, **changes)
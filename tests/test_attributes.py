@@ -0,0 +1,109 @@
+"""
+Unit tests for attributes.py module.
+"""
+
+import json
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from oddupiacz.attributes import AttributeCache, CACHE_FILE_NAME, check_skip_attributes
+
+
+@pytest.fixture()
+def git_repo(tmp_path: Path) -> Path:
+    """Create a git repository whose attributes mark generated, vendored and skipped files."""
+    repo_root = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)  # noqa: S603, S607
+    (repo_root / ".gitattributes").write_text(
+        "*.pb.go linguist-generated\n"
+        "vendor/** linguist-vendored\n"
+        "docs/** oddupiacz=skip\n"
+        "keep.pb.go -linguist-generated\n"
+    )
+    (repo_root / "src").mkdir()
+    (repo_root / "src" / ".gitattributes").write_text("schema.py linguist-generated=true\n")
+    return repo_root
+
+
+class TestCheckSkipAttributes:
+    """Tests for check_skip_attributes function."""
+
+    def test_check_attributes(self, git_repo: Path) -> None:
+        """Test that set, true and oddupiacz=skip values mark files, and unset or other values don't."""
+        paths = ["api.pb.go", "keep.pb.go", "vendor/lib/x.js", "docs/a.md", "src/schema.py", "src/app.py", "żółw.py"]
+
+        skipped = check_skip_attributes(git_repo, paths)
+
+        assert skipped == {
+            "api.pb.go": "linguist-generated",
+            "vendor/lib/x.js": "linguist-vendored",
+            "docs/a.md": "oddupiacz",
+            "src/schema.py": "linguist-generated",
+        }
+
+    def test_no_paths(self, tmp_path: Path) -> None:
+        """Test that git is not run without paths."""
+        assert check_skip_attributes(tmp_path, []) == {}
+
+    def test_not_a_repository(self, tmp_path: Path) -> None:
+        """Test that a failing git command raises CalledProcessError."""
+        with pytest.raises(subprocess.CalledProcessError):
+            check_skip_attributes(tmp_path / "missing", ["a.py"])
+
+
+class TestAttributeCache:
+    """Tests for AttributeCache class."""
+
+    def test_results_are_cached(self, git_repo: Path) -> None:
+        """Test that a second lookup of the same paths does not run git."""
+        cache = AttributeCache(git_repo, git_repo / ".git")
+        assert cache.find_skipped(["api.pb.go", "src/app.py"]) == {"api.pb.go": "linguist-generated"}
+        assert (git_repo / ".git" / "oddupiacz" / CACHE_FILE_NAME).exists()
+
+        with patch("oddupiacz.attributes.check_skip_attributes") as mock_check:
+            skipped = AttributeCache(git_repo, git_repo / ".git").find_skipped(["api.pb.go", "src/app.py"])
+
+        mock_check.assert_not_called()
+        assert skipped == {"api.pb.go": "linguist-generated"}
+
+    def test_changed_attributes_invalidate_paths_below(self, git_repo: Path) -> None:
+        """Test that editing a nested .gitattributes re-checks only the paths below it."""
+        AttributeCache(git_repo, git_repo / ".git").find_skipped(["api.pb.go", "src/app.py"])
+        (git_repo / "src" / ".gitattributes").write_text("app.py linguist-generated\n")
+
+        with patch("oddupiacz.attributes.check_skip_attributes", wraps=check_skip_attributes) as mock_check:
+            skipped = AttributeCache(git_repo, git_repo / ".git").find_skipped(["api.pb.go", "src/app.py"])
+
+        mock_check.assert_called_once_with(git_repo, ["src/app.py"])
+        assert skipped == {"api.pb.go": "linguist-generated", "src/app.py": "linguist-generated"}
+
+    def test_broken_cache_is_rebuilt(self, git_repo: Path) -> None:
+        """Test that an unreadable or outdated cache is ignored and replaced."""
+        cache_path = git_repo / ".git" / "oddupiacz" / CACHE_FILE_NAME
+        cache_path.parent.mkdir()
+        for content in ["not json", json.dumps({"version": 0, "paths": {}}), json.dumps({"version": 1, "paths": []})]:
+            cache_path.write_text(content)
+
+            assert AttributeCache(git_repo, git_repo / ".git").find_skipped(["docs/a.md"]) == {"docs/a.md": "oddupiacz"}
+            assert json.loads(cache_path.read_text())["version"] == 1
+
+    @patch("oddupiacz.attributes.MAX_CACHED_PATHS", 2)
+    def test_cache_is_bounded(self, git_repo: Path) -> None:
+        """Test that the cache starts over instead of growing past its limit."""
+        AttributeCache(git_repo, git_repo / ".git").find_skipped(["a.py", "b.py"])
+
+        skipped = AttributeCache(git_repo, git_repo / ".git").find_skipped(["a.py", "api.pb.go"])
+
+        entries = json.loads((git_repo / ".git" / "oddupiacz" / CACHE_FILE_NAME).read_text())["paths"]
+        assert sorted(entries) == ["api.pb.go"]
+        assert skipped == {"api.pb.go": "linguist-generated"}
+
+    @patch("oddupiacz.attributes.tempfile.mkstemp", side_effect=OSError("read-only"))
+    def test_unwritable_cache(self, mock_mkstemp: MagicMock, git_repo: Path) -> None:
+        """Test that a cache that cannot be written does not fail the lookup."""
+        skipped = AttributeCache(git_repo, git_repo / ".git").find_skipped(["api.pb.go"])
+
+        assert skipped == {"api.pb.go": "linguist-generated"}
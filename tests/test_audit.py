@@ -0,0 +1,66 @@
+"""
+Unit tests for audit.py module.
+"""
+
+import json
+from pathlib import Path
+
+from oddupiacz.audit import append_audit_log, get_audit_log_path
+from oddupiacz.config import Config
+from oddupiacz.models import Severity, Violation
+
+
+def _create_test_config(audit_log: Path | None = None) -> Config:
+    """Helper to create a test Config object."""
+    return Config(
+        hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+        forbidden_phrases=["TODO"],
+        exclude_paths=[],
+        exclude_files=[],
+        exclude_extensions=[],
+        exclude_repos=[],
+        audit_log=audit_log,
+    )
+
+
+class TestGetAuditLogPath:
+    """Tests for get_audit_log_path function."""
+
+    def test_default_path_in_hooks_dir(self) -> None:
+        """Test that the audit log defaults to the hooks directory."""
+        assert get_audit_log_path(_create_test_config()) == Path("/tmp/.githooks_global/audit.jsonl")  # noqa: S108
+
+    def test_configured_path(self, tmp_path: Path) -> None:
+        """Test that a configured audit log path is used."""
+        config = _create_test_config(audit_log=tmp_path / "compliance.jsonl")
+
+        assert get_audit_log_path(config) == tmp_path / "compliance.jsonl"
+
+
+class TestAppendAuditLog:
+    """Tests for append_audit_log function."""
+
+    def test_append_records(self, tmp_path: Path) -> None:
+        """Test that each audit match is appended as a JSON line."""
+        log_path = tmp_path / "logs" / "audit.jsonl"
+        violation = Violation(phrase="internal", file="a.py", line="internal api", severity=Severity.AUDIT)
+
+        append_audit_log([violation], log_path, "repo")
+        append_audit_log([violation], log_path, None)
+
+        records = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert len(records) == 2
+        assert records[0]["repo"] == "repo"
+        assert records[0]["phrase"] == "internal"
+        assert records[0]["file"] == "a.py"
+        assert records[0]["line"] == "internal api"
+        assert "timestamp" in records[0]
+        assert records[1]["repo"] is None
+
+    def test_nothing_to_append(self, tmp_path: Path) -> None:
+        """Test that no log file is created without audit matches."""
+        log_path = tmp_path / "audit.jsonl"
+
+        append_audit_log([], log_path, "repo")
+
+        assert not log_path.exists()
@@ -0,0 +1,131 @@
+"""
+Unit tests for background_scan.py module.
+"""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from oddupiacz.background_scan import (
+    get_background_report_path,
+    run_background_scan,
+    spawn_background_scan,
+    write_deferred_diff,
+)
+from oddupiacz.baseline import BASELINE_FILE_NAME, write_baseline
+from oddupiacz.models import FileDiff, Severity, Violation
+
+
+def _write_config(tmp_path: Path) -> Path:
+    """Helper to write a minimal config file."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n")
+    return config_path
+
+
+class TestGetBackgroundReportPath:
+    """Tests for get_background_report_path function."""
+
+    @patch("oddupiacz.background_scan.get_git_common_dir")
+    def test_report_inside_git_dir(self, mock_git_dir: MagicMock) -> None:
+        """Test that the report is stored inside the git directory."""
+        mock_git_dir.return_value = Path("/repo/.git")
+
+        assert get_background_report_path() == Path("/repo/.git/oddupiacz/background-report.txt")
+
+    @patch("oddupiacz.background_scan.get_git_common_dir")
+    def test_report_outside_git_repo(self, mock_git_dir: MagicMock) -> None:
+        """Test that the report falls back to the temp directory."""
+        mock_git_dir.return_value = None
+
+        assert get_background_report_path().name == "background-report.txt"
+
+
+class TestBackgroundScan:
+    """Tests for writing, spawning and running background scans."""
+
+    def test_write_deferred_diff(self, tmp_path: Path) -> None:
+        """Test that deferred files are written as a parseable diff."""
+        deferred = [FileDiff(path="a.py", added_lines=["x = 1"]), FileDiff(path="b.py", added_lines=["# TODO"])]
+
+        diff_path = write_deferred_diff(deferred, tmp_path / "reports")
+
+        assert diff_path.read_text() == "+++ b/a.py\n+x = 1\n+++ b/b.py\n+# TODO\n"
+
+    @patch("oddupiacz.background_scan.subprocess.Popen")
+    def test_spawn_background_scan(self, mock_popen: MagicMock, tmp_path: Path) -> None:
+        """Test that a detached background scan process is started."""
+        report_path = tmp_path / "reports" / "background-report.txt"
+
+        spawn_background_scan([FileDiff(path="a.py", added_lines=["x"])], tmp_path / "config.yaml", report_path)
+
+        args = mock_popen.call_args[0][0]
+        assert "oddupiacz.cli_background_scan" in args
+        assert str(report_path) in args
+        assert mock_popen.call_args.kwargs["start_new_session"] is True
+
+    @patch("oddupiacz.background_scan.get_repo_dirs", return_value=None)
+    def test_run_background_scan_writes_report(self, mock_repo_dirs: MagicMock, tmp_path: Path) -> None:
+        """Test that the background scan reports violations and removes the diff file."""
+        diff_path = tmp_path / "deferred.diff"
+        diff_path.write_text("+++ b/a.py\n+x = 1\n+++ b/b.py\n+# TODO: later\n")
+        report_path = tmp_path / "report.txt"
+
+        violations = run_background_scan(diff_path, _write_config(tmp_path), report_path)
+
+        assert len(violations) == 1
+        assert violations[0].file == "b.py"
+        report = report_path.read_text()
+        assert "Scanned 2 deferred file(s)" in report
+        assert "TODO: later" in report
+        assert "1 violation(s) found." in report
+        assert not diff_path.exists()
+
+    @patch("oddupiacz.background_scan.get_repo_dirs")
+    def test_run_background_scan_logs_audits(self, mock_repo_dirs: MagicMock, tmp_path: Path) -> None:
+        """Test that audit-only matches go to the audit log instead of the report."""
+        diff_path = tmp_path / "deferred.diff"
+        diff_path.write_text("+++ b/a.py\n+# TODO: later\n+internal only\n")
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(
+            f"hooks_dir: {tmp_path}\nforbidden_phrases: [TODO, {{phrase: internal, severity: audit}}]\n"
+        )
+        report_path = tmp_path / "report.txt"
+        mock_repo_dirs.return_value = (tmp_path / "repo", tmp_path / ".git")
+
+        violations = run_background_scan(diff_path, config_path, report_path)
+
+        assert len(violations) == 2
+        assert "internal" not in report_path.read_text()
+        assert '"repo": "repo"' in (tmp_path / "audit.jsonl").read_text()
+        assert '"phrase": "internal"' in (tmp_path / "audit.jsonl").read_text()
+
+    @patch("oddupiacz.background_scan.get_repo_dirs")
+    def test_run_background_scan_applies_overlay(self, mock_repo_dirs: MagicMock, tmp_path: Path) -> None:
+        """Test that the repository overlay is merged into the config used by the background scan."""
+        repo_root = tmp_path / "repo"
+        repo_root.mkdir()
+        (repo_root / ".oddupiacz.yaml").write_text("forbidden_phrases: [HACK]\n")
+        mock_repo_dirs.return_value = (repo_root, repo_root / ".git")
+        diff_path = tmp_path / "deferred.diff"
+        diff_path.write_text("+++ b/a.py\n+# TODO: later\n+# HACK\n")
+
+        violations = run_background_scan(diff_path, _write_config(tmp_path), tmp_path / "report.txt")
+
+        assert [v.phrase for v in violations] == ["TODO", "HACK"]
+
+    @patch("oddupiacz.background_scan.get_repo_dirs")
+    def test_run_background_scan_applies_baseline(self, mock_repo_dirs: MagicMock, tmp_path: Path) -> None:
+        """Test that violations in the repository's baseline are dropped."""
+        repo_root = tmp_path / "repo"
+        repo_root.mkdir()
+        write_baseline(
+            [Violation(phrase="TODO", file="a.py", line="# TODO: old", severity=Severity.BLOCK)],
+            repo_root / BASELINE_FILE_NAME,
+        )
+        mock_repo_dirs.return_value = (repo_root, repo_root / ".git")
+        diff_path = tmp_path / "deferred.diff"
+        diff_path.write_text("+++ b/a.py\n+  # TODO: old\n+# TODO: new\n")
+
+        violations = run_background_scan(diff_path, _write_config(tmp_path), tmp_path / "report.txt")
+
+        assert [v.line for v in violations] == ["# TODO: new"]
@@ -0,0 +1,135 @@
+"""
+Unit tests for baseline.py module.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from oddupiacz.baseline import (
+    Baseline,
+    BASELINE_FILE_NAME,
+    HEADER,
+    load_baseline,
+    load_repo_baseline,
+    normalize_line,
+    violation_fingerprint,
+    write_baseline,
+)
+from oddupiacz.config import CannotLoadConfigError
+from oddupiacz.models import Severity, Violation
+
+
+def _violation(line: str, file: str = "a.py", phrase: str = "TODO") -> Violation:
+    """Helper to create a blocking violation."""
+    return Violation(phrase=phrase, file=file, line=line, severity=Severity.BLOCK)
+
+
+class TestFingerprint:
+    """Tests for normalize_line and violation_fingerprint functions."""
+
+    def test_normalize_line(self) -> None:
+        """Test that whitespace runs collapse and surrounding whitespace is dropped."""
+        assert normalize_line("\t# TODO   fix\t it ") == "# TODO fix it"
+
+    def test_fingerprint_ignores_whitespace_and_severity(self) -> None:
+        """Test that reindenting or a changed severity keeps the fingerprint."""
+        fingerprint = violation_fingerprint(_violation("# TODO fix it"))
+
+        assert violation_fingerprint(_violation("  #  TODO fix\tit")) == fingerprint
+        assert violation_fingerprint(Violation("TODO", "a.py", "# TODO fix it", Severity.WARN)) == fingerprint
+        assert 0 <= fingerprint < 2**64
+
+    @pytest.mark.parametrize(
+        "violation",
+        [
+            _violation("# TODO fix it", file="b.py"),
+            _violation("# TODO fix that"),
+            _violation("# TODO fix it", phrase="fix"),
+        ],
+    )
+    def test_fingerprint_changes(self, violation: Violation) -> None:
+        """Test that the path, the line content and the phrase are all part of the fingerprint."""
+        assert violation_fingerprint(violation) != violation_fingerprint(_violation("# TODO fix it"))
+
+
+class TestBaseline:
+    """Tests for Baseline class."""
+
+    def test_filter(self) -> None:
+        """Test that known violations are dropped and the order of the others is kept."""
+        known = _violation("# TODO old")
+        baseline = Baseline([violation_fingerprint(known)])
+        new = [_violation("# TODO new"), _violation("x = 1  # TODO later")]
+
+        assert baseline.filter([new[0], known, new[1]]) == new
+        assert known in baseline
+        assert len(baseline) == 1
+
+    def test_filter_empty(self) -> None:
+        """Test that an empty baseline keeps all violations."""
+        violations = [_violation("# TODO")]
+
+        assert Baseline([]).filter(violations) is violations
+
+
+class TestBaselineFile:
+    """Tests for write_baseline and load_baseline functions."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test that fingerprints are written sorted and without duplicates and load back."""
+        violations = [_violation("# TODO one"), _violation("# TODO two"), _violation("#  TODO one")]
+        baseline_path = tmp_path / BASELINE_FILE_NAME
+
+        assert write_baseline(violations, baseline_path) == 2
+
+        data = baseline_path.read_bytes()
+        assert len(data) == HEADER.size + 2 * 8
+        stored = [int.from_bytes(data[i : i + 8], "little") for i in range(HEADER.size, len(data), 8)]
+        assert stored == sorted(violation_fingerprint(violation) for violation in violations[:2])
+        baseline = load_baseline(baseline_path)
+        assert baseline is not None
+        assert baseline.filter(violations) == []
+        assert list(tmp_path.iterdir()) == [baseline_path]
+
+    def test_load_missing(self, tmp_path: Path) -> None:
+        """Test that a missing baseline loads as None."""
+        assert load_repo_baseline(tmp_path) is None
+
+    def test_load_repo_baseline(self, tmp_path: Path) -> None:
+        """Test that the baseline is read from the repository root."""
+        write_baseline([_violation("# TODO")], tmp_path / BASELINE_FILE_NAME)
+
+        baseline = load_repo_baseline(tmp_path)
+
+        assert baseline is not None
+        assert len(baseline) == 1
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"", b"not a baseline file", HEADER.pack(b"ODDUBSL\0", 1, 2) + b"\0" * 8, HEADER.pack(b"ODDUBSL\0", 9, 0)],
+    )
+    def test_load_invalid(self, tmp_path: Path, data: bytes) -> None:
+        """Test that a truncated or foreign file is rejected."""
+        baseline_path = tmp_path / BASELINE_FILE_NAME
+        baseline_path.write_bytes(data)
+
+        with pytest.raises(CannotLoadConfigError, match="Invalid baseline file"):
+            load_baseline(baseline_path)
+
+    def test_load_unreadable(self, tmp_path: Path) -> None:
+        """Test that a baseline path that cannot be read raises CannotLoadConfigError."""
+        (tmp_path / BASELINE_FILE_NAME).mkdir()
+
+        with pytest.raises(CannotLoadConfigError, match="Is a directory"):
+            load_repo_baseline(tmp_path)
+
+    def test_write_failure_cleans_up(self, tmp_path: Path) -> None:
+        """Test that a failed write leaves no temporary file behind."""
+        (tmp_path / BASELINE_FILE_NAME).mkdir()
+        (tmp_path / BASELINE_FILE_NAME / "keep").touch()
+
+        with pytest.raises(IsADirectoryError):
+            write_baseline([_violation("# TODO")], tmp_path / BASELINE_FILE_NAME)
+
+        assert list(tmp_path.iterdir()) == [tmp_path / BASELINE_FILE_NAME]
@@ -0,0 +1,45 @@
+"""
+Unit tests for budget.py module.
+"""
+
+import time
+
+from oddupiacz.budget import Watchdog
+
+
+class TestWatchdog:
+    """Tests for Watchdog class."""
+
+    def test_watchdog_not_expired_before_budget(self) -> None:
+        """Test that the watchdog does not fire before the budget is used."""
+        watchdog = Watchdog(budget_seconds=10.0)
+        watchdog.start()
+
+        assert watchdog.expired is False
+        watchdog.stop()
+
+    def test_watchdog_expires_at_headroom(self) -> None:
+        """Test that the watchdog fires once the headroom share of the budget has elapsed."""
+        watchdog = Watchdog(budget_seconds=0.05, headroom=0.5)
+        watchdog.start()
+        time.sleep(0.2)
+
+        assert watchdog.expired is True
+        assert watchdog.elapsed >= 0.025
+
+    def test_watchdog_accounts_for_time_already_spent(self) -> None:
+        """Test that time spent before the watchdog was created counts against the budget."""
+        watchdog = Watchdog(budget_seconds=1.0, started_at=time.monotonic() - 5.0)
+        watchdog.start()
+        time.sleep(0.05)
+
+        assert watchdog.expired is True
+
+    def test_stopped_watchdog_never_expires(self) -> None:
+        """Test that stopping the watchdog cancels the timer."""
+        watchdog = Watchdog(budget_seconds=0.05)
+        watchdog.start()
+        watchdog.stop()
+        time.sleep(0.1)
+
+        assert watchdog.expired is False
@@ -0,0 +1,73 @@
+"""
+Unit tests for bundle.py module.
+"""
+
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from oddupiacz.bundle import compile_pyc, find_hook_packages, write_bundle
+
+
+class TestCompilePyc:
+    """Tests for compile_pyc function."""
+
+    def test_bytecode_is_used_without_checking_source(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that zipimport loads the compiled bytecode instead of compiling the source."""
+        archive = tmp_path / "modules.zip"
+        with zipfile.ZipFile(archive, "w") as bundle:
+            bundle.writestr("bundled_module.py", "VALUE = 'source'\n")
+            bundle.writestr("bundled_module.pyc", compile_pyc(b"VALUE = 'bytecode'\n", "bundled_module.py"))
+        monkeypatch.syspath_prepend(str(archive))
+        monkeypatch.delitem(sys.modules, "bundled_module", raising=False)
+
+        import bundled_module  # type: ignore[import-not-found]
+
+        assert bundled_module.VALUE == "bytecode"
+        monkeypatch.delitem(sys.modules, "bundled_module")
+
+
+class TestFindHookPackages:
+    """Tests for find_hook_packages function."""
+
+    def test_find_hook_packages(self) -> None:
+        """Test that the hook's own and third-party packages are found, but not the standard library."""
+        packages = find_hook_packages()
+
+        assert packages["oddupiacz"] == Path(__file__).parent.parent / "oddupiacz"
+        assert {"typer", "yaml"} <= packages.keys()
+        assert not {"json", "subprocess", "__main__"} & packages.keys()
+
+
+class TestWriteBundle:
+    """Tests for write_bundle function."""
+
+    def test_hook_runs_isolated_from_bundle(self, tmp_path: Path) -> None:
+        """Test that the hook runs from the bundle without site-packages and blocks a forbidden phrase."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(f"hooks_dir: {tmp_path}\nforbidden_phrases: [TODO]\n")
+        bundle_path = tmp_path / "oddupiacz-hook.pyz"
+
+        write_bundle(bundle_path)
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-I", "-S", str(bundle_path), "--config", str(config_path)],
+            input="+++ b/app.py\n+# TODO remove\n",
+            capture_output=True,
+            text=True,
+            cwd=tmp_path,
+        )
+
+        assert result.returncode == 1
+        assert "Forbidden phrase found: 'TODO'" in result.stdout + result.stderr
+        names = zipfile.ZipFile(bundle_path).namelist()
+        assert {
+            "__main__.py",
+            "__main__.pyc",
+            "oddupiacz/config.py",
+            "oddupiacz/config.pyc",
+            "yaml/__init__.pyc",
+        } <= set(names)
+        assert not (tmp_path / ".oddupiacz-hook.pyz.tmp").exists()
@@ -0,0 +1,83 @@
+"""
+Unit tests for case_folding.py module.
+"""
+
+import re
+from functools import cache
+
+import pytest
+
+from oddupiacz.case_folding import case_variants, fold_case, fold_char, UNDERIVABLE_CASE_VARIANTS
+
+
+@cache
+def _cased_chars() -> str:
+    """Get every character with a case mapping, which are the only characters regex IGNORECASE relates."""
+    return "".join(
+        char
+        for char in map(chr, range(0x110000))
+        if char.lower() != char or char.upper() != char or char.casefold() != char
+    )
+
+
+def _regex_variants(char: str) -> set[str]:
+    """Find the characters regex IGNORECASE treats as equal to a character."""
+    return {char, *re.findall(re.escape(char), _cased_chars(), re.IGNORECASE)}
+
+
+class TestFoldCase:
+    """Tests for fold_case function."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("Acme CORP", "acme corp"),
+            ("Zażółć GĘŚLĄ", "zażółć gęślą"),
+            ("teſt TEſT", "test test"),
+            ("Kelvin", "kelvin"),
+            ("ΣΑΣ σας", "σασ σασ"),
+            ("İstanbul AB", "istanbul ab"),
+            ("STRAẞE straße", "straße straße"),
+        ],
+    )
+    def test_folds_like_regex(self, text: str, expected: str) -> None:
+        """Test that characters regex IGNORECASE treats as equal fold alike, keeping the length."""
+        assert fold_case(text) == expected
+
+    def test_every_character_folds_to_a_regex_variant(self) -> None:
+        """Test that each cased character folds to a character regex IGNORECASE treats as equal to it."""
+        mismatches = [
+            char for char in _cased_chars() if not re.fullmatch(re.escape(fold_char(char)), char, re.IGNORECASE)
+        ]
+
+        assert mismatches == []
+
+    def test_fold_case_agrees_with_fold_char(self) -> None:
+        """Test that folding a string folds each of its characters."""
+        text = _cased_chars()
+
+        assert fold_case(text) == "".join(map(fold_char, text))
+
+
+class TestCaseVariants:
+    """Tests for case_variants function."""
+
+    def test_variants_of_dotless_i(self) -> None:
+        """Test that all forms of i are variants of each other, as in regex IGNORECASE."""
+        assert case_variants("i") == case_variants("ı") == frozenset("iIıİ")
+
+    def test_variants_match_regex(self) -> None:
+        """Test that the variants of every cased character are exactly the characters regex treats as equal."""
+        mismatches = [char for char in _cased_chars() if case_variants(char) != _regex_variants(char)]
+
+        assert mismatches == []
+
+    def test_underivable_variants_are_complete(self) -> None:
+        """Test that the table lists exactly the variants that are not the upper or title case of their fold."""
+        underivable = [
+            char
+            for char in _cased_chars()
+            if fold_char(char) != char and char not in {fold_char(char).upper(), fold_char(char).title()}
+        ]
+
+        assert "".join(underivable) == UNDERIVABLE_CASE_VARIANTS
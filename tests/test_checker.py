@@ -2,24 +2,64 @@
 Unit tests for checker.py module.
 """
 
+import io
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-from oddupiacz.checker import parse_diff_for_violations
-from oddupiacz.config import Config
+import pytest
 
+from oddupiacz.baseline import Baseline, violation_fingerprint
+from oddupiacz.budget import Watchdog
+from oddupiacz.checker import (
+    get_scanner,
+    parse_diff_for_violations,
+    scan_diff,
+    scan_file_diffs,
+    Scanner,
+    split_diff_by_file,
+)
+from oddupiacz.config import CannotLoadConfigError, Config
+from oddupiacz.detectors import load_detectors
+from oddupiacz.hashed_phrases import hash_phrases
+from oddupiacz.models import DetectorSpec, PatternRule, PhraseRule, RuleSet, ScanPlan, Severity, Violation
 
-def _create_test_config(forbidden_phrases: list[str]) -> Config:
+
+def _create_test_config(forbidden_phrases: list[str | PhraseRule], **kwargs: object) -> Config:
     """Helper to create a test Config object."""
+    kwargs.setdefault("hooks_dir", Path("/tmp/.githooks_global"))  # noqa: S108
     return Config(
-        hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
         forbidden_phrases=forbidden_phrases,
         exclude_paths=[],
         exclude_files=[],
         exclude_extensions=[],
         exclude_repos=[],
+        **kwargs,  # type: ignore[arg-type]
     )
 
 
+class _ExpiringWatchdog(Watchdog):
+    """Watchdog stub that expires after a given number of checks."""
+
+    def __init__(self, checks_before_expiry: int) -> None:
+        super().__init__(budget_seconds=3600.0)
+        self.checks_left = checks_before_expiry
+
+    @property
+    def expired(self) -> bool:
+        self.checks_left -= 1
+        return self.checks_left < 0
+
+
+def _make_diff(files: dict[str, list[str]]) -> str:
+    """Helper to build a diff with the given added lines per file."""
+    lines = []
+    for path, added in files.items():
+        lines.append(f"+++ b/{path}")
+        lines.extend(f"+{line}" for line in added)
+    return "\n".join(lines) + "\n"
+
+
 class TestParseDiffForViolations:
     """Tests for parse_diff_for_violations function."""
 
@@ -100,6 +140,261 @@ class TestParseDiffForViolations:
         assert violations[0].phrase.lower() == "todo"
         assert violations[1].phrase == "TODO"
 
+    @pytest.mark.parametrize(
+        ("rule", "line", "expected"),
+        [
+            (PhraseRule(phrase="dupa", whole_word=True), "see dupalink", None),
+            (PhraseRule(phrase="dupa", whole_word=True), "x = Dupa(1)", "Dupa"),
+            (PhraseRule(phrase="TODO", whole_word=True), "two todos", None),
+            (PhraseRule(phrase="todo", prefix=True), "two TODOs", "TODO"),
+            (PhraseRule(phrase="todo", prefix=True), "mytodo", None),
+            (PhraseRule(phrase="link", suffix=True), "dupalink here", "link"),
+            (PhraseRule(phrase="link", suffix=True), "links", None),
+            (PhraseRule(phrase="XXX", case_sensitive=True), "xxx-large", None),
+            (PhraseRule(phrase="XXX", case_sensitive=True), "# XXX: hack", "XXX"),
+            (PhraseRule(phrase="print(", whole_word=True), "print(x)", "print("),
+            (PhraseRule(phrase="print(", whole_word=True), "reprint(x)", None),
+            (PhraseRule(phrase="dupa"), "dupalink", "dupa"),
+        ],
+    )
+    def test_phrase_options(self, rule: PhraseRule, line: str, expected: str | None) -> None:
+        """Test case_sensitive, whole_word, prefix and suffix phrase options."""
+        config = _create_test_config([rule])
+
+        violations = parse_diff_for_violations(_make_diff({"a.py": [line]}), config)
+
+        assert [v.phrase for v in violations] == ([expected] if expected else [])
+
+    def test_phrase_options_do_not_hide_other_phrases(self) -> None:
+        """Test that an entry rejected by its options does not stop other entries from matching."""
+        config = _create_test_config([PhraseRule(phrase="todo", whole_word=True), "todos"])
+
+        violations = parse_diff_for_violations(_make_diff({"a.py": ["two todos"]}), config)
+
+        assert [v.phrase for v in violations] == ["todos"]
+
+    def test_severity_tiers_in_one_scan(self) -> None:
+        """Test that one scan tags matches with their severity, reporting each tier once per line."""
+        diff = _make_diff({"a.py": ["# FIXME internal TODO", "# TODO", "internal FIXME FIXME"]})
+        config = _create_test_config(
+            [
+                PhraseRule(phrase="internal", severity=Severity.AUDIT),
+                "TODO",
+                PhraseRule(phrase="FIXME", severity=Severity.WARN),
+            ]
+        )
+
+        result = scan_diff(diff, config)
+
+        assert [(v.severity, v.phrase, v.line) for v in result.violations] == [
+            (Severity.BLOCK, "TODO", "# FIXME internal TODO"),
+            (Severity.WARN, "FIXME", "# FIXME internal TODO"),
+            (Severity.AUDIT, "internal", "# FIXME internal TODO"),
+            (Severity.BLOCK, "TODO", "# TODO"),
+            (Severity.WARN, "FIXME", "internal FIXME FIXME"),
+            (Severity.AUDIT, "internal", "internal FIXME FIXME"),
+        ]
+        assert [v.line for v in result.blocking] == ["# FIXME internal TODO", "# TODO"]
+        assert len(result.warnings) == 2
+        assert len(result.audits) == 2
+
+    def test_more_severe_phrase_wins_at_same_position(self) -> None:
+        """Test that a more severe phrase takes a position from a less severe one."""
+        diff = _make_diff({"a.py": ["todos", "todos todo"]})
+        config = _create_test_config([PhraseRule(phrase="todo", severity=Severity.WARN), "todos"])
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [(v.severity, v.phrase, v.line) for v in violations] == [
+            (Severity.BLOCK, "todos", "todos"),
+            (Severity.BLOCK, "todos", "todos todo"),
+            (Severity.WARN, "todo", "todos todo"),
+        ]
+
+    def test_whole_word_tokens_compete_with_substring_phrases(self) -> None:
+        """Test that whole-word identifiers found by token lookup follow the combined regex semantics."""
+        diff = _make_diff({"a.py": ["secret = 1", "my_secret TOKEN token", "xtoken = Token"]})
+        config = _create_test_config(
+            [
+                PhraseRule(phrase="secret", whole_word=True, severity=Severity.WARN),
+                "secr",
+                PhraseRule(phrase="Token", whole_word=True, case_sensitive=True),
+                PhraseRule(phrase="token", whole_word=True, severity=Severity.AUDIT),
+            ]
+        )
+
+        result = scan_diff(diff, config)
+
+        assert [(v.severity, v.phrase, v.line) for v in result.violations] == [
+            (Severity.BLOCK, "secr", "secret = 1"),
+            (Severity.BLOCK, "secr", "my_secret TOKEN token"),
+            (Severity.AUDIT, "TOKEN", "my_secret TOKEN token"),
+            (Severity.BLOCK, "Token", "xtoken = Token"),
+        ]
+
+    @pytest.mark.parametrize(
+        ("phrases", "line", "expected"),
+        [
+            (("todo",), "# ToDo: later", "ToDo"),
+            (("todo",), "# to\u212aen todo", "todo"),
+            (("token",), "# to\u212aen todo", "to\u212aen"),
+            ((PhraseRule(phrase="XXX", case_sensitive=True), "hack"), "xxx HACK XXX", "HACK"),
+            (("zażółć",), "ZAŻÓŁĆ gęślą", "ZAŻÓŁĆ"),
+        ],
+    )
+    def test_ascii_and_unicode_lines_match_alike(
+        self, phrases: tuple[str | PhraseRule, ...], line: str, expected: str
+    ) -> None:
+        """Test that the ASCII fast path and the Unicode path report the same case-insensitive matches."""
+        config = _create_test_config(list(phrases))
+
+        violations = parse_diff_for_violations(_make_diff({"a.py": [line]}), config)
+
+        assert [v.phrase for v in violations] == [expected]
+
+    def test_whole_word_tokens_with_non_ascii_text(self) -> None:
+        """Test that token lookup matches non-ASCII letters the way case-insensitive regexes do."""
+        diff = _make_diff({"a.py": ["\u212aey = 1", "kéy = 1", "zażółć key"]})
+        config = _create_test_config([PhraseRule(phrase="key", whole_word=True)])
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [(v.phrase, v.line) for v in violations] == [("\u212aey", "\u212aey = 1"), ("key", "zażółć key")]
+
+    def test_pattern_severity_tiers(self) -> None:
+        """Test that pattern matches are tagged with their severity alongside phrases."""
+        diff = _make_diff({"a.py": ["token=abc ticket-42 TODO"]})
+        config = _create_test_config(
+            [PhraseRule(phrase="TODO", severity=Severity.WARN)],
+            forbidden_patterns=[PatternRule(pattern="ticket-[0-9]+", severity=Severity.AUDIT), "token=[a-z]+"],
+        )
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [(v.severity, v.phrase) for v in violations] == [
+            (Severity.BLOCK, "token=abc"),
+            (Severity.WARN, "TODO"),
+            (Severity.AUDIT, "ticket-42"),
+        ]
+
+    def test_first_violation_plan_ignores_warnings(self) -> None:
+        """Test that the first violation plan only stops at blocking violations."""
+        diff = _make_diff({"a.py": ["FIXME"], "b.py": ["TODO"], "c.py": ["TODO"]})
+        config = _create_test_config(
+            ["TODO", PhraseRule(phrase="FIXME", severity=Severity.WARN)], degraded_plan="first_violation"
+        )
+
+        result = scan_diff(diff, config, _ExpiringWatchdog(0))
+
+        assert [v.file for v in result.violations] == ["a.py", "b.py"]
+
+    def test_detect_forbidden_patterns(self) -> None:
+        """Test that forbidden patterns are reported with the matched text."""
+        diff = _make_diff({"settings.py": ["db_password = 'hunter2'", "password_hint = None", "# TODO later"]})
+        config = _create_test_config(["TODO"], forbidden_patterns=[r"password\s*=\s*'[^']+'"])
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [(v.phrase, v.line) for v in violations] == [
+            ("password = 'hunter2'", "db_password = 'hunter2'"),
+            ("TODO", "# TODO later"),
+        ]
+
+    def test_leftmost_of_phrase_and_pattern_is_reported(self) -> None:
+        """Test that the earlier of a phrase match and a pattern match is reported."""
+        diff = _make_diff({"a.py": ["token=abc # TODO", "TODO token=abc"]})
+        config = _create_test_config(["TODO"], forbidden_patterns=["token=[a-z]+"])
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [v.phrase for v in violations] == ["token=abc", "TODO"]
+
+    def test_patterns_without_phrases(self) -> None:
+        """Test scanning with forbidden patterns only."""
+        diff = _make_diff({"a.py": ["key: AKIA1234567890ABCDEF"]})
+        config = _create_test_config([], forbidden_patterns=["AKIA[0-9A-Z]{16}"])
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [v.phrase for v in violations] == ["AKIA1234567890ABCDEF"]
+
+    def test_rule_sets_apply_only_to_matching_paths(self) -> None:
+        """Test that rule set phrases are only checked in files matching their globs."""
+        diff = _make_diff(
+            {
+                "src/app.py": ["print(x)  # TODO", "console.log(x)"],
+                "scripts/run.py": ["print(x)  # TODO"],
+                "web/app.ts": ["console.log(x)"],
+            }
+        )
+        rule_sets = [
+            RuleSet(paths=("src/**",), forbidden_phrases=("print(",)),
+            RuleSet(paths=("*.ts",), forbidden_phrases=("console.log",)),
+        ]
+        config = _create_test_config(["TODO"], rule_sets=rule_sets)
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [(v.file, v.phrase) for v in violations] == [
+            ("src/app.py", "print("),
+            ("scripts/run.py", "TODO"),
+            ("web/app.ts", "console.log"),
+        ]
+
+    def test_rule_sets_without_global_phrases(self) -> None:
+        """Test scanning with rule sets only, including rule set patterns and severities."""
+        diff = _make_diff({"deploy/prod.env": ["KEY=AKIA1234567890ABCDEF"], "README.md": ["KEY=AKIA1234567890ABCDEF"]})
+        rule_sets = [
+            RuleSet(paths=("deploy/",), forbidden_patterns=(PatternRule("AKIA[0-9A-Z]{16}", Severity.WARN),)),
+        ]
+        config = _create_test_config([], rule_sets=rule_sets)
+
+        result = scan_diff(diff, config)
+
+        assert [(v.file, v.severity) for v in result.violations] == [("deploy/prod.env", Severity.WARN)]
+
+    def test_phrase_files(self, tmp_path: Path) -> None:
+        """Test that wordlist terms are found case-insensitively alongside phrases."""
+        wordlist = tmp_path / "customers.txt"
+        wordlist.write_text("Globex\nInitech Corp\n")
+        diff = _make_diff({"a.py": ["# for initech corp", "TODO globex", "globex TODO", "nothing"]})
+        config = _create_test_config(["TODO"], hooks_dir=tmp_path / "hooks", phrase_files=[wordlist])
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [v.phrase for v in violations] == ["initech corp", "TODO", "globex"]
+        assert list((tmp_path / "hooks" / "wordlists").iterdir())
+
+    def test_missing_phrase_file_raises_error(self, tmp_path: Path) -> None:
+        """Test that a wordlist removed after loading the config is reported as a config error."""
+        config = _create_test_config([], hooks_dir=tmp_path, phrase_files=[tmp_path / "missing.txt"])
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            parse_diff_for_violations(_make_diff({"a.py": ["x"]}), config)
+
+        assert "missing.txt" in str(exc_info.value)
+
+    def test_non_utf8_phrase_file_raises_error(self, tmp_path: Path) -> None:
+        """Test that a phrase file that is not UTF-8 is reported as a config error naming the file."""
+        wordlist = tmp_path / "latin1.txt"
+        wordlist.write_bytes(b"acme\n\xbf\xf3\xb3w\n")
+        config = _create_test_config([], hooks_dir=tmp_path, phrase_files=[wordlist])
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            parse_diff_for_violations(_make_diff({"a.py": ["x"]}), config)
+
+        assert "latin1.txt is not valid UTF-8" in str(exc_info.value)
+
+    def test_hashed_phrases(self) -> None:
+        """Test that hashed phrases are reported with the matched text from the diff."""
+        diff = _make_diff({"a.py": ["# Project FALCON launch", "TODO falcon", "project eagle"]})
+        hashed = hash_phrases(["project falcon", "falcon"], bytes(16))
+        config = _create_test_config(["TODO"], hashed_phrases=hashed)
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [v.phrase for v in violations] == ["Project FALCON", "TODO"]
+
     def test_track_correct_file(self) -> None:
         """Test that violations are attributed to the correct file."""
         diff = """+++ b/file1.py
@@ -127,3 +422,449 @@ class TestParseDiffForViolations:
 
         # Should not match "TODO" in the filename
         assert violations == []
+
+
+class TestNotebookScanning:
+    """Tests for scanning notebooks through their content handler."""
+
+    NOTEBOOK_LINES = [
+        "{",
+        ' "cells": [',
+        "  {",
+        '   "cell_type": "code",',
+        '   "outputs": [',
+        "    {",
+        '     "data": {',
+        '      "image/png": "iVBORw0KGgoTODOAAAA=="',
+        "     },",
+        '     "output_type": "display_data"',
+        "    }",
+        "   ],",
+        '   "source": [',
+        '    "x = 1  # TODO\\n",',
+        '    "print(x)"',
+        "   ]",
+        "  }",
+        " ]",
+        "}",
+    ]
+
+    def test_notebook_sources_only(self) -> None:
+        """Test that only cell sources of notebooks are scanned, with decoded lines reported."""
+        diff = _make_diff({"analysis.ipynb": self.NOTEBOOK_LINES, "data.json": ['"TODO"']})
+        config = _create_test_config(["TODO"])
+
+        violations = parse_diff_for_violations(diff, config)
+
+        assert [(v.file, v.line) for v in violations] == [("analysis.ipynb", "x = 1  # TODO"), ("data.json", '"TODO"')]
+
+    def test_parallel_notebook_scan(self) -> None:
+        """Test that notebook chunks scanned by an executor skip outputs as well."""
+        diff = _make_diff({"analysis.ipynb": self.NOTEBOOK_LINES * 3})
+        config = _create_test_config(["TODO"], scan_chunk_lines=2)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = scan_file_diffs(list(split_diff_by_file(diff)), config, executor=executor)
+
+        assert [v.line for v in result.violations] == ["x = 1  # TODO"] * 3
+
+
+class TestSplitDiffByFile:
+    """Tests for split_diff_by_file function."""
+
+    def test_split_sections(self) -> None:
+        """Test splitting a diff into per-file added lines."""
+        diff = """+orphan
++++ b/a.py
+@@ -1,0 +1,2 @@
++one
+ context
+-removed
++++ /dev/null
++++ b/b.py
++two
+"""
+        file_diffs = list(split_diff_by_file(diff))
+
+        assert [(f.path, f.added_lines, f.has_header) for f in file_diffs] == [
+            ("unknown_file", ["orphan"], False),
+            ("a.py", ["one"], True),
+            ("b.py", ["two"], True),
+        ]
+        assert [f.hunks for f in file_diffs] == [[], [(0, 1)], []]
+
+    def test_hunks_index_added_lines(self) -> None:
+        """Test that each hunk records the index of its first added line and its start in the new file."""
+        diff = "+++ b/a.py\n@@ -1 +1,2 @@\n+one\n+two\n@@ -10,2 +11 @@\n-old\n@@ -20 +20,2 @@ def f():\n+three\n"
+
+        [file_diff] = split_diff_by_file(diff)
+
+        assert file_diff.hunks == [(0, 1), (2, 11), (2, 20)]
+
+    def test_to_diff_text_roundtrip(self) -> None:
+        """Test that rendered sections split back into the same sections."""
+        diff = "+orphan\n+++ b/a.py\n+one\n+two\n"
+        file_diffs = list(split_diff_by_file(diff))
+
+        rendered = "".join(file_diff.to_diff_text() for file_diff in file_diffs)
+
+        assert list(split_diff_by_file(rendered)) == file_diffs
+
+
+class TestScanDiffWithBudget:
+    """Tests for scan_diff degraded plans."""
+
+    def test_full_plan_without_watchdog(self) -> None:
+        """Test that scanning without a budget uses the full plan."""
+        result = scan_diff(_make_diff({"a.py": ["TODO"]}), _create_test_config(["TODO"]))
+
+        assert result.plan is ScanPlan.FULL
+        assert len(result.violations) == 1
+
+    def test_full_plan_when_budget_not_exhausted(self) -> None:
+        """Test that a watchdog that never fires keeps the full plan."""
+        diff = _make_diff({"a.py": ["TODO"], "b.py": ["TODO"]})
+
+        result = scan_diff(diff, _create_test_config(["TODO"]), _ExpiringWatchdog(100))
+
+        assert result.plan is ScanPlan.FULL
+        assert len(result.violations) == 2
+
+    def test_skip_large_files_plan(self) -> None:
+        """Test that large files are skipped once the budget is nearly exhausted."""
+        diff = _make_diff({"a.py": ["TODO"], "big.py": ["TODO"] * 5, "small.py": ["TODO"]})
+        config = _create_test_config(["TODO"], degraded_plan="skip_large_files", large_file_lines=3)
+
+        result = scan_diff(diff, config, _ExpiringWatchdog(1))
+
+        assert result.plan is ScanPlan.SKIP_LARGE_FILES
+        assert result.skipped_files == ["big.py"]
+        assert [v.file for v in result.violations] == ["a.py", "small.py"]
+
+    def test_first_violation_plan(self) -> None:
+        """Test that scanning stops at the first violation after degrading."""
+        diff = _make_diff({"a.py": ["ok"], "b.py": ["TODO", "TODO"], "c.py": ["TODO"]})
+        config = _create_test_config(["TODO"], degraded_plan="first_violation")
+
+        result = scan_diff(diff, config, _ExpiringWatchdog(1))
+
+        assert result.plan is ScanPlan.FIRST_VIOLATION
+        assert [v.file for v in result.violations] == ["b.py", "b.py"]
+
+    def test_background_plan_defers_remaining_files(self) -> None:
+        """Test that remaining files are deferred to a background scan."""
+        diff = _make_diff({"a.py": ["TODO"], "b.py": ["TODO"], "c.py": ["x"]})
+        config = _create_test_config(["TODO"], degraded_plan="background")
+
+        result = scan_diff(diff, config, _ExpiringWatchdog(1))
+
+        assert result.plan is ScanPlan.BACKGROUND
+        assert [v.file for v in result.violations] == ["a.py"]
+        assert [f.path for f in result.deferred_files] == ["b.py", "c.py"]
+
+    def test_large_file_degrades_mid_file(self) -> None:
+        """Test that the watchdog is checked while scanning a large file."""
+        diff = _make_diff({"big.py": ["TODO"] * 3000, "c.py": ["TODO"]})
+        config = _create_test_config(["TODO"], degraded_plan="skip_large_files", large_file_lines=100)
+
+        result = scan_diff(diff, config, _ExpiringWatchdog(2))
+
+        assert result.plan is ScanPlan.SKIP_LARGE_FILES
+        assert result.skipped_files == ["big.py"]
+        assert len(result.violations) == 2049
+
+    def test_large_file_first_violation_mid_file(self) -> None:
+        """Test that the first violation plan stops inside a large file."""
+        diff = _make_diff({"big.py": ["ok"] * 1500 + ["TODO"] * 3000})
+        config = _create_test_config(["TODO"], degraded_plan="first_violation")
+
+        result = scan_diff(diff, config, _ExpiringWatchdog(1))
+
+        assert result.plan is ScanPlan.FIRST_VIOLATION
+        assert len(result.violations) == 548
+
+    def test_large_file_deferred_mid_file(self) -> None:
+        """Test that a partially scanned large file is deferred as a whole."""
+        diff = _make_diff({"big.py": ["x"] * 3000, "c.py": ["TODO"]})
+        config = _create_test_config(["TODO"], degraded_plan="background")
+
+        result = scan_diff(diff, config, _ExpiringWatchdog(2))
+
+        assert [f.path for f in result.deferred_files] == ["big.py", "c.py"]
+
+    def test_large_file_scanned_fully_without_expiry(self) -> None:
+        """Test that large files are fully scanned while within budget."""
+        diff = _make_diff({"big.py": ["TODO"] * 3000})
+
+        result = scan_diff(diff, _create_test_config(["TODO"]), _ExpiringWatchdog(100))
+
+        assert len(result.violations) == 3000
+
+
+class TestScanFileDiffsVerdicts:
+    """Tests for scan_file_diffs with known verdicts."""
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_known_verdicts_are_not_scanned(self, parallel: bool) -> None:
+        """Test that files with a known verdict are reported from it, in diff order."""
+        file_diffs = list(split_diff_by_file(_make_diff({"a.py": ["TODO a"], "b.py": ["TODO b"], "c.py": ["TODO c"]})))
+        known = {"b.py": [Violation(phrase="cached", file="b.py", line="TODO b")]}
+        config = _create_test_config(["TODO"])
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = scan_file_diffs(
+                file_diffs, config, executor=executor if parallel else None, verdicts=lambda f: known.get(f.path)
+            )
+
+        assert [(v.file, v.phrase) for v in result.violations] == [
+            ("a.py", "TODO"),
+            ("b.py", "cached"),
+            ("c.py", "TODO"),
+        ]
+
+    def test_first_violation_plan_stops_at_known_verdict(self) -> None:
+        """Test that a blocking known verdict ends a first_violation scan."""
+        file_diffs = list(split_diff_by_file(_make_diff({"a.py": ["x"] * 3000, "b.py": ["TODO"], "c.py": ["TODO"]})))
+        known = {"b.py": [Violation(phrase="TODO", file="b.py", line="TODO")]}
+        config = _create_test_config(["TODO"], degraded_plan="first_violation")
+
+        result = scan_file_diffs(file_diffs, config, _ExpiringWatchdog(1), verdicts=lambda f: known.get(f.path))
+
+        assert [v.file for v in result.violations] == ["b.py"]
+
+    def test_first_violation_plan_skips_baseline(self) -> None:
+        """Test that a violation in the baseline does not end a first_violation scan before a new one."""
+        file_diffs = list(split_diff_by_file(_make_diff({"a.py": ["TODO"], "b.py": ["TODO here"], "c.py": ["TODO"]})))
+        baseline = Baseline([violation_fingerprint(Violation(phrase="TODO", file="a.py", line="TODO"))])
+        config = _create_test_config(["TODO"], degraded_plan="first_violation")
+
+        result = scan_file_diffs(file_diffs, config, _ExpiringWatchdog(0), baseline=baseline)
+
+        assert result.plan is ScanPlan.FIRST_VIOLATION
+        assert [(v.file, v.line) for v in result.violations] == [("b.py", "TODO here")]
+
+
+class TestScanFileDiffsDetectors:
+    """Tests for scan_file_diffs with detectors."""
+
+    def test_detector_violations_follow_phrase_violations(self) -> None:
+        """Test that detectors check each file after the phrase matcher."""
+        diff = _make_diff({"a.py": ["<<<<<<< HEAD", "TODO"], "c.py": ["ok"]})
+        config = _create_test_config(["TODO"])
+        detectors = load_detectors([DetectorSpec(name="merge-conflict")])
+
+        result = scan_file_diffs(list(split_diff_by_file(diff)), config, detectors=detectors)
+
+        assert [(v.file, v.phrase, v.detector) for v in result.violations] == [
+            ("a.py", "TODO", None),
+            ("a.py", "<<<<<<<", "merge-conflict"),
+        ]
+        assert list(result.detector_seconds) == ["merge-conflict"]
+
+    def test_detectors_run_with_known_verdicts(self) -> None:
+        """Test that files with a known phrase verdict are still checked by detectors."""
+        file_diffs = list(split_diff_by_file(_make_diff({"a.py": ["TODO", ">>>>>>> main"]})))
+        known = [Violation(phrase="TODO", file="a.py", line="TODO")]
+        detectors = load_detectors([DetectorSpec(name="merge-conflict")])
+
+        result = scan_file_diffs(
+            file_diffs, _create_test_config(["TODO"]), verdicts=lambda f: known, detectors=detectors
+        )
+
+        assert [v.phrase for v in result.violations] == ["TODO", ">>>>>>>"]
+
+    def test_first_violation_plan_stops_at_detector_violation(self) -> None:
+        """Test that a blocking detector violation ends a first_violation scan."""
+        diff = _make_diff({"a.py": ["x"] * 3000, "b.py": ["<<<<<<< HEAD"], "c.py": ["TODO"]})
+        config = _create_test_config(["TODO"], degraded_plan="first_violation")
+        detectors = load_detectors([DetectorSpec(name="merge-conflict")])
+
+        result = scan_file_diffs(list(split_diff_by_file(diff)), config, _ExpiringWatchdog(1), detectors=detectors)
+
+        assert [v.file for v in result.violations] == ["b.py"]
+
+    def test_skipped_large_files_are_not_checked(self) -> None:
+        """Test that files skipped by a degraded plan are not checked by detectors either."""
+        diff = _make_diff({"a.py": ["ok"], "big.py": ["<<<<<<< HEAD"] * 5})
+        config = _create_test_config(["TODO"], degraded_plan="skip_large_files", large_file_lines=3)
+        detectors = load_detectors([DetectorSpec(name="merge-conflict")])
+
+        result = scan_file_diffs(list(split_diff_by_file(diff)), config, _ExpiringWatchdog(1), detectors=detectors)
+
+        assert result.skipped_files == ["big.py"]
+        assert result.violations == []
+
+
+class TestScanFileDiffsParallel:
+    """Tests for scan_file_diffs with an executor."""
+
+    def test_parallel_scan_matches_serial(self) -> None:
+        """Test that chunked parallel scanning returns the same violations in the same order."""
+        diff = _make_diff({"a.py": ["TODO 1", "ok", "FIXME 2"] * 5, "b.py": ["ok"], "c.py": ["TODO 3"] * 7})
+        config = _create_test_config(["TODO", "FIXME"], scan_chunk_lines=4)
+        file_diffs = list(split_diff_by_file(diff))
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            result = scan_file_diffs(file_diffs, config, executor=executor)
+
+        assert result.violations == parse_diff_for_violations(diff, config)
+
+    def test_parallel_scan_uses_rule_sets_per_file(self) -> None:
+        """Test that each file's chunks are scanned with the rules of its rule sets."""
+        diff = _make_diff({"src/a.py": ["print(1)", "TODO"] * 3, "tools/b.py": ["print(2)", "TODO"]})
+        rule_sets = [RuleSet(paths=("src/",), forbidden_phrases=("print(",))]
+        config = _create_test_config(["TODO"], scan_chunk_lines=2, rule_sets=rule_sets)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = scan_file_diffs(list(split_diff_by_file(diff)), config, executor=executor)
+
+        assert result.violations == parse_diff_for_violations(diff, config)
+        assert [v.phrase for v in result.violations] == ["print(", "TODO"] * 3 + ["TODO"]
+
+    def test_process_pool_scan(self) -> None:
+        """Test that chunks can be scanned in worker processes."""
+        diff = _make_diff({"a.py": ["TODO"] * 10, "b.py": ["FIXME"]})
+        config = _create_test_config(["TODO", "FIXME"], scan_chunk_lines=3)
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            result = scan_file_diffs(list(split_diff_by_file(diff)), config, executor=executor)
+
+        assert [v.file for v in result.violations] == ["a.py"] * 10 + ["b.py"]
+
+    def test_parallel_scan_applies_budget_plan(self) -> None:
+        """Test that degraded plans are applied while collecting parallel results."""
+        diff = _make_diff({"a.py": ["TODO"], "b.py": ["TODO"], "c.py": ["TODO"]})
+        config = _create_test_config(["TODO"], degraded_plan="background")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = scan_file_diffs(list(split_diff_by_file(diff)), config, _ExpiringWatchdog(1), executor)
+
+        assert [v.file for v in result.violations] == ["a.py"]
+        assert [f.path for f in result.deferred_files] == ["b.py", "c.py"]
+
+
+def _scan_in_worker(scanner: Scanner, diff: str) -> list[Violation]:
+    """Scan a diff with a scanner passed to a worker process."""
+    return scanner.scan_text(diff)
+
+
+class TestScanner:
+    """Tests for Scanner class."""
+
+    @pytest.fixture()
+    def config(self) -> Config:
+        """Fixture providing a config with phrases, patterns, a rule set and exclusions."""
+        config = _create_test_config(
+            ["TODO", PhraseRule(phrase="FIXME", severity=Severity.WARN)],
+            forbidden_patterns=[r"api[_-]?key\s*=\s*\w+"],
+            rule_sets=[RuleSet(paths=("src/",), forbidden_phrases=("print(",))],
+        )
+        config.exclude_paths.append("vendor/")
+        return config
+
+    @pytest.fixture()
+    def diff(self) -> str:
+        """Fixture providing a diff with violations in included and excluded files."""
+        return _make_diff(
+            {
+                "src/a.py": ["print(1)  # TODO", "api_key = abc123"],
+                "vendor/lib.py": ["# TODO vendored"],
+                "b.py": ["print(2)", "FIXME later"],
+            }
+        )
+
+    @pytest.fixture()
+    def expected(self) -> list[Violation]:
+        """Fixture providing the violations of the diff fixture, without the excluded file."""
+        return [
+            Violation(phrase="print(", file="src/a.py", line="print(1)  # TODO"),
+            Violation(phrase="api_key = abc123", file="src/a.py", line="api_key = abc123"),
+            Violation(phrase="FIXME", file="b.py", line="FIXME later", severity=Severity.WARN),
+        ]
+
+    def test_scan_text(self, config: Config, diff: str, expected: list[Violation]) -> None:
+        """Test that added lines are scanned with the rule sets of each file and excluded files are skipped."""
+        scanner = Scanner(config)
+
+        assert scanner.scan_text(diff) == expected
+        assert scanner.scan_text(diff, skip_excluded=False) == parse_diff_for_violations(diff, config)
+        assert scanner.is_excluded("vendor/lib.py")
+        assert not scanner.is_excluded("src/a.py")
+
+    def test_scan_lines_stream_and_file(
+        self, config: Config, diff: str, expected: list[Violation], tmp_path: Path
+    ) -> None:
+        """Test that lines, streams and files are scanned like the same diff text, with any line endings."""
+        scanner = Scanner(config)
+        path = tmp_path / "change.diff"
+        path.write_bytes(diff.replace("\n", "\r\n").encode() + b"+caf\xe9\n")
+
+        assert scanner.scan_lines(diff.splitlines()) == expected
+        assert scanner.scan_lines(diff.splitlines(keepends=True)) == expected
+        assert scanner.scan_stream(io.StringIO(diff)) == expected
+        assert scanner.scan_file(path) == expected
+
+    def test_scanner_is_immutable(self, config: Config) -> None:
+        """Test that attributes of a scanner cannot be set or deleted."""
+        scanner = Scanner(config)
+
+        with pytest.raises(AttributeError, match="immutable"):
+            scanner._resolver = None  # type: ignore[assignment]
+        with pytest.raises(AttributeError, match="immutable"):
+            del scanner._exclusions
+
+    def test_scanner_is_not_changed_by_config(self, config: Config, diff: str, expected: list[Violation]) -> None:
+        """Test that changing the config after creating a scanner does not change its rules."""
+        scanner = Scanner(config)
+
+        config.forbidden_phrases.append("print(")
+        config.exclude_paths.clear()
+
+        assert scanner.scan_text(diff) == expected
+
+    def test_pickled_scanner(self, config: Config, diff: str, expected: list[Violation]) -> None:
+        """Test that a scanner can be pickled and passed to worker processes."""
+        scanner = Scanner(config)
+
+        assert pickle.loads(pickle.dumps(scanner)).scan_text(diff) == expected  # noqa: S301
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            assert list(executor.map(_scan_in_worker, [scanner] * 2, [diff] * 2)) == [expected] * 2
+
+    def test_shared_by_threads(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that threads sharing a scanner find the same violations, even while pattern automata are flushed."""
+        monkeypatch.setattr("oddupiacz.safe_regex.MAX_DFA_STATES", 4)
+        config = _create_test_config([], forbidden_patterns=[r"tok[a-z]{2,}\d+x", r"sec(ret|urity)[0-9a-f]+"])
+        lines = [f"tok{'abcdefgh'[: i % 8 + 2]}{i}x secret{i:x} {'security' * (i % 3)}" for i in range(200)]
+        diff = _make_diff({"a.py": lines, "b.py": lines[::-1]})
+        scanner = Scanner(config)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(scanner.scan_text, [diff] * 32))
+
+        expected = [line.split()[0] for line in lines + lines[::-1]]
+        assert all([v.phrase for v in result] == expected for result in results)
+
+
+class TestGetScanner:
+    """Tests for get_scanner function."""
+
+    def test_scanner_is_reused_for_equal_config(self) -> None:
+        """Test that equal configs share a scanner and a changed config gets a new one."""
+        config = _create_test_config(["TODO"])
+
+        scanner = get_scanner(config)
+
+        assert get_scanner(_create_test_config(["TODO"])) is scanner
+        config.forbidden_phrases.append("FIXME")
+        assert get_scanner(config) is not scanner
+
+    def test_edited_phrase_file_is_compiled_again(self, tmp_path: Path) -> None:
+        """Test that a scanner is not reused once a phrase file of its config changes."""
+        wordlist = tmp_path / "names.txt"
+        wordlist.write_text("initech\n")
+        config = _create_test_config([], hooks_dir=tmp_path, phrase_files=[wordlist])
+        diff = _make_diff({"a.py": ["initech and globex"]})
+
+        assert [v.phrase for v in parse_diff_for_violations(diff, config)] == ["initech"]
+        wordlist.write_text("globex corporation\nglobex\n")
+        assert [v.phrase for v in parse_diff_for_violations(diff, config)] == ["globex"]
@@ -6,7 +6,8 @@ from pathlib import Path
 
 import pytest
 
-from oddupiacz.config import CannotLoadConfigError, Config, load_config
+from oddupiacz.config import CannotLoadConfigError, Config, load_config, merge_overlay
+from oddupiacz.models import DetectorSpec, HashedPhrases, PatternRule, PhraseRule, RuleSet, Severity
 
 
 class TestLoadConfig:
@@ -115,6 +116,408 @@ forbidden_phrases:
         assert config.exclude_files == []
         assert config.exclude_extensions == []
         assert config.exclude_repos == []
+        assert config.concurrent_local_hook is False
+        assert config.local_hook_workers == 4
+        assert config.time_budget_ms is None
+        assert config.degraded_plan == "skip_large_files"
+        assert config.large_file_lines == 1000
+        assert config.max_file_lines is None
+        assert config.scan_chunk_lines == 50000
+        assert config.parallel_min_lines == 200000
+        assert config.forbidden_patterns == []
+
+    def test_load_time_budget(self, tmp_path: Path) -> None:
+        """Test loading time budget settings."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("""
+hooks_dir: /tmp/.githooks_global
+forbidden_phrases: [TODO]
+time_budget_ms: 300
+degraded_plan: background
+large_file_lines: 200
+""")
+
+        config = load_config(config_file)
+        assert config.time_budget_ms == 300
+        assert config.degraded_plan == "background"
+        assert config.large_file_lines == 200
+
+    @pytest.mark.parametrize(
+        ("option", "expected_error"),
+        [
+            ("time_budget_ms: 0", "'time_budget_ms' must be a positive integer"),
+            ("degraded_plan: panic", "'degraded_plan' must be one of"),
+            ("large_file_lines: many", "'large_file_lines' must be a positive integer"),
+            ("max_file_lines: -1", "'max_file_lines' must be a positive integer"),
+            ("scan_chunk_lines: 0", "'scan_chunk_lines' must be a positive integer"),
+            ("parallel_min_lines: lots", "'parallel_min_lines' must be a positive integer"),
+        ],
+    )
+    def test_invalid_time_budget_settings_raise_error(self, tmp_path: Path, option: str, expected_error: str) -> None:
+        """Test that invalid time budget settings raise errors."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n{option}")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert expected_error in str(exc_info.value)
+
+    def test_load_phrase_options(self, tmp_path: Path) -> None:
+        """Test loading forbidden phrases with match options."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("""
+hooks_dir: /tmp/.githooks_global
+forbidden_phrases:
+  - TODO
+  - phrase: dupa
+    whole_word: true
+  - phrase: XXX
+    case_sensitive: true
+    prefix: false
+""")
+
+        config = load_config(config_file)
+        assert config.forbidden_phrases == [
+            "TODO",
+            PhraseRule(phrase="dupa", whole_word=True),
+            PhraseRule(phrase="XXX", case_sensitive=True),
+        ]
+
+    @pytest.mark.parametrize(
+        ("entry", "expected_error"),
+        [
+            ("- 42", "entries must be strings or mappings with a 'phrase' string"),
+            ("- {whole_word: true}", "entries must be strings or mappings with a 'phrase' string"),
+            ("- {phrase: ''}", "entries must be strings or mappings with a 'phrase' string"),
+            ("- {phrase: dupa, fuzzy: true}", "Unknown options for phrase 'dupa': fuzzy"),
+            ("- {phrase: dupa, whole_word: 'yes'}", "'whole_word' of phrase 'dupa' must be a boolean"),
+            ("- {phrase: dupa, severity: loud}", "'severity' of phrase 'dupa' must be one of: block, warn, audit"),
+        ],
+    )
+    def test_invalid_phrase_entries_raise_error(self, tmp_path: Path, entry: str, expected_error: str) -> None:
+        """Test that malformed phrase entries are rejected."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases:\n  {entry}\n")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert expected_error in str(exc_info.value)
+
+    def test_load_severities(self, tmp_path: Path) -> None:
+        """Test loading phrase and pattern severities and the audit log path."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"""
+hooks_dir: /tmp/.githooks_global
+audit_log: {tmp_path / "audit.jsonl"}
+forbidden_phrases:
+  - TODO
+  - phrase: FIXME
+    severity: warn
+forbidden_patterns:
+  - 'secret\\d+'
+  - pattern: 'internal-[a-z]+'
+    severity: audit
+""")
+
+        config = load_config(config_file)
+        assert config.forbidden_phrases == ["TODO", PhraseRule(phrase="FIXME", severity=Severity.WARN)]
+        assert config.forbidden_patterns == [
+            r"secret\d+",
+            PatternRule(pattern="internal-[a-z]+", severity=Severity.AUDIT),
+        ]
+        assert config.audit_log == tmp_path / "audit.jsonl"
+
+    def test_non_string_audit_log_raises_error(self, tmp_path: Path) -> None:
+        """Test that audit_log must be a path."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\naudit_log: [a]")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert "'audit_log' must be a path" in str(exc_info.value)
+
+    def test_load_forbidden_patterns(self, tmp_path: Path) -> None:
+        """Test loading forbidden patterns, which may replace forbidden phrases."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(r"""
+hooks_dir: /tmp/.githooks_global
+forbidden_phrases: []
+forbidden_patterns:
+  - 'api[_-]?key\s*='
+""")
+
+        config = load_config(config_file)
+        assert config.forbidden_phrases == []
+        assert config.forbidden_patterns == [r"api[_-]?key\s*="]
+
+    @pytest.mark.parametrize(
+        ("option", "expected_error"),
+        [
+            ("forbidden_patterns: 'a+'", "'forbidden_patterns' must be a list"),
+            ("forbidden_patterns: [1]", "entries must be strings or mappings with a 'pattern' string"),
+            ("forbidden_patterns: [{pattern: a+, tier: 1}]", "Unknown options for pattern 'a+': tier"),
+            ("forbidden_patterns: [{pattern: a+, severity: fatal}]", "'severity' of pattern 'a+' must be one of"),
+            ("forbidden_patterns: ['(a+)\\1']", "backreferences are not supported"),
+            ("forbidden_patterns: ['(?=a)b']", "lookaround assertions are not supported"),
+            ("forbidden_patterns: ['x*']", "pattern can match an empty string"),
+        ],
+    )
+    def test_invalid_forbidden_patterns_raise_error(self, tmp_path: Path, option: str, expected_error: str) -> None:
+        """Test that unsafe or malformed forbidden patterns are rejected at load time."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n{option}")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert expected_error in str(exc_info.value)
+
+    def test_load_rule_sets(self, tmp_path: Path) -> None:
+        """Test loading path-scoped rule sets."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("""hooks_dir: /tmp/.githooks_global
+forbidden_phrases: []
+rule_sets:
+  - paths: ["src/**"]
+    forbidden_phrases: ["print("]
+  - paths: ["*.ts", "*.tsx"]
+    forbidden_phrases:
+      - phrase: console.log
+        severity: warn
+    forbidden_patterns: ["debugger;?"]
+""")
+
+        config = load_config(config_file)
+        assert config.forbidden_phrases == []
+        assert config.rule_sets == [
+            RuleSet(paths=("src/**",), forbidden_phrases=("print(",)),
+            RuleSet(
+                paths=("*.ts", "*.tsx"),
+                forbidden_phrases=(PhraseRule(phrase="console.log", severity=Severity.WARN),),
+                forbidden_patterns=("debugger;?",),
+            ),
+        ]
+
+    @pytest.mark.parametrize(
+        ("option", "expected_error"),
+        [
+            ("rule_sets: {paths: [a]}", "'rule_sets' must be a list"),
+            ("rule_sets: [a]", "'rule_sets[0]' must be a mapping"),
+            ("rule_sets: [{paths: [a], forbidden_phrases: [x], scope: all}]", "Unknown keys in 'rule_sets[0]': scope"),
+            ("rule_sets: [{paths: [], forbidden_phrases: [x]}]", "'rule_sets[0].paths' must be a non-empty list"),
+            ("rule_sets: [{paths: [1], forbidden_phrases: [x]}]", "'rule_sets[0].paths' must be a non-empty list"),
+            ("rule_sets: [{paths: [a]}]", "'rule_sets[0]' must contain 'forbidden_phrases' or 'forbidden_patterns'"),
+            ("rule_sets: [{paths: [a], forbidden_patterns: ['x*']}]", "pattern can match an empty string"),
+        ],
+    )
+    def test_invalid_rule_sets_raise_error(self, tmp_path: Path, option: str, expected_error: str) -> None:
+        """Test that malformed rule sets are rejected at load time."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n{option}")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert expected_error in str(exc_info.value)
+
+    def test_load_phrase_files(self, tmp_path: Path) -> None:
+        """Test that phrase files are resolved relative to the config file."""
+        (tmp_path / "lists").mkdir()
+        (tmp_path / "lists" / "customers.txt").write_text("Globex\n")
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "hooks_dir: /tmp/.githooks_global\nforbidden_phrases: []\nphrase_files: [lists/customers.txt]"
+        )
+
+        config = load_config(config_file)
+        assert config.phrase_files == [(tmp_path / "lists" / "customers.txt").resolve()]
+
+    @pytest.mark.parametrize(
+        ("option", "expected_error"),
+        [
+            ("phrase_files: customers.txt", "'phrase_files' must be a list of paths"),
+            ("phrase_files: ['']", "'phrase_files' must be a list of paths"),
+            ("phrase_files: [missing.txt]", "Phrase file not found"),
+        ],
+    )
+    def test_invalid_phrase_files_raise_error(self, tmp_path: Path, option: str, expected_error: str) -> None:
+        """Test that malformed or missing phrase files are rejected."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n{option}")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert expected_error in str(exc_info.value)
+
+    def test_load_hashed_phrases(self, tmp_path: Path) -> None:
+        """Test loading hashed phrases grouped by length."""
+        entry = "0a" * 20
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "hooks_dir: /tmp/.githooks_global\nforbidden_phrases: []\n"
+            f"hashed_phrases: {{salt: {'AB' * 16}, hashes: {{6: ['{entry}'], 4: []}}}}"
+        )
+
+        config = load_config(config_file)
+        assert config.hashed_phrases == HashedPhrases(salt="ab" * 16, hashes=((4, ()), (6, (entry,))))
+        assert config.to_dict()["hashed_phrases"] == {"salt": "ab" * 16, "hashes": {4: [], 6: [entry]}}
+
+    @pytest.mark.parametrize(
+        ("option", "expected_error"),
+        [
+            ("hashed_phrases: [a]", "'hashed_phrases' must be a mapping with 'salt' and 'hashes'"),
+            (f"hashed_phrases: {{salt: {'ab' * 16}}}", "'hashed_phrases' must be a mapping"),
+            ("hashed_phrases: {salt: abcd, hashes: {}}", "'hashed_phrases.salt' must be a hex string of 16 to 64"),
+            (f"hashed_phrases: {{salt: {'zz' * 16}, hashes: {{}}}}", "'hashed_phrases.salt' must be a hex"),
+            (f"hashed_phrases: {{salt: {'ab' * 16}, hashes: [a]}}", "'hashed_phrases.hashes' must map"),
+            (f"hashed_phrases: {{salt: {'ab' * 16}, hashes: {{0: []}}}}", "'hashed_phrases.hashes' must map"),
+            (f"hashed_phrases: {{salt: {'ab' * 16}, hashes: {{3: [abc]}}}}", "Invalid entry in 'hashed_phrases"),
+        ],
+    )
+    def test_invalid_hashed_phrases_raise_error(self, tmp_path: Path, option: str, expected_error: str) -> None:
+        """Test that malformed hashed phrases are rejected."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n{option}")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert expected_error in str(exc_info.value)
+
+    def test_load_detectors(self, tmp_path: Path) -> None:
+        """Test loading detectors given by name or with a severity and options."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "hooks_dir: /tmp/.githooks_global\nforbidden_phrases: []\n"
+            "detectors: [merge-conflict, {name: long-line, severity: block, max_length: 200}]"
+        )
+
+        config = load_config(config_file)
+        assert config.detectors == [
+            DetectorSpec(name="merge-conflict"),
+            DetectorSpec(name="long-line", severity=Severity.BLOCK, options=(("max_length", 200),)),
+        ]
+        assert config.to_dict()["detectors"] == [
+            "merge-conflict",
+            {"name": "long-line", "severity": "block", "max_length": 200},
+        ]
+
+    @pytest.mark.parametrize(
+        ("option", "expected_error"),
+        [
+            ("detectors: merge-conflict", "'detectors' must be a list"),
+            ("detectors: ['']", "'detectors' entries must be names or mappings with a 'name' string"),
+            ("detectors: [{severity: warn}]", "'detectors' entries must be names or mappings"),
+            ("detectors: [{name: long-line, severity: loud}]", "severity"),
+        ],
+    )
+    def test_invalid_detectors_raise_error(self, tmp_path: Path, option: str, expected_error: str) -> None:
+        """Test that malformed detector entries are rejected."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n{option}")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert expected_error in str(exc_info.value)
+
+    def test_load_concurrent_local_hook(self, tmp_path: Path) -> None:
+        """Test loading the concurrent_local_hook option."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\nconcurrent_local_hook: true"
+        )
+
+        config = load_config(config_file)
+        assert config.concurrent_local_hook is True
+
+    def test_load_skip_generated(self, tmp_path: Path) -> None:
+        """Test that skipping generated files is on by default and can be turned off."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n")
+        assert load_config(config_file).skip_generated is True
+
+        config_file.write_text("hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\nskip_generated: false")
+        assert load_config(config_file).skip_generated is False
+
+        config_file.write_text("hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\nskip_generated: maybe")
+        with pytest.raises(CannotLoadConfigError, match="'skip_generated' must be a boolean"):
+            load_config(config_file)
+
+    def test_non_bool_concurrent_local_hook_raises_error(self, tmp_path: Path) -> None:
+        """Test that non-boolean concurrent_local_hook raises error."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\nconcurrent_local_hook: yes please"
+        )
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert "'concurrent_local_hook' must be a boolean" in str(exc_info.value)
+
+    @pytest.mark.parametrize("workers", ["0", "-2", "two", "true"])
+    def test_invalid_local_hook_workers_raises_error(self, tmp_path: Path, workers: str) -> None:
+        """Test that local_hook_workers must be a positive integer."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            f"hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\nlocal_hook_workers: {workers}"
+        )
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_config(config_file)
+
+        assert "'local_hook_workers' must be a positive integer" in str(exc_info.value)
+
+
+class TestMergeOverlay:
+    """Tests for merge_overlay function."""
+
+    def test_empty_overlay_keeps_config(self, tmp_path: Path) -> None:
+        """Test that an empty overlay file leaves the config unchanged."""
+        config = Config(
+            hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+            forbidden_phrases=["TODO"],
+            exclude_paths=[],
+            exclude_files=[],
+            exclude_extensions=[],
+            exclude_repos=[],
+        )
+        overlay_path = tmp_path / ".oddupiacz.yaml"
+        overlay_path.write_text("")
+
+        assert merge_overlay(config, overlay_path) is config
+
+    @pytest.mark.parametrize(
+        ("content", "expected_error"),
+        [
+            ("- TODO", "Overlay config must be a YAML dictionary"),
+            ("hooks_dir: /tmp", "Unknown keys in overlay config"),
+            ("forbidden_phrases: TODO", "'forbidden_phrases' must be a list"),
+            ("forbidden_patterns: ['(?=a)b']", "lookaround assertions are not supported"),
+        ],
+    )
+    def test_invalid_overlay_raises_error(self, tmp_path: Path, content: str, expected_error: str) -> None:
+        """Test that malformed overlays are rejected."""
+        config = Config(
+            hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+            forbidden_phrases=["TODO"],
+            exclude_paths=[],
+            exclude_files=[],
+            exclude_extensions=[],
+            exclude_repos=[],
+        )
+        overlay_path = tmp_path / ".oddupiacz.yaml"
+        overlay_path.write_text(content)
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            merge_overlay(config, overlay_path)
+
+        assert expected_error in str(exc_info.value)
 
 
 class TestConfig:
@@ -135,3 +538,51 @@ class TestConfig:
         assert config.exclude_files == ["test.py"]
         assert config.exclude_extensions == [".log"]
         assert config.exclude_repos == ["oddupiacz"]
+
+    def test_to_dict_keeps_only_set_phrase_options(self) -> None:
+        """Test that phrase rules are serialized with only their enabled options."""
+        config = Config(
+            hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+            forbidden_phrases=["TODO", PhraseRule(phrase="dupa", whole_word=True)],
+            exclude_paths=[],
+            exclude_files=[],
+            exclude_extensions=[],
+            exclude_repos=[],
+        )
+
+        assert config.to_dict()["forbidden_phrases"] == ["TODO", {"phrase": "dupa", "whole_word": True}]
+
+    def test_to_dict_serializes_severities(self) -> None:
+        """Test that non-default severities and the audit log path are serialized."""
+        config = Config(
+            hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+            forbidden_phrases=[PhraseRule(phrase="FIXME", severity=Severity.WARN)],
+            exclude_paths=[],
+            exclude_files=[],
+            exclude_extensions=[],
+            exclude_repos=[],
+            forbidden_patterns=["a+b", PatternRule(pattern="x+"), PatternRule(pattern="y+", severity=Severity.AUDIT)],
+            audit_log=Path("/tmp/audit.jsonl"),  # noqa: S108
+        )
+
+        data = config.to_dict()
+        assert data["forbidden_phrases"] == [{"phrase": "FIXME", "severity": "warn"}]
+        assert data["forbidden_patterns"] == ["a+b", "x+", {"pattern": "y+", "severity": "audit"}]
+        assert data["audit_log"] == "/tmp/audit.jsonl"  # noqa: S108
+
+    def test_to_dict_serializes_rule_sets(self) -> None:
+        """Test that rule sets are serialized with their paths, phrases and patterns."""
+        config = Config(
+            hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+            forbidden_phrases=["TODO"],
+            exclude_paths=[],
+            exclude_files=[],
+            exclude_extensions=[],
+            exclude_repos=[],
+            rule_sets=[RuleSet(paths=("src/**",), forbidden_phrases=(PhraseRule(phrase="print(", prefix=True),))],
+        )
+
+        assert config.to_dict()["phrase_files"] == []
+        assert config.to_dict()["rule_sets"] == [
+            {"paths": ["src/**"], "forbidden_phrases": [{"phrase": "print(", "prefix": True}], "forbidden_patterns": []}
+        ]
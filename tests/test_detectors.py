@@ -0,0 +1,238 @@
+"""
+Unit tests for detectors.py module.
+"""
+
+import pickle
+from importlib.metadata import EntryPoint
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from oddupiacz.config import CannotLoadConfigError
+from oddupiacz.detectors import (
+    Detector,
+    DetectorRunner,
+    EntropyDetector,
+    find_detector_class,
+    load_detectors,
+    LongLineDetector,
+    MergeConflictDetector,
+)
+from oddupiacz.models import DetectorSpec, FileDiff, Severity, Violation
+
+
+class FailingDetector(Detector):
+    """Detector whose constructor fails."""
+
+    name = "failing"
+
+    def __init__(self, severity: Severity | None = None) -> None:
+        raise KeyError()
+
+
+class RecordingDetector(Detector):
+    """Detector that records the events it receives."""
+
+    name = "recording"
+
+    def __init__(self, severity: Severity | None = None) -> None:
+        super().__init__(severity)
+        self.events: list[tuple[str, object]] = []
+
+    def start_file(self, path: str) -> list[Violation]:
+        self.events.append(("file", path))
+        return []
+
+    def start_hunk(self, path: str, new_start: int) -> list[Violation]:
+        self.events.append(("hunk", new_start))
+        return []
+
+    def check_line(self, path: str, line: str) -> list[Violation]:
+        self.events.append(("line", line))
+        return []
+
+    def finish_file(self, path: str) -> list[Violation]:
+        self.events.append(("end", path))
+        return [self.violation(path, "", "done")]
+
+
+class TestBuiltinDetectors:
+    """Tests for the built-in detectors."""
+
+    def test_merge_conflict_markers(self) -> None:
+        """Test that conflict markers are reported and a separator only inside a conflict."""
+        detector = MergeConflictDetector()
+        lines = ["Title", "=======", "<<<<<<< HEAD", "ours", "=======", "theirs", ">>>>>>> feature", "======="]
+
+        detector.start_file("a.md")
+        violations = [v for line in lines for v in detector.check_line("a.md", line)]
+
+        assert [(v.phrase, v.line, v.detector, v.severity) for v in violations] == [
+            ("<<<<<<<", "<<<<<<< HEAD", "merge-conflict", Severity.BLOCK),
+            ("=======", "=======", "merge-conflict", Severity.BLOCK),
+            (">>>>>>>", ">>>>>>> feature", "merge-conflict", Severity.BLOCK),
+        ]
+
+    def test_long_line(self) -> None:
+        """Test that lines over the limit are reported with the line shortened."""
+        detector = LongLineDetector(max_length=10)
+
+        assert detector.check_line("a.js", "x" * 10) == []
+        [violation] = detector.check_line("a.js", "y" * 11)
+        assert (violation.phrase, violation.line, violation.severity) == (
+            "line longer than 10 characters",
+            "y" * 10,
+            Severity.WARN,
+        )
+
+    @pytest.mark.parametrize(
+        ("line", "expected"),
+        [
+            ('key = "AKIAQ3F7ZK2LX9P1T8WHq0V5mR6sJ4dN"', "AKIAQ3F7ZK2LX9P1T8WHq0V5mR6sJ4dN"),
+            ("sha = 3f9a1c0d8e7b6a5f4e3d2c1b0a9f8e7d6c5b4a39", "3f9a1c0d8e7b6a5f4e3d2c1b0a9f8e7d6c5b4a39"),
+            ("some_long_function_name_here()", None),
+            ("aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa", None),
+        ],
+    )
+    def test_high_entropy(self, line: str, expected: str | None) -> None:
+        """Test that random-looking base64 and hex tokens are reported and words are not."""
+        violations = EntropyDetector().check_line("a.py", line)
+
+        assert [v.phrase for v in violations] == ([expected] if expected else [])
+
+    @pytest.mark.parametrize(
+        ("detector_class", "options", "expected_error"),
+        [
+            (LongLineDetector, {"max_length": 0}, "'max_length' of detector 'long-line' must be a positive integer"),
+            (EntropyDetector, {"hex_entropy": "high"}, "'hex_entropy' of detector 'high-entropy' must be a positive"),
+        ],
+    )
+    def test_invalid_options(
+        self, detector_class: type[Detector], options: dict[str, Any], expected_error: str
+    ) -> None:
+        """Test that invalid detector options are rejected."""
+        with pytest.raises(CannotLoadConfigError, match=expected_error):
+            detector_class(**options)
+
+
+class TestDetectorRunner:
+    """Tests for DetectorRunner class."""
+
+    def test_events_per_hunk(self) -> None:
+        """Test that each detector receives file, hunk and line events in order, and is timed."""
+        detector = RecordingDetector()
+        runner = DetectorRunner([detector])
+        file_diff = FileDiff(path="a.py", added_lines=["x", "y", "z"], hunks=[(0, 3), (2, 10)])
+        timings: dict[str, float] = {}
+
+        violations = runner.scan(file_diff, file_diff.added_lines, timings)
+
+        assert detector.events == [
+            ("file", "a.py"),
+            ("hunk", 3),
+            ("line", "x"),
+            ("line", "y"),
+            ("hunk", 10),
+            ("line", "z"),
+            ("end", "a.py"),
+        ]
+        assert [(v.phrase, v.detector) for v in violations] == [("done", "recording")]
+        assert list(timings) == ["recording"]
+
+    def test_events_without_hunks(self) -> None:
+        """Test that lines without hunk headers or changed by a content handler come without hunk events."""
+        detector = RecordingDetector()
+        runner = DetectorRunner([detector])
+        file_diff = FileDiff(path="a.ipynb", added_lines=['    "x"'], hunks=[(0, 1)])
+
+        runner.scan(file_diff, ["x"], {})
+        runner.scan(FileDiff(path="b.py", added_lines=["y"]), ["y"], {})
+
+        assert [event for event in detector.events if event[0] != "end"] == [
+            ("file", "a.ipynb"),
+            ("line", "x"),
+            ("file", "b.py"),
+            ("line", "y"),
+        ]
+
+    def test_runner_is_picklable(self) -> None:
+        """Test that the runner can be sent to worker processes."""
+        runner = load_detectors([DetectorSpec(name="long-line", options=(("max_length", 5),))])
+
+        assert runner is not None
+        copy = pickle.loads(pickle.dumps(runner))  # noqa: S301
+        assert [v.phrase for v in copy.scan(FileDiff(path="a", added_lines=["123456"]), ["123456"], {})] == [
+            "line longer than 5 characters"
+        ]
+
+
+class TestLoadDetectors:
+    """Tests for load_detectors and find_detector_class functions."""
+
+    def test_no_detectors(self) -> None:
+        """Test that no runner is created without enabled detectors."""
+        assert load_detectors([]) is None
+
+    def test_builtin_with_severity(self) -> None:
+        """Test that built-in detectors are created with the configured severity and options."""
+        runner = load_detectors(
+            [DetectorSpec(name="merge-conflict", severity=Severity.WARN), DetectorSpec(name="high-entropy")]
+        )
+
+        assert runner is not None
+        assert [(d.name, d.severity) for d in runner.detectors] == [
+            ("merge-conflict", Severity.WARN),
+            ("high-entropy", Severity.WARN),
+        ]
+
+    @patch("oddupiacz.detectors.entry_points")
+    def test_plugin_from_entry_point(self, mock_entry_points: MagicMock) -> None:
+        """Test that detectors are discovered through the oddupiacz.detectors entry point group."""
+        mock_entry_points.return_value = [
+            EntryPoint(name="recording", value="tests.test_detectors:RecordingDetector", group="oddupiacz.detectors")
+        ]
+
+        assert find_detector_class("recording") is RecordingDetector
+        mock_entry_points.assert_called_once_with(group="oddupiacz.detectors", name="recording")
+
+    @patch("oddupiacz.detectors.entry_points")
+    @pytest.mark.parametrize(
+        ("value", "expected_error"),
+        [
+            ("tests.test_detectors:pytest", "is not a Detector subclass"),
+            ("tests.test_detectors:Missing", "Cannot load detector 'bad': .*Missing"),
+            ("tests.missing_module:Detector", "Cannot load detector 'bad': No module named 'tests.missing_module'"),
+        ],
+    )
+    def test_invalid_plugin(self, mock_entry_points: MagicMock, value: str, expected_error: str) -> None:
+        """Test that entry points not naming a Detector subclass are rejected."""
+        mock_entry_points.return_value = [EntryPoint(name="bad", value=value, group="oddupiacz.detectors")]
+
+        with pytest.raises(CannotLoadConfigError, match=expected_error):
+            find_detector_class("bad")
+
+    @patch("oddupiacz.detectors.entry_points")
+    def test_plugin_failing_to_import(self, mock_entry_points: MagicMock) -> None:
+        """Test that any error raised while importing a plugin is reported with the detector name."""
+        mock_entry_points.return_value = [MagicMock(load=MagicMock(side_effect=RuntimeError("no license")))]
+
+        with pytest.raises(CannotLoadConfigError, match="Cannot load detector 'bad': no license"):
+            find_detector_class("bad")
+
+    @patch("oddupiacz.detectors.find_detector_class", return_value=FailingDetector)
+    def test_plugin_failing_to_initialize(self, mock_find_detector_class: MagicMock) -> None:
+        """Test that any error raised by a plugin's constructor is reported with the detector name."""
+        with pytest.raises(CannotLoadConfigError, match="Cannot create detector 'failing': KeyError"):
+            load_detectors([DetectorSpec(name="failing")])
+
+    @patch("oddupiacz.detectors.entry_points", return_value=[])
+    def test_unknown_detector(self, mock_entry_points: MagicMock) -> None:
+        """Test that an unknown detector name is rejected."""
+        with pytest.raises(CannotLoadConfigError, match="Unknown detector: 'nope'"):
+            load_detectors([DetectorSpec(name="nope")])
+
+    def test_unknown_option(self) -> None:
+        """Test that options a detector doesn't take are rejected."""
+        with pytest.raises(CannotLoadConfigError, match="Invalid options of detector 'merge-conflict'"):
+            load_detectors([DetectorSpec(name="merge-conflict", options=(("strict", True),))])
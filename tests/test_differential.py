@@ -0,0 +1,387 @@
+"""
+Differential tests: every scanning engine and mode must find exactly the violations of `parse_diff_for_violations`.
+
+Diffs and phrase lists are generated from an adversarial alphabet (Unicode case folding corner
+cases, CRLF line endings, `+++` lines inside hunks, file headers and mbox-like lines), and each
+failure is shrunk to a minimal reproducer before it is reported. Engines that load the phrases from
+wordlists, hashes, patterns or rule sets are fed examples adapted to what they can express. Set
+ODDUPIACZ_FUZZ_EXAMPLES and ODDUPIACZ_FUZZ_SEED for longer or different runs.
+"""
+
+import io
+import os
+import pickle
+import random
+import re
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import pytest
+
+from oddupiacz.budget import Watchdog
+from oddupiacz.case_folding import fold_case
+from oddupiacz.checker import (
+    MatcherResolver,
+    parse_diff_for_violations,
+    phrases_regex_source,
+    scan_file_diffs,
+    Scanner,
+    split_diff_by_file,
+)
+from oddupiacz.config import Config, rule_severity
+from oddupiacz.hashed_phrases import hash_phrases
+from oddupiacz.models import PatternRule, PhraseRule, RuleSet, Severity, Violation
+from oddupiacz.patches import scan_patch_chunk, split_patches
+from oddupiacz.planner import plan_file_diffs
+from oddupiacz.sweep import scan_file_lines
+
+FUZZ_EXAMPLES = int(os.environ.get("ODDUPIACZ_FUZZ_EXAMPLES", "150"))
+FUZZ_SEED = int(os.environ.get("ODDUPIACZ_FUZZ_SEED", "20251019"))
+# Characters whose case folding differs between str.lower, regex IGNORECASE and ASCII-only matching
+UNICODE_CHARS = "KkKſSsßẞİıIiΣσςﬀéÉ́ǅǆ_"
+ASCII_CHARS = "abtodoTODO fix_ME1-.+@"
+FRAGMENTS = ["TODO", "todo", "fixme", "FIXME", "temp_fix", "key", "Kelvin", "sſ", "straße", "İi", "ΣΑΣ", "σας"]
+PATHS = ["app.py", "src/main.c", "README.md", "a b.txt", "unknown_file"]
+
+
+@dataclass(frozen=True)
+class Example:
+    """A generated scan input: forbidden phrases and the lines of a diff."""
+
+    phrases: tuple[str | PhraseRule, ...]
+    lines: tuple[str, ...]
+
+    @property
+    def diff(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
+
+
+def _create_config(phrases: tuple[str | PhraseRule, ...], **kwargs: object) -> Config:
+    """Helper to create a Config with only forbidden phrases."""
+    return Config(
+        hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+        forbidden_phrases=list(phrases),
+        exclude_paths=[],
+        exclude_files=[],
+        exclude_extensions=[],
+        exclude_repos=[],
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def _random_text(rng: random.Random, max_length: int) -> str:
+    parts = []
+    for _ in range(rng.randint(0, max_length)):
+        choice = rng.random()
+        if choice < 0.3:
+            parts.append(rng.choice(FRAGMENTS))
+        elif choice < 0.6:
+            parts.append(rng.choice(UNICODE_CHARS))
+        else:
+            parts.append(rng.choice(ASCII_CHARS))
+    return "".join(parts)
+
+
+def _random_phrase(rng: random.Random) -> str | PhraseRule:
+    phrase = rng.choice(FRAGMENTS) if rng.random() < 0.5 else _random_text(rng, 3)
+    if not phrase.strip():
+        phrase = rng.choice(FRAGMENTS)
+    if rng.random() < 0.4:
+        return phrase
+    return PhraseRule(
+        phrase=phrase,
+        case_sensitive=rng.random() < 0.3,
+        whole_word=rng.random() < 0.4,
+        prefix=rng.random() < 0.2,
+        suffix=rng.random() < 0.2,
+        severity=rng.choice(list(Severity)),
+    )
+
+
+def _random_line(rng: random.Random) -> str:
+    path = rng.choice(PATHS)
+    line = rng.choices(
+        [
+            f"+++ b/{path}",
+            f"--- a/{path}",
+            f"diff --git a/{path} b/{path}",
+            f"@@ -{rng.randint(0, 9)},{rng.randint(0, 3)} +{rng.randint(0, 9)},{rng.randint(0, 3)} @@",
+            "+" + _random_text(rng, 6),
+            "-" + _random_text(rng, 4),
+            " " + _random_text(rng, 4),
+            "+++ " + _random_text(rng, 3),
+            "++" + _random_text(rng, 3),
+            "-- ",
+            "+",
+            "\\ No newline at end of file",
+        ],
+        weights=[3, 2, 2, 2, 20, 3, 3, 1, 1, 1, 1, 1],
+    )[0]
+    return line + "\r" if rng.random() < 0.15 else line
+
+
+def generate_example(rng: random.Random) -> Example:
+    """Generate a random phrase list and diff, usually starting with a file header."""
+    phrases = tuple(_random_phrase(rng) for _ in range(rng.randint(1, 5)))
+    lines = [_random_line(rng) for _ in range(rng.randint(0, 14))]
+    if rng.random() < 0.8:
+        lines.insert(0, f"+++ b/{rng.choice(PATHS)}")
+    return Example(phrases=phrases, lines=tuple(lines))
+
+
+def shrink(example: Example, fails: Callable[[Example], bool]) -> Example:
+    """
+    Shrink a failing example by removing phrases, lines and characters while it still fails.
+
+    Args:
+        example: Failing example
+        fails: Whether an example still reproduces the failure
+
+    Returns:
+        An example that fails but fails no longer with any single phrase, line or character removed
+    """
+    changed = True
+    while changed:
+        changed = False
+        candidates = [
+            replace(example, phrases=example.phrases[:i] + example.phrases[i + 1 :])
+            for i in range(len(example.phrases))
+        ]
+        candidates += [
+            replace(example, lines=example.lines[:i] + example.lines[i + 1 :]) for i in range(len(example.lines))
+        ]
+        for index, line in enumerate(example.lines):
+            for cut in range(len(line)):
+                shorter = line[:cut] + line[cut + 1 :]
+                candidates.append(
+                    replace(example, lines=example.lines[:index] + (shorter,) + example.lines[index + 1 :])
+                )
+        for candidate in candidates:
+            if candidate.phrases and fails(candidate):
+                example, changed = candidate, True
+                break
+    return example
+
+
+def _find_with_single_regex(phrases: tuple[str | PhraseRule, ...], content: str) -> list[tuple[Severity, str]]:
+    """The specification of phrase matching: one combined Unicode regex, without token or ASCII fast paths."""
+    regex = re.compile(phrases_regex_source(phrases), re.IGNORECASE)
+    found: dict[Severity, str] = {}
+    match = regex.search(content)
+    while match is not None:
+        found.setdefault(Severity(match.lastgroup) if match.lastgroup else rule_severity(phrases[0]), match.group())
+        match = regex.search(content, match.start() + 1)
+    return [(severity, found[severity]) for severity in Severity if severity in found]
+
+
+def scan_with_single_regex(example: Example) -> list[Violation]:
+    return [
+        Violation(phrase=phrase, file=file_diff.path, line=line.strip(), severity=severity)
+        for file_diff in split_diff_by_file(example.diff)
+        for line in file_diff.added_lines
+        for severity, phrase in _find_with_single_regex(example.phrases, line)
+    ]
+
+
+def scan_in_parallel_chunks(example: Example) -> list[Violation]:
+    config = _create_config(example.phrases, scan_chunk_lines=2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        return scan_file_diffs(list(split_diff_by_file(example.diff)), config, executor=executor).violations
+
+
+def scan_with_watchdog(example: Example) -> list[Violation]:
+    watchdog = Watchdog(3600.0)
+    watchdog.start()
+    try:
+        config = _create_config(example.phrases)
+        return scan_file_diffs(list(split_diff_by_file(example.diff)), config, watchdog=watchdog).violations
+    finally:
+        watchdog.stop()
+
+
+def scan_with_pickled_resolver(example: Example) -> list[Violation]:
+    config = _create_config(example.phrases)
+    resolver = pickle.loads(pickle.dumps(MatcherResolver(config)))  # noqa: S301
+    return scan_file_diffs(list(split_diff_by_file(example.diff)), config, resolver=resolver).violations
+
+
+def scan_planned(example: Example) -> list[Violation]:
+    config = _create_config(example.phrases)
+    _, file_diffs = plan_file_diffs(example.diff, config) if example.lines else (None, [])
+    return scan_file_diffs(file_diffs, config).violations
+
+
+def scan_file_contents(example: Example) -> list[Violation]:
+    resolver = MatcherResolver(_create_config(example.phrases))
+    return [
+        violation
+        for file_diff in split_diff_by_file(example.diff)
+        for violation in scan_file_lines(file_diff.path, file_diff.added_lines, resolver)
+    ]
+
+
+def scan_patch_chunks(example: Example) -> list[Violation]:
+    config = _create_config(example.phrases)
+    resolver = MatcherResolver(config)
+    chunks = split_patches(io.StringIO(example.diff, newline=""), Path("fuzz.patch"), 3)
+    return [violation for chunk in chunks for violation in scan_patch_chunk(chunk, config, resolver).violations]
+
+
+def scan_stream_with_pickled_scanner(example: Example) -> list[Violation]:
+    scanner = pickle.loads(pickle.dumps(Scanner(_create_config(example.phrases))))  # noqa: S301
+    return scanner.scan_stream(io.StringIO(example.diff, newline=""))
+
+
+def _phrase_text(entry: str | PhraseRule) -> str:
+    return (entry if isinstance(entry, str) else entry.phrase).strip()
+
+
+def plain_phrases(example: Example) -> Example:
+    """Turn every phrase into a plain (blocking, case-insensitive substring) phrase, as wordlists hold."""
+    return replace(example, phrases=tuple(_phrase_text(entry) for entry in example.phrases))
+
+
+def _without_extensions(example: Example) -> Example:
+    """
+    Drop phrases that extend a shorter phrase, so no two phrases match at the same position.
+
+    Of phrases matching at the same position, the one listed first is reported, while hashed
+    phrases and patterns (which don't keep the list order) report the longest.
+    """
+    folded = [fold_case(_phrase_text(entry)) for entry in example.phrases]
+    return replace(
+        example,
+        phrases=tuple(
+            entry
+            for entry, text in zip(example.phrases, folded, strict=True)
+            if not any(other != text and text.startswith(other) for other in folded)
+        ),
+    )
+
+
+def hashable_phrases(example: Example) -> Example:
+    """Turn every phrase into a plain phrase, without phrases extending another (see `_without_extensions`)."""
+    return _without_extensions(plain_phrases(example))
+
+
+def unbounded_phrases(example: Example) -> Example:
+    """
+    Drop the match options that a safe pattern cannot express (case sensitivity and word boundaries).
+
+    Every phrase gets the severity of the first one: phrases of different severities matching at the
+    same position are claimed by the most severe one, while each severity of patterns is matched on its own.
+    """
+    severity = rule_severity(example.phrases[0])
+    phrases = tuple(PhraseRule(_phrase_text(entry), severity=severity) for entry in example.phrases)
+    return _without_extensions(replace(example, phrases=phrases))
+
+
+def scan_with_phrase_files(example: Example) -> list[Violation]:
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = Path(tmp, "words.txt")
+        wordlist.write_text("".join(f"{phrase}\n" for phrase in example.phrases), encoding="utf-8")
+        config = replace(_create_config(()), hooks_dir=Path(tmp, "hooks"), phrase_files=[wordlist])
+        return parse_diff_for_violations(example.diff, config)
+
+
+def scan_with_hashed_phrases(example: Example) -> list[Violation]:
+    config = replace(_create_config(()), hashed_phrases=hash_phrases(map(_phrase_text, example.phrases), bytes(16)))
+    return parse_diff_for_violations(example.diff, config)
+
+
+def scan_with_patterns(example: Example) -> list[Violation]:
+    patterns: list[str | PatternRule] = [
+        PatternRule(re.escape(_phrase_text(entry)), rule_severity(entry)) for entry in example.phrases
+    ]
+    return parse_diff_for_violations(example.diff, replace(_create_config(()), forbidden_patterns=patterns))
+
+
+def scan_with_rule_sets(example: Example) -> list[Violation]:
+    # Phrases of rule sets that apply are appended to the base phrases, so the split keeps their order
+    split = len(example.phrases) // 2
+    rule_sets = [
+        RuleSet(paths=("vendor/",), forbidden_phrases=("TODO", "e")),
+        RuleSet(paths=("*",), forbidden_phrases=example.phrases[split:]),
+    ]
+    config = replace(_create_config(example.phrases[:split]), rule_sets=rule_sets)
+    return parse_diff_for_violations(example.diff, config)
+
+
+def _starts_with_header(example: Example) -> bool:
+    return bool(example.lines) and example.lines[0].startswith(("diff ", "--- ", "+++ b/"))
+
+
+def _always(example: Example) -> bool:
+    return True
+
+
+def _unchanged(example: Example) -> Example:
+    return example
+
+
+@dataclass(frozen=True)
+class Engine:
+    """A scanning engine, the examples it applies to and how generated examples are adapted to it."""
+
+    scan: Callable[[Example], list[Violation]]
+    applies: Callable[[Example], bool] = _always
+    adapt: Callable[[Example], Example] = _unchanged
+
+
+ENGINES: dict[str, Engine] = {
+    "single regex": Engine(scan_with_single_regex),
+    "parallel chunks": Engine(scan_in_parallel_chunks),
+    "watchdog chunks": Engine(scan_with_watchdog),
+    "pickled resolver": Engine(scan_with_pickled_resolver),
+    "planner": Engine(scan_planned),
+    "file contents": Engine(scan_file_contents),
+    "scanner stream": Engine(scan_stream_with_pickled_scanner),
+    # A patch file is scanned from its first file header, as text before it is mail headers and commit message
+    "patch chunks": Engine(scan_patch_chunks, applies=_starts_with_header),
+    "phrase files": Engine(scan_with_phrase_files, adapt=plain_phrases),
+    "hashed phrases": Engine(scan_with_hashed_phrases, adapt=hashable_phrases),
+    "forbidden patterns": Engine(scan_with_patterns, adapt=unbounded_phrases),
+    "rule sets": Engine(scan_with_rule_sets),
+}
+
+
+def _reference(example: Example) -> list[Violation]:
+    return parse_diff_for_violations(example.diff, _create_config(example.phrases))
+
+
+class TestDifferential:
+    """Differential tests of scanning engines and modes against parse_diff_for_violations."""
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_engine_matches_reference(self, engine: str) -> None:
+        """Test that the engine finds the same violations as the reference for generated examples."""
+        scan, applies, adapt = ENGINES[engine].scan, ENGINES[engine].applies, ENGINES[engine].adapt
+
+        def fails(example: Example) -> bool:
+            return applies(example) and scan(example) != _reference(example)
+
+        rng = random.Random(f"{FUZZ_SEED}-{engine}")  # noqa: S311
+        for _ in range(FUZZ_EXAMPLES):
+            example = adapt(generate_example(rng))
+            if fails(example):
+                minimal = shrink(example, fails)
+                pytest.fail(
+                    f"{engine} differs from parse_diff_for_violations\n"
+                    f"phrases: {minimal.phrases!r}\ndiff: {minimal.diff!r}\n"
+                    f"expected: {_reference(minimal)!r}\nactual: {scan(minimal)!r}"
+                )
+
+
+class TestShrink:
+    """Tests for the shrink helper."""
+
+    def test_shrink_to_minimal_example(self) -> None:
+        """Test that phrases, lines and characters that don't matter are removed."""
+        example = Example(phrases=("TODO", "FIXME"), lines=("+++ b/a.py", "+x TODO y", "+nothing"))
+
+        minimal = shrink(example, lambda candidate: any("TODO" in line for line in candidate.lines))
+
+        assert minimal == Example(phrases=("FIXME",), lines=("TODO",))
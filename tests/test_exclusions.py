@@ -0,0 +1,46 @@
+"""
+Unit tests for exclusions.py module.
+"""
+
+import pytest
+
+from oddupiacz.exclusions import ExclusionClassifier
+
+
+class TestExclusionClassifier:
+    """Tests for ExclusionClassifier class."""
+
+    @pytest.fixture()
+    def classifier(self) -> ExclusionClassifier:
+        """Classifier with one entry of each kind."""
+        return ExclusionClassifier(
+            exclude_paths=["vendor/", "node_modules"],
+            exclude_files=["package-lock.json", "docs/CHANGELOG.md"],
+            exclude_extensions=[".min.js", "log"],
+        )
+
+    @pytest.mark.parametrize(
+        ("path", "expected"),
+        [
+            ("vendor/lib/a.py", "exclude_paths"),
+            ("web/node_modules/react/index.js", "exclude_paths"),
+            ("vendor", "exclude_paths"),
+            ("package-lock.json", "exclude_files"),
+            ("web/package-lock.json", "exclude_files"),
+            ("docs/CHANGELOG.md", "exclude_files"),
+            ("static/app.min.js", "exclude_extensions"),
+            ("build.log", "exclude_extensions"),
+            ("src/vendoring.py", None),
+            ("src/app.js", None),
+            ("CHANGELOG.md", None),
+        ],
+    )
+    def test_classify(self, classifier: ExclusionClassifier, path: str, expected: str | None) -> None:
+        """Test classifying paths against exclusion lists."""
+        assert classifier.classify(path) == expected
+
+    def test_empty_classifier_excludes_nothing(self) -> None:
+        """Test that a classifier without entries never excludes."""
+        classifier = ExclusionClassifier([], [], [])
+
+        assert classifier.classify("vendor/a.py") is None
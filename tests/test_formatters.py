@@ -2,8 +2,45 @@
 Unit tests for formatters.py module.
 """
 
-from oddupiacz.formatters import format_violation_message
-from oddupiacz.models import Violation
+from pathlib import Path
+
+from oddupiacz.config import Config
+from oddupiacz.formatters import (
+    format_background_report,
+    format_detector_timings,
+    format_local_hook_results,
+    format_patch_summary,
+    format_push_report,
+    format_scan_plan_message,
+    format_sweep_progress,
+    format_sweep_summary,
+    format_violation_message,
+    format_warning_message,
+)
+from oddupiacz.models import (
+    FileDiff,
+    LocalHookResult,
+    PushScan,
+    RepositoryScan,
+    ScanPlan,
+    ScanResult,
+    Severity,
+    Violation,
+)
+
+
+def _create_budget_config() -> Config:
+    """Helper to create a Config with a time budget."""
+    return Config(
+        hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
+        forbidden_phrases=["TODO"],
+        exclude_paths=[],
+        exclude_files=[],
+        exclude_extensions=[],
+        exclude_repos=[],
+        time_budget_ms=300,
+        large_file_lines=500,
+    )
 
 
 class TestFormatViolationMessage:
@@ -39,3 +76,194 @@ class TestFormatViolationMessage:
         assert "test1.py" in message
         assert "test2.py" in message
         assert message.count("BLOCKED") == 2
+
+
+class TestFormatWarningMessage:
+    """Tests for format_warning_message function."""
+
+    def test_format_warnings(self) -> None:
+        """Test formatting warnings without aborting the commit."""
+        warnings = [Violation(phrase="FIXME", file="a.py", line="# FIXME", severity=Severity.WARN)]
+
+        message = format_warning_message(warnings)
+
+        assert "[WARN] Discouraged phrase found: 'FIXME'" in message
+        assert "a.py" in message
+        assert "Commit aborted" not in message
+
+
+class TestFormatDetectorFindings:
+    """Tests for formatting violations reported by detectors."""
+
+    def test_detector_violations_name_the_detector(self) -> None:
+        """Test that detector findings are labeled with the detector instead of the phrase kind."""
+        block = Violation(phrase="<<<<<<<", file="a.py", line="<<<<<<< HEAD", detector="merge-conflict")
+        warning = Violation(
+            phrase="line longer than 5 characters", file="a.js", line="x", severity=Severity.WARN, detector="long-line"
+        )
+
+        assert "[BLOCKED] Detector 'merge-conflict' found: '<<<<<<<'" in format_violation_message([block])
+        assert "[WARN] Detector 'long-line' found: 'line longer than 5 characters'" in format_warning_message([warning])
+
+    def test_format_detector_timings(self) -> None:
+        """Test that detector timings are listed in milliseconds, and omitted without detectors."""
+        assert format_detector_timings({}) == ""
+        assert format_detector_timings({"merge-conflict": 0.00012, "long-line": 0.0021}) == (
+            "[DETECTORS] merge-conflict 0.1 ms, long-line 2.1 ms"
+        )
+
+
+class TestFormatLocalHookResults:
+    """Tests for format_local_hook_results function."""
+
+    def test_format_hook_results_in_order(self) -> None:
+        """Test formatting passed, failed and cancelled hooks."""
+        results = [
+            LocalHookResult(path=Path("/hooks/10-lint"), returncode=0, output="lint ok\n", duration=0.5),
+            LocalHookResult(path=Path("/hooks/20-test"), returncode=2, output="boom\n", duration=1.25),
+            LocalHookResult(path=Path("/hooks/30-docs"), returncode=-1, output="", duration=0.0, cancelled=True),
+        ]
+
+        message = format_local_hook_results(results)
+
+        assert message.splitlines() == [
+            "[HOOK] 10-lint: passed in 0.50s",
+            "lint ok",
+            "[HOOK] 20-test: FAILED (exit code 2) in 1.25s",
+            "boom",
+            "[HOOK] 30-docs: cancelled",
+        ]
+
+
+class TestFormatScanPlanMessage:
+    """Tests for format_scan_plan_message function."""
+
+    def test_full_plan_has_no_message(self) -> None:
+        """Test that no notice is shown when the full plan was used."""
+        assert format_scan_plan_message(ScanResult(), _create_budget_config()) == ""
+
+    def test_skip_large_files_message(self) -> None:
+        """Test notice for the skip_large_files plan."""
+        result = ScanResult(plan=ScanPlan.SKIP_LARGE_FILES, skipped_files=["vendor/big.js"])
+
+        message = format_scan_plan_message(result, _create_budget_config())
+
+        assert "300 ms" in message
+        assert "skip_large_files" in message
+        assert "over 500 added lines" in message
+        assert "vendor/big.js" in message
+
+    def test_first_violation_message(self) -> None:
+        """Test notice for the first_violation plan."""
+        message = format_scan_plan_message(ScanResult(plan=ScanPlan.FIRST_VIOLATION), _create_budget_config())
+
+        assert "first_violation" in message
+        assert "Stopped scanning at the first blocking violation" in message
+
+    def test_background_message(self) -> None:
+        """Test notice for the background plan."""
+        result = ScanResult(plan=ScanPlan.BACKGROUND, deferred_files=[FileDiff(path="a.py", added_lines=[])])
+
+        message = format_scan_plan_message(result, _create_budget_config(), Path("/repo/.git/report.txt"))
+
+        assert "Handed 1 file(s) to a background scan" in message
+        assert "/repo/.git/report.txt" in message
+
+
+class TestFormatBackgroundReport:
+    """Tests for format_background_report function."""
+
+    def test_format_report(self) -> None:
+        """Test formatting a background report."""
+        violations = [Violation(phrase="TODO", file="a.py", line="TODO: later")]
+
+        report = format_background_report(violations, ["a.py", "b.py"])
+
+        assert "Scanned 2 deferred file(s)" in report
+        assert "TODO: later" in report
+        assert report.endswith("1 violation(s) found.")
+
+    def test_format_report_labels_warnings(self) -> None:
+        """Test that warnings are labelled by severity in the background report."""
+        violations = [
+            Violation(phrase="TODO", file="a.py", line="TODO"),
+            Violation(phrase="FIXME", file="a.py", line="FIXME", severity=Severity.WARN),
+        ]
+
+        report = format_background_report(violations, ["a.py"])
+
+        assert "[FOUND] Forbidden phrase found: 'TODO'" in report
+        assert "[WARN] Forbidden phrase found: 'FIXME'" in report
+
+
+class TestFormatSweep:
+    """Tests for format_sweep_progress and format_sweep_summary functions."""
+
+    def test_format_progress(self) -> None:
+        """Test progress lines for scanned and failed repositories."""
+        scan = RepositoryScan(
+            repo=Path("/src/one"), violations=[Violation(phrase="TODO", file="a", line="TODO")], files=3
+        )
+
+        assert format_sweep_progress(scan, 1, 4) == "[SWEEP] 1/4 /src/one: 3 file(s), 1 violation(s)"
+        assert format_sweep_progress(RepositoryScan(repo=Path("/src/two"), error="boom"), 2, 4) == (
+            "[SWEEP] 2/4 /src/two: ERROR: boom"
+        )
+
+    def test_format_summary(self) -> None:
+        """Test the summary with total throughput."""
+        summary = format_sweep_summary(2, 10, 4000, 3_000_000, 5, 1.5)
+
+        assert summary == (
+            "[SWEEP] 2 repositories, 10 file(s), 4000 line(s), 3.0 MB in 1.50s (2.0 MB/s, 2667 lines/s); "
+            "5 violation(s) found"
+        )
+
+
+class TestFormatPatchSummary:
+    """Tests for format_patch_summary function."""
+
+    def test_format_summary(self) -> None:
+        """Test the summary with throughput."""
+        summary = format_patch_summary(3, 12, 5000, 2, 2.0)
+
+        assert (
+            summary == "[PATCHES] 3 file(s), 12 patch(es), 5000 line(s) in 2.00s (2500 lines/s); 2 violation(s) found"
+        )
+
+
+class TestFormatPushReport:
+    """Tests for format_push_report function."""
+
+    def test_rejected_push(self) -> None:
+        """Test that blocking violations are listed before warnings and the push is rejected."""
+        scan = PushScan(
+            violations=[
+                Violation(phrase="FIXME", file="a.py", line="# FIXME", severity=Severity.WARN),
+                Violation(phrase="TODO", file="b.py", line="# TODO"),
+            ],
+            blobs=3,
+            cached_blobs=1,
+        )
+
+        lines = format_push_report(scan, 60).splitlines()
+
+        assert lines[0] == "[BLOCKED] Forbidden phrase found: 'TODO'"
+        assert lines[4] == "[WARN] Discouraged phrase found: 'FIXME'"
+        assert lines[-2:] == ["[PUSH] Scanned 3 new file(s), 1 of them already known", "Push rejected."]
+
+    def test_accepted_push_with_warnings(self) -> None:
+        """Test that warnings alone don't reject a push."""
+        scan = PushScan(violations=[Violation(phrase="FIXME", file="a.py", line="x", severity=Severity.WARN)], blobs=1)
+
+        assert "Push rejected." not in format_push_report(scan, 60)
+
+    def test_timed_out_or_failed_push(self) -> None:
+        """Test that a scan that failed or didn't finish in time rejects the push."""
+        report = format_push_report(PushScan(blobs=5, timed_out=True, error="Cannot read the pushed objects"), 1.5)
+
+        assert report.splitlines()[1:] == [
+            "[ERROR] Cannot read the pushed objects",
+            "[PUSH] Scan did not finish within 1.5s; push again to continue from the scanned files",
+            "Push rejected.",
+        ]
@@ -2,15 +2,37 @@
 Unit tests for git_utils.py module.
 """
 
+import subprocess
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from oddupiacz.git_utils import (
     configure_git_hooks_path,
+    find_local_hook_dir_paths,
     find_local_hook_path,
+    get_git_diff,
+    get_git_numstat,
+    get_git_path,
+    get_global_hooks_path,
+    get_repo_dirs,
     get_repo_name,
+    list_ignored_dirs,
+    list_tracked_files,
+    parse_numstat,
+    PATHSPEC_BATCH_SIZE,
     run_local_hook_if_exists,
 )
+from oddupiacz.models import FileStat
+
+
+@pytest.fixture()
+def git_repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create an empty git repository and chdir into it."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)  # noqa: S603, S607
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
 
 
 class TestGetRepoName:
@@ -38,6 +60,152 @@ class TestGetRepoName:
         assert result is None
 
 
+class TestGetRepoDirs:
+    """Tests for get_repo_dirs function."""
+
+    def test_get_repo_dirs_in_repo(self, git_repo: Path) -> None:
+        """Test getting the repository root and common git directory."""
+        (git_repo / "sub").mkdir()
+
+        result = get_repo_dirs()
+
+        assert result is not None
+        assert result[0].resolve() == git_repo.resolve()
+        assert result[1].resolve() == (git_repo / ".git").resolve()
+
+    def test_get_repo_dirs_not_in_git_repo(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test behavior outside a git repo."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+        assert get_repo_dirs() is None
+
+
+class TestGetGitDiff:
+    """Tests for get_git_diff function."""
+
+    @patch("subprocess.run")
+    def test_get_git_diff_for_paths_in_batches(self, mock_run: MagicMock) -> None:
+        """Test that path-limited diffs use literal pathspecs in batches."""
+        mock_run.return_value = MagicMock(stdout="x")
+        paths = [f"file{i}*.py" for i in range(PATHSPEC_BATCH_SIZE + 1)]
+
+        result = get_git_diff(cached=True, paths=paths)
+
+        assert result == "xx"
+        assert mock_run.call_count == 2
+        first_cmd = mock_run.call_args_list[0][0][0]
+        assert "--cached" in first_cmd
+        assert first_cmd[first_cmd.index("--") + 1] == ":(literal)file0*.py"
+
+    def test_get_git_diff_real_repo(self, git_repo: Path) -> None:
+        """Test getting a staged diff limited to one path."""
+        (git_repo / "a.txt").write_text("TODO\n")
+        (git_repo / "b.txt").write_text("other\n")
+        subprocess.run(["git", "add", "a.txt", "b.txt"], check=True)  # noqa: S603, S607
+
+        diff = get_git_diff(cached=True, paths=["a.txt"])
+
+        assert "+++ b/a.txt" in diff
+        assert "b.txt" not in diff
+
+    def test_get_git_diff_against_base(self, git_repo: Path) -> None:
+        """Test diffing working tree changes against HEAD, including staged ones."""
+        (git_repo / "a.txt").write_text("one\n")
+        subprocess.run(["git", "add", "a.txt"], check=True)  # noqa: S603, S607
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init"], check=True)  # noqa: S603, S607
+        (git_repo / "a.txt").write_text("one\nstaged\n")
+        subprocess.run(["git", "add", "a.txt"], check=True)  # noqa: S603, S607
+        (git_repo / "a.txt").write_text("one\nstaged\nunstaged\n")
+
+        diff = get_git_diff(cached=False, base="HEAD")
+
+        assert "+staged" in diff
+        assert "+unstaged" in diff
+        assert "+staged" not in get_git_diff(cached=False)
+
+
+class TestGetGitPath:
+    """Tests for get_git_path function."""
+
+    def test_get_index_path(self, git_repo: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test resolving the index path of the current worktree."""
+        (git_repo / "sub").mkdir()
+        monkeypatch.chdir(git_repo / "sub")
+
+        result = get_git_path("index")
+
+        assert result is not None
+        assert result.resolve() == (git_repo / ".git" / "index").resolve()
+
+    def test_not_in_git_repo(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test behavior outside a git repo."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+        assert get_git_path("index") is None
+
+
+class TestListIgnoredDirs:
+    """Tests for list_ignored_dirs function."""
+
+    def test_list_ignored_dirs(self, git_repo: Path) -> None:
+        """Test that ignored directories are listed, but not directories with other files."""
+        (git_repo / ".gitignore").write_text("build/\n*.log\n")
+        for directory in ["build/out", "src"]:
+            (git_repo / directory).mkdir(parents=True)
+        (git_repo / "build" / "out" / "a.o").write_text("x")
+        (git_repo / "src" / "debug.log").write_text("x")
+        (git_repo / "src" / "main.py").write_text("x")
+
+        assert list_ignored_dirs() == ["build"]
+
+
+class TestGetGitNumstat:
+    """Tests for get_git_numstat and parse_numstat functions."""
+
+    def test_parse_numstat(self) -> None:
+        """Test parsing regular, binary and renamed entries."""
+        output = "3\t1\tsrc/a.py\0-\t-\tlogo.png\0" + "2\t0\t\0old name.py\0new name.py\0"
+
+        assert parse_numstat(output) == [
+            FileStat(path="src/a.py", added=3, deleted=1),
+            FileStat(path="logo.png", added=0, deleted=0, binary=True),
+            FileStat(path="new name.py", added=2, deleted=0, old_path="old name.py"),
+        ]
+
+    def test_parse_empty_numstat(self) -> None:
+        """Test parsing output without changes."""
+        assert parse_numstat("") == []
+
+    def test_get_git_numstat_real_repo(self, git_repo: Path) -> None:
+        """Test reading numstat from a real repository."""
+        (git_repo / "a b.txt").write_text("one\ntwo\n")
+        (git_repo / "data.bin").write_bytes(b"\0\1\2")
+        subprocess.run(["git", "add", "."], check=True)  # noqa: S603, S607
+
+        stats = get_git_numstat(cached=True)
+
+        assert FileStat(path="a b.txt", added=2, deleted=0) in stats
+        assert FileStat(path="data.bin", added=0, deleted=0, binary=True) in stats
+
+
+class TestListTrackedFiles:
+    """Tests for list_tracked_files function."""
+
+    def test_list_tracked_files(
+        self, git_repo: Path, tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test listing tracked files of a repository from another directory."""
+        (git_repo / "sub").mkdir()
+        (git_repo / "sub" / "a b.txt").write_text("x")
+        (git_repo / "untracked.txt").write_text("x")
+        subprocess.run(["git", "add", "sub"], check=True)  # noqa: S603, S607
+        monkeypatch.chdir(tmp_path_factory.mktemp("elsewhere"))
+
+        assert list_tracked_files(git_repo) == ["sub/a b.txt"]
+
+
 class TestFindLocalHookPath:
     """Tests for find_local_hook_path function."""
 
@@ -69,6 +237,42 @@ class TestFindLocalHookPath:
         assert result is None
 
 
+class TestFindLocalHookDirPaths:
+    """Tests for find_local_hook_dir_paths function."""
+
+    @patch("subprocess.check_output")
+    def test_find_executable_hooks_sorted(self, mock_check_output: MagicMock, tmp_path: Path) -> None:
+        """Test that only executable files are returned, sorted by name."""
+        hooks_dir = tmp_path / "hooks" / "pre-commit.d"
+        hooks_dir.mkdir(parents=True)
+        for name in ["20-test", "10-lint"]:
+            (hooks_dir / name).write_text("#!/bin/sh\n")
+            (hooks_dir / name).chmod(0o755)
+        (hooks_dir / "README").write_text("not a hook")
+        (hooks_dir / "subdir").mkdir()
+        mock_check_output.return_value = f"{tmp_path}\n"
+
+        result = find_local_hook_dir_paths()
+
+        assert [path.name for path in result] == ["10-lint", "20-test"]
+
+    @patch("subprocess.check_output")
+    def test_missing_hooks_dir(self, mock_check_output: MagicMock, tmp_path: Path) -> None:
+        """Test that a missing pre-commit.d directory yields no hooks."""
+        mock_check_output.return_value = f"{tmp_path}\n"
+
+        assert find_local_hook_dir_paths() == []
+
+    @patch("subprocess.check_output")
+    def test_not_in_repo(self, mock_check_output: MagicMock) -> None:
+        """Test behavior when not in a git repo."""
+        from subprocess import CalledProcessError
+
+        mock_check_output.side_effect = CalledProcessError(128, "git")
+
+        assert find_local_hook_dir_paths() == []
+
+
 class TestRunLocalHookIfExists:
     """Tests for run_local_hook_if_exists function."""
 
@@ -104,6 +308,19 @@ class TestRunLocalHookIfExists:
         assert result is False
 
 
+class TestGetGlobalHooksPath:
+    """Tests for get_global_hooks_path function."""
+
+    def test_get_global_hooks_path(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test reading the global hooks path, and None when it isn't set."""
+        monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "gitconfig"))
+
+        assert get_global_hooks_path() is None
+
+        configure_git_hooks_path(tmp_path / "hooks")
+        assert get_global_hooks_path() == tmp_path / "hooks"
+
+
 class TestConfigureGitHooksPath:
     """Tests for configure_git_hooks_path function."""
 
@@ -0,0 +1,85 @@
+"""
+Unit tests for hashed_phrases.py module.
+"""
+
+import random
+import re
+
+import pytest
+
+from oddupiacz.hashed_phrases import ENTRY_HEX_LENGTH, hash_phrase, hash_phrases, HashedPhraseMatcher
+from oddupiacz.models import HashedPhrases
+
+SALT = bytes(range(16))
+
+
+class TestHashPhrases:
+    """Tests for hash_phrase and hash_phrases functions."""
+
+    def test_hash_phrase_is_case_insensitive(self) -> None:
+        """Test that entries do not depend on the phrase's case."""
+        length, entry = hash_phrase("Project Falcon", SALT)
+
+        assert length == 14
+        assert len(entry) == ENTRY_HEX_LENGTH
+        assert hash_phrase("PROJECT FALCON", SALT) == (length, entry)
+        assert "falcon" not in entry
+
+    def test_hash_depends_on_salt(self) -> None:
+        """Test that the same phrase hashes differently under another salt."""
+        assert hash_phrase("falcon", SALT) != hash_phrase("falcon", bytes(16))
+
+    def test_hash_phrases_groups_by_length(self) -> None:
+        """Test that entries are grouped by length, deduplicated and blank lines skipped."""
+        hashed = hash_phrases(["falcon", " Falcon ", "", "acme", "eagle1"], SALT)
+
+        assert hashed.salt == SALT.hex()
+        assert [(length, len(entries)) for length, entries in hashed.hashes] == [(4, 1), (6, 2)]
+
+
+class TestHashedPhraseMatcher:
+    """Tests for HashedPhraseMatcher class."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("launch of PROJECT FALCON", (10, 24)),
+            ("falcon and acme", (0, 6)),
+            ("the acme falcon", (4, 8)),
+            ("falco", None),
+            ("", None),
+        ],
+    )
+    def test_search(self, text: str, expected: tuple[int, int] | None) -> None:
+        """Test finding the leftmost hashed phrase in a line."""
+        matcher = HashedPhraseMatcher(hash_phrases(["project falcon", "falcon", "acme"], SALT))
+
+        assert matcher.search(text) == expected
+
+    def test_same_start_prefers_longest_phrase(self) -> None:
+        """Test that the longest phrase wins among those starting at the same position."""
+        matcher = HashedPhraseMatcher(hash_phrases(["falcon", "falcon eye"], SALT))
+
+        assert matcher.search("a falcon eye") == (2, 12)
+
+    def test_fingerprint_collision_is_not_reported(self) -> None:
+        """Test that windows matching only the rolling hash are rejected by the digest check."""
+        length, entry = hash_phrase("falcon", SALT)
+        _, other_entry = hash_phrase("condor", SALT)
+        forged = entry[:8] + other_entry[8:]
+
+        matcher = HashedPhraseMatcher(HashedPhrases(salt=SALT.hex(), hashes=((length, (forged,)),)))
+
+        assert matcher.search("falcon") is None
+
+    def test_matches_regex_alternation(self) -> None:
+        """Test that results agree with a case-insensitive regex alternation of the phrases."""
+        rng = random.Random(3)  # noqa: S311
+        phrases = list({"".join(rng.choice("abC") for _ in range(rng.randint(1, 4))).lower() for _ in range(20)})
+        matcher = HashedPhraseMatcher(hash_phrases(phrases, SALT))
+        regex = re.compile("|".join(map(re.escape, sorted(phrases, key=len, reverse=True))), re.IGNORECASE)
+
+        for _ in range(300):
+            text = "".join(rng.choice("aBcx") for _ in range(rng.randint(0, 12)))
+            match = regex.search(text)
+            assert matcher.search(text) == (match.span() if match else None), text
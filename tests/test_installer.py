@@ -2,17 +2,48 @@
 Unit tests for installer.py module.
 """
 
+import subprocess
+import sys
 from pathlib import Path
 
+import pytest
+
+from oddupiacz.config import CannotLoadConfigError
 from oddupiacz.installer import (
     create_hook_directory,
+    create_installation_settings,
+    DEFAULT_ODDUPIACZ_PATH,
+    find_outdated_installation,
     generate_shim_content,
+    install_hook,
+    is_hook_up_to_date,
+    precompile_bytecode,
     remove_hook_file,
+    uninstall_hook,
     write_executable_hook,
 )
 from oddupiacz.models import InstallationSettings
 
 
+@pytest.fixture()
+def global_git_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point git's global config at an empty file in the test directory."""
+    path = tmp_path / "gitconfig"
+    path.write_text("")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(path))
+    return path
+
+
+def _create_settings(tmp_path: Path) -> InstallationSettings:
+    """Helper to create settings that install into the test directory."""
+    return InstallationSettings(
+        hooks_dir=tmp_path / "hooks",
+        oddupiacz_path=Path("/path/to/oddupiacz"),
+        config_path=tmp_path / "config.yaml",
+        python_exec="/usr/bin/python3",
+    )
+
+
 class TestGenerateShimContent:
     """Tests for generate_shim_content function."""
 
@@ -30,7 +61,6 @@ class TestGenerateShimContent:
         assert "#!/bin/sh" in content
         assert settings.python_exec in content
         assert "-m oddupiacz.cli_hook" in content
-        assert "git diff --cached --unified=0 --no-color" in content
         assert "exit $EXIT_CODE" in content
 
     def test_generate_shim_with_config(self) -> None:
@@ -49,8 +79,8 @@ class TestGenerateShimContent:
         assert str(settings.config_path) in content
         assert "--config" in content
 
-    def test_shim_pipes_git_diff_to_python(self) -> None:
-        """Test that the shim correctly pipes git diff to python."""
+    def test_shim_lets_hook_query_git(self) -> None:
+        """Test that the shim doesn't pipe the whole diff, so the hook plans the scan from git's counts."""
         settings = InstallationSettings(
             hooks_dir=Path("/tmp/.githooks_global"),  # noqa: S108
             oddupiacz_path=Path("/path/to/oddupiacz"),
@@ -59,9 +89,26 @@ class TestGenerateShimContent:
         )
         content = generate_shim_content(settings)
 
-        assert "|" in content
-        assert "git diff" in content
-        assert content.index("git diff") < content.index("python3")
+        assert "git diff" not in content
+        assert f"{settings.create_exec_command()} < /dev/null" in content
+
+    def test_generate_zipapp_shim(self, tmp_path: Path) -> None:
+        """Test that a zipapp shim runs the zipapp isolated and changes with the sources."""
+        (tmp_path / "oddupiacz").mkdir()
+        (tmp_path / "oddupiacz" / "cli_hook.py").write_text("print('v1')\n")
+        settings = InstallationSettings(
+            hooks_dir=Path("/hooks"),
+            oddupiacz_path=tmp_path,
+            config_path=Path("/path/to/config.yaml"),
+            python_exec="/usr/bin/python3",
+            zipapp=True,
+        )
+
+        content = generate_shim_content(settings)
+        (tmp_path / "oddupiacz" / "cli_hook.py").write_text("print('v2')\n")
+
+        assert '"/usr/bin/python3" -I -S "/hooks/oddupiacz-hook.pyz" --config "/path/to/config.yaml"' in content
+        assert generate_shim_content(settings) != content
 
 
 class TestCreateHookDirectory:
@@ -152,3 +199,161 @@ class TestRemoveHookFile:
         removed = remove_hook_file(hook_path)
 
         assert removed is False
+
+
+class TestCreateInstallationSettings:
+    """Tests for create_installation_settings function."""
+
+    def test_defaults_from_config(self, tmp_path: Path) -> None:
+        """Test that the hooks directory comes from the config and Python defaults to the current one."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(f"hooks_dir: {tmp_path / 'hooks'}\nforbidden_phrases: [TODO]\n")
+
+        settings = create_installation_settings(config_path)
+
+        assert settings == InstallationSettings(
+            hooks_dir=tmp_path / "hooks",
+            oddupiacz_path=DEFAULT_ODDUPIACZ_PATH,
+            config_path=config_path,
+            python_exec=sys.executable,
+        )
+
+    def test_overrides(self, tmp_path: Path) -> None:
+        """Test that the hooks directory and Python executable can be overridden."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(f"hooks_dir: {tmp_path / 'hooks'}\nforbidden_phrases: [TODO]\n")
+
+        settings = create_installation_settings(config_path, tmp_path / "other", "sh")
+
+        assert (settings.hooks_dir, settings.python_exec) == (tmp_path / "other", "sh")
+
+    def test_invalid_settings(self, tmp_path: Path) -> None:
+        """Test that a missing config or Python executable is an error."""
+        config_path = tmp_path / "config.yaml"
+
+        with pytest.raises(CannotLoadConfigError):
+            create_installation_settings(config_path)
+
+        config_path.write_text(f"hooks_dir: {tmp_path / 'hooks'}\nforbidden_phrases: [TODO]\n")
+        with pytest.raises(FileNotFoundError, match="Python executable not found"):
+            create_installation_settings(config_path, python_exec=str(tmp_path / "missing-python"))
+
+
+class TestIsHookUpToDate:
+    """Tests for is_hook_up_to_date function."""
+
+    def test_is_hook_up_to_date(self, tmp_path: Path) -> None:
+        """Test that a hook is up to date only if it exists, is executable and has the content."""
+        hook_path = tmp_path / "pre-commit"
+
+        assert is_hook_up_to_date(hook_path, "new") is False
+
+        hook_path.write_text("new")
+        assert is_hook_up_to_date(hook_path, "new") is False
+
+        write_executable_hook(hook_path, "old")
+        assert is_hook_up_to_date(hook_path, "new") is False
+
+        write_executable_hook(hook_path, "new")
+        assert is_hook_up_to_date(hook_path, "new") is True
+
+
+class TestInstallHook:
+    """Tests for install_hook and find_outdated_installation functions."""
+
+    def test_install_is_idempotent(self, tmp_path: Path, global_git_config: Path) -> None:
+        """Test that installing twice changes nothing the second time."""
+        settings = _create_settings(tmp_path)
+
+        first = install_hook(settings)
+        hook_mtime = (settings.hooks_dir / "pre-commit").stat().st_mtime_ns
+        second = install_hook(settings)
+
+        assert first.changed is True
+        assert second.changed is False
+        assert (settings.hooks_dir / "pre-commit").stat().st_mtime_ns == hook_mtime
+        assert str(settings.hooks_dir) in global_git_config.read_text()
+
+    def test_find_outdated_installation(self, tmp_path: Path, global_git_config: Path) -> None:
+        """Test that missing and outdated parts are reported until the installation is up to date."""
+        settings = _create_settings(tmp_path)
+
+        assert len(find_outdated_installation(settings)) == 3
+
+        install_hook(settings)
+        assert find_outdated_installation(settings) == []
+
+        (settings.hooks_dir / "pre-commit").write_text("#!/bin/sh\n")
+        assert find_outdated_installation(settings) == [f"Hook {settings.hooks_dir / 'pre-commit'} is out of date"]
+
+    def test_install_zipapp(self, tmp_path: Path, global_git_config: Path) -> None:
+        """Test that the zipapp is built with the hook, rebuilt only when missing and removed on uninstall."""
+        settings = InstallationSettings(
+            hooks_dir=tmp_path / "hooks",
+            oddupiacz_path=DEFAULT_ODDUPIACZ_PATH,
+            config_path=tmp_path / "config.yaml",
+            python_exec=sys.executable,
+            zipapp=True,
+        )
+
+        install_hook(settings)
+        assert settings.zipapp_path.is_file()
+        assert install_hook(settings).changed is False
+
+        settings.zipapp_path.unlink()
+        assert find_outdated_installation(settings) == [f"Zipapp {settings.zipapp_path} is not built"]
+        assert install_hook(settings).hook_written is True
+        assert settings.zipapp_path.is_file()
+
+        uninstall_hook(settings.hooks_dir / "pre-commit")
+        assert not settings.zipapp_path.exists()
+
+    def test_installed_hook_scans_staged_changes(self, tmp_path: Path, global_git_config: Path) -> None:
+        """Test that commits run the installed hook, which scans only the lines a commit adds, also after a rename."""
+        settings = InstallationSettings(
+            hooks_dir=tmp_path / "hooks",
+            oddupiacz_path=DEFAULT_ODDUPIACZ_PATH,
+            config_path=tmp_path / "config.yaml",
+            python_exec=sys.executable,
+        )
+        settings.config_path.write_text(f"hooks_dir: {settings.hooks_dir}\nforbidden_phrases: [dupa]\n")
+        install_hook(settings)
+        repo = tmp_path / "repo"
+        git = ["git", "-C", str(repo), "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)  # noqa: S603, S607
+        (repo / "a.txt").write_text("line1 dupa\nline2\nline3\nline4\n")
+        subprocess.run([*git, "add", "."], check=True)  # noqa: S603
+        subprocess.run([*git, "commit", "-q", "--no-verify", "-m", "known"], check=True)  # noqa: S603
+
+        subprocess.run([*git, "mv", "a.txt", "b.txt"], check=True)  # noqa: S603
+        with open(repo / "b.txt", "a") as f:
+            f.write("line5\n")
+        subprocess.run([*git, "add", "."], check=True)  # noqa: S603
+        renamed = subprocess.run([*git, "commit", "-q", "-m", "rename"], capture_output=True, text=True)  # noqa: S603
+        (repo / "c.txt").write_text("new dupa\n")
+        subprocess.run([*git, "add", "."], check=True)  # noqa: S603
+        blocked = subprocess.run([*git, "commit", "-q", "-m", "add"], capture_output=True, text=True)  # noqa: S603
+
+        assert renamed.returncode == 0, renamed.stderr
+        assert blocked.returncode == 1
+        assert "File: c.txt" in blocked.stderr
+
+
+class TestPrecompileBytecode:
+    """Tests for precompile_bytecode function."""
+
+    def test_precompile_bytecode(self, tmp_path: Path) -> None:
+        """Test that the checkout's modules are compiled with the hook's Python executable."""
+        (tmp_path / "oddupiacz").mkdir()
+        (tmp_path / "oddupiacz" / "module.py").write_text("VALUE = 1\n")
+        settings = InstallationSettings(
+            hooks_dir=tmp_path / "hooks",
+            oddupiacz_path=tmp_path,
+            config_path=tmp_path / "config.yaml",
+            python_exec=sys.executable,
+            precompile=True,
+        )
+
+        precompile_bytecode(settings)
+
+        assert list((tmp_path / "oddupiacz" / "__pycache__").glob("module.*.pyc"))
@@ -0,0 +1,129 @@
+"""
+Unit tests for local_hooks.py module.
+"""
+
+from pathlib import Path
+
+from oddupiacz.local_hooks import LocalHookRunner, start_local_hook
+from oddupiacz.models import LocalHookResult
+
+
+def _write_hook(path: Path, body: str) -> Path:
+    """Helper to write an executable shell hook."""
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return path
+
+
+def _run_hooks(hook_paths: list[Path], max_workers: int) -> list[LocalHookResult]:
+    """Helper to run hooks with a LocalHookRunner and wait for them."""
+    runner = LocalHookRunner(hook_paths, [], max_workers)
+    runner.start()
+    return runner.wait()
+
+
+class TestStartLocalHook:
+    """Tests for start_local_hook function."""
+
+    def test_wait_collects_buffered_output(self, tmp_path: Path) -> None:
+        """Test that stdout and stderr are buffered until the hook finishes."""
+        hook_path = _write_hook(tmp_path / "pre-commit", 'echo "out $1"\necho err >&2')
+
+        running_hook = start_local_hook(hook_path, ["arg1"])
+        result = running_hook.wait()
+
+        assert result.succeeded is True
+        assert result.path == hook_path
+        assert "out arg1" in result.output
+        assert "err" in result.output
+        assert result.duration >= 0
+
+    def test_wait_reports_failure(self, tmp_path: Path) -> None:
+        """Test that a failing hook is reported as failed."""
+        hook_path = _write_hook(tmp_path / "pre-commit", "exit 3")
+
+        running_hook = start_local_hook(hook_path, [])
+        result = running_hook.wait()
+
+        assert result.returncode == 3
+        assert result.succeeded is False
+
+    def test_cancel_terminates_hook(self, tmp_path: Path) -> None:
+        """Test that cancelling stops a long-running hook."""
+        hook_path = _write_hook(tmp_path / "pre-commit", "exec sleep 30")
+
+        running_hook = start_local_hook(hook_path, [])
+        running_hook.cancel()
+
+        assert running_hook.process.poll() is not None
+        assert running_hook.output_file.closed
+
+    def test_wait_after_cancel_discards_output(self, tmp_path: Path) -> None:
+        """Test that a cancelled hook reports no output."""
+        hook_path = _write_hook(tmp_path / "pre-commit", "echo partial\nexec sleep 30")
+
+        running_hook = start_local_hook(hook_path, [])
+        running_hook.cancel()
+        result = running_hook.wait()
+
+        assert result.cancelled is True
+        assert result.succeeded is False
+        assert result.output == ""
+
+
+class TestLocalHookRunner:
+    """Tests for LocalHookRunner class."""
+
+    def test_run_no_hooks(self) -> None:
+        """Test that running no hooks returns no results."""
+        assert _run_hooks([], max_workers=4) == []
+
+    def test_results_keep_hook_order(self, tmp_path: Path) -> None:
+        """Test that results are returned in hook order regardless of finish order."""
+        slow = _write_hook(tmp_path / "10-slow", "sleep 0.3\necho slow")
+        fast = _write_hook(tmp_path / "20-fast", "echo fast")
+
+        results = _run_hooks([slow, fast], max_workers=2)
+
+        assert [result.path for result in results] == [slow, fast]
+        assert results[0].output.strip() == "slow"
+        assert results[1].output.strip() == "fast"
+        assert all(result.succeeded for result in results)
+
+    def test_hooks_run_in_parallel(self, tmp_path: Path) -> None:
+        """Test that hooks overlap when enough workers are available."""
+        marker = tmp_path / "marker"
+        first = _write_hook(tmp_path / "10-first", f"touch {marker}\nsleep 0.5")
+        second = _write_hook(tmp_path / "20-second", f"sleep 0.2\ntest -f {marker}")
+
+        results = _run_hooks([first, second], max_workers=2)
+
+        assert all(result.succeeded for result in results)
+
+    def test_first_failure_cancels_others(self, tmp_path: Path) -> None:
+        """Test that a failing hook cancels running and pending hooks."""
+        failing = _write_hook(tmp_path / "10-failing", "exit 1")
+        running = _write_hook(tmp_path / "20-running", "exec sleep 30")
+        pending = _write_hook(tmp_path / "30-pending", "echo pending")
+
+        results = _run_hooks([running, failing, pending], max_workers=2)
+
+        assert results[0].cancelled is True
+        assert results[1].returncode == 1
+        assert results[1].cancelled is False
+        assert results[2].cancelled is True
+        assert results[2].output == ""
+
+    def test_cancel_before_hooks_start(self, tmp_path: Path) -> None:
+        """Test that cancelling a runner prevents queued hooks from starting."""
+        marker = tmp_path / "marker"
+        blocker = _write_hook(tmp_path / "10-blocker", "exec sleep 30")
+        queued = _write_hook(tmp_path / "20-queued", f"touch {marker}")
+
+        runner = LocalHookRunner([blocker, queued], [], max_workers=1)
+        runner.start()
+        runner.cancel()
+        results = runner.wait()
+
+        assert all(result.cancelled for result in results)
+        assert not marker.exists()
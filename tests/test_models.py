@@ -4,7 +4,9 @@ Unit tests for models.py module.
 
 from pathlib import Path
 
-from oddupiacz.models import InstallationSettings, Violation
+import pytest
+
+from oddupiacz.models import InstallationSettings, PushScan, ScanResult, Severity, Violation
 
 
 class TestViolation:
@@ -19,6 +21,26 @@ class TestViolation:
         assert violation.line == "# TODO: fix this"
 
 
+class TestSeverityTiers:
+    """Tests for the SeverityTiers mixin of scan results."""
+
+    @pytest.mark.parametrize("result_class", [ScanResult, PushScan])
+    def test_violations_by_severity(self, result_class: type[ScanResult] | type[PushScan]) -> None:
+        """Test that violations are split into blocking, warning and audit-only ones, keeping their order."""
+        violations = [
+            Violation("a", "f", "x", Severity.WARN),
+            Violation("b", "f", "x"),
+            Violation("c", "f", "x", Severity.AUDIT),
+            Violation("d", "f", "x"),
+        ]
+
+        result = result_class(violations=violations)
+
+        assert result.blocking == [violations[1], violations[3]]
+        assert result.warnings == [violations[0]]
+        assert result.audits == [violations[2]]
+
+
 class TestInstallationSettings:
     """Tests for InstallationSettings dataclass."""
 
@@ -0,0 +1,94 @@
+"""
+Unit tests for notebooks.py module.
+"""
+
+import json
+from typing import Any
+
+import pytest
+
+from oddupiacz.notebooks import notebook_source_lines
+
+
+def _notebook_lines(cells: list[dict[str, Any]], indent: int = 1) -> list[str]:
+    """Render a notebook the way nbformat writes it and split it into lines."""
+    notebook = {"cells": cells, "metadata": {"kernelspec": {"name": "TODO-kernel"}}, "nbformat": 4, "nbformat_minor": 5}
+    return json.dumps(notebook, indent=indent, sort_keys=True, ensure_ascii=False).splitlines()
+
+
+CODE_CELL = {
+    "cell_type": "code",
+    "execution_count": 1,
+    "id": "a1",
+    "metadata": {"tags": ["TODO-tag"]},
+    "outputs": [
+        {
+            "data": {"image/png": "iVBORw0KGgoTODOAAAANSUhEUg==", "text/plain": ["<Figure TODO>"]},
+            "metadata": {},
+            "output_type": "display_data",
+        },
+        {"name": "stdout", "output_type": "stream", "text": ["TODO printed\n"]},
+    ],
+    "source": ["import os\n", '# TODO: "quoted" żółw\n', "print(1)"],
+}
+MARKDOWN_CELL = {"cell_type": "markdown", "id": "b2", "metadata": {}, "source": ["# Notes\n", "FIXME later"]}
+RAW_CELL = {"cell_type": "raw", "id": "c3", "metadata": {}, "source": ["TODO in raw"]}
+
+
+class TestNotebookSourceLines:
+    """Tests for notebook_source_lines function."""
+
+    @pytest.mark.parametrize("indent", [1, 2])
+    def test_new_notebook(self, indent: int) -> None:
+        """Test that only code and markdown cell sources are kept and decoded."""
+        lines = _notebook_lines([CODE_CELL, MARKDOWN_CELL, RAW_CELL], indent)
+
+        assert notebook_source_lines(lines) == [
+            "import os",
+            '# TODO: "quoted" żółw',
+            "print(1)",
+            "# Notes",
+            "FIXME later",
+        ]
+
+    def test_edited_source_without_context(self) -> None:
+        """Test that added source and output lines of a hunk without cell keys are told apart."""
+        lines = [
+            '    "# TODO: new line\\n",',
+            '      "image/png": "iVBORw0KGgoTODO",',
+            '       "TODO in output\\n"',
+            '    "tags": [',
+        ]
+
+        assert notebook_source_lines(lines) == ["# TODO: new line"]
+
+    def test_minified_notebook(self) -> None:
+        """Test that a notebook that is not indented is scanned as it is."""
+        line = json.dumps({"cells": [MARKDOWN_CELL], "nbformat": 4})
+
+        assert notebook_source_lines([line]) == [line]
+
+    def test_malformed_source_line(self) -> None:
+        """Test that a line that only looks like a source line is skipped."""
+        assert notebook_source_lines(['    "unterminated TODO', '    "split\\nline"']) == ["split", "line"]
+
+    def test_edited_two_space_source_without_context(self) -> None:
+        """Test that added source lines of a 2-space notebook are kept without cell keys in the hunk."""
+        lines = [
+            '        "# TODO: new line\\n",',
+            '            "TODO in output\\n"',
+            '          "TODO-tag"',
+        ]
+
+        assert notebook_source_lines(lines) == ["# TODO: new line"]
+
+    @pytest.mark.parametrize("indent", [1, 2])
+    def test_single_string_source(self, indent: int) -> None:
+        """Test that a cell source written as a single string is decoded."""
+        cells = [{**MARKDOWN_CELL, "source": "# Notes\nFIXME later"}, {**RAW_CELL, "source": "TODO in raw"}]
+
+        assert notebook_source_lines(_notebook_lines(cells, indent)) == ["# Notes", "FIXME later"]
+
+    def test_single_string_source_without_context(self) -> None:
+        """Test that a single-string source line alone in a hunk is decoded."""
+        assert notebook_source_lines(['   "source": "x = 1  # TODO"']) == ["x = 1  # TODO"]
@@ -0,0 +1,241 @@
+"""
+Unit tests for overlay.py module.
+"""
+
+import os
+import pickle
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from oddupiacz.config import CannotLoadConfigError, load_config
+from oddupiacz.models import Severity
+from oddupiacz.overlay import (
+    CACHE_FILE_NAME,
+    code_fingerprint,
+    file_fingerprint,
+    load_merged_config,
+    OVERLAY_FILE_NAME,
+)
+
+
+@pytest.fixture()
+def repo_dirs(tmp_path: Path) -> tuple[Path, Path]:
+    """Create a repository root with a git directory."""
+    repo_root = tmp_path / "repo"
+    (repo_root / ".git").mkdir(parents=True)
+    return repo_root, repo_root / ".git"
+
+
+def _write_config(tmp_path: Path) -> Path:
+    """Helper to write a minimal global config file."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n")
+    return config_path
+
+
+class _FailsToUnpickle:
+    """Object whose unpickling raises an error that is not one of pickle's own."""
+
+    def __reduce__(self) -> tuple[object, tuple[()]]:
+        return _fail_to_unpickle, ()
+
+
+def _fail_to_unpickle() -> None:
+    """Fail the way a constructor of cached code may fail."""
+    raise RuntimeError("cannot rebuild")
+
+
+def _touch(path: Path, content: str) -> None:
+    """Rewrite a file and move its modification time forward so the change shows in its fingerprint."""
+    path.write_text(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestFileFingerprint:
+    """Tests for file_fingerprint function."""
+
+    def test_fingerprint_changes_with_content(self, tmp_path: Path) -> None:
+        """Test that rewriting a file changes its fingerprint."""
+        path = tmp_path / "config.yaml"
+        path.write_text("a")
+        before = file_fingerprint(path)
+
+        _touch(path, "ab")
+
+        assert before is not None
+        assert file_fingerprint(path) != before
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        """Test that a missing file has no fingerprint."""
+        assert file_fingerprint(tmp_path / "missing.yaml") is None
+
+    def test_inaccessible_file(self, tmp_path: Path) -> None:
+        """Test that a path that cannot be accessed (here, below a regular file) has no fingerprint."""
+        (tmp_path / "file").write_text("")
+
+        assert file_fingerprint(tmp_path / "file" / "config.yaml") is None
+
+
+class TestCodeFingerprint:
+    """Tests for code_fingerprint function."""
+
+    def test_fingerprint_is_stable(self) -> None:
+        """Test that the fingerprint of unchanged code is the same on every call."""
+        assert code_fingerprint() == code_fingerprint.__wrapped__()
+
+
+class TestLoadMergedConfig:
+    """Tests for load_merged_config function."""
+
+    def test_without_overlay(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that the global config is used as is without an overlay."""
+        merged = load_merged_config(_write_config(tmp_path), repo_dirs)
+
+        assert merged.config.forbidden_phrases == ["TODO"]
+        assert merged.resolver.matcher_for("a.py").find("# TODO") == [(Severity.BLOCK, "TODO")]
+
+    def test_inaccessible_config_raises_config_error(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that a config path that cannot be accessed is reported as a config error, not an OSError."""
+        (tmp_path / "file").write_text("")
+
+        with pytest.raises(CannotLoadConfigError):
+            load_merged_config(tmp_path / "file" / "config.yaml", repo_dirs)
+
+    def test_inaccessible_overlay_is_ignored(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that an overlay path that cannot be accessed is treated as a missing overlay."""
+        with patch("oddupiacz.overlay.OVERLAY_FILE_NAME", "file/.oddupiacz.yaml"):
+            (repo_dirs[0] / "file").write_text("")
+            merged = load_merged_config(_write_config(tmp_path), repo_dirs)
+
+        assert merged.config.forbidden_phrases == ["TODO"]
+
+    def test_overlay_rules_are_added(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that overlay phrases, patterns and rule sets are added to the global ones."""
+        (repo_dirs[0] / OVERLAY_FILE_NAME).write_text(
+            "forbidden_phrases: [HACK]\n"
+            "forbidden_patterns: ['ticket-[0-9]+']\n"
+            "rule_sets: [{paths: ['src/'], forbidden_phrases: ['print(']}]\n"
+        )
+
+        merged = load_merged_config(_write_config(tmp_path), repo_dirs)
+
+        assert merged.config.forbidden_phrases == ["TODO", "HACK"]
+        assert merged.config.forbidden_patterns == ["ticket-[0-9]+"]
+        assert [phrase for _, phrase in merged.resolver.matcher_for("src/a.py").find("print(x)  # ticket-12")] == [
+            "print("
+        ]
+        assert merged.resolver.matcher_for("b.py").find("print(x)") == []
+
+    def test_cache_hit_skips_loading(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that a second load with unchanged files comes from the cache."""
+        config_path = _write_config(tmp_path)
+        load_merged_config(config_path, repo_dirs)
+
+        with patch("oddupiacz.overlay.load_config") as mock_load_config:
+            merged = load_merged_config(config_path, repo_dirs)
+
+        mock_load_config.assert_not_called()
+        assert merged.config.forbidden_phrases == ["TODO"]
+        assert (repo_dirs[1] / "oddupiacz" / CACHE_FILE_NAME).exists()
+
+    @pytest.mark.parametrize("changed", ["config", "overlay_added", "overlay_changed"])
+    def test_cache_invalidated_by_changes(self, tmp_path: Path, repo_dirs: tuple[Path, Path], changed: str) -> None:
+        """Test that changing the global config or the overlay rebuilds the merged config."""
+        config_path = _write_config(tmp_path)
+        overlay_path = repo_dirs[0] / OVERLAY_FILE_NAME
+        if changed == "overlay_changed":
+            overlay_path.write_text("forbidden_phrases: [HACK]\n")
+        load_merged_config(config_path, repo_dirs)
+
+        if changed == "config":
+            _touch(config_path, "hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [FIXME]\n")
+        else:
+            _touch(overlay_path, "forbidden_phrases: [XXX]\n")
+        merged = load_merged_config(config_path, repo_dirs)
+
+        expected = {"config": ["FIXME"], "overlay_added": ["TODO", "XXX"], "overlay_changed": ["TODO", "XXX"]}
+        assert merged.config.forbidden_phrases == expected[changed]
+
+    def test_cache_invalidated_by_phrase_file_change(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that changing a referenced wordlist rebuilds the cached matchers."""
+        wordlist = tmp_path / "customers.txt"
+        wordlist.write_text("Globex\n")
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(f"hooks_dir: {tmp_path / 'hooks'}\nforbidden_phrases: []\nphrase_files: [{wordlist}]\n")
+        assert load_merged_config(config_path, repo_dirs).resolver.matcher_for("a.py").find("globex")
+
+        _touch(wordlist, "Initech\n")
+        merged = load_merged_config(config_path, repo_dirs)
+
+        assert merged.resolver.matcher_for("a.py").find("globex initech") == [(Severity.BLOCK, "initech")]
+
+    def test_broken_cache_is_rebuilt(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that an unreadable cache file is ignored and replaced."""
+        cache_path = repo_dirs[1] / "oddupiacz" / CACHE_FILE_NAME
+        cache_path.parent.mkdir()
+        cache_path.write_bytes(b"not a pickle")
+
+        merged = load_merged_config(_write_config(tmp_path), repo_dirs)
+
+        assert merged.config.forbidden_phrases == ["TODO"]
+        with open(cache_path, "rb") as f:
+            cached = [pickle.load(f) for _ in range(3)]  # noqa: S301
+        assert cached[2].config.forbidden_phrases == ["TODO"]
+
+    def test_cache_invalidated_by_code_change(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that a cache written by another version of the package is rebuilt."""
+        config_path = _write_config(tmp_path)
+        load_merged_config(config_path, repo_dirs)
+
+        with (
+            patch("oddupiacz.overlay.code_fingerprint", return_value="other"),
+            patch("oddupiacz.overlay.load_config", wraps=load_config) as mock_load_config,
+        ):
+            merged = load_merged_config(config_path, repo_dirs)
+
+        mock_load_config.assert_called_once()
+        assert merged.config.forbidden_phrases == ["TODO"]
+
+    def test_any_unpickling_error_is_a_miss(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that a cache whose content fails to unpickle with any error is rebuilt."""
+        config_path = _write_config(tmp_path)
+        load_merged_config(config_path, repo_dirs)
+        cache_path = repo_dirs[1] / "oddupiacz" / CACHE_FILE_NAME
+        with open(cache_path, "rb") as f:
+            key, dependencies = pickle.load(f), pickle.load(f)  # noqa: S301
+        with open(cache_path, "wb") as f:
+            for part in (key, dependencies, _FailsToUnpickle()):
+                pickle.dump(part, f)
+
+        merged = load_merged_config(config_path, repo_dirs)
+
+        assert merged.config.forbidden_phrases == ["TODO"]
+
+    @patch("oddupiacz.overlay.tempfile.mkstemp", side_effect=OSError("read-only"))
+    def test_unwritable_cache_is_ignored(
+        self, mock_mkstemp: MagicMock, tmp_path: Path, repo_dirs: tuple[Path, Path]
+    ) -> None:
+        """Test that failing to write the cache does not fail the load."""
+        merged = load_merged_config(_write_config(tmp_path), repo_dirs)
+
+        assert merged.config.forbidden_phrases == ["TODO"]
+        mock_mkstemp.assert_called_once()
+
+    def test_outside_repository(self, tmp_path: Path) -> None:
+        """Test loading without a repository: no overlay and no cache."""
+        merged = load_merged_config(_write_config(tmp_path), None)
+
+        assert merged.config.forbidden_phrases == ["TODO"]
+
+    def test_invalid_overlay_raises_error(self, tmp_path: Path, repo_dirs: tuple[Path, Path]) -> None:
+        """Test that an overlay changing non-rule settings is rejected."""
+        (repo_dirs[0] / OVERLAY_FILE_NAME).write_text("forbidden_phrases: [HACK]\nexclude_paths: [src/]\n")
+
+        with pytest.raises(CannotLoadConfigError) as exc_info:
+            load_merged_config(_write_config(tmp_path), repo_dirs)
+
+        assert "Unknown keys in overlay config" in str(exc_info.value)
+        assert "exclude_paths" in str(exc_info.value)
@@ -0,0 +1,294 @@
+"""
+Unit tests for patches.py module.
+"""
+
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from oddupiacz.checker import MatcherResolver
+from oddupiacz.detectors import Detector, DetectorRunner
+from oddupiacz.models import PatchChunk, PatchScan, Severity, Violation
+from oddupiacz.patches import (
+    find_patch_files,
+    open_patch_file,
+    scan_patch_chunk,
+    scan_patch_files,
+    split_patches,
+    write_patch_records,
+)
+from tests.conftest import make_config
+
+PATCH = """diff --git a/app.py b/app.py
+--- a/app.py
++++ b/app.py
+@@ -1,2 +1,3 @@
+ import os
++# TODO remove
+ print(os.name)
+"""
+
+MBOX = f"""From 1111111111111111111111111111111111111111 Mon Sep 17 00:00:00 2001
+From: Dev <dev@example.com>
+Date: Mon, 1 Jan 2024 10:00:00 +0000
+Subject: [PATCH 1/2] Add a note
+
+Commit message mentioning TODO is not scanned.
+---
+ app.py | 1 +
+ 1 file changed, 1 insertion(+)
+
+{PATCH}--\x20
+2.43.0
+
+From 2222222222222222222222222222222222222222 Mon Sep 17 00:00:00 2001
+From: Dev <dev@example.com>
+Subject: [PATCH 2/2] Add another note
+
+---
+diff --git a/lib.py b/lib.py
+--- a/lib.py
++++ b/lib.py
+@@ -0,0 +1 @@
++# FIXME later
+"""
+
+
+class CrashingDetector(Detector):
+    """Detector that makes the worker checking a line with `crash` fail in the given way."""
+
+    name = "crashing"
+
+    def __init__(self, how: str) -> None:
+        super().__init__()
+        self.how = how
+
+    def check_line(self, path: str, line: str) -> list[Violation]:
+        if "crash" in line:
+            if self.how == "exit":
+                os._exit(1)
+            raise MemoryError()
+        return []
+
+
+class TestFindPatchFiles:
+    """Tests for find_patch_files function."""
+
+    def test_find_patch_files(self, tmp_path: Path) -> None:
+        """Test that directories are searched for (compressed) patches and explicit files are always kept."""
+        for name in ["b.patch", "a.diff.gz", "sub/series.mbox.zst", "sub/x.DIFF", "notes.txt", "archive.gz"]:
+            (tmp_path / "dir" / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / "dir" / name).write_text("")
+        (tmp_path / "explicit.txt").write_text("")
+
+        files = list(find_patch_files([tmp_path / "explicit.txt", tmp_path / "dir"]))
+
+        assert files == [
+            tmp_path / "explicit.txt",
+            tmp_path / "dir" / "a.diff.gz",
+            tmp_path / "dir" / "b.patch",
+            tmp_path / "dir" / "sub" / "series.mbox.zst",
+            tmp_path / "dir" / "sub" / "x.DIFF",
+        ]
+
+
+class TestOpenPatchFile:
+    """Tests for open_patch_file function."""
+
+    @pytest.mark.parametrize("compress", [gzip.compress, bz2.compress, lzma.compress, lambda data: data])
+    def test_decompresses_by_content(self, tmp_path: Path, compress: object) -> None:
+        """Test that the compression is recognized from the file content, not its name."""
+        path = tmp_path / "change.patch"
+        path.write_bytes(compress(PATCH.encode()))  # type: ignore[operator]
+
+        with open_patch_file(path) as stream:
+            assert stream.read() == PATCH
+
+    @pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd is not installed")
+    def test_zstd(self, tmp_path: Path) -> None:
+        """Test that zstd files are streamed through the zstd command."""
+        path = tmp_path / "change.diff"
+        path.write_text(PATCH)
+        subprocess.run(["zstd", "-q", "--rm", str(path)], check=True)  # noqa: S603, S607
+
+        with open_patch_file(tmp_path / "change.diff.zst") as stream:
+            assert stream.read() == PATCH
+
+    @pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd is not installed")
+    def test_corrupt_zstd(self, tmp_path: Path) -> None:
+        """Test that a corrupt zstd file raises OSError."""
+        path = tmp_path / "change.diff.zst"
+        path.write_bytes(b"\x28\xb5\x2f\xfd" + b"garbage")
+
+        with pytest.raises(OSError, match="zstd failed"), open_patch_file(path) as stream:
+            stream.read()
+
+    def test_invalid_utf8_is_replaced(self, tmp_path: Path) -> None:
+        """Test that undecodable bytes do not stop the scan."""
+        path = tmp_path / "change.patch"
+        path.write_bytes(b"+++ b/a.py\n+caf\xe9\n")
+
+        with open_patch_file(path) as stream:
+            assert stream.read() == "+++ b/a.py\n+caf�\n"
+
+
+class TestSplitPatches:
+    """Tests for split_patches function."""
+
+    def test_single_patch(self) -> None:
+        """Test that a file without mbox separators is one patch."""
+        chunks = list(split_patches(io.StringIO(PATCH), Path("a.patch"), 1000))
+
+        assert chunks == [PatchChunk(source=Path("a.patch"), message=1, subject=None, text=PATCH)]
+
+    def test_mbox_messages(self) -> None:
+        """Test that mbox messages are split, with their subjects and without mail headers."""
+        chunks = list(split_patches(io.StringIO(MBOX), Path("series.mbox"), 1000))
+
+        assert [(chunk.message, chunk.subject) for chunk in chunks] == [
+            (1, "[PATCH 1/2] Add a note"),
+            (2, "[PATCH 2/2] Add another note"),
+        ]
+        assert chunks[0].text.startswith("diff --git a/app.py b/app.py\n")
+        assert "Commit message" not in chunks[0].text
+        assert "+# TODO remove\n" in chunks[0].text
+        assert chunks[1].text.endswith("+# FIXME later\n")
+
+    def test_message_without_diff_is_skipped(self) -> None:
+        """Test that a message without a diff, such as a cover letter, yields no chunk."""
+        text = "From abc Mon Sep 17 00:00:00 2001\nSubject: [PATCH 0/1] Cover\n\nHello\n" + MBOX
+
+        chunks = list(split_patches(io.StringIO(text), Path("series.mbox"), 1000))
+
+        assert [chunk.message for chunk in chunks] == [1, 2]
+
+    def test_long_file_is_cut_with_header(self) -> None:
+        """Test that chunks are cut at the line limit, not after a header, and repeat the header of a cut file."""
+        text = "+++ b/a.py\n" + "".join(f"+line {i}\n" for i in range(5)) + "+++ b/b.py\n+other\n"
+
+        chunks = list(split_patches(io.StringIO(text), Path("a.diff"), 3))
+
+        assert [chunk.text for chunk in chunks] == [
+            "+++ b/a.py\n+line 0\n+line 1\n",
+            "+++ b/a.py\n+line 2\n+line 3\n",
+            "+++ b/a.py\n+line 4\n+++ b/b.py\n+other\n",
+        ]
+
+
+class TestScanPatchChunk:
+    """Tests for scan_patch_chunk function."""
+
+    def test_scan_chunk(self) -> None:
+        """Test that added lines of a chunk are scanned and excluded files are skipped."""
+        config = make_config(exclude_paths=["vendor/"])
+        text = PATCH + "+++ b/vendor/lib.py\n+# TODO vendored\n"
+        chunk = PatchChunk(source=Path("a.patch"), message=1, subject="Fix", text=text)
+
+        scan = scan_patch_chunk(chunk, config, MatcherResolver(config))
+
+        assert scan.violations == [Violation(phrase="TODO", file="app.py", line="# TODO remove")]
+        assert (scan.source, scan.message, scan.subject, scan.lines) == (Path("a.patch"), 1, "Fix", 9)
+
+
+class TestScanPatchFiles:
+    """Tests for scan_patch_files function."""
+
+    def test_scan_patch_files(self, tmp_path: Path) -> None:
+        """Test that chunks of all files are scanned in order and unreadable files are reported."""
+        config = make_config(scan_chunk_lines=4)
+        (tmp_path / "series.mbox.gz").write_bytes(gzip.compress(MBOX.encode()))
+        (tmp_path / "broken.diff.xz").write_bytes(b"\xfd7zXZ\x00broken")
+        paths = [tmp_path / "series.mbox.gz", tmp_path / "broken.diff.xz", tmp_path / "missing.patch"]
+
+        scans = list(scan_patch_files(paths, config, MatcherResolver(config), workers=2))
+
+        assert [(scan.source.name, scan.message) for scan in scans] == [
+            ("series.mbox.gz", 1),
+            ("series.mbox.gz", 1),
+            ("series.mbox.gz", 1),
+            ("series.mbox.gz", 2),
+            ("series.mbox.gz", 2),
+            ("broken.diff.xz", 0),
+            ("missing.patch", 0),
+        ]
+        assert [violation.phrase for scan in scans for violation in scan.violations] == ["TODO", "FIXME"]
+        assert [scan.error is not None for scan in scans] == [False] * 5 + [True] * 2
+        assert scans[-1].error is not None
+        assert scans[-1].error.startswith("Cannot read patch file:")
+
+    @pytest.mark.parametrize(
+        ("name", "corrupt"),
+        [
+            ("deflate.diff.gz", lambda data: data[:10] + bytes([data[10] ^ 0xFF]) + data[11:]),
+            ("truncated.diff.gz", lambda data: data[: len(data) // 2]),
+            ("stream.diff.bz2", lambda data: data[:4] + b"broken" + data[10:]),
+        ],
+    )
+    def test_corrupt_file_is_reported(self, tmp_path: Path, name: str, corrupt: object) -> None:
+        """Test that a corrupt compressed file becomes an error record and the files after it are still scanned."""
+        config = make_config()
+        compress = bz2.compress if name.endswith(".bz2") else lambda data: gzip.compress(data, mtime=0)
+        (tmp_path / name).write_bytes(corrupt(compress(MBOX.encode())))  # type: ignore[operator]
+        (tmp_path / "after.patch").write_text(PATCH)
+
+        scans = list(scan_patch_files([tmp_path / name, tmp_path / "after.patch"], config, MatcherResolver(config), 1))
+
+        assert [scan.source.name for scan in scans] == [name, "after.patch"]
+        assert scans[0].error is not None
+        assert scans[0].error.startswith("Cannot read patch file:")
+        assert [violation.phrase for violation in scans[1].violations] == ["TODO"]
+
+    @pytest.mark.parametrize("how", ["raise", "exit"])
+    def test_worker_failure_is_reported(self, tmp_path: Path, how: str) -> None:
+        """Test that chunks whose worker fails or dies become error records instead of an exception."""
+        config = make_config()
+        (tmp_path / "a.patch").write_text(PATCH.replace("TODO remove", "crash"))
+        (tmp_path / "b.patch").write_text(PATCH)
+        paths = [tmp_path / "a.patch", tmp_path / "b.patch"]
+
+        scans = list(
+            scan_patch_files(paths, config, MatcherResolver(config), 1, DetectorRunner([CrashingDetector(how)]))
+        )
+
+        assert [scan.source.name for scan in scans] == ["a.patch", "b.patch"]
+        assert scans[0].error is not None
+        assert scans[0].error.startswith("Cannot scan message 1:")
+        # A dead worker breaks the pool, so the chunks after it cannot be scanned either
+        assert (scans[1].error is not None) == (how == "exit")
+
+
+class TestWritePatchRecords:
+    """Tests for write_patch_records function."""
+
+    def test_write_records(self) -> None:
+        """Test that violations and errors are written as JSON Lines."""
+        report = io.StringIO()
+        violation = Violation(phrase="long line", file="a.py", line="x", severity=Severity.WARN, detector="long-line")
+        write_patch_records(PatchScan(source=Path("a.patch"), message=2, subject="Fix", violations=[violation]), report)
+        write_patch_records(
+            PatchScan(source=Path("b.patch"), message=1, violations=[Violation("TODO", "b", "y")]), report
+        )
+        write_patch_records(PatchScan(source=Path("c.patch"), message=0, error="Cannot read"), report)
+
+        assert [json.loads(line) for line in report.getvalue().splitlines()] == [
+            {
+                "source": "a.patch",
+                "message": 2,
+                "subject": "Fix",
+                "file": "a.py",
+                "severity": "warn",
+                "phrase": "long line",
+                "line": "x",
+                "detector": "long-line",
+            },
+            {"source": "b.patch", "message": 1, "file": "b", "severity": "block", "phrase": "TODO", "line": "y"},
+            {"source": "c.patch", "error": "Cannot read"},
+        ]
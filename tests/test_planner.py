@@ -0,0 +1,149 @@
+"""
+Unit tests for planner.py module.
+"""
+
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from oddupiacz.models import FileStat
+from oddupiacz.planner import plan_file_diffs, plan_scan
+from tests.conftest import make_config
+
+EXCLUSIONS = {"exclude_paths": ["vendor/"], "exclude_extensions": [".lock"]}
+
+
+class TestPlanScan:
+    """Tests for plan_scan function."""
+
+    def test_excludes_files_up_front(self) -> None:
+        """Test that binary, configured, empty and oversized files are excluded."""
+        stats = [
+            FileStat(path="src/app.py", added=10, deleted=0),
+            FileStat(path="logo.png", added=0, deleted=0, binary=True),
+            FileStat(path="vendor/big.js", added=500000, deleted=0),
+            FileStat(path="uv.lock", added=20, deleted=3),
+            FileStat(path="src/removed.py", added=0, deleted=40),
+            FileStat(path="data/dump.sql", added=9000, deleted=0),
+        ]
+
+        strategy = plan_scan(stats, make_config(**EXCLUSIONS, max_file_lines=5000))
+
+        assert strategy.scan_paths == ["src/app.py"]
+
+    def test_small_change_is_serial(self) -> None:
+        """Test that a small change is scanned serially."""
+        strategy = plan_scan([FileStat(path="a.py", added=1, deleted=0)], make_config(**EXCLUSIONS))
+
+        assert strategy.parallel is False
+
+    @patch("oddupiacz.planner.get_parallel_workers", return_value=4)
+    def test_large_change_is_parallel(self, mock_workers: MagicMock) -> None:
+        """Test that a large change is scanned in parallel."""
+        stats = [FileStat(path="a.py", added=80, deleted=0), FileStat(path="b.py", added=20, deleted=0)]
+
+        strategy = plan_scan(stats, make_config(**EXCLUSIONS, parallel_min_lines=100))
+
+        assert strategy.parallel is True
+
+    @patch("oddupiacz.planner.get_parallel_workers", return_value=4)
+    def test_excluded_lines_do_not_count(self, mock_workers: MagicMock) -> None:
+        """Test that lines of excluded files do not count towards a parallel scan."""
+        stats = [FileStat(path="a.py", added=20, deleted=0), FileStat(path="vendor/b.py", added=500, deleted=0)]
+
+        strategy = plan_scan(stats, make_config(**EXCLUSIONS, parallel_min_lines=100))
+
+        assert strategy.parallel is False
+
+    @patch("oddupiacz.planner.get_parallel_workers", return_value=1)
+    def test_single_cpu_is_serial(self, mock_workers: MagicMock) -> None:
+        """Test that a single CPU never gets a parallel plan."""
+        stats = [FileStat(path="a.py", added=150, deleted=0)]
+
+        strategy = plan_scan(stats, make_config(**EXCLUSIONS, parallel_min_lines=100))
+
+        assert strategy.parallel is False
+
+
+class TestPlanFileDiffs:
+    """Tests for plan_file_diffs function."""
+
+    def test_plan_from_existing_diff(self) -> None:
+        """Test that a piped diff is planned from its own counts and filtered."""
+        diff = "+++ b/src/a.py\n+TODO\n+++ b/vendor/b.py\n+TODO\n"
+
+        strategy, file_diffs = plan_file_diffs(diff, make_config(**EXCLUSIONS))
+
+        assert strategy.scan_paths == ["src/a.py"]
+        assert [file_diff.path for file_diff in file_diffs] == ["src/a.py"]
+
+    @patch("oddupiacz.planner.get_git_diff")
+    @patch("oddupiacz.planner.get_git_numstat")
+    def test_plan_from_numstat(self, mock_numstat: MagicMock, mock_diff: MagicMock) -> None:
+        """Test that the diff is requested only for planned files."""
+        mock_numstat.return_value = [
+            FileStat(path="src/a.py", added=1, deleted=0),
+            FileStat(path="vendor/b.py", added=1, deleted=0),
+        ]
+        mock_diff.return_value = "+++ b/src/a.py\n+TODO\n"
+
+        strategy, file_diffs = plan_file_diffs("", make_config(**EXCLUSIONS))
+
+        mock_diff.assert_called_once_with(cached=True, paths=["src/a.py"])
+        assert [file_diff.path for file_diff in file_diffs] == ["src/a.py"]
+
+    def test_plan_from_numstat_with_rename(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that only the lines added to a renamed file are loaded, not its whole content."""
+        git = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)  # noqa: S603, S607
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "a.txt").write_text("line1 TODO\nline2\nline3\nline4\n")
+        subprocess.run([*git, "add", "."], check=True)  # noqa: S603
+        subprocess.run([*git, "commit", "-q", "-m", "initial"], check=True)  # noqa: S603
+        subprocess.run([*git, "mv", "a.txt", "b.txt"], check=True)  # noqa: S603
+        with open(tmp_path / "b.txt", "a") as f:
+            f.write("line5\n")
+        subprocess.run([*git, "add", "."], check=True)  # noqa: S603
+
+        strategy, file_diffs = plan_file_diffs("", make_config(**EXCLUSIONS))
+
+        assert strategy.scan_paths == ["b.txt"]
+        assert [(file_diff.path, file_diff.added_lines) for file_diff in file_diffs] == [("b.txt", ["line5"])]
+
+    @patch("oddupiacz.planner.get_git_diff")
+    @patch("oddupiacz.planner.get_git_numstat")
+    def test_plan_without_files_skips_diff(self, mock_numstat: MagicMock, mock_diff: MagicMock) -> None:
+        """Test that no diff is requested when nothing needs scanning."""
+        mock_numstat.return_value = [FileStat(path="logo.png", added=0, deleted=0, binary=True)]
+
+        strategy, file_diffs = plan_file_diffs("", make_config(**EXCLUSIONS))
+
+        mock_diff.assert_not_called()
+        assert file_diffs == []
+
+    def test_plan_skips_files_by_attributes(self) -> None:
+        """Test that files marked in .gitattributes are excluded with the marking attribute."""
+        attributes = MagicMock()
+        attributes.find_skipped.return_value = {"gen/api.py": "linguist-generated"}
+        diff = "+++ b/src/a.py\n+TODO\n+++ b/gen/api.py\n+TODO\n+++ b/vendor/b.py\n+TODO\n"
+
+        strategy, file_diffs = plan_file_diffs(diff, make_config(**EXCLUSIONS), attributes)
+
+        attributes.find_skipped.assert_called_once_with(["src/a.py", "gen/api.py", "vendor/b.py"])
+        assert strategy.scan_paths == ["src/a.py"]
+        assert [file_diff.path for file_diff in file_diffs] == ["src/a.py"]
+
+    def test_plan_ignores_attributes_when_disabled_or_failing(self) -> None:
+        """Test that attributes are not consulted with skip_generated off and a git failure skips nothing."""
+        attributes = MagicMock()
+        attributes.find_skipped.side_effect = subprocess.CalledProcessError(128, "git")
+        diff = "+++ b/gen/api.py\n+TODO\n"
+
+        _, disabled = plan_file_diffs(diff, make_config(**EXCLUSIONS, skip_generated=False), attributes)
+        attributes.find_skipped.assert_not_called()
+        _, failing = plan_file_diffs(diff, make_config(**EXCLUSIONS), attributes)
+
+        assert [file_diff.path for file_diff in disabled] == ["gen/api.py"]
+        assert [file_diff.path for file_diff in failing] == ["gen/api.py"]
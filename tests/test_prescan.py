@@ -0,0 +1,154 @@
+"""
+Unit tests for prescan.py module.
+"""
+
+import os
+from dataclasses import replace
+from pathlib import Path
+
+from oddupiacz.checker import MatcherResolver, scan_file_diffs
+from oddupiacz.models import FileDiff, Severity, Violation
+from oddupiacz.prescan import (
+    file_diff_key,
+    get_prescan_dir,
+    open_prescan_store,
+    prescan_diff,
+    PRESCAN_DIR_NAME,
+    PrescanStore,
+    rules_digest,
+)
+from tests.conftest import make_config
+
+
+class TestRulesDigest:
+    """Tests for rules_digest function."""
+
+    def test_digest_depends_on_rules_only(self, tmp_path: Path) -> None:
+        """Test that the digest changes with the rules but not with unrelated settings."""
+        config = make_config(hooks_dir=tmp_path / "hooks")
+
+        assert rules_digest(config) == rules_digest(replace(config, time_budget_ms=100))
+        assert rules_digest(config) != rules_digest(replace(config, forbidden_phrases=["TODO"]))
+
+    def test_digest_follows_phrase_files(self, tmp_path: Path) -> None:
+        """Test that editing a phrase file changes the digest."""
+        phrase_file = tmp_path / "phrases.txt"
+        phrase_file.write_text("secret\n")
+        config = make_config(hooks_dir=tmp_path / "hooks", phrase_files=[phrase_file])
+        before = rules_digest(config)
+
+        phrase_file.write_text("secret\nhidden\n")
+
+        assert rules_digest(config) != before
+
+
+class TestFileDiffKey:
+    """Tests for file_diff_key function."""
+
+    def test_key_covers_path_and_lines(self) -> None:
+        """Test that the key changes with the path and with the added lines."""
+        key = file_diff_key(FileDiff(path="a.py", added_lines=["x", "y"]))
+
+        assert key == file_diff_key(FileDiff(path="a.py", added_lines=["x", "y"]))
+        assert key != file_diff_key(FileDiff(path="b.py", added_lines=["x", "y"]))
+        assert key != file_diff_key(FileDiff(path="a.py", added_lines=["x\ny"]))
+        assert key != file_diff_key(FileDiff(path="a.py", added_lines=["xy"]))
+
+
+class TestPrescanStore:
+    """Tests for PrescanStore class."""
+
+    def test_store_and_lookup(self, tmp_path: Path) -> None:
+        """Test that verdicts round-trip, including clean files."""
+        store = PrescanStore(tmp_path / "store")
+        dirty = FileDiff(path="a.py", added_lines=["# TODO", "# FIXME"])
+        clean = FileDiff(path="b.py", added_lines=["ok"])
+        violations = [
+            Violation(phrase="TODO", file="a.py", line="# TODO"),
+            Violation(phrase="FIXME", file="a.py", line="# FIXME", severity=Severity.WARN),
+        ]
+
+        store.store(dirty, violations)
+        store.store(clean, [])
+
+        assert store.lookup(dirty) == violations
+        assert store.lookup(clean) == []
+        assert store.lookup(FileDiff(path="a.py", added_lines=["# TODO"])) is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that an unreadable verdict is treated as never scanned."""
+        store = PrescanStore(tmp_path / "store")
+        file_diff = FileDiff(path="a.py", added_lines=["x"])
+        store.store(file_diff, [])
+        key = file_diff_key(file_diff)
+        (store.directory / key[:2] / key[2:]).write_text("{")
+
+        assert store.lookup(file_diff) is None
+
+    def test_prune(self, tmp_path: Path) -> None:
+        """Test that verdicts of other configs and old verdicts are removed."""
+        store = PrescanStore(tmp_path / "prescan" / "current")
+        other = PrescanStore(tmp_path / "prescan" / "other")
+        old, recent = FileDiff(path="a.py", added_lines=["old"]), FileDiff(path="a.py", added_lines=["new"])
+        for file_diff in (old, recent):
+            store.store(file_diff, [])
+        other.store(old, [])
+        key = file_diff_key(old)
+        os.utime(store.directory / key[:2] / key[2:], (0, 0))
+
+        store.prune()
+
+        assert not other.directory.exists()
+        assert store.lookup(old) is None
+        assert store.lookup(recent) == []
+
+
+class TestOpenPrescanStore:
+    """Tests for get_prescan_dir and open_prescan_store functions."""
+
+    def test_no_store_without_watcher(self, tmp_path: Path) -> None:
+        """Test that nothing is opened when no verdicts were written."""
+        assert open_prescan_store(tmp_path, make_config(hooks_dir=tmp_path / "hooks")) is None
+
+    def test_store_of_current_config_only(self, tmp_path: Path) -> None:
+        """Test that only the verdicts of the current rules are opened."""
+        config = make_config(hooks_dir=tmp_path / "hooks")
+        get_prescan_dir(tmp_path, config).mkdir(parents=True)
+
+        store = open_prescan_store(tmp_path, config)
+
+        assert store is not None
+        assert store.directory.parent == tmp_path / "oddupiacz" / PRESCAN_DIR_NAME
+        assert open_prescan_store(tmp_path, replace(config, forbidden_phrases=["XXX"])) is None
+
+    def test_missing_phrase_file(self, tmp_path: Path) -> None:
+        """Test that a config whose phrase file vanished opens no store."""
+        (tmp_path / "oddupiacz" / PRESCAN_DIR_NAME).mkdir(parents=True)
+        config = make_config(hooks_dir=tmp_path / "hooks", phrase_files=[tmp_path / "missing.txt"])
+
+        assert open_prescan_store(tmp_path, config) is None
+
+
+class TestPrescanDiff:
+    """Tests for prescan_diff function."""
+
+    def test_prescan_then_reuse_verdicts(self, tmp_path: Path) -> None:
+        """Test that pre-scanned verdicts replace scanning and match a full scan."""
+        config = make_config(hooks_dir=tmp_path / "hooks", exclude_extensions=[".md"])
+        resolver = MatcherResolver(config)
+        store = PrescanStore(tmp_path / "store")
+        diff = "+++ b/a.py\n+# TODO\n+# FIXME\n+++ b/b.py\n+ok\n+++ b/c.md\n+TODO\n"
+
+        assert prescan_diff(diff, config, resolver, store) == 2
+        assert prescan_diff(diff, config, resolver, store) == 0
+        assert prescan_diff("", config, resolver, store) == 0
+
+        file_diffs = [
+            FileDiff(path="a.py", added_lines=["# TODO", "# FIXME"]),
+            FileDiff(path="b.py", added_lines=["ok"]),
+            FileDiff(path="new.py", added_lines=["TODO again"]),
+        ]
+        result = scan_file_diffs(file_diffs, config, resolver=resolver, verdicts=store.lookup)
+
+        assert result.violations == scan_file_diffs(file_diffs, config, resolver=resolver).violations
+        assert store.lookup(file_diffs[2]) is None
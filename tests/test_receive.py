@@ -0,0 +1,348 @@
+"""
+Unit tests for receive.py module.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from oddupiacz.baseline import BASELINE_FILE_NAME, write_baseline
+from oddupiacz.checker import MatcherResolver
+from oddupiacz.models import PushedBlob, RefUpdate, Severity, Violation
+from oddupiacz.receive import (
+    git_object_env,
+    is_zero_oid,
+    list_new_blobs,
+    parse_ref_updates,
+    PushScanner,
+    PushScanServer,
+    read_objects,
+    repository_name,
+    request_push_scan,
+    VerdictCache,
+)
+from tests.conftest import make_config
+
+ZERO_OID = "0" * 40
+GIT_IDENTITY = ["-c", "user.name=Test", "-c", "user.email=test@example.com"]
+
+
+def _git(*args: str) -> str:
+    """Run git and return its output."""
+    return subprocess.run(  # noqa: S603
+        ["git", *GIT_IDENTITY, *args],  # noqa: S607
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def _commit(work: Path, files: dict[str, bytes]) -> str:
+    """Write files into a working tree, commit them and return the commit."""
+    for name, content in files.items():
+        (work / name).parent.mkdir(parents=True, exist_ok=True)
+        (work / name).write_bytes(content)
+    _git("-C", str(work), "add", ".")
+    _git("-C", str(work), "commit", "-q", "-m", "change")
+    return _git("-C", str(work), "rev-parse", "HEAD")
+
+
+@pytest.fixture()
+def repos(tmp_path: Path) -> tuple[Path, Path, str]:
+    """A bare server repository whose main branch has one commit, and a clone of it."""
+    server = tmp_path / "project.git"
+    work = tmp_path / "work"
+    _git("init", "-q", "--bare", "-b", "main", str(server))
+    _git("init", "-q", "-b", "main", str(work))
+    base = _commit(work, {"old.py": b"# TODO already on the server\n"})
+    _git("-C", str(work), "push", "-q", str(server), "main")
+    return server, work, base
+
+
+def _receive(server: Path, work: Path) -> None:
+    """Copy the objects of the clone's main branch into the server without updating any ref, as in pre-receive."""
+    _git("--git-dir", str(server), "fetch", "-q", str(work), "main")
+
+
+@pytest.fixture()
+def scanner() -> Iterator[PushScanner]:
+    """A PushScanner with a single worker process."""
+    config = make_config(exclude_paths=["vendor/"], exclude_repos=["legacy"])
+    with PushScanner(config, MatcherResolver(config), None, workers=1) as push_scanner:
+        yield push_scanner
+
+
+class TestRefUpdates:
+    """Tests for parsing the input of a pre-receive hook."""
+
+    def test_parse_ref_updates(self) -> None:
+        """Test that each line becomes a ref update and blank lines are ignored."""
+        updates = parse_ref_updates(f"{ZERO_OID} {'a' * 40} refs/heads/new\n\n{'b' * 40} {ZERO_OID} refs/tags/v1\n")
+
+        assert updates == [
+            RefUpdate(old=ZERO_OID, new="a" * 40, ref="refs/heads/new"),
+            RefUpdate(old="b" * 40, new=ZERO_OID, ref="refs/tags/v1"),
+        ]
+        assert [is_zero_oid(update.new) for update in updates] == [False, True]
+
+    def test_malformed_line(self) -> None:
+        """Test that lines without three fields are rejected."""
+        with pytest.raises(ValueError, match="Malformed ref update"):
+            parse_ref_updates("abc refs/heads/main\n")
+
+    @pytest.mark.parametrize(
+        ("git_dir", "expected"), [("/srv/git/project.git", "project"), ("/home/me/project/.git", "project")]
+    )
+    def test_repository_name(self, git_dir: str, expected: str) -> None:
+        """Test that bare and non-bare git directories are named after the repository."""
+        assert repository_name(Path(git_dir)) == expected
+
+    def test_git_object_env(self) -> None:
+        """Test that only object directory variables are kept, with relative paths made absolute."""
+        environ = {
+            "GIT_DIR": ".",
+            "GIT_OBJECT_DIRECTORY": "./objects/incoming-abc",
+            "GIT_ALTERNATE_OBJECT_DIRECTORIES": f"./objects{os.pathsep}/srv/shared/objects",
+        }
+
+        assert git_object_env(environ, Path("/srv/git/project.git")) == {
+            "GIT_OBJECT_DIRECTORY": "/srv/git/project.git/objects/incoming-abc",
+            "GIT_ALTERNATE_OBJECT_DIRECTORIES": f"/srv/git/project.git/objects{os.pathsep}/srv/shared/objects",
+        }
+
+
+class TestNewBlobs:
+    """Tests for finding and reading the blobs a push adds."""
+
+    def test_list_new_blobs(self, repos: tuple[Path, Path, str]) -> None:
+        """Test that only blobs unreachable from existing refs are listed, with their paths."""
+        server, work, base = repos
+        new = _commit(work, {"old.py": b"# TODO already on the server\nx = 1\n", "src/new.py": b"y = 2\n"})
+        _receive(server, work)
+
+        blobs = list_new_blobs(server, [RefUpdate(base, new, "refs/heads/main")], {})
+
+        assert sorted(blob.path for blob in blobs) == ["old.py", "src/new.py"]
+        assert read_objects(server, [blob.oid for blob in blobs] + ["f" * 40], {})[-1] is None
+        assert list_new_blobs(server, [RefUpdate(base, ZERO_OID, "refs/heads/main")], {}) == []
+        assert list_new_blobs(server, [RefUpdate(ZERO_OID, base, "refs/heads/copy")], {}) == []
+
+    def test_blob_is_listed_under_every_path(self, repos: tuple[Path, Path, str]) -> None:
+        """Test that a blob added at several paths, also in earlier pushed commits, is listed under each of them."""
+        server, work, base = repos
+        _commit(work, {"docs/a.txt": b"same\n", "src/z.py": b"same\n"})
+        _git("-C", str(work), "mv", "src/z.py", "src/w.py")
+        new = _commit(work, {})
+        _receive(server, work)
+
+        blobs = list_new_blobs(server, [RefUpdate(base, new, "refs/heads/main")], {})
+
+        assert len({blob.oid for blob in blobs}) == 1
+        assert sorted(blob.path for blob in blobs) == ["docs/a.txt", "src/w.py", "src/z.py"]
+
+
+class TestVerdictCache:
+    """Tests for VerdictCache class."""
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        """Test that the cache keeps the most recently used verdicts per blob and path."""
+        cache = VerdictCache(max_entries=2)
+        first, second, third = (PushedBlob(oid=str(index) * 40, path="a.py", size=1) for index in range(3))
+        violations = [Violation(phrase="TODO", file="a.py", line="TODO")]
+
+        cache.put(first, violations)
+        cache.put(second, [])
+        assert cache.get(first) == violations
+        cache.put(third, [])
+
+        assert len(cache) == 2
+        assert cache.get(second) is None
+        assert cache.get(first) == violations
+        assert cache.get(PushedBlob(oid=first.oid, path="b.py", size=1)) is None
+
+
+class TestPushScanner:
+    """Tests for PushScanner class."""
+
+    def test_scan_push(self, repos: tuple[Path, Path, str], scanner: PushScanner) -> None:
+        """Test that new blobs are scanned, excluded ones skipped and verdicts reused by later pushes."""
+        server, work, base = repos
+        new = _commit(
+            work,
+            {
+                "a.py": b"# TODO block\n# FIXME warn\n",
+                "vendor/lib.py": b"# TODO vendored\n",
+                "image.png": b"\x89PNG\0TODO",
+            },
+        )
+        _receive(server, work)
+        update = RefUpdate(base, new, "refs/heads/main")
+
+        scan = scanner.scan_push(server, [update], {}, timeout=60)
+
+        assert scan.error is None
+        assert not scan.timed_out
+        assert [(v.file, v.phrase, v.severity) for v in scan.violations] == [
+            ("a.py", "TODO", Severity.BLOCK),
+            ("a.py", "FIXME", Severity.WARN),
+        ]
+        assert (scan.blobs, scan.cached_blobs) == (2, 0)
+        assert scan.scanned_bytes > 0
+
+        again = scanner.scan_push(server, [RefUpdate(ZERO_OID, new, "refs/heads/other")], {}, timeout=60)
+        assert (again.blobs, again.cached_blobs, again.scanned_bytes) == (2, 2, 0)
+        assert again.violations == scan.violations
+
+    def test_blob_at_excluded_and_scanned_path(self, repos: tuple[Path, Path, str], scanner: PushScanner) -> None:
+        """Test that a blob is scanned if any path it is added at is not excluded."""
+        server, work, base = repos
+        new = _commit(work, {"vendor/lib.py": b"# TODO\n", "zz/z.py": b"# TODO\n"})
+        _receive(server, work)
+
+        scan = scanner.scan_push(server, [RefUpdate(base, new, "refs/heads/main")], {}, timeout=60)
+
+        assert [v.file for v in scan.violations] == ["zz/z.py"]
+
+    def test_baseline_of_default_branch(self, repos: tuple[Path, Path, str], scanner: PushScanner) -> None:
+        """Test that violations recorded in the baseline already on the default branch are dropped."""
+        server, work, _ = repos
+        write_baseline([Violation(phrase="TODO", file="a.py", line="# TODO known")], work / BASELINE_FILE_NAME)
+        base = _commit(work, {})
+        _git("-C", str(work), "push", "-q", str(server), "main")
+        new = _commit(work, {"a.py": b"# TODO known\n# TODO new\n"})
+        _receive(server, work)
+
+        scan = scanner.scan_push(server, [RefUpdate(base, new, "refs/heads/main")], {}, timeout=60)
+
+        assert [v.line for v in scan.violations] == ["# TODO new"]
+
+    def test_pushed_baseline_is_ignored(self, repos: tuple[Path, Path, str], scanner: PushScanner) -> None:
+        """Test that a push cannot whitelist its own violations with a baseline it adds."""
+        server, work, base = repos
+        write_baseline([Violation(phrase="TODO", file="a.py", line="# TODO known")], work / BASELINE_FILE_NAME)
+        new = _commit(work, {"a.py": b"# TODO known\n"})
+        _receive(server, work)
+
+        scan = scanner.scan_push(server, [RefUpdate(base, new, "refs/heads/main")], {}, timeout=60)
+
+        assert [v.line for v in scan.violations] == ["# TODO known"]
+
+    def test_timeout(self, repos: tuple[Path, Path, str], scanner: PushScanner) -> None:
+        """Test that a push whose scan doesn't finish in time is marked as timed out."""
+        server, work, base = repos
+        new = _commit(work, {"a.py": b"# TODO\n"})
+        _receive(server, work)
+
+        scan = scanner.scan_push(server, [RefUpdate(base, new, "refs/heads/main")], {}, timeout=0)
+
+        assert scan.timed_out
+
+    def test_excluded_repository(self, tmp_path: Path, scanner: PushScanner) -> None:
+        """Test that repositories named in exclude_repos are not scanned."""
+        scan = scanner.scan_push(tmp_path / "legacy.git", [RefUpdate(ZERO_OID, "a" * 40, "refs/heads/main")], {}, 60)
+
+        assert scan.error is None
+        assert scan.blobs == 0
+
+    def test_unknown_objects(self, repos: tuple[Path, Path, str], scanner: PushScanner) -> None:
+        """Test that a push naming objects the repository doesn't have reports an error."""
+        server, _, base = repos
+
+        scan = scanner.scan_push(server, [RefUpdate(base, "f" * 40, "refs/heads/main")], {}, timeout=60)
+
+        assert scan.error is not None
+        assert scan.error.startswith("Cannot read the pushed objects")
+
+
+class TestPushScanServer:
+    """Tests for the scan server and its client."""
+
+    def test_request_push_scan(self, tmp_path: Path, repos: tuple[Path, Path, str], scanner: PushScanner) -> None:
+        """Test that a hook gets the same result from the server as from scanning itself."""
+        server_repo, work, base = repos
+        new = _commit(work, {"a.py": b"# TODO block\n"})
+        _receive(server_repo, work)
+        socket_path = tmp_path / "scan.sock"
+        server = PushScanServer(socket_path, scanner)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            scan = request_push_scan(socket_path, server_repo, [RefUpdate(base, new, "refs/heads/main")], {}, 60)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(socket_path))
+                client.sendall(b'{"git_dir": "."}\n')
+                invalid = json.loads(client.makefile("rb").readline())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert [(v.file, v.phrase) for v in scan.violations] == [("a.py", "TODO")]
+        assert invalid["error"] == "Invalid scan request: 'updates'"
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+
+    def test_server_unavailable(self, tmp_path: Path) -> None:
+        """Test that a missing server is reported as an OSError so the hook can scan by itself."""
+        with pytest.raises(OSError, match="No such file"):
+            request_push_scan(tmp_path / "missing.sock", tmp_path, [], {}, 1)
+
+
+def _install_hook(server: Path, tmp_path: Path) -> None:
+    """Install the pre-receive hook, without a scan server, in a bare repository."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("hooks_dir: /tmp/.githooks_global\nforbidden_phrases: [TODO]\n")
+    hook_path = server / "hooks" / "pre-receive"
+    hook_path.write_text(
+        "#!/bin/sh\n"
+        f'PYTHONPATH="{Path(__file__).parents[1]}" exec "{sys.executable}" -m oddupiacz.cli_receive hook '
+        f'--config "{config_path}" --socket "{tmp_path / "missing.sock"}" --workers 1\n'
+    )
+    hook_path.chmod(0o755)
+
+
+class TestPreReceiveHook:
+    """End-to-end tests of the pre-receive hook installed in a local bare repository."""
+
+    def test_push_is_rejected(self, tmp_path: Path, repos: tuple[Path, Path, str]) -> None:
+        """Test that a push adding a forbidden phrase is rejected while a clean push is accepted."""
+        server, work, _ = repos
+        _install_hook(server, tmp_path)
+
+        _commit(work, {"a.py": b"# TODO\n"})
+        rejected = subprocess.run(  # noqa: S603
+            ["git", "-C", str(work), "push", str(server), "main"],  # noqa: S607
+            capture_output=True,
+            text=True,
+        )
+        _git("-C", str(work), "reset", "-q", "--hard", "HEAD~1")
+        clean = _commit(work, {"b.py": b"ok\n"})
+        _git("-C", str(work), "push", "-q", str(server), "main")
+
+        assert rejected.returncode != 0
+        assert "[BLOCKED] Forbidden phrase found: 'TODO'" in rejected.stderr
+        assert "Scan server unavailable" in rejected.stderr
+        assert "Push rejected." in rejected.stderr
+        assert _git("--git-dir", str(server), "rev-parse", "main") == clean
+
+    def test_self_whitelisting_push_is_rejected(self, tmp_path: Path, repos: tuple[Path, Path, str]) -> None:
+        """Test that a push adding a forbidden phrase together with a baseline listing it is rejected."""
+        server, work, base = repos
+        _install_hook(server, tmp_path)
+        write_baseline([Violation(phrase="TODO", file="a.py", line="x = 'TODO'")], work / BASELINE_FILE_NAME)
+        _commit(work, {"a.py": b"x = 'TODO'\n"})
+
+        rejected = subprocess.run(  # noqa: S603
+            ["git", "-C", str(work), "push", str(server), "main"],  # noqa: S607
+            capture_output=True,
+            text=True,
+        )
+
+        assert rejected.returncode != 0
+        assert "Push rejected." in rejected.stderr
+        assert _git("--git-dir", str(server), "rev-parse", "main") == base
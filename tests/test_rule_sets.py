@@ -0,0 +1,53 @@
+"""
+Unit tests for rule_sets.py module.
+"""
+
+import pytest
+
+from oddupiacz.models import RuleSet
+from oddupiacz.rule_sets import RuleSetIndex
+
+
+def _create_index(*paths: tuple[str, ...]) -> RuleSetIndex:
+    """Helper to create an index with one rule set per tuple of path globs."""
+    return RuleSetIndex([RuleSet(paths=globs, forbidden_phrases=("TODO",)) for globs in paths])
+
+
+class TestRuleSetIndex:
+    """Tests for RuleSetIndex class."""
+
+    @pytest.mark.parametrize(
+        ("path_glob", "path", "expected"),
+        [
+            ("src/**", "src/app.py", True),
+            ("src/**", "src/pkg/deep/app.py", True),
+            ("src/**", "scripts/app.py", False),
+            ("src/**", "lib/src/app.py", False),
+            ("src/", "src/pkg/app.py", True),
+            ("/src/*.py", "src/app.py", True),
+            ("src/*.py", "src/pkg/app.py", False),
+            ("*.ts", "index.ts", True),
+            ("*.ts", "web/components/button.ts", True),
+            ("*.ts", "web/components/button.tsx", False),
+            ("web/**/*.tsx", "web/components/button.tsx", True),
+            ("web/**/*.tsx", "web/button.tsx", True),
+            ("docs/README.md", "docs/README.md", True),
+            ("docs/README.md", "README.md", False),
+            ("src/*/migrations/*.sql", "src/billing/migrations/001.sql", True),
+            ("**/.env", "config/.env", True),
+        ],
+    )
+    def test_lookup_matches_globs(self, path_glob: str, path: str, expected: bool) -> None:
+        """Test glob matching for anchored, depth-independent and directory globs."""
+        index = _create_index((path_glob,))
+
+        assert index.lookup(path) == ((0,) if expected else ())
+
+    def test_lookup_returns_all_matching_rule_sets_in_order(self) -> None:
+        """Test that every matching rule set is returned once, in config order."""
+        index = _create_index(("*.ts",), ("scripts/**",), ("src/**", "*.ts"), ("src/web/**",))
+
+        assert index.lookup("src/web/app.ts") == (0, 2, 3)
+        assert index.lookup("src/app.py") == (2,)
+        assert index.lookup("scripts/build.py") == (1,)
+        assert index.lookup("setup.py") == ()
@@ -0,0 +1,252 @@
+"""
+Unit tests for safe_regex.py module.
+"""
+
+import pickle
+import random
+import re
+import time
+
+import pytest
+
+from oddupiacz.safe_regex import (
+    compile_safe_patterns,
+    MAX_NFA_STATES,
+    parse_pattern,
+    SafePatternSet,
+    UnsafePatternError,
+)
+
+
+def _find(pattern: str, text: str) -> str | None:
+    match = SafePatternSet((pattern,)).search(text)
+    return text[match.start : match.end] if match is not None else None
+
+
+class TestSafePatternSet:
+    """Tests for SafePatternSet class."""
+
+    @pytest.mark.parametrize(
+        ("pattern", "text", "expected"),
+        [
+            ("secret", "my SECRET key", "SECRET"),
+            (r"password\s*=\s*\w+", "db Password = hunter2;", "Password = hunter2"),
+            (r"api[_-]?key", "API-KEY here", "API-KEY"),
+            (r"\d{3}-\d{4}", "call 555-1234 now", "555-1234"),
+            (r"\d{3}-\d{4}", "call 55-1234 now", None),
+            ("colou?r", "the color red", "color"),
+            ("(foo|bar)+baz", "xx foobarbaz", "foobarbaz"),
+            ("(?:ab){2,3}", "abababab", "ababab"),
+            ("(?P<name>x)y", "axy", "xy"),
+            ("a{2,}", "caaaat", "aaaa"),
+            ("a.c", "a-c", "a-c"),
+            ("[a-c]+", "xxCAB", "CAB"),
+            ("x[^abc]y", "xAy xdy", "xdy"),
+            (r"\D\W\S", "1!b", None),
+            (r"\D\W\S", "a!b", "a!b"),
+            (r"[\d_]+", "ab__12", "__12"),
+            (r"[\b]x", "\bx", "\bx"),
+            (r"\x41B\U00000043", "abc", "abc"),
+            (r"\t\.", "a\t.b", "\t."),
+            ("x{", "ax{", "x{"),
+            ("[-a]+", "b-a-", "-a-"),
+            ("[a-]+", "b-a-", "-a-"),
+            ("[]a]+", "x]a", "]a"),
+            ("żółw", "ŻÓŁW", "ŻÓŁW"),
+        ],
+    )
+    def test_search(self, pattern: str, text: str, expected: str | None) -> None:
+        """Test finding matches with the supported syntax."""
+        assert _find(pattern, text) == expected
+
+    @pytest.mark.parametrize(
+        ("pattern", "text", "expected"),
+        [
+            ("^TODO", "TODO: later", "TODO"),
+            ("^TODO", "  TODO: later", None),
+            (r"\ATODO", "TODO: later", "TODO"),
+            ("end$", "the end", "end"),
+            ("end$", "the end.", None),
+            (r"end\Z", "the end", "end"),
+            ("^only$", "only", "only"),
+            ("^only$", "only this", None),
+            ("a$b", "a b ab", None),
+        ],
+    )
+    def test_anchors(self, pattern: str, text: str, expected: str | None) -> None:
+        """Test that anchors match only at the start and end of a line."""
+        assert _find(pattern, text) == expected
+
+    @pytest.mark.parametrize(
+        ("pattern", "text"),
+        [
+            ("b|(?:ab)*c", "axAabcAx"),
+            ("c|ab+c", "xabbbbc"),
+            ("x|a+y", "aaaay x"),
+            ("(?:a|b)*c|d", "ababd abc"),
+            ("b|a.*z", "xa b z"),
+            ("end$|n", "the end"),
+        ],
+    )
+    def test_span_matches_re(self, pattern: str, text: str) -> None:
+        """Test that the leftmost match is reported even if a match starting later completes first."""
+        match = SafePatternSet((pattern,)).search(text)
+        expected = re.search(pattern, text, re.IGNORECASE)
+
+        assert match is not None
+        assert expected is not None
+        assert (match.start, match.end) == expected.span()
+
+    def test_random_spans_match_re(self) -> None:
+        """Test that matches start where re finds them and are the longest match from there."""
+        rng = random.Random(1234)  # noqa: S311
+        atoms = ["a", "b", "c", ".", "[ab]", "(?:ab)", "(?:a|bc)"]
+        checked = 0
+        while checked < 300:
+            pattern = "".join(rng.choice(atoms) + rng.choice(["", "", "*", "+", "?"]) for _ in range(rng.randint(1, 3)))
+            if rng.random() < 0.5:
+                pattern += "|" + rng.choice(atoms) + rng.choice(["", "+"])
+            text = "".join(rng.choice("abcAB x") for _ in range(rng.randint(0, 12)))
+            try:
+                match = SafePatternSet((pattern,)).search(text)
+            except UnsafePatternError:
+                continue
+            checked += 1
+            compiled = re.compile(pattern, re.IGNORECASE)
+            expected = compiled.search(text)
+
+            assert (match is None) == (expected is None), (pattern, text)
+            if match is not None and expected is not None:
+                ends = [end for end in range(match.start, len(text) + 1) if compiled.fullmatch(text, match.start, end)]
+                assert (match.start, match.end) == (expected.start(), max(ends)), (pattern, text)
+
+    def test_multiple_patterns_report_first_match(self) -> None:
+        """Test that the leftmost match is reported with its pattern index."""
+        patterns = SafePatternSet(("token", "passw(or)?d"))
+
+        match = patterns.search("passwd and token")
+
+        assert match is not None
+        assert (match.start, match.end, match.pattern_index) == (0, 6, 1)
+        assert patterns.search("nothing here") is None
+
+    def test_search_groups(self) -> None:
+        """Test finding the leftmost match of each pattern group in one pass."""
+        patterns = SafePatternSet(("abcd", "bc", "x+", "zz"), groups=(0, 1, 2, 2))
+
+        matches = patterns.search_groups("zzabcd xx")
+
+        assert {group: (m.start, m.end, m.pattern_index) for group, m in matches.items()} == {
+            0: (2, 6, 0),
+            1: (3, 5, 1),
+            2: (0, 2, 3),
+        }
+        assert patterns.search_groups("nothing") == {}
+
+    def test_search_groups_at_line_end(self) -> None:
+        """Test that groups only matching at the end of a line are found."""
+        patterns = SafePatternSet(("end$", "the"), groups=(1, 0))
+
+        assert sorted(patterns.search_groups("the end")) == [0, 1]
+
+    def test_groups_must_match_patterns(self) -> None:
+        """Test that each pattern needs a group."""
+        with pytest.raises(ValueError, match="exactly one group"):
+            SafePatternSet(("a", "b"), groups=(0,))
+
+    def test_nested_quantifiers_run_in_linear_time(self) -> None:
+        """Test that patterns catastrophic for backtracking engines are matched quickly."""
+        patterns = SafePatternSet(("(a+)+b", "(a|aa)*c", "(x+x+)+y"))
+
+        started = time.monotonic()
+        assert patterns.search("a" * 50000 + "!") is None
+        assert patterns.search("x" * 50000) is None
+        assert time.monotonic() - started < 5
+
+    def test_state_explosion_is_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that patterns with exponentially large DFAs match correctly with a flushed state cache."""
+        monkeypatch.setattr("oddupiacz.safe_regex.MAX_DFA_STATES", 16)
+        patterns = SafePatternSet(("(a|b)*a(a|b){12}", "AKIA[0-9A-Z]{16}"))
+
+        assert patterns.search("ab" * 5000) is not None
+        assert patterns.search("b" * 12 + "a" + "b" * 11) is None
+        match = patterns.search("id=AKIAKIAKIA1234567890ABCDEF")
+        assert match is not None
+        assert (match.start, match.end, match.pattern_index) == (3, 23, 1)
+
+    def test_non_ascii_text(self) -> None:
+        """Test matching lines containing characters outside ASCII."""
+        patterns = SafePatternSet((r"klucz\s*:\s*.+",))
+
+        match = patterns.search("zażółć KLUCZ: gęślą")
+
+        assert match is not None
+        assert match.start == 7
+
+    def test_pickled_pattern_set(self) -> None:
+        """Test that a pickled pattern set keeps its patterns and groups and matches like the original."""
+        patterns = SafePatternSet(("end$", "the"), groups=(1, 0))
+        patterns.search_groups("the end")
+
+        restored = pickle.loads(pickle.dumps(patterns))  # noqa: S301
+
+        assert (restored.patterns, restored.groups) == (patterns.patterns, patterns.groups)
+        assert restored.search_groups("the end") == patterns.search_groups("the end")
+
+    def test_compile_safe_patterns_is_cached(self) -> None:
+        """Test that compiled pattern sets are reused."""
+        assert compile_safe_patterns(("abc",)) is compile_safe_patterns(("abc",))
+
+
+class TestUnsafePatterns:
+    """Tests for rejecting unsafe or unsupported patterns."""
+
+    @pytest.mark.parametrize(
+        ("pattern", "reason"),
+        [
+            ("", "cannot be empty"),
+            ("a*", "can match an empty string"),
+            ("(a|)", "can match an empty string"),
+            ("^$", "can match an empty string"),
+            (r"(a)\1", "backreferences are not supported"),
+            ("(?P<x>a)(?P=x)", "backreferences are not supported"),
+            ("(?=a)b", "lookaround assertions are not supported"),
+            ("(?<!a)b", "lookaround assertions are not supported"),
+            ("(?>a)", "atomic groups are not supported"),
+            ("(?(1)a|b)", "conditional groups are not supported"),
+            ("(?i)a", "inline flags"),
+            (r"\bword", "word boundaries"),
+            (r"\N{DASH}", "named characters"),
+            ("a++", "possessive quantifiers are not supported"),
+            ("a**", "multiple repeat"),
+            ("a{2}{3}", "multiple repeat"),
+            ("*a", "nothing to repeat"),
+            ("{2}a", "nothing to repeat"),
+            ("a{101}", "repetition counts above 100"),
+            ("a{3,2}", "min repeat greater than max repeat"),
+            ("(ab", "missing )"),
+            ("ab)", "unbalanced parenthesis"),
+            ("(?P<ab", "unterminated group name"),
+            ("[ab", "unterminated character set"),
+            ("[b-a]", "bad character range"),
+            (r"[a-\d]", "bad character range"),
+            (r"[\1]", "bad escape"),
+            (r"\q", "bad escape"),
+            ("a\\", "bad escape (end of pattern)"),
+            (r"\x4", "incomplete escape"),
+            (r"\U00110000", "bad escape"),
+            ("((ab){100}){100}", f"more than {MAX_NFA_STATES} automaton states"),
+        ],
+    )
+    def test_rejected_patterns(self, pattern: str, reason: str) -> None:
+        """Test that unsupported constructs are rejected with a clear reason."""
+        with pytest.raises(UnsafePatternError) as exc_info:
+            SafePatternSet(("ok", pattern))
+
+        assert exc_info.value.pattern == pattern
+        assert reason in str(exc_info.value)
+        assert f"'{pattern}'" in str(exc_info.value)
+
+    def test_parse_pattern_accepts_lazy_quantifiers(self) -> None:
+        """Test that lazy quantifiers are accepted and treated like greedy ones."""
+        assert parse_pattern("a+?b") == parse_pattern("a+b")
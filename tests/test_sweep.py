@@ -0,0 +1,169 @@
+"""
+Unit tests for sweep.py module.
+"""
+
+import io
+import json
+import subprocess
+from pathlib import Path
+
+from oddupiacz.baseline import BASELINE_FILE_NAME, write_baseline
+from oddupiacz.checker import MatcherResolver
+from oddupiacz.models import RepositoryScan, RuleSet, Severity, Violation
+from oddupiacz.sweep import find_repositories, scan_repository, sweep_repositories, write_sweep_records
+from tests.conftest import make_config
+
+
+def _create_repo(path: Path, files: dict[str, bytes]) -> Path:
+    """Create a git repository with the given files staged."""
+    subprocess.run(["git", "init", "-q", str(path)], check=True)  # noqa: S603, S607
+    for name, content in files.items():
+        (path / name).parent.mkdir(parents=True, exist_ok=True)
+        (path / name).write_bytes(content)
+    subprocess.run(["git", "-C", str(path), "add", "."], check=True)  # noqa: S603, S607
+    return path
+
+
+class TestFindRepositories:
+    """Tests for find_repositories function."""
+
+    def test_find_repositories(self, tmp_path: Path) -> None:
+        """Test that repositories are found in order, excluded names are skipped and repos are not descended."""
+        for name in ["b", "a", "legacy", "group/c", "a/vendor/nested"]:
+            (tmp_path / name / ".git").mkdir(parents=True)
+        (tmp_path / "worktree").mkdir()
+        (tmp_path / "worktree" / ".git").write_text("gitdir: /elsewhere\n")
+        (tmp_path / "plain").mkdir()
+
+        repos = list(find_repositories(tmp_path, ["legacy"]))
+
+        assert repos == [tmp_path / "a", tmp_path / "b", tmp_path / "group" / "c", tmp_path / "worktree"]
+
+
+class TestScanRepository:
+    """Tests for scan_repository function."""
+
+    def test_scan_tracked_files(self, tmp_path: Path) -> None:
+        """Test that tracked text files are scanned line by line with their rule sets."""
+        repo = _create_repo(
+            tmp_path / "repo",
+            {
+                "src/a.py": b"ok\n# TODO one\nprint(1)\n",
+                "docs/b.md": b"TODO skipped\n",
+                "tools/c.py": b"# FIXME later\nprint(2)\n",
+                "logo.png": b"\x89PNG\0TODO",
+                "big.txt": b"TODO\n" * 5,
+            },
+        )
+        (repo / "untracked.py").write_text("TODO untracked\n")
+        config = make_config(
+            exclude_extensions=[".md"],
+            max_file_lines=4,
+            rule_sets=[RuleSet(paths=("src/",), forbidden_phrases=("print(",))],
+        )
+
+        scan = scan_repository(repo, config, MatcherResolver(config))
+
+        assert scan.error is None
+        assert [(v.file, v.phrase, v.severity) for v in scan.violations] == [
+            ("src/a.py", "TODO", Severity.BLOCK),
+            ("src/a.py", "print(", Severity.BLOCK),
+            ("tools/c.py", "FIXME", Severity.WARN),
+        ]
+        assert (scan.files, scan.lines) == (2, 5)
+        assert scan.scanned_bytes == len(b"ok\n# TODO one\nprint(1)\n# FIXME later\nprint(2)\n")
+
+    def test_scan_skips_files_by_attributes(self, tmp_path: Path) -> None:
+        """Test that generated, vendored and oddupiacz=skip files are not scanned unless disabled."""
+        repo = _create_repo(
+            tmp_path / "repo",
+            {
+                ".gitattributes": b"gen/** linguist-generated\nthird_party/** linguist-vendored\n"
+                b"legacy.py oddupiacz=skip\n",
+                "gen/api.py": b"# TODO generated\n",
+                "third_party/lib.py": b"# TODO vendored\n",
+                "legacy.py": b"# TODO legacy\n",
+                "app.py": b"# TODO app\n",
+            },
+        )
+
+        scan = scan_repository(repo, make_config(), MatcherResolver(make_config()))
+        full_config = make_config(skip_generated=False)
+        full_scan = scan_repository(repo, full_config, MatcherResolver(full_config))
+
+        assert [v.file for v in scan.violations] == ["app.py"]
+        assert sorted(v.file for v in full_scan.violations) == [
+            "app.py",
+            "gen/api.py",
+            "legacy.py",
+            "third_party/lib.py",
+        ]
+
+    def test_scan_with_baseline(self, tmp_path: Path) -> None:
+        """Test that violations in the repository's baseline are only reported without it."""
+        repo = _create_repo(tmp_path / "repo", {"a.py": b"# TODO old\nprint(1)\n# TODO new\n"})
+        config = make_config()
+        known = scan_repository(repo, config, MatcherResolver(config)).violations[:1]
+        write_baseline(known, repo / BASELINE_FILE_NAME)
+        (repo / "a.py").write_text("print(0)\n    # TODO  old\nprint(1)\n# TODO new\n")
+
+        scan = scan_repository(repo, config, MatcherResolver(config))
+        full_scan = scan_repository(repo, config, MatcherResolver(config), use_baseline=False)
+
+        assert [v.line for v in scan.violations] == ["# TODO new"]
+        assert [v.line for v in full_scan.violations] == ["# TODO  old", "# TODO new"]
+
+    def test_scan_invalid_baseline(self, tmp_path: Path) -> None:
+        """Test that an invalid baseline is reported as an error."""
+        repo = _create_repo(tmp_path / "repo", {"a.py": b"# TODO\n"})
+        (repo / BASELINE_FILE_NAME).write_bytes(b"garbage")
+        config = make_config()
+
+        scan = scan_repository(repo, config, MatcherResolver(config))
+
+        assert scan.error is not None
+        assert "Invalid baseline file" in scan.error
+
+    def test_scan_not_a_repository(self, tmp_path: Path) -> None:
+        """Test that a directory git cannot read is reported as an error."""
+        (tmp_path / "broken" / ".git").mkdir(parents=True)
+        config = make_config()
+
+        scan = scan_repository(tmp_path / "broken", config, MatcherResolver(config))
+
+        assert scan.error is not None
+        assert scan.violations == []
+
+
+class TestSweepRepositories:
+    """Tests for sweep_repositories function."""
+
+    def test_sweep_in_process_pool(self, tmp_path: Path) -> None:
+        """Test that worker processes scan every repository with the preloaded rules."""
+        repos = [_create_repo(tmp_path / name, {"a.py": f"TODO {name}\n".encode()}) for name in ["one", "two", "three"]]
+        config = make_config()
+
+        scans = list(sweep_repositories(repos, config, MatcherResolver(config), workers=2))
+
+        assert sorted((scan.repo.name, [v.line for v in scan.violations]) for scan in scans) == [
+            ("one", ["TODO one"]),
+            ("three", ["TODO three"]),
+            ("two", ["TODO two"]),
+        ]
+
+
+class TestWriteSweepRecords:
+    """Tests for write_sweep_records function."""
+
+    def test_write_records(self) -> None:
+        """Test writing one JSON object per violation and one per error."""
+        report = io.StringIO()
+        violation = Violation(phrase="TODO", file="a.py", line="# TODO żółw", severity=Severity.WARN)
+
+        write_sweep_records(RepositoryScan(repo=Path("/src/one"), violations=[violation]), report)
+        write_sweep_records(RepositoryScan(repo=Path("/src/two"), error="Cannot list tracked files"), report)
+
+        assert [json.loads(line) for line in report.getvalue().splitlines()] == [
+            {"repo": "/src/one", "file": "a.py", "severity": "warn", "phrase": "TODO", "line": "# TODO żółw"},
+            {"repo": "/src/two", "error": "Cannot list tracked files"},
+        ]
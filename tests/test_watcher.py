@@ -0,0 +1,164 @@
+"""
+Unit tests for watcher.py module.
+"""
+
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from oddupiacz.checker import MatcherResolver
+from oddupiacz.config import Config
+from oddupiacz.models import FileDiff
+from oddupiacz.overlay import MergedConfig
+from oddupiacz.prescan import PrescanStore
+from oddupiacz.watcher import IN_CLOSE_WRITE, Inotify, PendingChanges, RepositoryWatcher
+
+
+def _git(*args: str) -> None:
+    """Run a git command in the current directory."""
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], check=True)  # noqa: S603, S607
+
+
+@pytest.fixture()
+def git_repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create a git repository with one commit and chdir into it."""
+    repo_root = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)  # noqa: S603, S607
+    monkeypatch.chdir(repo_root)
+    (repo_root / ".gitignore").write_text("build/\n")
+    (repo_root / "src").mkdir()
+    (repo_root / "src" / "a.py").write_text("print(1)\n")
+    (repo_root / "build").mkdir()
+    _git("add", ".")
+    _git("commit", "-qm", "init")
+    return repo_root
+
+
+@pytest.fixture()
+def watcher(git_repo: Path, tmp_path: Path) -> Iterator[RepositoryWatcher]:
+    """Create a watcher for the repository with an empty verdict store."""
+    config = Config(
+        hooks_dir=tmp_path / "hooks",
+        forbidden_phrases=["TODO"],
+        exclude_paths=[],
+        exclude_files=[],
+        exclude_extensions=[],
+        exclude_repos=[],
+    )
+    merged = MergedConfig(config=config, resolver=MatcherResolver(config))
+    repo_watcher = RepositoryWatcher(git_repo, git_repo / ".git" / "index", merged, PrescanStore(tmp_path / "store"))
+    yield repo_watcher
+    repo_watcher.close()
+
+
+def _drain(repo_watcher: RepositoryWatcher) -> PendingChanges:
+    """Collect all queued events."""
+    pending = PendingChanges()
+    while events := repo_watcher._inotify.read(0.1):
+        repo_watcher.collect(events, pending)
+    return pending
+
+
+class TestInotify:
+    """Tests for Inotify class."""
+
+    def test_read_events(self, tmp_path: Path) -> None:
+        """Test that file writes in a watched directory are reported."""
+        inotify = Inotify()
+        try:
+            inotify.add_watch(tmp_path, IN_CLOSE_WRITE)
+            (tmp_path / "a.txt").write_text("x")
+
+            events = inotify.read(1)
+        finally:
+            inotify.close()
+
+        assert [(event.path, bool(event.mask & IN_CLOSE_WRITE)) for event in events] == [(tmp_path / "a.txt", True)]
+
+    def test_read_timeout(self, tmp_path: Path) -> None:
+        """Test that no events are returned when nothing happens."""
+        inotify = Inotify()
+        try:
+            inotify.add_watch(tmp_path, IN_CLOSE_WRITE)
+            assert inotify.read(0) == []
+        finally:
+            inotify.close()
+
+    def test_add_watch_missing_directory(self, tmp_path: Path) -> None:
+        """Test that watching a missing directory raises OSError."""
+        inotify = Inotify()
+        try:
+            with pytest.raises(OSError, match="missing"):
+                inotify.add_watch(tmp_path / "missing", IN_CLOSE_WRITE)
+        finally:
+            inotify.close()
+
+
+class TestRepositoryWatcher:
+    """Tests for RepositoryWatcher class."""
+
+    def test_working_tree_changes(self, git_repo: Path, watcher: RepositoryWatcher) -> None:
+        """Test that edited files are pre-scanned against HEAD and ignored directories are not watched."""
+        (git_repo / "src" / "a.py").write_text("print(1)\n# TODO\n")
+        (git_repo / "build" / "out.py").write_text("# TODO\n")
+
+        pending = _drain(watcher)
+
+        assert pending.paths == {"src/a.py"}
+        assert not pending.index_changed
+        assert watcher.prescan(pending) == 1
+        verdict = watcher.store.lookup(FileDiff(path="src/a.py", added_lines=["# TODO"]))
+        assert verdict is not None
+        assert [violation.phrase for violation in verdict] == ["TODO"]
+
+    def test_index_and_new_directories(self, git_repo: Path, watcher: RepositoryWatcher) -> None:
+        """Test that staging updates the index and new directories are watched."""
+        (git_repo / "docs").mkdir()
+        pending = _drain(watcher)
+        assert pending.rescan_all
+
+        (git_repo / "docs" / "b.md").write_text("clean\n")
+        _git("add", "docs/b.md")
+        pending = _drain(watcher)
+
+        assert pending.index_changed
+        assert "docs/b.md" in pending.paths
+        assert watcher.prescan(pending) == 1
+        assert watcher.store.lookup(FileDiff(path="docs/b.md", added_lines=["clean"])) == []
+
+    def test_run_prescans_existing_changes(self, git_repo: Path, watcher: RepositoryWatcher) -> None:
+        """Test that the watcher pre-scans current changes before waiting for events."""
+        (git_repo / "src" / "a.py").write_text("print(2)\n")
+        _git("add", ".")
+        scans: list[int] = []
+
+        watcher.run(on_scan=scans.append, stop=lambda: bool(scans))
+
+        assert scans == [1]
+        assert watcher.store.lookup(FileDiff(path="src/a.py", added_lines=["print(2)"])) == []
+
+    def test_prescan_without_head(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a repository without commits only pre-scans the index."""
+        subprocess.run(["git", "init", "-q", str(tmp_path / "empty")], check=True)  # noqa: S603, S607
+        monkeypatch.chdir(tmp_path / "empty")
+        (tmp_path / "empty" / "a.py").write_text("TODO\n")
+        _git("add", "a.py")
+        config = Config(
+            hooks_dir=tmp_path / "hooks",
+            forbidden_phrases=["TODO"],
+            exclude_paths=[],
+            exclude_files=[],
+            exclude_extensions=[],
+            exclude_repos=[],
+        )
+        merged = MergedConfig(config=config, resolver=MatcherResolver(config))
+        store = PrescanStore(tmp_path / "store")
+        repo_watcher = RepositoryWatcher(tmp_path / "empty", tmp_path / "empty" / ".git" / "index", merged, store)
+        try:
+            scanned = repo_watcher.prescan(PendingChanges(index_changed=True, rescan_all=True))
+        finally:
+            repo_watcher.close()
+
+        assert scanned == 1
@@ -0,0 +1,172 @@
+"""
+Unit tests for wordlists.py module.
+"""
+
+import os
+import pickle
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from oddupiacz.case_folding import fold_case
+from oddupiacz.wordlists import (
+    build_automaton,
+    compile_phrase_files,
+    HEADER,
+    InvalidAutomatonError,
+    PhraseAutomaton,
+    read_terms,
+)
+
+
+def _create_automaton(tmp_path: Path, terms: list[str]) -> PhraseAutomaton:
+    """Helper to build an automaton file from terms in priority order."""
+    priorities: dict[str, int] = {}
+    for term in terms:
+        priorities.setdefault(fold_case(term), len(priorities))
+    path = tmp_path / "phrases.bin"
+    path.write_bytes(build_automaton(priorities))
+    return PhraseAutomaton(path)
+
+
+def _write_wordlist(path: Path, terms: list[str]) -> Path:
+    """Helper to write a wordlist and move its modification time forward."""
+    path.write_text("\n".join(terms) + "\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return path
+
+
+class TestReadTerms:
+    """Tests for read_terms function."""
+
+    def test_read_terms_in_order(self, tmp_path: Path) -> None:
+        """Test that terms are stripped, case-folded and deduplicated in file order."""
+        first = _write_wordlist(tmp_path / "a.txt", ["  Acme Corp ", "", "Globex"])
+        second = _write_wordlist(tmp_path / "b.txt", ["globex", "Initech"])
+
+        assert read_terms([first, second]) == {"acme corp": 0, "globex": 1, "initech": 2}
+
+    def test_non_utf8_wordlist_raises_error(self, tmp_path: Path) -> None:
+        """Test that a wordlist that is not UTF-8 is reported with its path."""
+        wordlist = tmp_path / "latin1.txt"
+        wordlist.write_bytes("acme\nżółw\n".encode("iso-8859-2"))
+
+        with pytest.raises(ValueError, match="latin1.txt is not valid UTF-8"):
+            read_terms([wordlist])
+
+
+class TestPhraseAutomaton:
+    """Tests for PhraseAutomaton class."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("ushers", (1, 4)),
+            ("a his b", (2, 5)),
+            ("hhe", (1, 3)),
+            ("Contract with ACME Corp.", (14, 23)),
+            ("sh", None),
+            ("", None),
+        ],
+    )
+    def test_search(self, tmp_path: Path, text: str, expected: tuple[int, int] | None) -> None:
+        """Test finding the leftmost term, including terms found through failure links."""
+        automaton = _create_automaton(tmp_path, ["he", "she", "his", "hers", "acme corp"])
+
+        assert automaton.search(text) == expected
+
+    def test_same_start_prefers_first_listed_term(self, tmp_path: Path) -> None:
+        """Test that the first listed term wins when several start at the same position."""
+        assert _create_automaton(tmp_path, ["abcd", "ab"]).search("xabcd") == (1, 5)
+        assert _create_automaton(tmp_path, ["ab", "abcd"]).search("xabcd") == (1, 3)
+
+    def test_longer_term_starting_earlier_wins(self, tmp_path: Path) -> None:
+        """Test that a term ending later but starting earlier is preferred."""
+        automaton = _create_automaton(tmp_path, ["cd", "abcdef"])
+
+        assert automaton.search("abcdef") == (0, 6)
+
+    def test_matches_regex_alternation(self, tmp_path: Path) -> None:
+        """Test that results agree with a case-insensitive regex alternation of the same terms."""
+        rng = random.Random(7)  # noqa: S311
+        terms = list(dict.fromkeys("".join(rng.choice("abC") for _ in range(rng.randint(1, 4))) for _ in range(30)))
+        automaton = _create_automaton(tmp_path, terms)
+        regex = re.compile("|".join(map(re.escape, terms)), re.IGNORECASE)
+
+        for _ in range(300):
+            text = "".join(rng.choice("aBcx") for _ in range(rng.randint(0, 12)))
+            match = regex.search(text)
+            assert automaton.search(text) == (match.span() if match else None), text
+
+    def test_pickle_maps_file_again(self, tmp_path: Path) -> None:
+        """Test that a pickled automaton is restored from its file."""
+        automaton = _create_automaton(tmp_path, ["globex"])
+
+        restored = pickle.loads(pickle.dumps(automaton))  # noqa: S301
+
+        assert restored.path == automaton.path
+        assert restored.search("GLOBEX") == (0, 6)
+
+    @pytest.mark.parametrize("content", [b"short", b"NOTMAGIC" + bytes(HEADER.size)])
+    def test_invalid_file_raises_error(self, tmp_path: Path, content: bytes) -> None:
+        """Test that truncated or foreign files are rejected."""
+        path = tmp_path / "phrases.bin"
+        path.write_bytes(content)
+
+        with pytest.raises(InvalidAutomatonError):
+            PhraseAutomaton(path)
+
+    def test_truncated_arrays_raise_error(self, tmp_path: Path) -> None:
+        """Test that a file with missing array data is rejected."""
+        path = tmp_path / "phrases.bin"
+        path.write_bytes(build_automaton({"globex": 0})[:-4])
+
+        with pytest.raises(InvalidAutomatonError):
+            PhraseAutomaton(path)
+
+
+class TestCompilePhraseFiles:
+    """Tests for compile_phrase_files function."""
+
+    def test_compiles_and_reuses_file(self, tmp_path: Path) -> None:
+        """Test that an up-to-date automaton file is reused instead of rebuilt."""
+        wordlist = _write_wordlist(tmp_path / "terms.txt", ["Globex"])
+        cache_dir = tmp_path / "cache"
+
+        path = compile_phrase_files((wordlist,), cache_dir)
+        inode = path.stat().st_ino
+
+        assert compile_phrase_files((wordlist,), cache_dir) == path
+        assert path.stat().st_ino == inode
+        assert PhraseAutomaton(path).search("globex inc") == (0, 6)
+
+    def test_rebuilds_when_wordlist_changes(self, tmp_path: Path) -> None:
+        """Test that changing a wordlist builds a new automaton file and removes the old one."""
+        wordlist = _write_wordlist(tmp_path / "terms.txt", ["Globex"])
+        cache_dir = tmp_path / "cache"
+        old_path = compile_phrase_files((wordlist,), cache_dir)
+        old_automaton = PhraseAutomaton(old_path)
+
+        _write_wordlist(wordlist, ["Initech"])
+        path = compile_phrase_files((wordlist,), cache_dir)
+
+        assert path != old_path
+        assert PhraseAutomaton(path).search("globex initech") == (7, 14)
+        assert old_automaton.search("globex initech") == (0, 6)
+        assert list(cache_dir.iterdir()) == [path]
+
+    def test_rebuilds_unusable_file(self, tmp_path: Path) -> None:
+        """Test that a corrupt automaton file is replaced."""
+        wordlist = _write_wordlist(tmp_path / "terms.txt", ["Globex"])
+        path = compile_phrase_files((wordlist,), tmp_path)
+        path.write_bytes(b"corrupt")
+
+        assert PhraseAutomaton(compile_phrase_files((wordlist,), tmp_path)).search("globex") == (0, 6)
+
+    def test_missing_wordlist_raises_error(self, tmp_path: Path) -> None:
+        """Test that a missing wordlist is reported."""
+        with pytest.raises(OSError, match="missing.txt"):
+            compile_phrase_files((tmp_path / "missing.txt",), tmp_path / "cache")